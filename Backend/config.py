@@ -8,6 +8,15 @@ from pydantic_settings import BaseSettings
 from typing import List
 import os
 
+# Thư mục Backend: gốc của các đường dẫn tương đối trong settings dùng chung
+# giữa API server và script (chạy từ thư mục khác)
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def backend_path(path: str) -> str:
+    """Đường dẫn tương đối tính từ BACKEND_DIR (đường dẫn tuyệt đối giữ nguyên)"""
+    return path if os.path.isabs(path) else os.path.join(BACKEND_DIR, path)
+
 
 class Settings(BaseSettings):
     """
@@ -37,6 +46,34 @@ class Settings(BaseSettings):
         """Tạo database connection string"""
         return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
     
+    # ========== Pagination Settings ==========
+    COUNT_CACHE_TTL_SECONDS: int = 60  # count_strategy="cached"
+    COUNT_CACHE_MAX_SIZE: int = 1024
+    COUNT_ESTIMATE_THRESHOLD: int = 1000  # Dưới ngưỡng này "estimate" đếm chính xác
+    
+    # ========== Analytics Cache Settings ==========
+    ANALYTICS_CACHE_TTL_SECONDS: int = 300  # Bị xóa sớm hơn khi có ghi farms/history
+    ANALYTICS_CACHE_MAX_SIZE: int = 512
+    
+    # ========== Vector Tile Settings ==========
+    TILE_CACHE_DIR: str = "cache/tiles"
+    TILE_CACHE_MAX_ZOOM: int = 14  # Zoom sâu hơn không cache (ít người xem, nhiều tile)
+    TILE_CACHE_TTL_SECONDS: int = 24 * 3600  # Tile cũ hơn (mtime) được dựng lại
+    
+    # ========== Boundary Files ==========
+    BOUNDARY_DIR: str = "static/boundaries"  # Output của scripts/convert_shapefile_to_geojson.py
+    
+    # ========== Coordinate Validation ==========
+    COORDINATE_VALIDATION_ENABLED: bool = True  # Kiểm tra tọa độ vùng trồng thuộc tỉnh khai báo
+    COORDINATE_TOLERANCE_DEGREES: float = 0.02  # ~2 km quanh ranh giới (polygon đã đơn giản hóa)
+    PROVINCE_BOUNDARY_FILE: str = "../Frontend/public/data/vietnam-provinces.geojson"  # Khi DB chưa có don_vi_hanh_chinh
+    
+    # ========== Farm Cluster Settings ==========
+    CLUSTER_INDEX_WAIT_SECONDS: float = 5.0  # Request chờ index cluster dựng xong (lúc startup) tối đa
+    CLUSTER_INDEX_CHECK_SECONDS: float = 30.0  # Kiểm tra phiên bản dữ liệu (ghi ngoài API) tối đa mỗi N giây
+    CLUSTER_INDEX_MAX_AGE_SECONDS: int = 3600  # Dựng lại dù không thấy thay đổi
+    FARM_DATA_VERSION_FILE: str = "cache/farm_data_version"  # Script nạp hàng loạt tăng thế hệ (mark_farm_data_changed)
+    
     # ========== CORS Settings ==========
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
     
@@ -49,6 +86,8 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str = "your-secret-key-change-this-in-production"
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
+    USER_CACHE_TTL_SECONDS: int = 60  # Cache user đã xác thực (get_current_user)
+    USER_CACHE_MAX_SIZE: int = 1024
     
     # ========== Upload Settings ==========
     UPLOAD_DIR: str = "uploads"
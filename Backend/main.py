@@ -9,10 +9,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from config import settings
-from database import engine, Base
+from database import engine, Base, SessionLocal
+from utils.auth import user_cache
+from utils.response_cache import analytics_cache
+from utils.farm_clusters import farm_cluster_index
+from utils.coordinate_validation import province_validator
+from utils.input_rollup import ensure_rollup_table
 
 # Import all routes
-from routes import auth, farms, history, categories, qr, users, analytics, feedback
+from routes import auth, farms, history, categories, qr, users, analytics, feedback, tiles, boundaries
 
 # Create FastAPI app
 app = FastAPI(
@@ -45,6 +50,8 @@ app.include_router(qr.router, prefix=settings.API_PREFIX)
 app.include_router(users.router, prefix=settings.API_PREFIX)
 app.include_router(analytics.router, prefix=settings.API_PREFIX)
 app.include_router(feedback.router, prefix=settings.API_PREFIX)
+app.include_router(tiles.router, prefix=settings.API_PREFIX)
+app.include_router(boundaries.router, prefix=settings.API_PREFIX)
 
 
 # ========== Root Endpoint ==========
@@ -66,7 +73,13 @@ async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "database": "connected"
+        "database": "connected",
+        "caches": {
+            "users": user_cache.stats(),
+            "analytics": analytics_cache.stats(),
+            "farm_clusters": farm_cluster_index.stats()
+        },
+        "coordinate_validation": province_validator.stats()
     }
 
 
@@ -81,6 +94,26 @@ async def startup_event():
     print(f"📊 Database: {settings.DATABASE_URL}")
     print(f"🌐 CORS Origins: {settings.cors_origins_list}")
     print(f"📝 API Docs: http://localhost:8000/docs")
+    
+    # Polygon tỉnh cho kiểm tra tọa độ vùng trồng (nạp một lần)
+    db = SessionLocal()
+    try:
+        province_count = province_validator.load(db)
+    finally:
+        db.close()
+    print(f"🗺️  Province polygons: {province_count} ({province_validator.source or 'validation disabled'})")
+    
+    # Bảng rollup vật tư: ghi lịch sử canh tác cập nhật bảng này
+    db = SessionLocal()
+    try:
+        rollup_ready = ensure_rollup_table(db)
+    finally:
+        db.close()
+    print(f"📦 Input usage rollup: {'ready' if rollup_ready else 'unavailable (history writes skip it)'}")
+    
+    # Index cluster vùng trồng dựng trong thread nền, không chặn startup / event loop
+    farm_cluster_index.start_build(SessionLocal)
+    print("🧭 Farm cluster index: building in background")
     print("=" * 70)
 
 
@@ -0,0 +1,36 @@
+"""
+Migration script to add normalized quantity columns to lich_su_canh_tac table
+
+- so_luong: numeric quantity parsed from lieu_luong (canonical unit)
+- don_vi_chuan: canonical unit ('kg' or 'L')
+
+Run scripts/backfill_history_quantity.py afterwards to fill existing rows.
+"""
+from sqlalchemy import create_engine, text
+import sys
+sys.path.append('..')
+from config import settings
+
+def upgrade():
+    """Add so_luong / don_vi_chuan columns and index on vung_trong_id"""
+    engine = create_engine(settings.DATABASE_URL)
+    
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("""
+                ALTER TABLE lich_su_canh_tac
+                ADD COLUMN IF NOT EXISTS so_luong NUMERIC(14, 4),
+                ADD COLUMN IF NOT EXISTS don_vi_chuan VARCHAR(10)
+            """))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_lich_su_canh_tac_vung_trong_id
+                ON lich_su_canh_tac (vung_trong_id)
+            """))
+            conn.commit()
+            print("✅ Added so_luong, don_vi_chuan columns to lich_su_canh_tac table")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            raise
+
+if __name__ == "__main__":
+    upgrade()
@@ -7,6 +7,8 @@ from models.input import PhanBon, ThuocBVTV, GiongCay
 from models.cultivation import VuMua, LichSuCanhTac
 from models.alert import BaoDong
 from models.feedback import Feedback
+from models.input_usage import TongHopVatTu
+from models.admin_unit import DonViHanhChinh
 
 # Export all
 __all__ = [
@@ -22,4 +24,6 @@ __all__ = [
     "LichSuCanhTac",
     "BaoDong",
     "Feedback",
+    "TongHopVatTu",
+    "DonViHanhChinh",
 ]
@@ -0,0 +1,41 @@
+# Administrative Unit Model - Đơn vị hành chính (tỉnh / huyện)
+from sqlalchemy import Column, Integer, SmallInteger, String, Numeric, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import deferred
+from geoalchemy2 import Geometry
+from models.base import Base
+
+# Giá trị cap
+CAP_TINH = 1
+CAP_HUYEN = 2
+
+
+class DonViHanhChinh(Base):
+    """
+    Ranh giới hành chính nạp từ shapefile Database/data_space/VNM_adm
+    
+    Được nạp và gán cho vung_trong.tinh_id / huyen_id bởi
+    scripts/assign_admin_units.py.
+    """
+    __tablename__ = "don_vi_hanh_chinh"
+    __table_args__ = (
+        UniqueConstraint("cap", "ma", name="uq_don_vi_hanh_chinh_cap_ma"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cap = Column(SmallInteger, nullable=False, index=True)  # 1 = tỉnh, 2 = huyện
+    ma = Column(String(50), nullable=False)  # Mã trong shapefile (GID_1 / GID_2)
+    ten = Column(String(200), nullable=False)
+    parent_id = Column(Integer, ForeignKey("don_vi_hanh_chinh.id"), nullable=True)
+    
+    # Tâm (trọng số diện tích) và điểm nhãn (luôn nằm trong polygon),
+    # ghi bởi scripts/extract_province_centroids.py --write-db
+    tam_lat = Column(Numeric(10, 6), nullable=True)
+    tam_lon = Column(Numeric(10, 6), nullable=True)
+    nhan_lat = Column(Numeric(10, 6), nullable=True)
+    nhan_lon = Column(Numeric(10, 6), nullable=True)
+    
+    # Deferred: polygon lớn, chỉ dùng trong truy vấn không gian
+    geom = deferred(Column(Geometry("MULTIPOLYGON", srid=4326), nullable=True))
+    
+    def __repr__(self):
+        return f"<DonViHanhChinh(cap={self.cap}, ten='{self.ten}')>"
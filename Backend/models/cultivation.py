@@ -1,5 +1,5 @@
 # Cultivation Models - Lịch sử canh tác, Vụ mùa
-from sqlalchemy import Column, Integer, String, Text, Date, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, Date, ForeignKey, DateTime, Numeric
 from sqlalchemy.orm import relationship
 from models.base import Base, TimestampMixin
 
@@ -28,7 +28,7 @@ class LichSuCanhTac(Base, TimestampMixin):
     __tablename__ = "lich_su_canh_tac"
     
     id = Column(Integer, primary_key=True, index=True)
-    vung_trong_id = Column(Integer, ForeignKey("vung_trong.id", ondelete="CASCADE"))
+    vung_trong_id = Column(Integer, ForeignKey("vung_trong.id", ondelete="CASCADE"), index=True)
     vu_mua_id = Column(Integer, ForeignKey("vu_mua.id"))
     loai_hoat_dong_id = Column(Integer, ForeignKey("loai_hoat_dong.id"))
     
@@ -44,6 +44,10 @@ class LichSuCanhTac(Base, TimestampMixin):
     lieu_luong = Column(String(200))
     don_vi = Column(String(100))
     
+    # Normalized quantity (parsed from lieu_luong/don_vi on write, see utils/quantity.py)
+    so_luong = Column(Numeric(14, 4), nullable=True)
+    don_vi_chuan = Column(String(10), nullable=True)  # 'kg' or 'L'
+    
     # Relationships
     vung_trong = relationship("VungTrong", back_populates="lich_su")
     vu_mua = relationship("VuMua")
@@ -1,6 +1,7 @@
 # Farm (Vùng trồng) Model
 from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
+from geoalchemy2 import Geometry
 from models.base import Base, TimestampMixin
 
 
@@ -26,11 +27,20 @@ class VungTrong(Base, TimestampMixin):
     tinh_name = Column(String(100))
     thi_truong_xuat_khau = Column(String(200))
     
+    # Đơn vị hành chính theo tọa độ (scripts/assign_admin_units.py)
+    tinh_id = Column(Integer, ForeignKey("don_vi_hanh_chinh.id"), nullable=True, index=True)
+    huyen_id = Column(Integer, ForeignKey("don_vi_hanh_chinh.id"), nullable=True, index=True)
+    
     # GPS Coordinates (optional)
     latitude = Column(Numeric(10, 6), nullable=True)
     longitude = Column(Numeric(10, 6), nullable=True)
     
-    # Farm input data (fertilizer and pesticide volumes in kg)
+    # PostGIS point, synced from latitude/longitude by trigger
+    # (Database/migrations/add_geom_to_vung_trong.sql). Deferred: only
+    # used in WHERE clauses, never loaded with the row.
+    geom = deferred(Column(Geometry("POINT", srid=4326), nullable=True))
+    
+    # Farm input data: fertilizer in kg, pesticide in L (utils/input_rollup.VOLUME_UNITS)
     fertilizer_volume = Column(Numeric(10, 2), default=0)
     pesticide_volume = Column(Numeric(10, 2), default=0)
     
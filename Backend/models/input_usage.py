@@ -0,0 +1,39 @@
+# Input Usage Rollup Model - Tổng hợp vật tư theo vùng trồng / tháng
+from sqlalchemy import Column, Integer, String, Date, Numeric, ForeignKey, UniqueConstraint
+from models.base import Base
+
+# Giá trị loai_vat_tu
+LOAI_PHAN_BON = "phan_bon"
+LOAI_THUOC_BVTV = "thuoc_bvtv"
+
+
+class TongHopVatTu(Base):
+    """
+    Tổng hợp sử dụng vật tư theo vùng trồng, tháng và loại vật tư (rollup)
+    
+    Được cập nhật tăng dần khi tạo/sửa/xóa LichSuCanhTac (utils/input_rollup.py),
+    dựng lại toàn bộ bằng scripts/rebuild_input_rollup.py. Bảng được tạo bởi
+    Database/migrations/add_tong_hop_vat_tu.sql hoặc lúc startup (ensure_rollup_table).
+    
+    Mỗi đơn vị chuẩn (kg / L) một dòng riêng: không cộng kg với L.
+    """
+    __tablename__ = "tong_hop_vat_tu"
+    __table_args__ = (
+        UniqueConstraint(
+            "vung_trong_id", "thang", "loai_vat_tu", "vat_tu_id", "don_vi_chuan",
+            name="uq_tong_hop_vat_tu"
+        ),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    vung_trong_id = Column(Integer, ForeignKey("vung_trong.id", ondelete="CASCADE"), nullable=False, index=True)
+    thang = Column(Date, nullable=False, index=True)  # Ngày đầu tháng
+    loai_vat_tu = Column(String(20), nullable=False)  # phan_bon, thuoc_bvtv
+    vat_tu_id = Column(Integer, nullable=False)  # phan_bon.id hoặc thuoc_bvtv.id
+    don_vi_chuan = Column(String(10), nullable=False)  # kg hoặc L (lịch sử không có đơn vị: kg / L theo loại)
+    
+    so_lan = Column(Integer, nullable=False, default=0)  # Số lần sử dụng
+    tong_so_luong = Column(Numeric(16, 4), nullable=False, default=0)  # Theo don_vi_chuan
+    
+    def __repr__(self):
+        return f"<TongHopVatTu(vung_trong_id={self.vung_trong_id}, thang='{self.thang}', loai='{self.loai_vat_tu}')>"
@@ -1,17 +1,29 @@
 # Analytics Routes - Admin Dashboard APIs
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract, desc
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, extract, desc, case, true
 from datetime import datetime, timedelta
 from typing import Optional
 
-from database import get_db
+import numpy as np
+
+from config import settings
+from database import SessionLocal, get_db
 from models import (
     VungTrong, LichSuCanhTac, VuMua, BaoDong, 
-    LoaiCayTrong, User, PhanBon, ThuocBVTV, GiongCay
+    LoaiCayTrong, LoaiHoatDong, User, PhanBon, ThuocBVTV, GiongCay, TongHopVatTu,
+    DonViHanhChinh
 )
+from models.input_usage import LOAI_PHAN_BON, LOAI_THUOC_BVTV
+from models.admin_unit import CAP_TINH
 from routes.auth import get_current_active_user, require_manager_or_admin
 from utils.permission import get_province_filter
+from utils.admin_boundaries import province_lookup
+from utils.response_cache import analytics_cache, cache_response
+from utils.spatial import BBox, farm_within_bbox, parse_bbox
+from utils.farm_clusters import farm_cluster_index
+from utils.input_rollup import DEFAULT_UNITS, VOLUME_UNITS
+from utils.spatial_grid import GRID_SQUARE, GridCells, aggregate_grid, cell_polygon, cells_in_bbox
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
@@ -20,6 +32,7 @@ router = APIRouter(prefix="/analytics", tags=["Analytics"])
 # ==================== KPI Endpoints ====================
 
 @router.get("/kpi/overview")
+@cache_response
 async def get_kpi_overview(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_manager_or_admin)
@@ -57,6 +70,7 @@ async def get_kpi_overview(
 
 
 @router.get("/kpi/alerts")
+@cache_response
 async def get_alert_kpi(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_manager_or_admin)
@@ -90,7 +104,119 @@ async def get_alert_kpi(
     }
 
 
+@router.get("/kpi/summary")
+@cache_response
+async def get_kpi_summary(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_manager_or_admin)
+):
+    """
+    All dashboard KPI cards in one round trip
+    
+    Combines /kpi/overview and /kpi/alerts. Managers only see their province:
+    farms by tinh_name, seasons/alerts through their farm, farmers owning
+    a farm in the province.
+    """
+    province_filter = get_province_filter(current_user)
+    row = query_kpi_summary(db, province_filter)
+    
+    return {
+        "total_farms": row.total_farms,
+        "total_area": float(row.total_area),
+        "active_seasons": row.active_seasons,
+        "total_farmers": row.total_farmers,
+        "total_alerts": row.total_alerts,
+        "unresolved_alerts": row.unresolved_alerts,
+        "alerts_by_severity": row.alerts_by_severity or {}
+    }
+
+
+def query_kpi_summary(db: Session, province_filter: Optional[str] = None):
+    """
+    KPI counters as one SELECT over single-row aggregate subqueries
+    
+    Each table is scanned once; conditional counters use
+    COUNT(*) FILTER (WHERE ...).
+    
+    Args:
+        db: Database session
+        province_filter: Only data of this province (managers)
+    
+    Returns:
+        Row: total_farms, total_area, active_seasons, total_farmers,
+        total_alerts, unresolved_alerts, alerts_by_severity (dict)
+    """
+    farms = db.query(
+        func.count(VungTrong.id).label("total_farms"),
+        func.coalesce(func.sum(VungTrong.dien_tich), 0).label("total_area")
+    )
+    seasons = db.query(
+        func.count(VuMua.id).filter(VuMua.trang_thai == "dang_hoat_dong").label("active_seasons")
+    )
+    alerts = db.query(
+        func.count(BaoDong.id).label("total_alerts"),
+        func.count(BaoDong.id).filter(
+            BaoDong.trang_thai.in_(["chua_giai_quyet", "dang_xu_ly"])
+        ).label("unresolved_alerts")
+    )
+    severity = db.query(
+        func.coalesce(BaoDong.muc_do, "khong_xac_dinh").label("muc_do"),
+        func.count(BaoDong.id).label("count")
+    )
+    farmers = db.query(
+        func.count(User.id).label("total_farmers")
+    ).filter(User.role == "farmer")
+    
+    if province_filter:
+        farms = farms.filter(VungTrong.tinh_name == province_filter)
+        seasons = seasons.join(
+            VungTrong, VuMua.vung_trong_id == VungTrong.id
+        ).filter(VungTrong.tinh_name == province_filter)
+        alerts = alerts.join(
+            VungTrong, BaoDong.vung_trong_id == VungTrong.id
+        ).filter(VungTrong.tinh_name == province_filter)
+        severity = severity.join(
+            VungTrong, BaoDong.vung_trong_id == VungTrong.id
+        ).filter(VungTrong.tinh_name == province_filter)
+        farmers = farmers.filter(
+            User.id.in_(
+                db.query(VungTrong.chu_so_huu_id).filter(
+                    VungTrong.tinh_name == province_filter
+                )
+            )
+        )
+    
+    severity = severity.group_by(
+        func.coalesce(BaoDong.muc_do, "khong_xac_dinh")
+    ).subquery()
+    by_severity = db.query(
+        func.json_object_agg(severity.c.muc_do, severity.c.count)
+    ).scalar_subquery()
+    
+    farms = farms.subquery()
+    seasons = seasons.subquery()
+    alerts = alerts.subquery()
+    farmers = farmers.subquery()
+    
+    return db.query(
+        farms.c.total_farms,
+        farms.c.total_area,
+        seasons.c.active_seasons,
+        farmers.c.total_farmers,
+        alerts.c.total_alerts,
+        alerts.c.unresolved_alerts,
+        by_severity.label("alerts_by_severity")
+    ).select_from(farms).join(
+        seasons, true()
+    ).join(
+        alerts, true()
+    ).join(
+        farmers, true()
+    ).one()
+
+
 @router.get("/kpi/markets")
+@cache_response
 async def get_market_distribution(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_manager_or_admin)
@@ -126,6 +252,7 @@ async def get_market_distribution(
 # ==================== Chart Data Endpoints ====================
 
 @router.get("/charts/crop-distribution")
+@cache_response
 async def get_crop_distribution(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_manager_or_admin)
@@ -147,6 +274,7 @@ async def get_crop_distribution(
 
 
 @router.get("/charts/input-usage")
+@cache_response
 async def get_input_usage_trends(
     months: int = 6,
     db: Session = Depends(get_db),
@@ -158,46 +286,28 @@ async def get_input_usage_trends(
     Args:
         months: Number of months to look back (default: 6)
     """
-    start_date = datetime.now().date() - timedelta(days=months * 30)
-    
-    # Fertilizer usage by month
-    fertilizer_usage = db.query(
-        extract('year', LichSuCanhTac.ngay_thuc_hien).label('year'),
-        extract('month', LichSuCanhTac.ngay_thuc_hien).label('month'),
-        func.count(LichSuCanhTac.id).label('count')
-    ).filter(
-        LichSuCanhTac.ngay_thuc_hien >= start_date,
-        LichSuCanhTac.phan_bon_id.isnot(None)
-    ).group_by('year', 'month').order_by('year', 'month').all()
+    start_month = (datetime.now().date() - timedelta(days=months * 30)).replace(day=1)
     
-    # Pesticide usage by month
-    pesticide_usage = db.query(
-        extract('year', LichSuCanhTac.ngay_thuc_hien).label('year'),
-        extract('month', LichSuCanhTac.ngay_thuc_hien).label('month'),
-        func.count(LichSuCanhTac.id).label('count')
+    # Usage count by month and input type (precomputed rollup)
+    usage = db.query(
+        TongHopVatTu.thang,
+        TongHopVatTu.loai_vat_tu,
+        func.sum(TongHopVatTu.so_lan).label('count')
     ).filter(
-        LichSuCanhTac.ngay_thuc_hien >= start_date,
-        LichSuCanhTac.thuoc_bvtv_id.isnot(None)
-    ).group_by('year', 'month').order_by('year', 'month').all()
+        TongHopVatTu.thang >= start_month
+    ).group_by(
+        TongHopVatTu.thang, TongHopVatTu.loai_vat_tu
+    ).all()
     
-    # Format data for line chart
-    months_labels = []
-    fertilizer_data = []
-    pesticide_data = []
-    
-    for item in fertilizer_usage:
-        label = f"{int(item.year)}-{int(item.month):02d}"
-        months_labels.append(label)
-        fertilizer_data.append(item.count)
-    
-    # Create a dict for pesticide data
-    pesticide_dict = {
-        f"{int(item.year)}-{int(item.month):02d}": item.count 
-        for item in pesticide_usage
+    counts = {
+        (item.thang.strftime("%Y-%m"), item.loai_vat_tu): int(item.count)
+        for item in usage
     }
     
-    # Fill pesticide data matching fertilizer months
-    pesticide_data = [pesticide_dict.get(label, 0) for label in months_labels]
+    # Format data for line chart
+    months_labels = sorted({label for label, _ in counts})
+    fertilizer_data = [counts.get((label, LOAI_PHAN_BON), 0) for label in months_labels]
+    pesticide_data = [counts.get((label, LOAI_THUOC_BVTV), 0) for label in months_labels]
     
     return {
         "labels": months_labels,
@@ -210,6 +320,7 @@ async def get_input_usage_trends(
 
 
 @router.get("/charts/input-usage-categorized")
+@cache_response
 async def get_input_usage_categorized(
     province_name: Optional[str] = None,
     farm_id: Optional[int] = None,
@@ -222,6 +333,9 @@ async def get_input_usage_categorized(
     Fertilizers: Grouped by type (Hữu cơ / Vô cơ)
     Pesticides: Grouped by type (Thuốc trừ sâu, Thuốc diệt cỏ, Thuốc diệt rầy, etc.)
     
+    Mỗi item có "unit" (kg / L): lượng ghi theo đơn vị khác nhau là các item
+    riêng, không cộng kg với L.
+    
     Args:
         province_name: Filter by province name (optional)
         farm_id: Filter by specific farm ID (optional, takes priority over province)
@@ -229,90 +343,62 @@ async def get_input_usage_categorized(
     # Get province filter for managers
     province_filter = get_province_filter(current_user)
     
-    # Helper function to parse volume from string
-    def parse_volume(volume_str):
-        if not volume_str:
-            return 0.0
-        try:
-            # Remove common units and extract number
-            cleaned = str(volume_str).lower().replace('kg', '').replace('lít', '').replace('l', '').replace('ml', '').replace('g', '').strip()
-            return float(cleaned)
-        except:
-            return 0.0
-    
-    # Base query for farms with province filter
-    farm_query = db.query(VungTrong.id)
-    
-    # Apply farm_id filter (highest priority)
-    if farm_id:
-        farm_query = farm_query.filter(VungTrong.id == farm_id)
-    # Apply province_name filter from request parameter
-    elif province_name:
-        farm_query = farm_query.filter(VungTrong.tinh_name == province_name)
-    # Apply manager's province filter
-    elif province_filter:
-        farm_query = farm_query.filter(VungTrong.tinh_name == province_filter)
-    
-    farm_ids = [f[0] for f in farm_query.all()]
-    
-    if not farm_ids:
-        return {
-            "fertilizer_by_type": [],
-            "pesticide_by_type": []
-        }
+    def scope(query):
+        # Apply farm_id filter (highest priority)
+        if farm_id:
+            return query.filter(TongHopVatTu.vung_trong_id == farm_id)
+        # Apply province_name filter from request parameter, else manager's province
+        province = province_name or province_filter
+        if province:
+            return query.join(
+                VungTrong, VungTrong.id == TongHopVatTu.vung_trong_id
+            ).filter(VungTrong.tinh_name == province)
+        return query
     
     # Fertilizer usage by type (Hữu cơ / Vô cơ)
-    fertilizer_data = {}
-    fertilizer_records = db.query(
+    fertilizer_records = scope(db.query(
         PhanBon.loai_phan_bon,
-        LichSuCanhTac.lieu_luong
+        TongHopVatTu.don_vi_chuan,
+        func.sum(TongHopVatTu.tong_so_luong).label("volume")
     ).join(
-        LichSuCanhTac, LichSuCanhTac.phan_bon_id == PhanBon.id
+        TongHopVatTu,
+        (TongHopVatTu.vat_tu_id == PhanBon.id) & (TongHopVatTu.loai_vat_tu == LOAI_PHAN_BON)
     ).filter(
-        LichSuCanhTac.vung_trong_id.in_(farm_ids),
         PhanBon.loai_phan_bon.isnot(None)
-    ).all()
-    
-    for type_name, volume_str in fertilizer_records:
-        if type_name not in fertilizer_data:
-            fertilizer_data[type_name] = 0.0
-        fertilizer_data[type_name] += parse_volume(volume_str)
+    )).group_by(PhanBon.loai_phan_bon, TongHopVatTu.don_vi_chuan).all()
     
     # Pesticide usage by type
-    pesticide_data = {}
-    pesticide_records = db.query(
+    pesticide_records = scope(db.query(
         ThuocBVTV.loai_thuoc,
-        LichSuCanhTac.lieu_luong
+        TongHopVatTu.don_vi_chuan,
+        func.sum(TongHopVatTu.tong_so_luong).label("volume")
     ).join(
-        LichSuCanhTac, LichSuCanhTac.thuoc_bvtv_id == ThuocBVTV.id
+        TongHopVatTu,
+        (TongHopVatTu.vat_tu_id == ThuocBVTV.id) & (TongHopVatTu.loai_vat_tu == LOAI_THUOC_BVTV)
     ).filter(
-        LichSuCanhTac.vung_trong_id.in_(farm_ids),
         ThuocBVTV.loai_thuoc.isnot(None)
-    ).all()
-    
-    for type_name, volume_str in pesticide_records:
-        if type_name not in pesticide_data:
-            pesticide_data[type_name] = 0.0
-        pesticide_data[type_name] += parse_volume(volume_str)
+    )).group_by(ThuocBVTV.loai_thuoc, TongHopVatTu.don_vi_chuan).all()
     
     # Format response
     fertilizer_by_type = [
-        {"type": type_name, "value": round(volume, 2)}
-        for type_name, volume in fertilizer_data.items()
+        {"type": type_name, "unit": unit, "value": round(float(volume or 0), 2)}
+        for type_name, unit, volume in fertilizer_records
     ]
     
     pesticide_by_type = [
-        {"type": type_name, "value": round(volume, 2)}
-        for type_name, volume in pesticide_data.items()
+        {"type": type_name, "unit": unit, "value": round(float(volume or 0), 2)}
+        for type_name, unit, volume in pesticide_records
     ]
     
     return {
         "fertilizer_by_type": fertilizer_by_type,
-        "pesticide_by_type": pesticide_by_type
+        "pesticide_by_type": pesticide_by_type,
+        "units": {"fertilizer": DEFAULT_UNITS[LOAI_PHAN_BON], "pesticide": DEFAULT_UNITS[LOAI_THUOC_BVTV]}
     }
 
 
 @router.get("/charts/alert-heatmap")
+@cache_response
 async def get_alert_heatmap(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_manager_or_admin)
@@ -436,13 +522,35 @@ async def get_farm_density(
 ):
     """
     Get farm density by administrative units
+
+    Tỉnh kèm tọa độ điểm nhãn (latitude/longitude, luôn nằm trong tỉnh) và
+    tâm (centroid) từ don_vi_hanh_chinh, null nếu chưa chạy
+    scripts/extract_province_centroids.py --write-db.
+    
+    Tỉnh được ghép theo tên chuẩn hóa (province_lookup) chứ không JOIN theo
+    ten: tinh_name có nhiều cách viết và (cap, ten) không unique, JOIN sẽ
+    nhân đôi dòng.
     """
     # Province level
     province_density = db.query(
         VungTrong.tinh_name,
         func.count(VungTrong.id).label('farm_count'),
         func.sum(VungTrong.dien_tich).label('total_area')
-    ).group_by(VungTrong.tinh_name).all()
+    ).group_by(
+        VungTrong.tinh_name
+    ).all()
+    
+    # Label point / centroid (vài chục dòng), tra theo tên chuẩn hóa
+    find_province = province_lookup(db.query(
+        DonViHanhChinh.ten,
+        DonViHanhChinh.nhan_lat,
+        DonViHanhChinh.nhan_lon,
+        DonViHanhChinh.tam_lat,
+        DonViHanhChinh.tam_lon
+    ).filter(
+        DonViHanhChinh.cap == CAP_TINH,
+        DonViHanhChinh.nhan_lat.isnot(None)
+    ).order_by(DonViHanhChinh.id).all())
     
     # District level
     district_density = db.query(
@@ -455,15 +563,23 @@ async def get_farm_density(
         VungTrong.huyen_name
     ).all()
     
+    provinces = []
+    for item in province_density:
+        unit = find_province(item.tinh_name)
+        provinces.append({
+            "name": item.tinh_name,
+            "farm_count": item.farm_count,
+            "total_area": float(item.total_area) if item.total_area else 0,
+            "latitude": float(unit.nhan_lat) if unit is not None else None,
+            "longitude": float(unit.nhan_lon) if unit is not None else None,
+            "centroid": (
+                [float(unit.tam_lat), float(unit.tam_lon)]
+                if unit is not None and unit.tam_lat is not None else None
+            )
+        })
+    
     return {
-        "provinces": [
-            {
-                "name": item.tinh_name,
-                "farm_count": item.farm_count,
-                "total_area": float(item.total_area) if item.total_area else 0
-            }
-            for item in province_density
-        ],
+        "provinces": provinces,
         "districts": [
             {
                 "province": item.tinh_name,
@@ -476,9 +592,106 @@ async def get_farm_density(
     }
 
 
+@router.get("/spatial/grid")
+async def get_spatial_grid(
+    cell_size: float = Query(0.1, ge=0.01, le=5.0),
+    shape: str = Query(GRID_SQUARE, pattern="^(square|hex)$"),
+    bbox: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_manager_or_admin)
+):
+    """
+    Lưới mật độ vùng trồng cho heatmap (ô vuông hoặc lục giác)
+    
+    Mỗi ô: số vùng trồng, tổng diện tích, phân bón, thuốc BVTV, số báo động
+    và polygon của ô. Lưới của mỗi (tỉnh, shape, cell_size) được tính một lần
+    và cache trong analytics_cache (xóa khi farms/history thay đổi), khung
+    nhìn chỉ cắt trên lưới đã cache.
+    
+    - **cell_size**: Cạnh ô vuông / bán kính lục giác (độ)
+    - **shape**: square hoặc hex
+    - **bbox**: Khung nhìn bản đồ: minLng,minLat,maxLng,maxLat
+    """
+    province_filter = get_province_filter(current_user)
+    viewport = parse_bbox(bbox)
+    
+    key = ("spatial-grid", province_filter, shape, cell_size)
+    cells = analytics_cache.get(key)
+    if cells is None:
+        cells = query_spatial_grid(db, shape, cell_size, province_filter)
+        analytics_cache.set(key, cells)
+    
+    selected = np.flatnonzero(cells_in_bbox(cells, viewport)) if viewport else np.arange(len(cells.counts))
+    
+    return {
+        "shape": shape,
+        "cell_size": cell_size,
+        "total_farms": int(cells.counts[selected].sum()),
+        "units": VOLUME_UNITS,
+        "data": [
+            {
+                "latitude": round(float(cells.lats[i]), 6),
+                "longitude": round(float(cells.lons[i]), 6),
+                "farm_count": int(cells.counts[i]),
+                "dien_tich": round(float(cells.sums["dien_tich"][i]), 2),
+                "fertilizer_volume": round(float(cells.sums["fertilizer_volume"][i]), 2),
+                "pesticide_volume": round(float(cells.sums["pesticide_volume"][i]), 2),
+                "alert_count": int(cells.sums["alert_count"][i]),
+                "polygon": cell_polygon(shape, cells.lons[i], cells.lats[i], cell_size)
+            }
+            for i in selected
+        ]
+    }
+
+
+def query_spatial_grid(
+    db: Session,
+    shape: str,
+    cell_size: float,
+    province_filter: Optional[str] = None
+) -> GridCells:
+    """
+    Tọa độ + chỉ số của mọi vùng trồng (một query), gom lưới bằng NumPy
+    
+    Số báo động lấy từ subquery GROUP BY vung_trong_id, join một lần.
+    """
+    alerts = db.query(
+        BaoDong.vung_trong_id.label("vung_trong_id"),
+        func.count(BaoDong.id).label("alert_count")
+    ).group_by(BaoDong.vung_trong_id).subquery()
+    
+    query = db.query(
+        VungTrong.longitude,
+        VungTrong.latitude,
+        func.coalesce(VungTrong.dien_tich, 0),
+        func.coalesce(VungTrong.fertilizer_volume, 0),
+        func.coalesce(VungTrong.pesticide_volume, 0),
+        func.coalesce(alerts.c.alert_count, 0)
+    ).outerjoin(
+        alerts, alerts.c.vung_trong_id == VungTrong.id
+    ).filter(
+        VungTrong.latitude.isnot(None),
+        VungTrong.longitude.isnot(None)
+    )
+    if province_filter:
+        query = query.filter(VungTrong.tinh_name == province_filter)
+    
+    values = np.array(query.all(), dtype=float).reshape(-1, 6)
+    return aggregate_grid(
+        values[:, 0], values[:, 1], shape, cell_size,
+        weights={
+            "dien_tich": values[:, 2],
+            "fertilizer_volume": values[:, 3],
+            "pesticide_volume": values[:, 4],
+            "alert_count": values[:, 5]
+        }
+    )
+
+
 # ==================== New Advanced Chart Endpoints ====================
 
 @router.get("/charts/crop-market-relationship")
+@cache_response
 async def get_crop_market_relationship(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_manager_or_admin)
@@ -530,6 +743,7 @@ async def get_crop_market_relationship(
 
 
 @router.get("/charts/fruit-input-correlation")
+@cache_response
 async def get_fruit_input_correlation(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_manager_or_admin)
@@ -565,6 +779,7 @@ async def get_fruit_input_correlation(
 
 
 @router.get("/charts/input-usage-frequency")
+@cache_response
 async def get_input_usage_frequency(
     input_type: str,  # "fertilizer" or "pesticide"
     db: Session = Depends(get_db),
@@ -656,6 +871,7 @@ async def get_revoked_alerts(
 
 @router.get("/farms/with-layers")
 async def get_farms_with_layers(
+    bbox: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_manager_or_admin)
 ):
@@ -667,51 +883,20 @@ async def get_farms_with_layers(
     - pesticide_volume: total volume of pesticide applications (in liters)
     - Coordinates for mapping
     
-    Managers only see farms in their province
-    """
+    Applications recorded in the other unit (e.g. liquid fertilizer in L)
+    are not added to these totals; units are listed in "units".
     
-    def parse_volume(volume_str):
-        """Parse volume string to float"""
-        if not volume_str:
-            return 0.0
-        try:
-            # Remove common non-numeric characters and convert to float
-            cleaned = str(volume_str).strip().replace(',', '.')
-            import re
-            match = re.search(r'\d+\.?\d*', cleaned)
-            if match:
-                return float(match.group())
-            return 0.0
-        except:
-            return 0.0
+    Managers only see farms in their province
     
+    - **bbox**: Only farms inside the map viewport: minLng,minLat,maxLng,maxLat
+    """
     # Get province filter for managers
     province_filter = get_province_filter(current_user)
     
-    # Get farms with optional province filter
-    farms_query = db.query(VungTrong)
-    if province_filter:
-        farms_query = farms_query.filter(VungTrong.tinh_name == province_filter)
-    farms = farms_query.all()
+    farms = query_farms_with_layers(db, province_filter, parse_bbox(bbox))
     
     result = []
     for farm in farms:
-        # Aggregate fertilizer volume
-        fertilizer_records = db.query(LichSuCanhTac).filter(
-            LichSuCanhTac.vung_trong_id == farm.id,
-            LichSuCanhTac.phan_bon_id.isnot(None)
-        ).all()
-        
-        fertilizer_volume = sum(parse_volume(rec.lieu_luong) for rec in fertilizer_records)
-        
-        # Aggregate pesticide volume
-        pesticide_records = db.query(LichSuCanhTac).filter(
-            LichSuCanhTac.vung_trong_id == farm.id,
-            LichSuCanhTac.thuoc_bvtv_id.isnot(None)
-        ).all()
-        
-        pesticide_volume = sum(parse_volume(rec.lieu_luong) for rec in pesticide_records)
-        
         result.append({
             "id": farm.id,
             "ma_vung": farm.ma_vung,
@@ -719,16 +904,141 @@ async def get_farms_with_layers(
             "tinh_name": farm.tinh_name,
             "huyen_name": farm.huyen_name,
             "thi_truong_xuat_khau": farm.thi_truong_xuat_khau,
-            "cay_trong": getattr(farm, 'cay_trong', None),
+            "cay_trong": {
+                "id": farm.cay_trong_id,
+                "ten_cay": farm.ten_cay
+            } if farm.cay_trong_id else None,
             "dien_tich": float(farm.dien_tich) if farm.dien_tich else 0,
             "latitude": float(farm.latitude) if farm.latitude else None,
             "longitude": float(farm.longitude) if farm.longitude else None,
-            "fertilizer_volume": round(fertilizer_volume, 2),  # in kg
-            "pesticide_volume": round(pesticide_volume, 2),     # in liters
+            "fertilizer_volume": round(float(farm.fertilizer_volume), 2),  # in kg
+            "pesticide_volume": round(float(farm.pesticide_volume), 2),     # in liters
             "nong_dan_count": 1  # Placeholder for farmer count
         })
     
-    return {"data": result}
+    return {"units": VOLUME_UNITS, "data": result}
+
+
+@router.get("/farms/clusters")
+def get_farm_clusters(
+    zoom: int = Query(..., ge=0, le=22),
+    bbox: Optional[str] = None,
+    current_user: User = Depends(require_manager_or_admin)
+):
+    """
+    Farm clusters for the map at a zoom level
+    
+    Each cluster has count, farm_id (single-farm clusters), centroid
+    latitude/longitude, total dien_tich and fertilizer/pesticide volumes.
+    Served from the in-memory grid index (utils/farm_clusters.py), so the
+    payload grows with the viewport, not with the number of farms.
+    Plain def (threadpool): while the index is still being built at startup
+    the request waits up to CLUSTER_INDEX_WAIT_SECONDS, then returns 503.
+    
+    - **zoom**: Leaflet zoom level
+    - **bbox**: Map viewport: minLng,minLat,maxLng,maxLat
+    """
+    province_filter = get_province_filter(current_user)
+    viewport = parse_bbox(bbox)
+    
+    if not farm_cluster_index.ensure_built(SessionLocal, settings.CLUSTER_INDEX_WAIT_SECONDS):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Farm cluster index is being built, please retry shortly",
+            headers={"Retry-After": str(int(settings.CLUSTER_INDEX_WAIT_SECONDS) or 1)}
+        )
+    clusters = farm_cluster_index.clusters(zoom, viewport, province_filter)
+    
+    return {
+        "zoom": zoom,
+        "total_farms": sum(cluster["count"] for cluster in clusters),
+        "units": VOLUME_UNITS,
+        "data": clusters
+    }
+
+
+def query_farms_with_layers(
+    db: Session,
+    province_filter: Optional[str] = None,
+    bbox: Optional[BBox] = None
+):
+    """
+    Farms joined with their fertilizer/pesticide totals in a single statement
+    
+    History rows are aggregated once per request (GROUP BY vung_trong_id)
+    over the normalized so_luong column instead of two queries per farm.
+    Only kg of fertilizer and L of pesticide are summed (VOLUME_UNITS);
+    history without don_vi_chuan counts in the default unit of its type.
+    
+    Args:
+        db: Database session
+        province_filter: Only farms of this province (managers)
+        bbox: Only farms inside this (minx, miny, maxx, maxy) box (farms
+            without coordinates by their province point)
+    
+    Returns:
+        list: Rows with farm columns, ten_cay, fertilizer_volume, pesticide_volume
+    """
+    volume = func.coalesce(LichSuCanhTac.so_luong, 0)
+    
+    def in_unit(input_column, loai_vat_tu, unit):
+        # Dòng của loại vật tư này, ghi theo đơn vị unit (không có đơn vị: mặc định của loại)
+        return input_column.isnot(None) & (
+            func.coalesce(LichSuCanhTac.don_vi_chuan, DEFAULT_UNITS[loai_vat_tu]) == unit
+        )
+    
+    usage = db.query(
+        LichSuCanhTac.vung_trong_id.label("vung_trong_id"),
+        func.sum(case(
+            (in_unit(LichSuCanhTac.phan_bon_id, LOAI_PHAN_BON, VOLUME_UNITS["fertilizer_volume"]), volume),
+            else_=0
+        )).label("fertilizer_volume"),
+        func.sum(case(
+            (in_unit(LichSuCanhTac.thuoc_bvtv_id, LOAI_THUOC_BVTV, VOLUME_UNITS["pesticide_volume"]), volume),
+            else_=0
+        )).label("pesticide_volume")
+    ).filter(
+        (LichSuCanhTac.phan_bon_id.isnot(None)) |
+        (LichSuCanhTac.thuoc_bvtv_id.isnot(None))
+    )
+    
+    farm_filters = []
+    if province_filter:
+        farm_filters.append(VungTrong.tinh_name == province_filter)
+    if bbox:
+        farm_filters.append(farm_within_bbox(db, bbox))
+    
+    if farm_filters:
+        usage = usage.join(
+            VungTrong, LichSuCanhTac.vung_trong_id == VungTrong.id
+        ).filter(*farm_filters)
+    
+    usage = usage.group_by(LichSuCanhTac.vung_trong_id).subquery()
+    
+    query = db.query(
+        VungTrong.id,
+        VungTrong.ma_vung,
+        VungTrong.ten_vung,
+        VungTrong.tinh_name,
+        VungTrong.huyen_name,
+        VungTrong.thi_truong_xuat_khau,
+        VungTrong.cay_trong_id,
+        LoaiCayTrong.ten_cay,
+        VungTrong.dien_tich,
+        VungTrong.latitude,
+        VungTrong.longitude,
+        func.coalesce(usage.c.fertilizer_volume, 0).label("fertilizer_volume"),
+        func.coalesce(usage.c.pesticide_volume, 0).label("pesticide_volume")
+    ).outerjoin(
+        LoaiCayTrong, VungTrong.cay_trong_id == LoaiCayTrong.id
+    ).outerjoin(
+        usage, usage.c.vung_trong_id == VungTrong.id
+    )
+    
+    if farm_filters:
+        query = query.filter(*farm_filters)
+    
+    return query.all()
 
 
 
@@ -857,7 +1167,9 @@ async def get_farmer_farms_map(
             detail="This endpoint is for farmers only"
         )
     
-    farms = db.query(VungTrong).filter(
+    farms = db.query(VungTrong).options(
+        joinedload(VungTrong.cay_trong)
+    ).filter(
         VungTrong.chu_so_huu_id == current_user.id
     ).all()
     
@@ -869,7 +1181,7 @@ async def get_farmer_farms_map(
             "ten_vung": farm.ten_vung,
             "tinh_name": farm.tinh_name,
             "huyen_name": farm.huyen_name,
-            "cay_trong": farm.cay_trong,
+            "cay_trong": farm.cay_trong.ten_cay if farm.cay_trong else None,
             "dien_tich": float(farm.dien_tich) if farm.dien_tich else 0,
             "latitude": float(farm.latitude) if farm.latitude else None,
             "longitude": float(farm.longitude) if farm.longitude else None
@@ -895,60 +1207,53 @@ async def get_farmer_cultivation_timeline(
             detail="This endpoint is for farmers only"
         )
     
-    # Get farmer's farm IDs
-    farm_ids_query = db.query(VungTrong.id).filter(
+    # One joined projection: farm, activity type and input names per row
+    query = db.query(
+        LichSuCanhTac.id,
+        LichSuCanhTac.vung_trong_id,
+        LichSuCanhTac.ngay_thuc_hien,
+        LichSuCanhTac.chi_tiet,
+        LichSuCanhTac.lieu_luong,
+        VungTrong.ten_vung,
+        LoaiHoatDong.ten_hoat_dong,
+        PhanBon.ten_phan_bon,
+        ThuocBVTV.ten_thuoc
+    ).join(
+        VungTrong, LichSuCanhTac.vung_trong_id == VungTrong.id
+    ).outerjoin(
+        LoaiHoatDong, LichSuCanhTac.loai_hoat_dong_id == LoaiHoatDong.id
+    ).outerjoin(
+        PhanBon, LichSuCanhTac.phan_bon_id == PhanBon.id
+    ).outerjoin(
+        ThuocBVTV, LichSuCanhTac.thuoc_bvtv_id == ThuocBVTV.id
+    ).filter(
         VungTrong.chu_so_huu_id == current_user.id
     )
     
     # Filter by specific farm if provided
     if farm_id:
-        farm_ids_query = farm_ids_query.filter(VungTrong.id == farm_id)
+        query = query.filter(VungTrong.id == farm_id)
     
-    farm_ids = [f[0] for f in farm_ids_query.all()]
-    
-    if not farm_ids:
-        return []
-    
-    # Get recent cultivation history with all details
-    activities = db.query(LichSuCanhTac).filter(
-        LichSuCanhTac.vung_trong_id.in_(farm_ids)
-    ).order_by(
-        LichSuCanhTac.ngay_thuc_hien.desc()
+    activities = query.order_by(
+        LichSuCanhTac.ngay_thuc_hien.desc(),
+        LichSuCanhTac.id.desc()
     ).limit(limit).all()
     
-    result = []
-    for activity in activities:
-        # Get farm details
-        farm = db.query(VungTrong).filter(VungTrong.id == activity.vung_trong_id).first()
-        
-        # Get fertilizer details if used
-        fertilizer_name = None
-        if activity.phan_bon_id:
-            fertilizer = db.query(PhanBon).filter(PhanBon.id == activity.phan_bon_id).first()
-            if fertilizer:
-                fertilizer_name = fertilizer.ten_phan_bon
-        
-        # Get pesticide details if used
-        pesticide_name = None
-        if activity.thuoc_bvtv_id:
-            pesticide = db.query(ThuocBVTV).filter(ThuocBVTV.id == activity.thuoc_bvtv_id).first()
-            if pesticide:
-                pesticide_name = pesticide.ten_thuoc
-        
-        result.append({
+    return [
+        {
             "id": activity.id,
             "farm_id": activity.vung_trong_id,
-            "farm_name": farm.ten_vung if farm else "Unknown",
-            "activity_type": activity.hoat_dong or "Không xác định",
+            "farm_name": activity.ten_vung or "Unknown",
+            "activity_type": activity.ten_hoat_dong or "Không xác định",
             "date": activity.ngay_thuc_hien.isoformat() if activity.ngay_thuc_hien else None,
-            "description": activity.mo_ta or "",
-            "fertilizer": fertilizer_name,
-            "pesticide": pesticide_name,
+            "description": activity.chi_tiet or "",
+            "fertilizer": activity.ten_phan_bon,
+            "pesticide": activity.ten_thuoc,
             "dosage": activity.lieu_luong or "",
-            "notes": activity.ghi_chu or ""
-        })
-    
-    return result
+            "notes": ""
+        }
+        for activity in activities
+    ]
 
 
 @router.get("/farmer/export-markets")
@@ -993,6 +1298,8 @@ async def get_farmer_input_usage(
     """
     Get fertilizer and pesticide usage statistics categorized by type
     Optionally filter by specific farm_id
+    
+    Each item has a "unit" (kg / L); volumes in different units are separate items.
     """
     if current_user.role != "farmer":
         raise HTTPException(
@@ -1000,87 +1307,56 @@ async def get_farmer_input_usage(
             detail="This endpoint is for farmers only"
         )
     
-    def parse_volume(volume_str):
-        """Parse volume string to float"""
-        if not volume_str:
-            return 0.0
-        try:
-            cleaned = str(volume_str).strip().replace(',', '.')
-            import re
-            match = re.search(r'\d+\.?\d*', cleaned)
-            if match:
-                return float(match.group())
-            return 0.0
-        except:
-            return 0.0
-    
-    # Get farmer's farm IDs
-    farm_ids_query = db.query(VungTrong.id).filter(
-        VungTrong.chu_so_huu_id == current_user.id
-    )
-    
-    # Filter by specific farm if provided
-    if farm_id:
-        farm_ids_query = farm_ids_query.filter(VungTrong.id == farm_id)
-    
-    farm_ids = [f[0] for f in farm_ids_query.all()]
-    
-    if not farm_ids:
-        return {
-            "fertilizer_by_name": [],
-            "pesticide_by_type": []
-        }
+    def scope(query):
+        # Only the farmer's farms, optionally a specific farm
+        query = query.join(
+            VungTrong, VungTrong.id == TongHopVatTu.vung_trong_id
+        ).filter(VungTrong.chu_so_huu_id == current_user.id)
+        if farm_id:
+            query = query.filter(VungTrong.id == farm_id)
+        return query
     
     # Categorize fertilizers by name
-    fertilizer_usage = {}
-    fertilizer_records = db.query(LichSuCanhTac, PhanBon).join(
-        PhanBon, LichSuCanhTac.phan_bon_id == PhanBon.id
-    ).filter(
-        LichSuCanhTac.vung_trong_id.in_(farm_ids)
-    ).all()
-    
-    for record, fertilizer in fertilizer_records:
-        fert_name = fertilizer.ten_phan_bon or "Khác"
-        volume = parse_volume(record.lieu_luong)
-        if fert_name in fertilizer_usage:
-            fertilizer_usage[fert_name] += volume
-        else:
-            fertilizer_usage[fert_name] = volume
+    fertilizer_usage = scope(db.query(
+        func.coalesce(PhanBon.ten_phan_bon, "Khác").label("name"),
+        TongHopVatTu.don_vi_chuan.label("unit"),
+        func.sum(TongHopVatTu.tong_so_luong).label("volume")
+    ).select_from(TongHopVatTu).join(
+        PhanBon,
+        (TongHopVatTu.vat_tu_id == PhanBon.id) & (TongHopVatTu.loai_vat_tu == LOAI_PHAN_BON)
+    )).group_by("name", TongHopVatTu.don_vi_chuan).all()
     
     # Categorize pesticides by type (loai_thuoc)
-    pesticide_usage = {}
-    pesticide_records = db.query(LichSuCanhTac, ThuocBVTV).join(
-        ThuocBVTV, LichSuCanhTac.thuoc_bvtv_id == ThuocBVTV.id
-    ).filter(
-        LichSuCanhTac.vung_trong_id.in_(farm_ids)
-    ).all()
-    
-    for record, pesticide in pesticide_records:
-        pest_type = pesticide.loai_thuoc or "Khác"
-        volume = parse_volume(record.lieu_luong)
-        if pest_type in pesticide_usage:
-            pesticide_usage[pest_type] += volume
-        else:
-            pesticide_usage[pest_type] = volume
+    pesticide_usage = scope(db.query(
+        func.coalesce(ThuocBVTV.loai_thuoc, "Khác").label("type"),
+        TongHopVatTu.don_vi_chuan.label("unit"),
+        func.sum(TongHopVatTu.tong_so_luong).label("volume")
+    ).select_from(TongHopVatTu).join(
+        ThuocBVTV,
+        (TongHopVatTu.vat_tu_id == ThuocBVTV.id) & (TongHopVatTu.loai_vat_tu == LOAI_THUOC_BVTV)
+    )).group_by("type", TongHopVatTu.don_vi_chuan).all()
     
     # Format response
     fertilizer_by_name = [
         {
-            "name": name,
-            "volume": round(volume, 2)
+            "name": item.name,
+            "unit": item.unit,
+            "volume": round(float(item.volume or 0), 2)
         }
-        for name, volume in fertilizer_usage.items()
+        for item in fertilizer_usage
     ]
     
     pesticide_by_type = [
         {
-            "type": ptype,
-            "volume": round(volume, 2)
+            "type": item.type,
+            "unit": item.unit,
+            "volume": round(float(item.volume or 0), 2)
         }
-        for ptype, volume in pesticide_usage.items()
+        for item in pesticide_usage
     ]
     
     return {
         "fertilizer_by_name": fertilizer_by_name,
-        "pesticide_by_type": pesticide_by_type
+        "pesticide_by_type": pesticide_by_type,
+        "units": {"fertilizer": DEFAULT_UNITS[LOAI_PHAN_BON], "pesticide": DEFAULT_UNITS[LOAI_THUOC_BVTV]}
     }
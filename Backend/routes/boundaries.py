@@ -0,0 +1,233 @@
+# Boundary Routes - ranh giới tỉnh nhiều mức đơn giản hóa (theo zoom)
+import hashlib
+import json
+import os
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse, RedirectResponse
+
+from config import backend_path, settings
+from utils.admin_boundaries import normalize_province_name
+
+router = APIRouter(prefix="/boundaries", tags=["Ranh giới hành chính"])
+
+# File có hash trong tên: nội dung không bao giờ đổi
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+# Redirect từ zoom -> file có thể đổi khi chạy lại converter
+REDIRECT_CACHE = "public, max-age=300"
+
+MEDIA_TYPES = {
+    "geojson": "application/geo+json",
+    "topojson": "application/json",
+}
+
+# Bản nén có sẵn, theo thứ tự ưu tiên
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+_manifest_cache = {"mtime": None, "data": None}
+# Manifest dựng từ PROVINCE_BOUNDARY_FILE khi chưa chạy converter
+_fallback_cache = {"mtime": None, "data": None, "files": {}}
+
+
+def _feature_name(feature: dict) -> str:
+    properties = feature.get("properties") or {}
+    for column in ("NAME_1", "name", "Ten_Tinh", "TEN_TINH"):
+        if properties.get(column):
+            return str(properties[column])
+    return str(feature.get("id", ""))
+
+
+def _hashed_name(stem: str, content: bytes) -> str:
+    # Cùng quy ước tên file với converter: <stem>.<sha256[:12]>.geojson
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}.geojson"
+
+
+def load_fallback_manifest() -> dict:
+    """
+    Manifest một level (mọi zoom) từ GeoJSON đóng gói sẵn của Frontend
+
+    Dùng khi static/boundaries chưa được sinh (converter cần geopandas):
+    file toàn quốc và từng tỉnh giữ trong bộ nhớ, tên file có hash nội dung
+    như bản do converter tạo ra.
+
+    Raises:
+        HTTPException: 503 nếu cả file đóng gói cũng không có
+    """
+    path = backend_path(settings.PROVINCE_BOUNDARY_FILE)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Boundary files not generated. Run scripts/convert_shapefile_to_geojson.py"
+        )
+
+    if _fallback_cache["mtime"] != mtime:
+        with open(path, "rb") as f:
+            content = f.read()
+        files = {}
+        level = {
+            "name": "bundled",
+            "min_zoom": 0,
+            "tolerance": None,
+            "geojson": _hashed_name("provinces.bundled", content),
+            "topojson": None,
+            "provinces": {}
+        }
+        files[level["geojson"]] = content
+
+        for feature in json.loads(content).get("features", []):
+            province = _feature_name(feature)
+            single = json.dumps(
+                {"type": "FeatureCollection", "features": [feature]},
+                ensure_ascii=False, separators=(",", ":")
+            ).encode("utf-8")
+            slug = normalize_province_name(province).replace(" ", "-") or "province"
+            filename = "provinces/" + _hashed_name(f"{slug}.bundled", single)
+            level["provinces"][province] = filename
+            files[filename] = single
+
+        _fallback_cache["data"] = {"levels": [level], "fallback": True}
+        _fallback_cache["files"] = files
+        _fallback_cache["mtime"] = mtime
+    return _fallback_cache["data"]
+
+
+def load_manifest() -> dict:
+    """
+    Đọc manifest.json do scripts/convert_shapefile_to_geojson.py tạo ra
+
+    Đọc lại khi file thay đổi (so mtime). Chưa chạy converter thì dùng
+    load_fallback_manifest() (một level, không đơn giản hóa theo zoom).
+
+    Raises:
+        HTTPException: 503 nếu chưa chạy converter và không có file đóng gói
+    """
+    path = os.path.join(backend_path(settings.BOUNDARY_DIR), "manifest.json")
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return load_fallback_manifest()
+
+    if _manifest_cache["mtime"] != mtime:
+        with open(path, "r", encoding="utf-8") as f:
+            _manifest_cache["data"] = json.load(f)
+        _manifest_cache["mtime"] = mtime
+    return _manifest_cache["data"]
+
+
+def level_for_zoom(manifest: dict, zoom: int) -> dict:
+    """Level chi tiết nhất có min_zoom <= zoom"""
+    levels = sorted(manifest["levels"], key=lambda level: level["min_zoom"])
+    selected = levels[0]
+    for level in levels:
+        if level["min_zoom"] <= zoom:
+            selected = level
+    return selected
+
+
+def _file_url(request: Request, filename: str) -> str:
+    return str(request.url_for("get_boundary_file", filename=filename))
+
+
+def _redirect(request: Request, filename: Optional[str]) -> RedirectResponse:
+    if not filename:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Boundary file not available for this level/format"
+        )
+    return RedirectResponse(
+        _file_url(request, filename),
+        status_code=status.HTTP_302_FOUND,
+        headers={"Cache-Control": REDIRECT_CACHE}
+    )
+
+
+@router.get("/manifest")
+async def get_boundary_manifest():
+    """Danh sách level, zoom tối thiểu và tên file"""
+    return load_manifest()
+
+
+@router.get("/provinces")
+async def get_provinces_boundary(
+    request: Request,
+    zoom: int = Query(6, ge=0, le=22),
+    format: str = Query("geojson", pattern="^(geojson|topojson)$")
+):
+    """
+    Ranh giới 63 tỉnh ở mức đơn giản hóa phù hợp với zoom
+
+    Redirect tới URL có hash nội dung (cache immutable).
+
+    - **zoom**: Zoom hiện tại của bản đồ
+    - **format**: geojson hoặc topojson
+    """
+    level = level_for_zoom(load_manifest(), zoom)
+    return _redirect(request, level.get(format))
+
+
+@router.get("/provinces/{province_name}")
+async def get_province_boundary(
+    request: Request,
+    province_name: str,
+    zoom: int = Query(6, ge=0, le=22)
+):
+    """
+    Ranh giới một tỉnh (GeoJSON) ở mức phù hợp với zoom
+
+    - **province_name**: Tên tỉnh như trong shapefile (VD: "Sơn La")
+    """
+    level = level_for_zoom(load_manifest(), zoom)
+    provinces = level.get("provinces", {})
+    if province_name not in provinces:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Province '{province_name}' not found"
+        )
+    return _redirect(request, provinces[province_name])
+
+
+@router.get("/files/{filename:path}", name="get_boundary_file")
+async def get_boundary_file(filename: str, request: Request):
+    """
+    File ranh giới có hash trong tên (cache 1 năm, immutable)
+
+    Trả bản nén sẵn (.br / .gz) nếu client chấp nhận.
+    """
+    manifest = load_manifest()
+    known = set()
+    for level in manifest["levels"]:
+        known.update(name for name in (level.get("geojson"), level.get("topojson")) if name)
+        known.update(level.get("provinces", {}).values())
+    if filename not in known:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Boundary file not found"
+        )
+
+    path = os.path.join(backend_path(settings.BOUNDARY_DIR), filename)
+    extension = filename.rsplit(".", 1)[-1]
+    headers = {
+        "Cache-Control": IMMUTABLE_CACHE,
+        "Vary": "Accept-Encoding",
+        # Hash nội dung nằm trong tên file
+        "ETag": '"' + filename.rsplit(".", 2)[-2] + '"'
+    }
+
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if manifest.get("fallback"):
+        return Response(
+            _fallback_cache["files"][filename], media_type=MEDIA_TYPES.get(extension), headers=headers
+        )
+
+    accepted = request.headers.get("accept-encoding", "")
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted and os.path.exists(path + suffix):
+            headers["Content-Encoding"] = encoding
+            return FileResponse(path + suffix, media_type=MEDIA_TYPES.get(extension), headers=headers)
+
+    return FileResponse(path, media_type=MEDIA_TYPES.get(extension), headers=headers)
@@ -1,18 +1,74 @@
 # Farm Routes (Vùng trồng)
+import json
+
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 
-from database import get_db
-from models import User, VungTrong, LichSuCanhTac, VuMua
-from schemas import FarmCreate, FarmUpdate, FarmResponse, FarmWithHistory, HistoryResponse, PaginatedResponse
+from database import get_db, SessionLocal
+from models import User, VungTrong, LichSuCanhTac, VuMua, LoaiCayTrong
+from schemas import (
+    FarmCreate, FarmUpdate, FarmResponse, FarmWithHistory, HistoryResponse, PaginatedResponse,
+    NearbyFarm, NearbyFarmsResponse
+)
 from utils.auth import get_current_active_user
-from utils.pagination import paginate
+from utils.pagination import paginate, clear_count_cache, COUNT_CACHED
 from utils.permission import get_province_filter
+from utils.spatial import SRID_WGS84, farm_within_bbox, parse_bbox, unlocated_farm_points
+from utils.tiles import farm_location, invalidate_farm_tiles
+from utils.farm_clusters import farm_cluster_index
+from utils.coordinate_validation import province_validator
+from utils.response_cache import invalidate_analytics_cache
 from sqlalchemy import func
 
 router = APIRouter(prefix="/farms", tags=["Vùng trồng"])
 
+# Số dòng mỗi lần fetch từ server-side cursor khi xuất GeoJSON
+GEOJSON_BATCH_SIZE = 1000
+
+
+def scope_farm_query(query, current_user: User):
+    """
+    Giới hạn query vùng trồng theo quyền của user
+    
+    - Farmer: chỉ vùng trồng của mình
+    - Manager: chỉ vùng trồng trong tỉnh được phân công
+    - Admin: tất cả
+    """
+    if current_user.role == "farmer":
+        return query.filter(VungTrong.chu_so_huu_id == current_user.id)
+    if current_user.role == "manager":
+        province_filter = get_province_filter(current_user)
+        if province_filter:
+            return query.filter(VungTrong.tinh_name == province_filter)
+    return query
+
+
+# Cột mà scope_farm_query / filter_farm_query lọc theo (latitude/longitude -> geom
+# cho bbox): cập nhật một trong các cột này làm sai tổng số đã cache (COUNT_CACHED)
+FILTERABLE_FARM_FIELDS = frozenset({
+    "chu_so_huu_id", "tinh_name", "ma_vung", "ten_vung", "latitude", "longitude"
+})
+
+
+def filter_farm_query(query, search: Optional[str] = None, tinh: Optional[str] = None, viewport=None):
+    """Bộ lọc chung của danh sách vùng trồng (search, tinh, bbox)"""
+    if search:
+        query = query.filter(
+            (VungTrong.ma_vung.ilike(f"%{search}%")) |
+            (VungTrong.ten_vung.ilike(f"%{search}%"))
+        )
+    
+    if tinh:
+        query = query.filter(VungTrong.tinh_name.ilike(f"%{tinh}%"))
+    
+    if viewport:
+        # Gồm cả vùng trồng chưa có tọa độ có tâm tỉnh trong khung nhìn
+        query = query.filter(farm_within_bbox(query.session, viewport))
+    
+    return query
+
 
 @router.get("", response_model=PaginatedResponse[FarmResponse])
 async def list_farms(
@@ -20,6 +76,8 @@ async def list_farms(
     page_size: int = Query(20, ge=1, le=100),
     search: Optional[str] = None,
     tinh: Optional[str] = None,
+    bbox: Optional[str] = None,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -30,6 +88,8 @@ async def list_farms(
     - **page_size**: Số lượng/trang (default: 20, max: 100)
     - **search**: Tìm kiếm theo mã vùng hoặc tên
     - **tinh**: Lọc theo tỉnh
+    - **bbox**: Chỉ lấy vùng trồng trong khung nhìn bản đồ: minLng,minLat,maxLng,maxLat
+    - **cursor**: Phân trang theo cursor (để trống = trang đầu, sau đó dùng next_cursor)
     """
     query = db.query(VungTrong).options(
         joinedload(VungTrong.cay_trong),
@@ -38,48 +98,199 @@ async def list_farms(
     )
     
     # Filter by user role
-    if current_user.role == "farmer":
-        query = query.filter(VungTrong.chu_so_huu_id == current_user.id)
-    elif current_user.role == "manager":
-        # Manager can only see farms in their province
-        province_filter = get_province_filter(current_user)
-        if province_filter:
-            query = query.filter(VungTrong.tinh_name == province_filter)
-    # Admin sees all farms (no filter)
+    query = scope_farm_query(query, current_user)
     
     # Apply filters
-    if search:
-        query = query.filter(
-            (VungTrong.ma_vung.ilike(f"%{search}%")) |
-            (VungTrong.ten_vung.ilike(f"%{search}%"))
-        )
-    
-    if tinh:
-        query = query.filter(VungTrong.tinh_name.ilike(f"%{tinh}%"))
+    query = filter_farm_query(query, search, tinh, parse_bbox(bbox))
     
     # Order by ID
     query = query.order_by(VungTrong.id.desc())
     
     # Paginate
-    result = paginate(query, page, page_size)
+    # Total is cached per filter signature (COUNT_CACHE_TTL_SECONDS)
+    result = paginate(
+        query, page, page_size,
+        cursor=cursor, keyset=[VungTrong.id], count_strategy=COUNT_CACHED
+    )
     
-    # Annotate each farm with active_seasons count
+    # Annotate each farm with active_seasons count (one grouped query per page)
     active_statuses = ['đang trồng', 'đang phát triển', 'sắp thu hoạch']
-    for farm in result['items']:
-        # Count active cultivation seasons
-        active_count = db.query(func.count(VuMua.id))\
+    farm_ids = [farm.id for farm in result['items']]
+    active_counts = {}
+    if farm_ids:
+        active_counts = dict(
+            db.query(VuMua.vung_trong_id, func.count(VuMua.id))
             .filter(
-                VuMua.vung_trong_id == farm.id,
+                VuMua.vung_trong_id.in_(farm_ids),
                 VuMua.trang_thai.in_(active_statuses)
-            )\
-            .scalar()
-        
-        # Add to farm object
-        farm.active_seasons = active_count or 0
+            )
+            .group_by(VuMua.vung_trong_id)
+            .all()
+        )
+    
+    for farm in result['items']:
+        farm.active_seasons = active_counts.get(farm.id, 0)
     
     return PaginatedResponse(**result)
 
 
+@router.get(".geojson")
+async def export_farms_geojson(
+    search: Optional[str] = None,
+    tinh: Optional[str] = None,
+    bbox: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Xuất vùng trồng dạng GeoJSON FeatureCollection (stream)
+    
+    Cùng bộ lọc và phân quyền với GET /farms. Các dòng được đọc bằng
+    server-side cursor (yield_per) và ghi ra từng feature, nên bộ nhớ
+    không tăng theo số vùng trồng. Vùng trồng chưa có tọa độ được đặt tại
+    điểm của tỉnh (properties.vi_tri_theo_tinh = true), geometry null nếu
+    không khớp được tỉnh.
+    
+    - **search**: Tìm kiếm theo mã vùng hoặc tên
+    - **tinh**: Lọc theo tỉnh
+    - **bbox**: Chỉ lấy vùng trồng trong khung nhìn: minLng,minLat,maxLng,maxLat
+    """
+    viewport = parse_bbox(bbox)
+    
+    return StreamingResponse(
+        stream_farm_features(current_user, search, tinh, viewport),
+        media_type="application/geo+json",
+        headers={"Content-Disposition": 'attachment; filename="farms.geojson"'}
+    )
+
+
+def stream_farm_features(current_user: User, search=None, tinh=None, viewport=None):
+    """
+    Sinh FeatureCollection theo từng đoạn bytes
+    
+    Dùng session riêng: generator chạy sau khi endpoint đã trả về, khi
+    session của get_db có thể đã đóng.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(
+            VungTrong.id,
+            VungTrong.ma_vung,
+            VungTrong.ten_vung,
+            VungTrong.dien_tich,
+            VungTrong.nguoi_dai_dien,
+            VungTrong.xa_name,
+            VungTrong.huyen_name,
+            VungTrong.tinh_name,
+            VungTrong.thi_truong_xuat_khau,
+            VungTrong.fertilizer_volume,
+            VungTrong.pesticide_volume,
+            VungTrong.latitude,
+            VungTrong.longitude,
+            LoaiCayTrong.ten_cay
+        ).outerjoin(
+            LoaiCayTrong, VungTrong.cay_trong_id == LoaiCayTrong.id
+        )
+        query = scope_farm_query(query, current_user)
+        query = filter_farm_query(query, search, tinh, viewport)
+        query = query.order_by(VungTrong.id).execution_options(yield_per=GEOJSON_BATCH_SIZE)
+        
+        yield b'{"type":"FeatureCollection","features":['
+        separator = b""
+        province_points = None
+        for row in query:
+            geometry = None
+            by_province = False
+            if row.latitude is not None and row.longitude is not None:
+                geometry = {"type": "Point", "coordinates": [float(row.longitude), float(row.latitude)]}
+            else:
+                if province_points is None:
+                    province_points = unlocated_farm_points(db)
+                if row.tinh_name in province_points:
+                    geometry = {"type": "Point", "coordinates": list(province_points[row.tinh_name])}
+                    by_province = True
+            feature = {
+                "type": "Feature",
+                "id": row.id,
+                "geometry": geometry,
+                "properties": {
+                    "ma_vung": row.ma_vung,
+                    "ten_vung": row.ten_vung,
+                    "dien_tich": float(row.dien_tich) if row.dien_tich is not None else None,
+                    "nguoi_dai_dien": row.nguoi_dai_dien,
+                    "cay_trong": row.ten_cay,
+                    "xa_name": row.xa_name,
+                    "huyen_name": row.huyen_name,
+                    "tinh_name": row.tinh_name,
+                    "thi_truong_xuat_khau": row.thi_truong_xuat_khau,
+                    "fertilizer_volume": float(row.fertilizer_volume or 0),
+                    "pesticide_volume": float(row.pesticide_volume or 0),
+                    "vi_tri_theo_tinh": by_province
+                }
+            }
+            yield separator + json.dumps(feature, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            separator = b","
+        yield b"]}"
+    finally:
+        db.close()
+
+
+@router.get("/nearby", response_model=NearbyFarmsResponse)
+async def list_nearby_farms(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius: Optional[float] = Query(None, gt=0, le=100_000),
+    k: int = Query(10, ge=1, le=100),
+    crop: Optional[str] = None,
+    market: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Vùng trồng gần một điểm, gần nhất trước
+    
+    Sắp xếp KNN (<->) và lọc bán kính (ST_DWithin) trên geography nên
+    dùng GiST index idx_vung_trong_geog và khoảng cách tính bằng mét.
+    
+    - **lat**, **lon**: Vị trí tìm kiếm (WGS84)
+    - **radius**: Bán kính (mét), để trống = không giới hạn
+    - **k**: Số vùng trồng tối đa (default: 10, max: 100)
+    - **crop**: Lọc theo tên cây trồng (VD: "Sầu riêng")
+    - **market**: Lọc theo thị trường xuất khẩu
+    """
+    # geography(geom) khớp biểu thức của index idx_vung_trong_geog (geom::geography)
+    point = func.geography(func.ST_SetSRID(func.ST_MakePoint(lon, lat), SRID_WGS84))
+    farm_geog = func.geography(VungTrong.geom)
+    distance = func.ST_Distance(farm_geog, point).label("distance_m")
+    
+    query = db.query(VungTrong, distance).options(
+        joinedload(VungTrong.cay_trong),
+        joinedload(VungTrong.phan_bon),
+        joinedload(VungTrong.thuoc_bvtv)
+    ).filter(VungTrong.geom.isnot(None))
+    query = scope_farm_query(query, current_user)
+    
+    if radius:
+        query = query.filter(func.ST_DWithin(farm_geog, point, radius))
+    if crop:
+        query = query.filter(
+            VungTrong.cay_trong.has(LoaiCayTrong.ten_cay.ilike(f"%{crop}%"))
+        )
+    if market:
+        query = query.filter(VungTrong.thi_truong_xuat_khau.ilike(f"%{market}%"))
+    
+    rows = query.order_by(farm_geog.op("<->")(point)).limit(k).all()
+    
+    farms = []
+    for farm, distance_m in rows:
+        farm.distance_m = round(float(distance_m), 1)
+        farms.append(farm)
+    
+    return NearbyFarmsResponse(
+        latitude=lat, longitude=lon, radius=radius, k=k,
+        items=[NearbyFarm.model_validate(farm) for farm in farms]
+    )
+
+
 @router.get("/{farm_id}", response_model=FarmResponse)
 async def get_farm(
     farm_id: int, 
@@ -137,11 +348,18 @@ async def create_farm(
             detail=f"Farm with code {farm_data.ma_vung} already exists"
         )
     
+    # Tọa độ phải nằm trong tỉnh khai báo
+    province_validator.validate(farm_data.latitude, farm_data.longitude, farm_data.tinh_name)
+    
     # Create farm
     new_farm = VungTrong(**farm_data.model_dump())
     db.add(new_farm)
     db.commit()
+    invalidate_analytics_cache()
+    clear_count_cache()
     db.refresh(new_farm)
+    invalidate_farm_tiles(farm_location(new_farm))
+    farm_cluster_index.upsert(new_farm)
     
     return new_farm
 
@@ -178,11 +396,23 @@ async def update_farm(
     
     # Update fields
     update_data = farm_data.model_dump(exclude_unset=True)
+    if update_data.keys() & {"latitude", "longitude", "tinh_name"}:
+        province_validator.validate(
+            update_data.get("latitude", farm.latitude),
+            update_data.get("longitude", farm.longitude),
+            update_data.get("tinh_name", farm.tinh_name)
+        )
+    previous_location = farm_location(farm)
     for field, value in update_data.items():
         setattr(farm, field, value)
     
     db.commit()
+    invalidate_analytics_cache()
     db.refresh(farm)
+    invalidate_farm_tiles(previous_location, farm_location(farm))
+    farm_cluster_index.upsert(farm)
+    if update_data.keys() & FILTERABLE_FARM_FIELDS:
+        clear_count_cache()
     
     return farm
 
@@ -212,8 +442,13 @@ async def delete_farm(
             detail=f"Farm with ID {farm_id} not found"
         )
     
+    location = farm_location(farm)
     db.delete(farm)
     db.commit()
+    invalidate_analytics_cache()
+    clear_count_cache()
+    invalidate_farm_tiles(location)
+    farm_cluster_index.remove(farm_id)
     
     return {"message": f"Farm {farm.ma_vung} deleted successfully"}
 
@@ -13,6 +13,33 @@ from utils.pagination import paginate
 router = APIRouter(prefix="/feedback", tags=["feedback"])
 
 
+def _user_info(user: Optional[User]) -> Optional[dict]:
+    if not user:
+        return None
+    return {
+        'id': user.id,
+        'username': user.username,
+        'full_name': user.full_name,
+        'role': user.role
+    }
+
+
+def _with_users(items, users_by_id: dict) -> list:
+    """
+    Gắn thông tin user vào từng feedback của trang
+
+    users_by_id được tải trước (một query cho cả trang), không lazy-load
+    quan hệ Feedback.user theo từng dòng.
+    """
+    return [
+        FeedbackResponse.model_validate({
+            **{column.name: getattr(item, column.name) for column in Feedback.__table__.columns},
+            'user': _user_info(users_by_id.get(item.user_id)),
+        })
+        for item in items
+    ]
+
+
 @router.post("/", response_model=FeedbackResponse, status_code=status.HTTP_201_CREATED)
 async def create_feedback(
     feedback: FeedbackCreate,
@@ -42,11 +69,14 @@ async def get_my_feedback(
     page_size: int = Query(20, ge=1, le=100),
     status: Optional[str] = None,
     category: Optional[str] = None,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     Lấy danh sách feedback của user hiện tại
+    
+    - **cursor**: Phân trang theo cursor (để trống = trang đầu, sau đó dùng next_cursor)
     """
     query = db.query(Feedback).filter(Feedback.user_id == current_user.id)
     
@@ -55,9 +85,15 @@ async def get_my_feedback(
     if category:
         query = query.filter(Feedback.category == category)
         
-    query = query.order_by(Feedback.created_at.desc())
+    query = query.order_by(Feedback.created_at.desc(), Feedback.id.desc())
+    
+    result = paginate(
+        query, page, page_size,
+        cursor=cursor, keyset=[Feedback.created_at, Feedback.id]
+    )
+    result['items'] = _with_users(result['items'], {current_user.id: current_user})
     
-    return paginate(query, page, page_size)
+    return result
 
 
 @router.get("/all", response_model=FeedbackListResponse)
@@ -67,11 +103,14 @@ async def get_all_feedback(
     status: Optional[str] = None,
     category: Optional[str] = None,
     user_id: Optional[int] = None,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     Lấy tất cả feedback (Admin only)
+    
+    - **cursor**: Phân trang theo cursor (để trống = trang đầu, sau đó dùng next_cursor)
     """
     if current_user.role != "admin":
         raise HTTPException(
@@ -88,20 +127,17 @@ async def get_all_feedback(
     if user_id:
         query = query.filter(Feedback.user_id == user_id)
         
-    query = query.order_by(Feedback.created_at.desc())
-    
-    result = paginate(query, page, page_size)
-    
-    # Add user info to each feedback
-    for item in result['items']:
-        user = db.query(User).filter(User.id == item.user_id).first()
-        if user:
-            item.user = {
-                'id': user.id,
-                'username': user.username,
-                'full_name': user.full_name,
-                'role': user.role
-            }
+    query = query.order_by(Feedback.created_at.desc(), Feedback.id.desc())
+    
+    result = paginate(
+        query, page, page_size,
+        cursor=cursor, keyset=[Feedback.created_at, Feedback.id]
+    )
+    
+    # Add user info to each feedback (một query IN cho cả trang)
+    user_ids = {item.user_id for item in result['items']}
+    users = db.query(User).filter(User.id.in_(user_ids)).all() if user_ids else []
+    result['items'] = _with_users(result['items'], {user.id: user for user in users})
     
     return result
 
@@ -8,7 +8,12 @@ from database import get_db
 from models import User, VungTrong, LichSuCanhTac
 from schemas import HistoryCreate, HistoryUpdate, HistoryResponse, PaginatedResponse
 from utils.auth import get_current_active_user
-from utils.pagination import paginate
+from utils.pagination import paginate, COUNT_ESTIMATE
+from utils.quantity import normalize_history_quantity
+from utils.input_rollup import apply_history_to_rollup, snapshot_history
+from utils.response_cache import invalidate_analytics_cache
+from utils.tiles import farm_location, invalidate_farm_tiles
+from utils.farm_clusters import farm_cluster_index
 
 router = APIRouter(prefix="/history", tags=["Lịch sử canh tác"])
 
@@ -20,6 +25,7 @@ async def list_history(
     vung_trong_id: Optional[int] = None,
     from_date: Optional[date] = None,
     to_date: Optional[date] = None,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -29,6 +35,7 @@ async def list_history(
     - **vung_trong_id**: Lọc theo vùng trồng
     - **from_date**: Từ ngày (YYYY-MM-DD)
     - **to_date**: Đến ngày (YYYY-MM-DD)
+    - **cursor**: Phân trang theo cursor (để trống = trang đầu, sau đó dùng next_cursor)
     """
     query = db.query(LichSuCanhTac)
     
@@ -57,11 +64,15 @@ async def list_history(
     if to_date:
         query = query.filter(LichSuCanhTac.ngay_thuc_hien <= to_date)
     
-    # Order by date descending
-    query = query.order_by(LichSuCanhTac.ngay_thuc_hien.desc())
+    # Order by date descending (id as tie-breaker for stable pages)
+    query = query.order_by(LichSuCanhTac.ngay_thuc_hien.desc(), LichSuCanhTac.id.desc())
     
-    # Paginate
-    result = paginate(query, page, page_size)
+    # Paginate (history is the largest table: planner estimate for big result sets)
+    result = paginate(
+        query, page, page_size,
+        cursor=cursor, keyset=[LichSuCanhTac.ngay_thuc_hien, LichSuCanhTac.id],
+        count_strategy=COUNT_ESTIMATE
+    )
     
     return PaginatedResponse(**result)
 
@@ -112,8 +123,14 @@ async def create_history(
     
     # Create history record
     new_history = LichSuCanhTac(**history_data.model_dump())
+    normalize_history_quantity(new_history)
     db.add(new_history)
+    apply_history_to_rollup(db, new_history)
+    location = farm_location(farm)
     db.commit()
+    invalidate_analytics_cache()
+    invalidate_farm_tiles(location)
+    farm_cluster_index.upsert(farm)
     db.refresh(new_history)
     
     return new_history
@@ -148,11 +165,30 @@ async def update_history(
         )
     
     # Update fields
+    previous = snapshot_history(history)
     update_data = history_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(history, field, value)
     
+    # Re-parse quantity (lieu_luong, don_vi or input type may have changed)
+    normalize_history_quantity(history)
+    
+    # Move the record's contribution in the input usage rollup
+    apply_history_to_rollup(db, previous, sign=-1)
+    apply_history_to_rollup(db, history)
+    
+    # Volumes shown in tiles/clusters changed for the old and new farm
+    farms = [farm]
+    if history.vung_trong_id != previous.vung_trong_id:
+        farms.append(db.get(VungTrong, history.vung_trong_id))
+    locations = [farm_location(f) for f in farms]
+    
     db.commit()
+    invalidate_analytics_cache()
+    invalidate_farm_tiles(*locations)
+    for changed_farm in farms:
+        if changed_farm is not None:
+            farm_cluster_index.upsert(changed_farm)
     db.refresh(history)
     
     return history
@@ -185,7 +221,12 @@ async def delete_history(
             detail="You do not have permission to delete this history record"
         )
     
+    apply_history_to_rollup(db, history, sign=-1)
+    location = farm_location(farm)
     db.delete(history)
     db.commit()
+    invalidate_analytics_cache()
+    invalidate_farm_tiles(location)
+    farm_cluster_index.upsert(farm)
     
     return {"message": f"History record {history_id} deleted successfully"}
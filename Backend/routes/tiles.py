@@ -0,0 +1,101 @@
+# Vector Tile Routes - Mapbox Vector Tiles (MVT) cho bản đồ
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select, func, cast, Float, true
+from sqlalchemy.orm import Session
+
+from database import get_db
+from models import VungTrong, LoaiCayTrong, User
+from routes.auth import require_manager_or_admin
+from utils.permission import get_province_filter
+from utils.spatial import within_bbox
+from utils.tiles import (
+    FARMS_LAYER, TILE_EXTENT, TILE_BUFFER,
+    is_valid_tile, tile_bounds_mercator, tile_bounds_lonlat,
+    tile_scope, read_cached_tile, write_cached_tile
+)
+
+router = APIRouter(prefix="/tiles", tags=["Vector Tiles"])
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+SRID_WEB_MERCATOR = 3857
+
+
+@router.get("/farms/{z}/{x}/{y}.pbf")
+async def get_farm_tile(
+    z: int,
+    x: int,
+    y: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_manager_or_admin)
+):
+    """
+    Tile MVT của layer vùng trồng (layer name: "farms")
+
+    Thuộc tính mỗi điểm: id, ma_vung, crop, market, fertilizer_volume,
+    pesticide_volume. Manager chỉ nhận vùng trồng trong tỉnh của mình.
+    Tile được cache trên đĩa (TILE_CACHE_DIR) và xóa khi vùng trồng
+    hoặc lịch sử canh tác trong tile thay đổi, toàn bộ khi script nạp hàng
+    loạt chạy (clear_tile_cache); hết hạn sau TILE_CACHE_TTL_SECONDS.
+    """
+    if not is_valid_tile(z, x, y):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Tile {z}/{x}/{y} does not exist"
+        )
+
+    province_filter = get_province_filter(current_user)
+    scope = tile_scope(province_filter)
+
+    tile = read_cached_tile(FARMS_LAYER, scope, z, x, y)
+    if tile is None:
+        tile = query_farm_tile(db, z, x, y, province_filter)
+        write_cached_tile(FARMS_LAYER, scope, z, x, y, tile)
+
+    return Response(
+        content=tile,
+        media_type=MVT_MEDIA_TYPE,
+        headers={"Cache-Control": "private, no-cache"}
+    )
+
+
+def query_farm_tile(db: Session, z: int, x: int, y: int, province_filter: str = None) -> bytes:
+    """
+    Dựng tile MVT bằng ST_AsMVTGeom / ST_AsMVT trong một câu lệnh
+
+    Lọc bằng geom && khung tile (mở rộng thêm vùng đệm) để dùng GiST index.
+
+    Returns:
+        bytes: Tile đã mã hóa protobuf (rỗng nếu không có vùng trồng)
+    """
+    envelope = func.ST_MakeEnvelope(*tile_bounds_mercator(z, x, y), SRID_WEB_MERCATOR)
+    search_box = tile_bounds_lonlat(z, x, y, buffer=TILE_BUFFER / TILE_EXTENT)
+
+    features = select(
+        func.ST_AsMVTGeom(
+            func.ST_Transform(VungTrong.geom, SRID_WEB_MERCATOR),
+            envelope, TILE_EXTENT, TILE_BUFFER, true()
+        ).label("geom"),
+        VungTrong.id,
+        VungTrong.ma_vung,
+        LoaiCayTrong.ten_cay.label("crop"),
+        VungTrong.thi_truong_xuat_khau.label("market"),
+        cast(func.coalesce(VungTrong.fertilizer_volume, 0), Float).label("fertilizer_volume"),
+        cast(func.coalesce(VungTrong.pesticide_volume, 0), Float).label("pesticide_volume")
+    ).outerjoin(
+        LoaiCayTrong, VungTrong.cay_trong_id == LoaiCayTrong.id
+    ).where(
+        within_bbox(VungTrong.geom, search_box)
+    )
+
+    if province_filter:
+        features = features.where(VungTrong.tinh_name == province_filter)
+
+    features = features.subquery(FARMS_LAYER)
+
+    tile = db.execute(
+        select(
+            func.ST_AsMVT(features.table_valued(), FARMS_LAYER, TILE_EXTENT, "geom")
+        ).select_from(features)
+    ).scalar()
+
+    return bytes(tile) if tile else b""
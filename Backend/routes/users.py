@@ -6,9 +6,10 @@ from typing import List, Optional
 from database import get_db
 from models import User
 from schemas import UserCreate, UserUpdate, UserResponse, PaginatedResponse
-from utils.auth import get_current_active_user, get_password_hash
+from utils.auth import get_current_active_user, get_password_hash, invalidate_user_cache
 from utils.pagination import paginate
 from utils.permission import get_province_filter, is_manager_or_admin
+from utils.response_cache import invalidate_analytics_cache
 
 router = APIRouter(prefix="/users", tags=["Quản lý Người dùng"])
 
@@ -19,12 +20,15 @@ async def list_users(
     page_size: int = Query(20, ge=1, le=100),
     search: Optional[str] = None,
     role: Optional[str] = None,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     Lấy danh sách người dùng (Admin and Manager)
     Managers can only see farmers in their province
+    
+    - **cursor**: Phân trang theo cursor (để trống = trang đầu, sau đó dùng next_cursor)
     """
     if not is_manager_or_admin(current_user):
         raise HTTPException(
@@ -68,7 +72,7 @@ async def list_users(
     query = query.order_by(User.id.desc())
     
     # Paginate
-    result = paginate(query, page, page_size)
+    result = paginate(query, page, page_size, cursor=cursor, keyset=[User.id])
     return PaginatedResponse(**result)
 
 
@@ -108,6 +112,7 @@ async def create_user(
     
     db.add(new_user)
     db.commit()
+    invalidate_analytics_cache()
     db.refresh(new_user)
     return new_user
 
@@ -134,6 +139,7 @@ async def update_user(
         
     # Update fields
     update_data = user_data.model_dump(exclude_unset=True)
+    previous_username = user.username
     
     if "password" in update_data and update_data["password"]:
         update_data["password_hash"] = get_password_hash(update_data["password"])
@@ -143,7 +149,9 @@ async def update_user(
         setattr(user, field, value)
         
     db.commit()
+    invalidate_analytics_cache()
     db.refresh(user)
+    invalidate_user_cache(previous_username, user.username)
     return user
 
 
@@ -179,6 +187,8 @@ async def delete_user(
         
     db.delete(user)
     db.commit()
+    invalidate_analytics_cache()
+    invalidate_user_cache(user.username)
     return {"message": "User deleted successfully"}
 
 
@@ -3,7 +3,10 @@ from schemas.common import SuccessResponse, PaginatedResponse, ErrorResponse
 from schemas.user import (
     UserCreate, UserUpdate, UserResponse, UserLogin, Token, TokenData
 )
-from schemas.farm import FarmCreate, FarmUpdate, FarmResponse, FarmWithHistory
+from schemas.farm import (
+    FarmCreate, FarmUpdate, FarmResponse, FarmWithHistory,
+    NearbyFarm, NearbyFarmsResponse
+)
 from schemas.cultivation import (
     SeasonCreate, SeasonResponse,
     HistoryCreate, HistoryUpdate, HistoryResponse
@@ -30,6 +33,8 @@ __all__ = [
     "FarmUpdate",
     "FarmResponse",
     "FarmWithHistory",
+    "NearbyFarm",
+    "NearbyFarmsResponse",
     # Cultivation
     "SeasonCreate",
     "SeasonResponse",
@@ -15,10 +15,12 @@ class SuccessResponse(BaseModel):
 class PaginatedResponse(BaseModel, Generic[T]):
     """Paginated response wrapper"""
     items: List[T]
-    total: int
+    total: Optional[int] = None  # None in cursor mode
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
+    total_estimated: bool = False  # True when total is a planner estimate
 
 
 class ErrorResponse(BaseModel):
@@ -2,6 +2,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime, date
+from decimal import Decimal
 
 
 class SeasonBase(BaseModel):
@@ -65,6 +66,9 @@ class HistoryResponse(HistoryBase):
     """Schema for history response"""
     id: int
     created_at: datetime
+    # Normalized quantity (kg or L)
+    so_luong: Optional[Decimal] = None
+    don_vi_chuan: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -86,6 +86,20 @@ class FarmResponse(FarmBase):
         from_attributes = True
 
 
+class NearbyFarm(FarmResponse):
+    """Farm with distance from the search point"""
+    distance_m: float  # Khoảng cách (mét, trên mặt cầu)
+
+
+class NearbyFarmsResponse(BaseModel):
+    """Result of /farms/nearby, nearest first"""
+    latitude: float
+    longitude: float
+    radius: Optional[float] = None
+    k: int
+    items: List[NearbyFarm]
+
+
 class FarmWithHistory(FarmResponse):
     """Farm with cultivation history"""
     lich_su_count: int = 0
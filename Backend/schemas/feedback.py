@@ -46,7 +46,9 @@ class FeedbackResponse(FeedbackBase):
 class FeedbackListResponse(BaseModel):
     """Paginated feedback list response"""
     items: list[FeedbackResponse]
-    total: int
+    total: Optional[int] = None  # None in cursor mode
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    total_estimated: bool = False
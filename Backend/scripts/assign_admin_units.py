@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Assign Administrative Units to Farms
+Nạp ranh giới tỉnh/huyện từ Database/data_space/VNM_adm vào don_vi_hanh_chinh,
+rồi gán vung_trong.tinh_id / huyen_id theo tọa độ (point-in-polygon).
+
+Tra cứu chạy vectorized trên toàn bộ vùng trồng bằng STRtree của shapely
+(utils/admin_boundaries.py), sau đó chỉ UPDATE những dòng có id thay đổi.
+
+Chạy migration trước:
+    python ../Database/migrations/run_migration.py add_admin_units.sql
+
+Usage:
+    python scripts/assign_admin_units.py                     # nạp shapefile + gán
+    python scripts/assign_admin_units.py --from-db           # dùng polygon đã nạp
+    python scripts/assign_admin_units.py --normalize-names   # ghi lại tinh_name/huyen_name chuẩn
+    python scripts/assign_admin_units.py --dry-run
+    python scripts/assign_admin_units.py --benchmark 200000  # đo throughput với điểm ngẫu nhiên
+"""
+import argparse
+import sys
+import os
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import shapely
+
+# Add Backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert
+
+from database import SessionLocal
+from models import VungTrong, DonViHanhChinh
+from models.admin_unit import CAP_TINH, CAP_HUYEN
+from utils.admin_boundaries import (
+    BOUNDARY_DIR, NOT_FOUND, AdminUnitIndex,
+    find_shapefile, load_units_from_shapefile, load_units_from_db, normalize_province_name
+)
+from utils.data_version import mark_farm_data_changed
+from utils.spatial import SRID_WGS84
+
+UPDATE_BATCH_SIZE = 5000
+
+
+def sync_units(db, units):
+    """
+    Upsert đơn vị hành chính theo (cap, ma), gán unit.id
+
+    Một câu INSERT ... ON CONFLICT DO UPDATE ... RETURNING cho mỗi cấp.
+    """
+    if not units:
+        return
+
+    adopt_existing_provinces(db, units)
+
+    parent_ids = {
+        ma: unit_id for unit_id, ma in db.query(DonViHanhChinh.id, DonViHanhChinh.ma).filter(
+            DonViHanhChinh.cap == CAP_TINH
+        )
+    }
+
+    values = [
+        {
+            "cap": unit.cap,
+            "ma": unit.ma,
+            "ten": unit.ten,
+            "parent_id": parent_ids.get(unit.parent_ma),
+            "geom": func.ST_Multi(func.ST_GeomFromWKB(shapely.to_wkb(unit.geometry), SRID_WGS84))
+        }
+        for unit in units
+    ]
+    statement = insert(DonViHanhChinh.__table__).values(values)
+    statement = statement.on_conflict_do_update(
+        constraint="uq_don_vi_hanh_chinh_cap_ma",
+        set_={
+            "ten": statement.excluded.ten,
+            "parent_id": statement.excluded.parent_id,
+            "geom": statement.excluded.geom
+        }
+    ).returning(DonViHanhChinh.id, DonViHanhChinh.ma)
+
+    ids = {row.ma: row.id for row in db.execute(statement)}
+    for unit in units:
+        unit.id = ids[unit.ma]
+
+
+def adopt_existing_provinces(db, units):
+    """
+    Đổi mã các tỉnh đã có (cùng tên chuẩn hóa, khác mã) sang mã của shapefile
+
+    scripts/extract_province_centroids.py --write-db có thể đã thêm tỉnh với
+    mã ID_1 của GeoJSON; đổi mã thay vì thêm dòng mới để mỗi tỉnh chỉ có một
+    dòng (giữ nguyên id và tâm / điểm nhãn đã ghi).
+    """
+    incoming = {normalize_province_name(unit.ten): unit.ma for unit in units if unit.cap == CAP_TINH}
+    if not incoming:
+        return
+    existing = db.query(DonViHanhChinh.id, DonViHanhChinh.ma, DonViHanhChinh.ten).filter(
+        DonViHanhChinh.cap == CAP_TINH
+    ).order_by(DonViHanhChinh.id).all()
+    taken = {row.ma for row in existing}
+    for row in existing:
+        ma = incoming.get(normalize_province_name(row.ten))
+        if ma is not None and ma != row.ma and ma not in taken:
+            db.execute(update(DonViHanhChinh).where(DonViHanhChinh.id == row.id).values(ma=ma))
+            taken.add(ma)
+
+
+def load_units(db, cap, from_db, boundary_dir):
+    """Đơn vị hành chính của một cấp, sắp theo id (khớp thứ tự của trigger DB)"""
+    if from_db:
+        units = load_units_from_db(db, cap)
+    else:
+        path = find_shapefile(cap, boundary_dir)
+        print(f"  Reading {path.name} ...")
+        units = load_units_from_shapefile(path, cap)
+        sync_units(db, units)
+    units.sort(key=lambda unit: unit.id)
+    return units
+
+
+def report_throughput(label, count, elapsed):
+    rate = count / elapsed if elapsed > 0 else float("inf")
+    print(f"  {label}: {count:,} points in {elapsed:.3f}s ({rate:,.0f} points/s)")
+
+
+def run_benchmark(indexes, count, seed=0):
+    """Tra cứu `count` điểm ngẫu nhiên trong khung bao của các tỉnh"""
+    provinces = indexes[CAP_TINH]
+    minx, miny, maxx, maxy = shapely.total_bounds(provinces.geometries)
+    rng = np.random.default_rng(seed)
+    lons = rng.uniform(minx, maxx, count)
+    lats = rng.uniform(miny, maxy, count)
+
+    print(f"\n⏱️  Benchmark ({count:,} random points in {minx:.2f},{miny:.2f},{maxx:.2f},{maxy:.2f})")
+    for cap, index in indexes.items():
+        start = time.perf_counter()
+        ids = index.lookup(lons, lats)
+        elapsed = time.perf_counter() - start
+        label = "Province" if cap == CAP_TINH else "District"
+        report_throughput(f"{label} ({len(index)} polygons, {np.count_nonzero(ids != NOT_FOUND):,} matched)", count, elapsed)
+
+
+def report_name_mismatches(farms, names, ids, limit=10):
+    """Những tinh_name khác tên tỉnh theo tọa độ (lỗi chính tả, tên cũ, ...)"""
+    mismatches = Counter(
+        (farm.tinh_name, names[unit_id])
+        for farm, unit_id in zip(farms, ids)
+        if unit_id != NOT_FOUND and farm.tinh_name != names[unit_id]
+    )
+    if not mismatches:
+        return
+    print(f"\n⚠️  {sum(mismatches.values()):,} farms whose tinh_name differs from the province at their coordinates:")
+    for (text_name, unit_name), count in mismatches.most_common(limit):
+        print(f"  {count:6,}  '{text_name}' -> '{unit_name}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assign tinh_id / huyen_id to farms by point-in-polygon")
+    parser.add_argument("--boundary-dir", default=str(BOUNDARY_DIR), help="Thư mục shapefile VNM_adm")
+    parser.add_argument("--from-db", action="store_true", help="Dùng polygon đã có trong don_vi_hanh_chinh")
+    parser.add_argument("--normalize-names", action="store_true", help="Ghi tên tỉnh/huyện chuẩn vào tinh_name/huyen_name")
+    parser.add_argument("--dry-run", action="store_true", help="Chỉ báo cáo, không ghi DB")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Đo throughput với N điểm ngẫu nhiên")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🗺️  Assigning administrative units to farms")
+    print("=" * 60)
+
+    db = SessionLocal()
+
+    try:
+        print("\n📥 Loading boundaries")
+        indexes = {}
+        names = {}
+        for cap in (CAP_TINH, CAP_HUYEN):
+            try:
+                units = load_units(db, cap, args.from_db, Path(args.boundary_dir))
+            except FileNotFoundError as e:
+                if cap == CAP_TINH:
+                    raise
+                print(f"  ⚠️  {e}, skipping districts")
+                continue
+            start = time.perf_counter()
+            indexes[cap] = AdminUnitIndex(units)
+            names.update({unit.id: unit.ten for unit in units})
+            print(f"  Level {cap}: {len(units)} polygons, index built in {time.perf_counter() - start:.2f}s")
+
+        if args.benchmark:
+            run_benchmark(indexes, args.benchmark)
+
+        farms = db.query(
+            VungTrong.id,
+            VungTrong.longitude,
+            VungTrong.latitude,
+            VungTrong.tinh_name,
+            VungTrong.huyen_name,
+            VungTrong.tinh_id,
+            VungTrong.huyen_id
+        ).order_by(VungTrong.id).all()
+
+        lons = np.array([np.nan if farm.longitude is None else float(farm.longitude) for farm in farms])
+        lats = np.array([np.nan if farm.latitude is None else float(farm.latitude) for farm in farms])
+        has_coords = ~(np.isnan(lons) | np.isnan(lats))
+
+        print(f"\n🔍 Point-in-polygon for {int(has_coords.sum()):,} of {len(farms):,} farms")
+        assigned = {}
+        for cap, index in indexes.items():
+            ids = np.full(len(farms), NOT_FOUND, dtype=np.int64)
+            start = time.perf_counter()
+            ids[has_coords] = index.lookup(lons[has_coords], lats[has_coords])
+            report_throughput("Province" if cap == CAP_TINH else "District", int(has_coords.sum()), time.perf_counter() - start)
+            assigned[cap] = ids
+
+        tinh_ids = assigned[CAP_TINH]
+        huyen_ids = assigned.get(CAP_HUYEN, np.full(len(farms), NOT_FOUND, dtype=np.int64))
+        print(f"  Matched province: {np.count_nonzero(tinh_ids != NOT_FOUND):,}, "
+              f"outside all provinces: {np.count_nonzero(has_coords & (tinh_ids == NOT_FOUND)):,}")
+
+        report_name_mismatches(farms, names, tinh_ids)
+
+        changes = []
+        for farm, tinh_id, huyen_id in zip(farms, tinh_ids.tolist(), huyen_ids.tolist()):
+            values = {
+                "tinh_id": None if tinh_id == NOT_FOUND else tinh_id,
+                "huyen_id": None if huyen_id == NOT_FOUND else huyen_id
+            }
+            if args.normalize_names:
+                if values["tinh_id"] is not None:
+                    values["tinh_name"] = names[values["tinh_id"]]
+                if values["huyen_id"] is not None:
+                    values["huyen_name"] = names[values["huyen_id"]]
+            if any(getattr(farm, key) != value for key, value in values.items()):
+                changes.append({"id": farm.id, **values})
+
+        print(f"\n✏️  {len(changes):,} farms to update")
+        if args.dry_run:
+            db.rollback()
+            print("Dry run, no changes written")
+            return
+
+        start = time.perf_counter()
+        for offset in range(0, len(changes), UPDATE_BATCH_SIZE):
+            db.execute(update(VungTrong), changes[offset:offset + UPDATE_BATCH_SIZE])
+        db.commit()
+        mark_farm_data_changed()
+        print(f"\n✅ Updated {len(changes):,} farms in {time.perf_counter() - start:.2f}s")
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
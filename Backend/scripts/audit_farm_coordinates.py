@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Audit Farm Coordinates
+Kiểm tra toàn bộ vùng trồng: tọa độ có nằm trong tỉnh khai báo (tinh_name) không.
+
+Dùng cùng polygon và sai số với kiểm tra khi ghi (utils/coordinate_validation.py),
+tra cứu vectorized một lần cho mọi vùng trồng. Chỉ đọc, không sửa dữ liệu.
+
+Phân loại:
+- outside: tọa độ ngoài mọi tỉnh (kể cả sai số)
+- mismatch: tọa độ thuộc tỉnh khác tinh_name
+- no_coordinates / no_province: thiếu tọa độ / thiếu tinh_name
+
+Usage:
+    python scripts/audit_farm_coordinates.py
+    python scripts/audit_farm_coordinates.py --csv mismatches.csv --limit 50
+"""
+import argparse
+import csv
+import sys
+import os
+import time
+from collections import Counter
+
+import numpy as np
+
+# Add Backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config import settings
+from database import SessionLocal
+from models import VungTrong
+from utils.admin_boundaries import NOT_FOUND, province_key
+from utils.coordinate_validation import province_validator
+
+
+def classify(farms, index, tolerance):
+    """
+    Phân loại từng vùng trồng
+
+    Returns:
+        list: (farm, status, tên tỉnh theo tọa độ) cho mọi vùng trồng
+    """
+    lons = np.array([np.nan if farm.longitude is None else float(farm.longitude) for farm in farms])
+    lats = np.array([np.nan if farm.latitude is None else float(farm.latitude) for farm in farms])
+    has_coords = ~(np.isnan(lons) | np.isnan(lats))
+    rows = np.flatnonzero(has_coords)
+
+    positions = np.full(len(farms), NOT_FOUND, dtype=np.int64)
+    positions[rows] = index.lookup_positions(lons[rows], lats[rows])
+
+    # Các tỉnh trong phạm vi sai số của mỗi điểm (một truy vấn cây)
+    point_idx, geom_idx = index.pairs_near(lons[rows], lats[rows], tolerance)
+    unit_keys = [province_key(unit.ten) for unit in index.units]
+    nearby = {}
+    for point, geom in zip(rows[point_idx].tolist(), geom_idx.tolist()):
+        nearby.setdefault(point, set()).add(unit_keys[geom])
+
+    results = []
+    for i, farm in enumerate(farms):
+        inside = index.units[positions[i]].ten if positions[i] != NOT_FOUND else None
+        if not has_coords[i]:
+            status = "no_coordinates"
+        elif i not in nearby:
+            status = "outside"
+        elif not farm.tinh_name:
+            status = "no_province"
+        elif province_key(farm.tinh_name) not in nearby[i]:
+            status = "mismatch"
+        else:
+            status = "ok"
+        results.append((farm, status, inside))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag farms whose coordinates are outside their declared province")
+    parser.add_argument("--csv", help="Ghi các vùng trồng bị gắn cờ ra file CSV")
+    parser.add_argument("--limit", type=int, default=20, help="Số dòng in ra cho mỗi loại")
+    parser.add_argument("--tolerance", type=float, default=settings.COORDINATE_TOLERANCE_DEGREES,
+                        help="Sai số quanh ranh giới (độ)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🔎 Auditing farm coordinates against province polygons")
+    print("=" * 60)
+
+    db = SessionLocal()
+
+    try:
+        count = province_validator.load(db)
+        if not count:
+            print("\n❌ No province polygons (load don_vi_hanh_chinh or set PROVINCE_BOUNDARY_FILE)")
+            sys.exit(1)
+        print(f"\n📥 {count} provinces from {province_validator.source}")
+
+        farms = db.query(
+            VungTrong.id,
+            VungTrong.ma_vung,
+            VungTrong.tinh_name,
+            VungTrong.latitude,
+            VungTrong.longitude
+        ).order_by(VungTrong.id).all()
+
+        start = time.perf_counter()
+        results = classify(farms, province_validator.index, args.tolerance)
+        elapsed = time.perf_counter() - start
+        rate = len(farms) / elapsed if elapsed > 0 else float("inf")
+        print(f"🔍 Checked {len(farms):,} farms in {elapsed:.3f}s ({rate:,.0f} farms/s)")
+
+        totals = Counter(status for _, status, _ in results)
+        print("\n📊 Summary:")
+        for status in ("ok", "mismatch", "outside", "no_province", "no_coordinates"):
+            print(f"  {status:15s} {totals.get(status, 0):8,}")
+
+        flagged = [row for row in results if row[1] in ("mismatch", "outside")]
+        for status in ("mismatch", "outside"):
+            rows = [row for row in flagged if row[1] == status]
+            if not rows:
+                continue
+            print(f"\n⚠️  {status} (showing {min(len(rows), args.limit)} of {len(rows):,}):")
+            for farm, _, inside in rows[:args.limit]:
+                print(f"  #{farm.id} {farm.ma_vung}: declared '{farm.tinh_name}', "
+                      f"at ({farm.latitude}, {farm.longitude}) -> {inside or 'no province'}")
+
+        if args.csv:
+            with open(args.csv, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["id", "ma_vung", "tinh_name", "latitude", "longitude", "status", "province_at_coordinates"])
+                for farm, status, inside in flagged:
+                    writer.writerow([farm.id, farm.ma_vung, farm.tinh_name, farm.latitude, farm.longitude, status, inside or ""])
+            print(f"\n💾 Wrote {len(flagged):,} flagged farms to {args.csv}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
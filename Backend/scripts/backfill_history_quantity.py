@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Backfill normalized quantity for cultivation history
+Parse lieu_luong/don_vi của lich_su_canh_tac thành so_luong + don_vi_chuan (kg/L)
+
+Usage:
+    python scripts/backfill_history_quantity.py            # chỉ các dòng chưa có so_luong
+    python scripts/backfill_history_quantity.py --all      # tính lại toàn bộ
+    python scripts/backfill_history_quantity.py --batch-size 5000
+"""
+import sys
+import os
+import time
+import argparse
+
+# Add Backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from database import SessionLocal
+from models import LichSuCanhTac
+from utils.quantity import normalize_history_quantity
+
+
+def backfill(db, recompute_all=False, batch_size=2000):
+    """
+    Duyệt lich_su_canh_tac theo lô (keyset trên id) và ghi so_luong/don_vi_chuan
+
+    Returns:
+        int: Số dòng đã cập nhật
+    """
+    last_id = 0
+    updated = 0
+    start = time.perf_counter()
+
+    while True:
+        query = db.query(
+            LichSuCanhTac.id,
+            LichSuCanhTac.lieu_luong,
+            LichSuCanhTac.don_vi,
+            LichSuCanhTac.phan_bon_id,
+            LichSuCanhTac.thuoc_bvtv_id
+        ).filter(
+            LichSuCanhTac.id > last_id,
+            LichSuCanhTac.lieu_luong.isnot(None)
+        )
+        if not recompute_all:
+            query = query.filter(LichSuCanhTac.so_luong.is_(None))
+
+        rows = query.order_by(LichSuCanhTac.id).limit(batch_size).all()
+        if not rows:
+            break
+
+        mappings = []
+        for row in rows:
+            record = LichSuCanhTac(
+                lieu_luong=row.lieu_luong,
+                don_vi=row.don_vi,
+                phan_bon_id=row.phan_bon_id,
+                thuoc_bvtv_id=row.thuoc_bvtv_id
+            )
+            normalize_history_quantity(record)
+            mappings.append({
+                "id": row.id,
+                "so_luong": record.so_luong,
+                "don_vi_chuan": record.don_vi_chuan
+            })
+
+        db.bulk_update_mappings(LichSuCanhTac, mappings)
+        db.commit()
+
+        updated += len(mappings)
+        last_id = rows[-1].id
+        elapsed = time.perf_counter() - start
+        print(f"   ... {updated:,} rows ({updated / elapsed:,.0f} rows/s)")
+
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill so_luong/don_vi_chuan for lich_su_canh_tac")
+    parser.add_argument("--all", action="store_true", help="Tính lại cả các dòng đã có so_luong")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Số dòng mỗi lô")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🔢 Backfilling normalized quantity for LichSuCanhTac")
+    print("=" * 60)
+
+    db = SessionLocal()
+
+    try:
+        updated = backfill(db, recompute_all=args.all, batch_size=args.batch_size)
+        print(f"\n✅ Updated {updated:,} LichSuCanhTac records")
+    except Exception as e:
+        print(f"\n❌ Error during backfill: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark /analytics/farms/with-layers
+Đo latency và số câu SQL của query tổng hợp vật tư theo từng tỉnh (số farm tăng dần)
+và toàn quốc. Với aggregation theo nhóm, số statement luôn là 1 và latency
+tăng rất chậm theo số farm.
+
+Usage:
+    python scripts/benchmark_farms_with_layers.py [--repeat 5]
+"""
+import sys
+import os
+import time
+import argparse
+import statistics
+
+# Add Backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import func
+
+from database import SessionLocal, engine
+from models import VungTrong
+from routes.analytics import query_farms_with_layers
+from utils.query_counter import count_queries
+
+
+def measure(db, province_filter, repeat):
+    """Chạy query `repeat` lần, trả về (số farm, số statement, median ms)"""
+    timings = []
+    statements = 0
+    farm_count = 0
+
+    for _ in range(repeat):
+        with count_queries(engine) as counter:
+            start = time.perf_counter()
+            rows = query_farms_with_layers(db, province_filter)
+            timings.append((time.perf_counter() - start) * 1000)
+        statements = counter.count
+        farm_count = len(rows)
+
+    return farm_count, statements, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark farms/with-layers aggregation")
+    parser.add_argument("--repeat", type=int, default=5, help="Số lần chạy mỗi kịch bản")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        provinces = db.query(
+            VungTrong.tinh_name,
+            func.count(VungTrong.id).label("farm_count")
+        ).filter(
+            VungTrong.tinh_name.isnot(None)
+        ).group_by(VungTrong.tinh_name).order_by("farm_count").all()
+
+        scenarios = [(p.tinh_name, p.tinh_name) for p in provinces]
+        scenarios.append(("(toàn quốc)", None))
+
+        # Warm up connection pool / plan cache
+        query_farms_with_layers(db, None)
+
+        print("=" * 70)
+        print(f"{'Tỉnh':30s} {'Farms':>8s} {'SQL':>5s} {'Median (ms)':>12s} {'ms/1k farms':>12s}")
+        print("-" * 70)
+
+        for label, province_filter in scenarios:
+            farm_count, statements, median_ms = measure(db, province_filter, args.repeat)
+            per_thousand = median_ms / farm_count * 1000 if farm_count else 0
+            print(f"{label[:30]:30s} {farm_count:>8,} {statements:>5} {median_ms:>12.1f} {per_thousand:>12.2f}")
+
+        print("=" * 70)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Province Name Check
+Kiểm tra mọi cách viết tên tỉnh mà app và dữ liệu dùng đều khớp đúng polygon
+tỉnh qua province_key() (cùng đường đi với kiểm tra tọa độ khi ghi).
+
+- Khóa của các tỉnh không trùng nhau (trừ alias có chủ đích trong PROVINCE_ALIASES)
+- Với mỗi tỉnh: tên gốc, các biến thể VARNAME_1 (GeoJSON) và KNOWN_SPELLINGS
+  đều qua được province_validator.validate() tại một điểm trong tỉnh
+- tinh_name đang có trong vung_trong (nếu kết nối được DB) và trong file
+  msvt_thitruongvungtrong.csv đều khớp một tỉnh
+
+Thoát với mã 1 nếu có cách viết không khớp.
+
+Usage:
+    python scripts/check_province_names.py
+"""
+import csv
+import json
+import os
+import sys
+from pathlib import Path
+
+import shapely
+from fastapi import HTTPException
+
+# Add Backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config import settings
+from database import SessionLocal
+from models import VungTrong
+from utils.admin_boundaries import normalize_province_name, province_key
+from utils.coordinate_validation import province_validator
+
+# Tên tỉnh (như trong polygon) -> cách viết app / dữ liệu đang dùng
+KNOWN_SPELLINGS = {
+    "Hồ Chí Minh city": [
+        "TP. Hồ Chí Minh", "TP Hồ Chí Minh", "Hồ Chí Minh", "Thành phố Hồ Chí Minh",
+        "TPHCM", "TP. HCM", "TP.HCM", "HCM",
+    ],
+    "Hà Nội": ["Thành phố Hà Nội", "TP. Hà Nội", "Hanoi"],
+    "Hải Phòng": ["Thành phố Hải Phòng", "TP. Hải Phòng"],
+    "Đà Nẵng": ["Thành phố Đà Nẵng", "TP. Đà Nẵng"],
+    "Cần Thơ": ["Thành phố Cần Thơ", "TP. Cần Thơ"],
+    "Thừa Thiên - Huế": ["Thừa Thiên Huế", "Tỉnh Thừa Thiên Huế"],
+    "Đăk Nông": ["Đắk Nông", "Tỉnh Đắk Nông"],
+    "Đắk Lắk": ["Đăk Lăk", "Tỉnh Đắk Lắk"],
+    "Bà Rịa - Vũng Tàu": ["Bà Rịa Vũng Tàu", "Tỉnh Bà Rịa - Vũng Tàu"],
+    "Gia Lai": ["Tỉnh Gia Lai"],
+}
+
+VUNG_TRONG_CSV = Path(__file__).parent.parent.parent / "Database/data/msvt/msvt_thitruongvungtrong.csv"
+
+
+def geojson_variants() -> dict:
+    """{khóa tỉnh: [VARNAME_1...]} từ file GeoJSON ranh giới tỉnh"""
+    if not os.path.exists(settings.PROVINCE_BOUNDARY_FILE):
+        return {}
+    with open(settings.PROVINCE_BOUNDARY_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    variants = {}
+    for feature in data["features"]:
+        properties = feature.get("properties") or {}
+        names = [name for name in (properties.get("VARNAME_1") or "").split("|") if name.strip()]
+        variants.setdefault(province_key(properties.get("NAME_1")), []).extend(names)
+    return variants
+
+
+def used_names() -> set:
+    """tinh_name trong vung_trong (nếu có DB) và trong file CSV vùng trồng"""
+    names = set()
+    db = SessionLocal()
+    try:
+        names.update(row[0] for row in db.query(VungTrong.tinh_name).distinct() if row[0])
+    except Exception as e:
+        print(f"⚠️  vung_trong.tinh_name not checked (database unavailable: {type(e).__name__})")
+    finally:
+        db.close()
+
+    if VUNG_TRONG_CSV.exists():
+        with open(VUNG_TRONG_CSV, newline="", encoding="utf-8-sig") as f:
+            names.update((row.get("tinh") or "").strip() for row in csv.DictReader(f, delimiter=";"))
+    names.discard("")
+    return names
+
+
+def check_spellings(units) -> list:
+    """Mỗi cách viết của một tỉnh phải qua validate() tại một điểm trong tỉnh đó"""
+    variants = geojson_variants()
+    known = {province_key(name): spellings for name, spellings in KNOWN_SPELLINGS.items()}
+    failures = []
+    for unit in units:
+        key = province_key(unit.ten)
+        point = shapely.point_on_surface(unit.geometry)
+        spellings = [unit.ten] + variants.get(key, []) + known.pop(key, [])
+        for spelling in spellings:
+            try:
+                province_validator.validate(point.y, point.x, spelling)
+            except HTTPException as e:
+                failures.append(f"{spelling!r} ({unit.ten}): {e.detail}")
+    failures.extend(f"{name!r}: no province polygon with this name" for name in known)
+    return failures
+
+
+def main():
+    db = SessionLocal()
+    try:
+        province_count = province_validator.load(db)
+    finally:
+        db.close()
+    if not province_count:
+        print("❌ No province polygons found")
+        sys.exit(1)
+
+    units = province_validator.index.units
+    print("=" * 70)
+    print(f"Province name check: {province_count} provinces from {province_validator.source}")
+    print("=" * 70)
+
+    failures = []
+    keys = {}
+    for unit in units:
+        key = province_key(unit.ten)
+        # Trùng khóa chỉ hợp lệ khi do alias có chủ đích (quần đảo thuộc tỉnh)
+        if key in keys and key == normalize_province_name(unit.ten) == normalize_province_name(keys[key]):
+            failures.append(f"{unit.ten!r} and {keys[key]!r} share key {key!r}")
+        keys.setdefault(key, unit.ten)
+
+    failures += check_spellings(units)
+
+    names = used_names()
+    for name in sorted(names):
+        if province_key(name) not in keys:
+            failures.append(f"{name!r} (used in data): no matching province")
+    print(f"Checked {len(units)} provinces and {len(names)} tinh_name value(s) used in data")
+
+    print("=" * 70)
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Every province spelling matches its polygon")
+
+
+if __name__ == "__main__":
+    main()
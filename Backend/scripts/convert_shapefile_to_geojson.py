@@ -2,61 +2,214 @@
 """
 Convert Vietnam Admin Boundary Shapefile to GeoJSON
 Converts 63Tinh_QuanDao.shp to web-compatible GeoJSON format
+
+Outputs a multi-resolution pyramid for the boundaries API (routes/boundaries.py):
+- One simplified GeoJSON (+ quantized TopoJSON) per level in LEVELS
+- One GeoJSON per province per level
+- Content-hashed file names, precompressed .gz (and .br if brotli is installed)
+- manifest.json describing levels, zoom ranges and file names
+
+The legacy Frontend/public/data/vietnam-provinces.geojson (tolerance 0.01)
+is still written for pages that load it directly.
+
+Usage:
+    python scripts/convert_shapefile_to_geojson.py [--output-dir static/boundaries]
+
+Optional dependencies: topojson (TopoJSON output), brotli (.br files)
 """
 
-import geopandas as gpd
+import argparse
+import gzip
+import hashlib
 import json
+import re
+import unicodedata
 from pathlib import Path
 
-def convert_shapefile_to_geojson():
-    """Convert shapefile to simplified GeoJSON"""
-    
-    # Paths
-    base_dir = Path(__file__).parent.parent.parent
-    shp_path = base_dir / 'Database/data_space/VNM_adm/63Tinh_QuanDao.shp'
-    output_path = base_dir / 'Frontend/public/data/vietnam-provinces.geojson'
-    
-    print(f"Reading shapefile from: {shp_path}")
-    
+import geopandas as gpd
+
+try:
+    import topojson
+except ImportError:  # TopoJSON output is optional
+    topojson = None
+
+try:
+    import brotli
+except ImportError:  # .br variants are optional
+    brotli = None
+
+# (name, simplify tolerance in degrees, min zoom, coordinate decimals)
+LEVELS = [
+    ("z0", 0.05, 0, 3),
+    ("z1", 0.01, 6, 4),
+    ("z2", 0.002, 9, 5),
+    ("z3", 0.0005, 12, 5),
+]
+
+# TopoJSON quantization (grid size per axis)
+TOPOJSON_QUANTIZATION = 1e5
+
+LEGACY_TOLERANCE = 0.01
+
+BASE_DIR = Path(__file__).parent.parent.parent
+SHP_PATH = BASE_DIR / 'Database/data_space/VNM_adm/63Tinh_QuanDao.shp'
+LEGACY_OUTPUT = BASE_DIR / 'Frontend/public/data/vietnam-provinces.geojson'
+DEFAULT_OUTPUT_DIR = Path(__file__).parent.parent / 'static/boundaries'
+
+
+def slugify(name):
+    """'Bà Rịa - Vũng Tàu' -> 'ba-ria-vung-tau'"""
+    text = str(name).replace('đ', 'd').replace('Đ', 'D')
+    text = unicodedata.normalize('NFD', text)
+    text = ''.join(c for c in text if unicodedata.category(c) != 'Mn')
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def province_name(row):
+    """Tên tỉnh từ thuộc tính shapefile"""
+    for column in ('NAME_1', 'name', 'Ten_Tinh', 'TEN_TINH'):
+        if column in row and row[column]:
+            return str(row[column])
+    return str(row.name)
+
+
+def round_coordinates(geometry, decimals):
+    """Làm tròn tọa độ GeoJSON (giảm kích thước file)"""
+    if isinstance(geometry, (list, tuple)):
+        if geometry and isinstance(geometry[0], (int, float)):
+            return [round(value, decimals) for value in geometry]
+        return [round_coordinates(part, decimals) for part in geometry]
+    return geometry
+
+
+def to_geojson_bytes(gdf, decimals):
+    """GeoDataFrame -> GeoJSON bytes gọn (không khoảng trắng, tọa độ đã làm tròn)"""
+    data = json.loads(gdf.to_json(drop_id=True))
+    for feature in data['features']:
+        geometry = feature.get('geometry')
+        if geometry:
+            geometry['coordinates'] = round_coordinates(geometry['coordinates'], decimals)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def to_topojson_bytes(gdf, tolerance):
+    """GeoDataFrame -> TopoJSON quantized (simplify trên topology nên biên giữa các tỉnh khớp nhau)"""
+    topology = topojson.Topology(
+        gdf,
+        prequantize=TOPOJSON_QUANTIZATION,
+        toposimplify=tolerance,
+        object_name='provinces'
+    )
+    return json.dumps(topology.to_dict(), separators=(',', ':')).encode('utf-8')
+
+
+def write_hashed(output_dir, stem, extension, content):
+    """
+    Ghi file tên có hash nội dung + bản nén .gz/.br
+
+    Returns:
+        str: Tên file (không kèm .gz/.br)
+    """
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    filename = f"{stem}.{digest}.{extension}"
+    path = output_dir / filename
+
+    path.write_bytes(content)
+    path.with_name(filename + '.gz').write_bytes(gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        path.with_name(filename + '.br').write_bytes(brotli.compress(content, quality=11))
+
+    return filename
+
+
+def build_pyramid(gdf, output_dir):
+    """Ghi toàn bộ level + manifest.json, trả về manifest"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    provinces_dir = output_dir / 'provinces'
+    provinces_dir.mkdir(exist_ok=True)
+
+    manifest = {"levels": []}
+
+    for name, tolerance, min_zoom, decimals in LEVELS:
+        print(f"\nLevel {name}: tolerance={tolerance}, zoom>={min_zoom}")
+        simplified = gdf.copy()
+        simplified['geometry'] = simplified['geometry'].simplify(tolerance=tolerance, preserve_topology=True)
+
+        content = to_geojson_bytes(simplified, decimals)
+        level = {
+            "name": name,
+            "min_zoom": min_zoom,
+            "tolerance": tolerance,
+            "geojson": write_hashed(output_dir, f"provinces.{name}", "geojson", content),
+            "topojson": None,
+            "provinces": {}
+        }
+        print(f"  GeoJSON: {level['geojson']} ({len(content) / 1024:.1f} KB)")
+
+        if topojson is not None:
+            topo = to_topojson_bytes(gdf, tolerance)
+            level["topojson"] = write_hashed(output_dir, f"provinces.{name}", "topojson", topo)
+            print(f"  TopoJSON: {level['topojson']} ({len(topo) / 1024:.1f} KB)")
+
+        for _, row in simplified.iterrows():
+            province = province_name(row)
+            single = simplified.loc[[row.name]]
+            filename = write_hashed(
+                provinces_dir, f"{slugify(province)}.{name}", "geojson",
+                to_geojson_bytes(single, decimals)
+            )
+            level["provinces"][province] = f"provinces/{filename}"
+        print(f"  Provinces: {len(level['provinces'])} files")
+
+        manifest["levels"].append(level)
+
+    if topojson is None:
+        print("\n⚠️  topojson not installed, skipped TopoJSON output (pip install topojson)")
+    if brotli is None:
+        print("⚠️  brotli not installed, skipped .br files (pip install brotli)")
+
+    (output_dir / 'manifest.json').write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8'
+    )
+    return manifest
+
+
+def write_legacy_geojson(gdf):
+    """File GeoJSON đơn cho frontend cũ (/data/vietnam-provinces.geojson)"""
+    simplified = gdf.copy()
+    simplified['geometry'] = simplified['geometry'].simplify(tolerance=LEGACY_TOLERANCE, preserve_topology=True)
+    LEGACY_OUTPUT.parent.mkdir(parents=True, exist_ok=True)
+    simplified.to_file(LEGACY_OUTPUT, driver='GeoJSON')
+    print(f"\nLegacy file: {LEGACY_OUTPUT} ({LEGACY_OUTPUT.stat().st_size / 1024:.1f} KB)")
+
+
+def convert_shapefile_to_geojson(output_dir=DEFAULT_OUTPUT_DIR):
+    """Convert shapefile to simplified GeoJSON pyramid"""
+    print(f"Reading shapefile from: {SHP_PATH}")
+
     # Read shapefile
-    gdf = gpd.read_file(shp_path)
-    
+    gdf = gpd.read_file(SHP_PATH)
+
     print(f"Number of features: {len(gdf)}")
     print(f"Original CRS: {gdf.crs}")
     print(f"Columns: {list(gdf.columns)}")
-    
+
     # Convert to WGS84 (EPSG:4326) for web compatibility
     if gdf.crs != 'EPSG:4326':
         print("Converting to EPSG:4326...")
         gdf = gdf.to_crs(epsg=4326)
-    
-    # Simplify geometry for better performance
-    print("Simplifying geometries...")
-    original_size = len(str(gdf.to_json()))
-    gdf['geometry'] = gdf['geometry'].simplify(tolerance=0.01, preserve_topology=True)
-    simplified_size = len(str(gdf.to_json()))
-    
-    print(f"Size reduction: {original_size:,} -> {simplified_size:,} bytes ({100 - simplified_size/original_size*100:.1f}% reduction)")
-    
-    # Save as GeoJSON
-    print(f"Saving to: {output_path}")
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    gdf.to_file(output_path, driver='GeoJSON')
-    
-    # Get file size
-    file_size = output_path.stat().st_size
+
+    manifest = build_pyramid(gdf, Path(output_dir))
+    write_legacy_geojson(gdf)
+
     print(f"\n✅ Conversion complete!")
-    print(f"Output file: {output_path}")
-    print(f"File size: {file_size / 1024:.1f} KB")
-    print(f"Features: {len(gdf)}")
-    
-    # Show sample properties
-    if len(gdf) > 0:
-        print(f"\nSample feature properties:")
-        first_feature = gdf.iloc[0]
-        for col in gdf.columns:
-            if col != 'geometry':
-                print(f"  - {col}: {first_feature[col]}")
+    print(f"Output directory: {output_dir}")
+    for level in manifest["levels"]:
+        print(f"  - {level['name']} (zoom >= {level['min_zoom']}): {level['geojson']}")
+
 
 if __name__ == '__main__':
-    convert_shapefile_to_geojson()
+    parser = argparse.ArgumentParser(description="Build province boundary pyramid from shapefile")
+    parser.add_argument("--output-dir", default=str(DEFAULT_OUTPUT_DIR), help="Thư mục output cho boundaries API")
+    args = parser.parse_args()
+    convert_shapefile_to_geojson(args.output_dir)
@@ -0,0 +1,765 @@
+#!/usr/bin/env python3
+"""
+Synthetic Dataset Generator
+Sinh dữ liệu giả lập quy mô production (10k - 1M vùng trồng) cho load test:
+users (nông dân), vung_trong, vu_mua, lich_su_canh_tac, bao_dong
+
+- Tất định: cùng --seed, cùng tham số và cùng --as-of -> cùng dữ liệu
+  (numpy default_rng, mỗi lô vùng trồng có một generator riêng)
+- Tọa độ nằm trong polygon tỉnh thật (don_vi_hanh_chinh, hoặc GeoJSON
+  settings.PROVINCE_BOUNDARY_FILE); số vùng trồng mỗi tỉnh tỉ lệ với diện tích,
+  bỏ qua polygon quần đảo (QĐ.Hoàng Sa, QĐ.Trường Sa)
+- Mỗi --farms-per-farmer vùng trồng liên tiếp thuộc một user farmer giả lập
+  (chu_so_huu_id, nguoi_dai_dien = họ tên farmer), đăng nhập bằng
+  SYNTHETIC_FARMER_PASSWORD
+- Sinh theo cột bằng numpy, nạp bằng COPY ... FROM STDIN (không qua ORM),
+  id cấp trước theo từng lô nên bảng con tham chiếu được bảng cha
+- Mã vùng / username có tiền tố (mặc định SYN- / syn-farmer-) để --clean
+  xóa đúng dữ liệu giả lập
+- Nạp xong gọi mark_farm_data_changed(): xóa cache tile, API server dựng lại
+  index cluster
+
+Bổ sung cho seed_demo_data.py (vài chục dòng demo trên vùng trồng có sẵn).
+
+Usage:
+    python scripts/generate_synthetic_data.py --farms 100000
+    python scripts/generate_synthetic_data.py --farms 1000000 --seed 7 --no-admin-trigger
+    python scripts/generate_synthetic_data.py --farms 10000 --dry-run
+    python scripts/generate_synthetic_data.py --clean
+"""
+import sys
+import os
+import io
+import csv
+import time
+import argparse
+import math
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import shapely
+
+# Add Backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import text
+
+from config import settings
+from database import SessionLocal, engine
+from models import TongHopVatTu
+from models.admin_unit import CAP_TINH
+from utils.admin_boundaries import (
+    AdminUnit, load_units_from_db, load_units_from_geojson, normalize_province_name
+)
+from utils.auth import get_password_hash
+from utils.data_version import mark_farm_data_changed
+from utils.input_rollup import rebuild_input_rollup
+from utils.quantity import parse_quantity
+
+DEFAULT_SEED = 42
+DEFAULT_PREFIX = "SYN"
+FARMS_PER_BLOCK = 50_000
+COORDINATE_DECIMALS = 6  # latitude/longitude Numeric(10, 6)
+DEFAULT_FARMS_PER_FARMER = 5
+SYNTHETIC_FARMER_PASSWORD = "synthetic123"
+
+# Polygon quần đảo trong shapefile/GeoJSON tỉnh: không sinh vùng trồng
+ARCHIPELAGO_NAMES = {"qd hoang sa", "qd truong sa"}
+
+# Loại hoạt động (id như seed_demo_data.py) -> tỉ lệ trong lịch sử canh tác
+HOAT_DONG_GIEO_HAT = 1
+HOAT_DONG_BON_PHAN = 2
+HOAT_DONG_PHUN_THUOC = 3
+HOAT_DONG_TUOI_NUOC = 4
+HOAT_DONG_THU_HOACH = 5
+ACTIVITY_WEIGHTS = {
+    HOAT_DONG_GIEO_HAT: 0.10,
+    HOAT_DONG_BON_PHAN: 0.30,
+    HOAT_DONG_PHUN_THUOC: 0.25,
+    HOAT_DONG_TUOI_NUOC: 0.25,
+    HOAT_DONG_THU_HOACH: 0.10,
+}
+OTHER_ACTIVITY_WEIGHT = 0.02
+
+ALERT_TYPES = [
+    ("benh_hai", "Phát hiện sâu bệnh"),
+    ("thien_tai", "Cảnh báo thiên tai"),
+    ("mua_kho", "Dự báo khô hạn"),
+    ("suy_dinh_duong", "Thiếu dinh dưỡng"),
+    ("khac", "Vấn đề khác"),
+]
+SEVERITY_LEVELS = ["thap", "trung_binh", "cao", "rat_cao"]
+SEVERITY_WEIGHTS = [0.35, 0.35, 0.2, 0.1]
+ALERT_STATUSES = ["chua_giai_quyet", "dang_xu_ly", "da_giai_quyet"]
+ALERT_STATUS_WEIGHTS = [0.25, 0.15, 0.6]
+
+HO = ["Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Huỳnh", "Phan", "Vũ", "Võ", "Đặng", "Bùi", "Đỗ", "Hồ", "Ngô"]
+DEM = ["Văn", "Thị", "Hữu", "Đức", "Minh", "Ngọc", "Thanh", "Quang", "Thu", "Kim"]
+TEN = ["An", "Bình", "Cường", "Dũng", "Hà", "Hải", "Hùng", "Lan", "Long", "Mai", "Nam", "Phúc", "Sơn", "Tâm", "Trang", "Tuấn"]
+MARKETS = ["Nội địa", "Trung Quốc", "EU", "Mỹ", "Nhật Bản", "Hàn Quốc", "Úc"]
+MARKET_WEIGHTS = [0.4, 0.25, 0.1, 0.08, 0.07, 0.06, 0.04]
+
+USER_COLUMNS = [
+    "id", "username", "email", "full_name", "password_hash", "role", "is_active", "created_at", "updated_at",
+]
+FARM_COLUMNS = [
+    "id", "ma_vung", "ten_vung", "dien_tich", "nguoi_dai_dien", "chu_so_huu_id", "cay_trong_id", "phan_bon_id",
+    "thuoc_bvtv_id", "tinh_name", "tinh_id", "thi_truong_xuat_khau", "latitude", "longitude",
+    "fertilizer_volume", "pesticide_volume", "created_at", "updated_at",
+]
+SEASON_COLUMNS = ["id", "ten_vu", "vung_trong_id", "ngay_bat_dau", "ngay_ket_thuc", "trang_thai", "ghi_chu"]
+HISTORY_COLUMNS = [
+    "id", "vung_trong_id", "vu_mua_id", "loai_hoat_dong_id", "ngay_thuc_hien", "chi_tiet",
+    "nguoi_thuc_hien", "phan_bon_id", "thuoc_bvtv_id", "giong_id", "lieu_luong", "don_vi",
+    "so_luong", "don_vi_chuan", "created_at", "updated_at",
+]
+ALERT_COLUMNS = [
+    "id", "vung_trong_id", "loai_bao_dong", "muc_do", "tieu_de", "noi_dung", "ngay_tao",
+    "trang_thai", "ngay_giai_quyet",
+]
+TABLE_COLUMNS = {
+    "vung_trong": FARM_COLUMNS,
+    "vu_mua": SEASON_COLUMNS,
+    "lich_su_canh_tac": HISTORY_COLUMNS,
+    "bao_dong": ALERT_COLUMNS,
+}
+
+
+@dataclass
+class Catalogs:
+    """Id danh mục có sẵn trong DB mà dữ liệu giả lập tham chiếu tới"""
+    crops: Dict[int, str]
+    activities: List[int]
+    fertilizers: List[int] = field(default_factory=list)
+    pesticides: List[int] = field(default_factory=list)
+    seeds: List[int] = field(default_factory=list)
+
+
+@dataclass
+class TableStats:
+    table: str
+    rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+class ProvinceSampler:
+    """
+    Sinh điểm ngẫu nhiên nằm trong polygon tỉnh
+
+    Rejection sampling trong bounding box của từng tỉnh, kiểm tra bằng
+    shapely.contains_xy trên geometry đã prepare (vectorized).
+    """
+
+    def __init__(self, units: List[AdminUnit]):
+        self.units = units
+        self.geometries = np.array([unit.geometry for unit in units], dtype=object)
+        shapely.prepare(self.geometries)
+        self.bounds = shapely.bounds(self.geometries)
+        areas = shapely.area(self.geometries)
+        self.weights = areas / areas.sum()
+        box_areas = (self.bounds[:, 2] - self.bounds[:, 0]) * (self.bounds[:, 3] - self.bounds[:, 1])
+        self.fill_ratio = np.clip(areas / box_areas, 0.01, 1.0)
+
+    def sample(self, rng: np.random.Generator, position: int, count: int):
+        """
+        count điểm trong tỉnh thứ `position`
+
+        Returns:
+            tuple: (lons, lats) đã làm tròn COORDINATE_DECIMALS, vẫn nằm trong polygon
+        """
+        min_x, min_y, max_x, max_y = self.bounds[position]
+        geometry = self.geometries[position]
+        lons, lats = [], []
+        remaining = count
+        while remaining > 0:
+            draw = int(remaining / self.fill_ratio[position] * 1.2) + 16
+            x = np.round(rng.uniform(min_x, max_x, draw), COORDINATE_DECIMALS)
+            y = np.round(rng.uniform(min_y, max_y, draw), COORDINATE_DECIMALS)
+            inside = shapely.contains_xy(geometry, x, y)
+            lons.append(x[inside][:remaining])
+            lats.append(y[inside][:remaining])
+            remaining -= len(lons[-1])
+        return np.concatenate(lons), np.concatenate(lats)
+
+    def sample_farms(self, rng: np.random.Generator, count: int):
+        """
+        Phân bổ count vùng trồng vào các tỉnh (theo diện tích) rồi sinh tọa độ
+
+        Returns:
+            tuple: (vị trí tỉnh, lons, lats), mỗi mảng dài count
+        """
+        positions = np.sort(rng.choice(len(self.units), size=count, p=self.weights))
+        lons = np.empty(count)
+        lats = np.empty(count)
+        uniques, starts, counts = np.unique(positions, return_index=True, return_counts=True)
+        for position, start, n in zip(uniques, starts, counts):
+            lons[start:start + n], lats[start:start + n] = self.sample(rng, position, n)
+        order = rng.permutation(count)
+        return positions[order], lons[order], lats[order]
+
+
+def without_archipelagos(units: List[AdminUnit]) -> List[AdminUnit]:
+    """Bỏ polygon QĐ.Hoàng Sa / QĐ.Trường Sa (không có đất canh tác)"""
+    return [unit for unit in units if normalize_province_name(unit.ten) not in ARCHIPELAGO_NAMES]
+
+
+def load_provinces(db=None) -> tuple:
+    """
+    Polygon tỉnh: don_vi_hanh_chinh (cap = 1) trước, GeoJSON sau (không gồm quần đảo)
+
+    Returns:
+        tuple: (units, from_db) - from_db cho biết unit.id là id don_vi_hanh_chinh
+    """
+    if db is not None:
+        try:
+            units = without_archipelagos(load_units_from_db(db, CAP_TINH))
+            if units:
+                return units, True
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️  Province polygons not loaded from database: {e}")
+
+    if not os.path.exists(settings.PROVINCE_BOUNDARY_FILE):
+        raise FileNotFoundError(f"No province polygons: {settings.PROVINCE_BOUNDARY_FILE}")
+    return without_archipelagos(load_units_from_geojson(settings.PROVINCE_BOUNDARY_FILE, CAP_TINH)), False
+
+
+def load_catalogs(db) -> Catalogs:
+    """Id danh mục hiện có (loai_cay_trong, loai_hoat_dong bắt buộc phải có dữ liệu)"""
+    def ids(table: str) -> List[int]:
+        return [row[0] for row in db.execute(text(f"SELECT id FROM {table} ORDER BY id"))]
+
+    crops = {row.id: row.ten_cay for row in db.execute(text("SELECT id, ten_cay FROM loai_cay_trong ORDER BY id"))}
+    return Catalogs(
+        crops=crops,
+        activities=ids("loai_hoat_dong"),
+        fertilizers=ids("phan_bon"),
+        pesticides=ids("thuoc_bvtv"),
+        seeds=ids("giong_cay"),
+    )
+
+
+def placeholder_catalogs() -> Catalogs:
+    """Danh mục giả cho --dry-run (không kết nối DB)"""
+    return Catalogs(
+        crops={i: f"Cây trồng {i}" for i in range(1, 21)},
+        activities=sorted(ACTIVITY_WEIGHTS),
+        fertilizers=list(range(1, 201)),
+        pesticides=list(range(1, 201)),
+        seeds=list(range(1, 51)),
+    )
+
+
+def choice_or_none(rng: np.random.Generator, ids: Sequence[int], mask: np.ndarray) -> np.ndarray:
+    """Id ngẫu nhiên trong ids tại các vị trí mask, None ở chỗ còn lại (hoặc khi ids rỗng)"""
+    result = np.full(len(mask), None, dtype=object)
+    if len(ids) and mask.any():
+        result[mask] = rng.choice(np.asarray(ids), size=int(mask.sum())).tolist()
+    return result
+
+
+def where_or_none(mask: np.ndarray, values: np.ndarray) -> np.ndarray:
+    result = np.full(len(mask), None, dtype=object)
+    result[mask] = values[mask].tolist()
+    return result
+
+
+def group_starts(counts: np.ndarray) -> np.ndarray:
+    """Vị trí phần tử đầu của mỗi nhóm khi các nhóm (độ dài counts) nằm liền nhau"""
+    return np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+
+def grouped_cumsum(values: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Cộng dồn values trong từng nhóm liền nhau"""
+    total = np.cumsum(values)
+    starts = group_starts(counts)[counts > 0]
+    offsets = np.repeat(total[starts] - values[starts], counts[counts > 0])
+    return total - offsets
+
+
+def season_label(start: date) -> str:
+    if start.month <= 4:
+        return f"Vụ Xuân {start.year}"
+    if start.month <= 8:
+        return f"Vụ Hè Thu {start.year}"
+    return f"Vụ Đông {start.year}"
+
+
+def text_pool(rng: np.random.Generator, size: int, render) -> np.ndarray:
+    """size câu render sẵn, các dòng lấy ngẫu nhiên từ pool (nhanh hơn format từng dòng)"""
+    return np.array([render(rng) for _ in range(size)], dtype=object)
+
+
+def history_detail_pools(rng: np.random.Generator) -> Dict[int, np.ndarray]:
+    """Mẫu chi_tiet theo loại hoạt động, giống seed_demo_data.py"""
+    return {
+        HOAT_DONG_GIEO_HAT: text_pool(rng, 30, lambda r: (
+            f"Gieo hạt đều, mật độ {r.choice(['thưa', 'vừa phải', 'dày'])}, độ sâu {r.integers(2, 6)} cm")),
+        HOAT_DONG_BON_PHAN: text_pool(rng, 60, lambda r: (
+            f"Bón phân {r.choice(['NPK', 'DAP', 'Urê', 'Kali', 'hữu cơ vi sinh'])} "
+            f"với liều lượng {r.integers(50, 301)} kg/ha")),
+        HOAT_DONG_PHUN_THUOC: text_pool(rng, 30, lambda r: (
+            f"Phun thuốc {r.choice(['BVTV sinh học', 'thuốc hóa học'])} để phòng trừ "
+            f"{r.choice(['sâu bệnh', 'cỏ dại', 'nấm bệnh', 'rầy nâu'])}")),
+        HOAT_DONG_TUOI_NUOC: text_pool(rng, 10, lambda r: (
+            f"Tưới nước đủ ẩm, thời gian {r.choice(['sáng sớm', 'chiều mát', 'cả ngày'])}")),
+        HOAT_DONG_THU_HOACH: text_pool(rng, 40, lambda r: (
+            f"Thu hoạch bằng {r.choice(['máy gặt', 'thủ công'])}, "
+            f"năng suất ước tính {r.uniform(3.5, 8.5):.1f} tấn/ha")),
+    }
+
+
+def to_dates(base: np.datetime64, days: np.ndarray) -> np.ndarray:
+    return (base + days.astype("timedelta64[D]")).astype(object)
+
+
+def to_datetimes(base: np.datetime64, seconds: np.ndarray) -> np.ndarray:
+    return (base.astype("datetime64[s]") + seconds.astype("timedelta64[s]")).astype(object)
+
+
+class SyntheticGenerator:
+    """Sinh một lô dữ liệu (vùng trồng + bảng con) dưới dạng cột numpy"""
+
+    def __init__(self, sampler: ProvinceSampler, catalogs: Catalogs, args, province_ids: Optional[np.ndarray]):
+        self.sampler = sampler
+        self.catalogs = catalogs
+        self.args = args
+        self.province_ids = province_ids
+        self.as_of = np.datetime64(args.as_of, "D")
+
+        # Farmer của vùng trồng thứ i (từ 1): (i - 1) // farms_per_farmer
+        self.farmer_count = math.ceil(args.farms / args.farms_per_farmer)
+        self.farmer_names = self.people(np.random.default_rng([args.seed, 0, 1]), self.farmer_count)
+        self.first_farmer_id = 1  # Gán lại bằng id cấp từ sequence users trước khi sinh lô
+
+        self.crop_ids = np.array(sorted(catalogs.crops))
+        self.crop_names = np.array([catalogs.crops[i] for i in self.crop_ids], dtype=object)
+        self.province_names = np.array([unit.ten for unit in sampler.units], dtype=object)
+
+        self.activity_ids = np.array(catalogs.activities)
+        weights = np.array([ACTIVITY_WEIGHTS.get(i, OTHER_ACTIVITY_WEIGHT) for i in self.activity_ids])
+        self.activity_weights = weights / weights.sum()
+
+        pool_rng = np.random.default_rng([args.seed, 0])
+        self.detail_pools = history_detail_pools(pool_rng)
+        self.alert_pool = text_pool(pool_rng, 50, lambda r: (
+            f"Phát hiện vấn đề cần xử lý. "
+            f"Diện tích ảnh hưởng khoảng {r.uniform(0.5, 5):.1f} ha."))
+
+    def people(self, rng: np.random.Generator, count: int) -> np.ndarray:
+        ho = np.array(HO, dtype=object)[rng.integers(0, len(HO), count)]
+        dem = np.array(DEM, dtype=object)[rng.integers(0, len(DEM), count)]
+        ten = np.array(TEN, dtype=object)[rng.integers(0, len(TEN), count)]
+        return ho + " " + dem + " " + ten
+
+    def farmers(self) -> dict:
+        """Users role farmer sở hữu vùng trồng giả lập (cùng một mật khẩu)"""
+        count = self.farmer_count
+        username = np.array(
+            [f"{self.args.prefix.lower()}-farmer-{i:07d}" for i in range(1, count + 1)], dtype=object
+        )
+        created_at = to_datetimes(self.as_of, np.full(count, -3 * 365 * 86400))
+        return {
+            "id": np.arange(self.first_farmer_id, self.first_farmer_id + count),
+            "username": username,
+            "email": username + "@synthetic.local",
+            "full_name": self.farmer_names,
+            "password_hash": np.full(count, get_password_hash(SYNTHETIC_FARMER_PASSWORD), dtype=object),
+            "role": np.full(count, "farmer", dtype=object),
+            "is_active": np.full(count, True),
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+    def farms(self, rng: np.random.Generator, first_index: int, count: int, first_id: int) -> dict:
+        positions, lons, lats = self.sampler.sample_farms(rng, count)
+        farmer = (np.arange(first_index, first_index + count) - 1) // self.args.farms_per_farmer
+        crop = rng.integers(0, len(self.crop_ids), count)
+        ma_vung = np.array(
+            [f"{self.args.prefix}-{i:07d}" for i in range(first_index, first_index + count)], dtype=object
+        )
+        created_at = to_datetimes(self.as_of, -rng.integers(1, 3 * 365 * 86400, count))
+
+        return {
+            "id": np.arange(first_id, first_id + count),
+            "ma_vung": ma_vung,
+            "ten_vung": "Vùng " + self.crop_names[crop] + " " + ma_vung,
+            "dien_tich": np.round(np.clip(rng.lognormal(np.log(2.0), 0.9, count), 0.1, 500), 2),
+            "nguoi_dai_dien": self.farmer_names[farmer],
+            "chu_so_huu_id": self.first_farmer_id + farmer,
+            "cay_trong_id": self.crop_ids[crop],
+            "phan_bon_id": choice_or_none(rng, self.catalogs.fertilizers, rng.random(count) < 0.6),
+            "thuoc_bvtv_id": choice_or_none(rng, self.catalogs.pesticides, rng.random(count) < 0.5),
+            "tinh_name": self.province_names[positions],
+            "tinh_id": self.province_ids[positions] if self.province_ids is not None
+            else np.full(count, None, dtype=object),
+            "thi_truong_xuat_khau": np.array(MARKETS, dtype=object)[
+                rng.choice(len(MARKETS), size=count, p=MARKET_WEIGHTS)],
+            "latitude": lats,
+            "longitude": lons,
+            # Tính lại từ lịch sử canh tác bởi rebuild_input_rollup()
+            "fertilizer_volume": np.zeros(count),
+            "pesticide_volume": np.zeros(count),
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+    def seasons(self, rng: np.random.Generator, farms: dict, first_id: int) -> dict:
+        """Các vụ của mỗi vùng trồng nối tiếp nhau lùi về quá khứ, vụ mới nhất có thể đang diễn ra"""
+        counts = 1 + rng.poisson(max(self.args.seasons_per_farm - 1, 0), len(farms["id"]))
+        total = int(counts.sum())
+        farm_index = np.repeat(np.arange(len(counts)), counts)
+
+        duration = rng.integers(90, 181, total)
+        gap = rng.integers(10, 61, total)
+        step = duration + gap
+        step[group_starts(counts)] = 0
+        latest_start = -rng.integers(0, 241, len(counts))
+        start = np.repeat(latest_start, counts) - grouped_cumsum(step, counts)
+        end = start + duration
+
+        ngay_bat_dau = to_dates(self.as_of, start)
+        return {
+            "id": np.arange(first_id, first_id + total),
+            "ten_vu": np.array([season_label(d) for d in ngay_bat_dau], dtype=object)
+            + " - " + np.array([name[:20] for name in farms["ten_vung"][farm_index]], dtype=object),
+            "vung_trong_id": farms["id"][farm_index],
+            "ngay_bat_dau": ngay_bat_dau,
+            "ngay_ket_thuc": to_dates(self.as_of, end),
+            "trang_thai": np.where(end > 0, "dang_hoat_dong", "ket_thuc").astype(object),
+            "ghi_chu": "Synthetic season for " + farms["ma_vung"][farm_index],
+            # Dùng nội bộ cho lịch sử canh tác, không nạp vào DB
+            "_start": start,
+            "_end": np.minimum(end, 0),
+            "_farm_index": farm_index,
+        }
+
+    def history(self, rng: np.random.Generator, farms: dict, seasons: dict, first_id: int) -> dict:
+        counts = rng.poisson(self.args.history_per_season, len(seasons["id"]))
+        total = int(counts.sum())
+        season_index = np.repeat(np.arange(len(counts)), counts)
+        farm_index = seasons["_farm_index"][season_index]
+
+        start = seasons["_start"][season_index]
+        span = seasons["_end"][season_index] - start + 1
+        day = start + (rng.random(total) * span).astype(np.int64)
+        activity = rng.choice(self.activity_ids, size=total, p=self.activity_weights)
+        fertilizing = activity == HOAT_DONG_BON_PHAN
+        spraying = activity == HOAT_DONG_PHUN_THUOC
+
+        chi_tiet = np.full(total, None, dtype=object)
+        for activity_id, pool in self.detail_pools.items():
+            mask = activity == activity_id
+            chi_tiet[mask] = pool[rng.integers(0, len(pool), int(mask.sum()))]
+
+        lieu_luong = np.full(total, None, dtype=object)
+        don_vi = np.full(total, None, dtype=object)
+        lieu_luong[fertilizing] = rng.integers(50, 301, int(fertilizing.sum())).astype(str)
+        don_vi[fertilizing] = "kg/ha"
+        lieu_luong[spraying] = np.char.replace(
+            np.round(rng.uniform(0.5, 3.0, int(spraying.sum())), 1).astype(str), ".", ",")
+        don_vi[spraying] = "lít/ha"
+
+        # so_luong / don_vi_chuan theo đúng parser của API (ít giá trị phân biệt)
+        so_luong = np.full(total, None, dtype=object)
+        don_vi_chuan = np.full(total, None, dtype=object)
+        dosed = fertilizing | spraying
+        pairs = {pair: parse_quantity(*pair) for pair in set(zip(lieu_luong[dosed], don_vi[dosed]))}
+        parsed = [pairs[pair] for pair in zip(lieu_luong[dosed], don_vi[dosed])]
+        so_luong[dosed] = [value for value, _ in parsed]
+        don_vi_chuan[dosed] = [unit for _, unit in parsed]
+
+        created_at = to_datetimes(self.as_of, day * 86400 + rng.integers(6 * 3600, 18 * 3600, total))
+        return {
+            "id": np.arange(first_id, first_id + total),
+            "vung_trong_id": farms["id"][farm_index],
+            "vu_mua_id": seasons["id"][season_index],
+            "loai_hoat_dong_id": activity,
+            "ngay_thuc_hien": to_dates(self.as_of, day),
+            "chi_tiet": chi_tiet,
+            "nguoi_thuc_hien": farms["nguoi_dai_dien"][farm_index],
+            "phan_bon_id": choice_or_none(rng, self.catalogs.fertilizers, fertilizing),
+            "thuoc_bvtv_id": choice_or_none(rng, self.catalogs.pesticides, spraying),
+            "giong_id": choice_or_none(rng, self.catalogs.seeds, activity == HOAT_DONG_GIEO_HAT),
+            "lieu_luong": lieu_luong,
+            "don_vi": don_vi,
+            "so_luong": so_luong,
+            "don_vi_chuan": don_vi_chuan,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+    def alerts(self, rng: np.random.Generator, farms: dict, first_id: int) -> dict:
+        counts = rng.poisson(self.args.alerts_per_farm, len(farms["id"]))
+        total = int(counts.sum())
+        farm_index = np.repeat(np.arange(len(counts)), counts)
+
+        kind = rng.integers(0, len(ALERT_TYPES), total)
+        status = rng.choice(len(ALERT_STATUSES), size=total, p=ALERT_STATUS_WEIGHTS)
+        created = -rng.integers(3600, 90 * 86400, total)
+        resolved = np.minimum(created + rng.integers(3600, 20 * 86400, total), 0)
+        titles = np.array([title for _, title in ALERT_TYPES], dtype=object)
+
+        return {
+            "id": np.arange(first_id, first_id + total),
+            "vung_trong_id": farms["id"][farm_index],
+            "loai_bao_dong": np.array([code for code, _ in ALERT_TYPES], dtype=object)[kind],
+            "muc_do": np.array(SEVERITY_LEVELS, dtype=object)[
+                rng.choice(len(SEVERITY_LEVELS), size=total, p=SEVERITY_WEIGHTS)],
+            "tieu_de": np.array([
+                (title + " tại " + name)[:200] for title, name in zip(titles[kind], farms["ten_vung"][farm_index])
+            ], dtype=object),
+            "noi_dung": self.alert_pool[rng.integers(0, len(self.alert_pool), total)],
+            "ngay_tao": to_datetimes(self.as_of, created),
+            "trang_thai": np.array(ALERT_STATUSES, dtype=object)[status],
+            "ngay_giai_quyet": where_or_none(
+                status == ALERT_STATUSES.index("da_giai_quyet"), to_datetimes(self.as_of, resolved)),
+        }
+
+
+def copy_rows(cursor, table: str, columns: List[str], data: dict) -> int:
+    """
+    COPY một lô cột vào bảng (CSV: None -> ô rỗng -> NULL)
+
+    Returns:
+        int: Số dòng đã nạp
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(zip(*(data[column].tolist() for column in columns)))
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+    )
+    return len(data["id"])
+
+
+def reserve_ids(cursor, table: str, count: int) -> int:
+    """
+    Cấp trước count id liên tiếp từ sequence của bảng (dùng cho COPY có cột id)
+
+    Bảng được LOCK tới hết transaction nên không ghi đồng thời nào lấy trùng;
+    bắt đầu từ sau MAX(id) phòng khi dữ liệu cũ được nạp với id tường minh.
+
+    Returns:
+        int: Id đầu tiên
+    """
+    cursor.execute(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE")
+    cursor.execute(f"SELECT pg_get_serial_sequence('{table}', 'id')")
+    sequence = cursor.fetchone()[0]
+    cursor.execute(
+        f"SELECT GREATEST(nextval(%s), (SELECT COALESCE(MAX(id), 0) + 1 FROM {table}))", (sequence,)
+    )
+    first_id = cursor.fetchone()[0]
+    if count > 0:
+        cursor.execute("SELECT setval(%s, %s)", (sequence, first_id + count - 1))
+    return first_id
+
+
+def generate_block(generator: SyntheticGenerator, block: int, first_index: int, count: int, first_ids: dict) -> dict:
+    """Sinh một lô: {bảng: cột}. rng riêng theo (seed, lô) nên kết quả không phụ thuộc số lô đã chạy"""
+    rng = np.random.default_rng([generator.args.seed, block + 1])
+    farms = generator.farms(rng, first_index, count, first_ids["vung_trong"])
+    seasons = generator.seasons(rng, farms, first_ids["vu_mua"])
+    history = generator.history(rng, farms, seasons, first_ids["lich_su_canh_tac"])
+    alerts = generator.alerts(rng, farms, first_ids["bao_dong"])
+    return {"vung_trong": farms, "vu_mua": seasons, "lich_su_canh_tac": history, "bao_dong": alerts}
+
+
+def existing_synthetic_count(conn, prefix: str) -> int:
+    return conn.execute(
+        text("SELECT COUNT(*) FROM vung_trong WHERE ma_vung LIKE :pattern"),
+        {"pattern": f"{prefix}-%"}
+    ).scalar()
+
+
+def farmer_pattern(prefix: str) -> str:
+    return f"{prefix.lower()}-farmer-%"
+
+
+def clean(prefix: str):
+    """Xóa dữ liệu giả lập (bảng con trước; tong_hop_vat_tu xóa theo CASCADE, farmer sau cùng)"""
+    pattern = f"{prefix}-%"
+    synthetic = "SELECT id FROM vung_trong WHERE ma_vung LIKE :pattern"
+    with engine.begin() as conn:
+        for table in ("lich_su_canh_tac", "vu_mua", "bao_dong"):
+            result = conn.execute(text(f"DELETE FROM {table} WHERE vung_trong_id IN ({synthetic})"),
+                                  {"pattern": pattern})
+            print(f"🗑️  {table}: {result.rowcount:,} rows deleted")
+        result = conn.execute(text("DELETE FROM vung_trong WHERE ma_vung LIKE :pattern"), {"pattern": pattern})
+        print(f"🗑️  vung_trong: {result.rowcount:,} rows deleted")
+        result = conn.execute(text("""
+            DELETE FROM users u WHERE u.username LIKE :pattern AND u.role = 'farmer'
+            AND NOT EXISTS (SELECT 1 FROM vung_trong v WHERE v.chu_so_huu_id = u.id)
+        """), {"pattern": farmer_pattern(prefix)})
+        print(f"🗑️  users: {result.rowcount:,} synthetic farmers deleted")
+    mark_farm_data_changed()
+
+
+def print_report(stats: Dict[str, TableStats], generate_seconds: float, wall_seconds: float, dry_run: bool):
+    print("\n" + "=" * 70)
+    print("SYNTHETIC DATASET" + (" (dry run, not loaded)" if dry_run else ""))
+    print("=" * 70)
+    for item in stats.values():
+        if dry_run:
+            print(f"  {item.table:20s} {item.rows:>12,} rows")
+        else:
+            print(f"  {item.table:20s} {item.rows:>12,} rows  COPY {item.seconds:>7.1f}s  "
+                  f"{item.rows_per_second:>10,.0f} rows/s")
+    total = sum(item.rows for item in stats.values())
+    print("-" * 70)
+    print(f"  Generated {total:,} rows in {generate_seconds:.1f}s "
+          f"({total / generate_seconds if generate_seconds > 0 else 0:,.0f} rows/s), wall time {wall_seconds:.1f}s")
+    print("=" * 70)
+
+
+def main():
+    """Generate and bulk-load the synthetic dataset"""
+    parser = argparse.ArgumentParser(description="Generate a production-sized synthetic dataset for load testing")
+    parser.add_argument("--farms", type=int, default=10_000, help="Number of farms (vung_trong)")
+    parser.add_argument("--farms-per-farmer", type=int, default=DEFAULT_FARMS_PER_FARMER,
+                        help="Farms owned by each generated farmer user (chu_so_huu_id)")
+    parser.add_argument("--seasons-per-farm", type=float, default=2.0, help="Mean seasons per farm (at least 1)")
+    parser.add_argument("--history-per-season", type=float, default=6.0, help="Mean history records per season")
+    parser.add_argument("--alerts-per-farm", type=float, default=0.3, help="Mean alerts per farm")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Random seed")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today(),
+                        help="Reference date (YYYY-MM-DD), fix it to reproduce a dataset exactly")
+    parser.add_argument("--prefix", default=DEFAULT_PREFIX, help="ma_vung prefix of synthetic farms")
+    parser.add_argument("--block-size", type=int, default=FARMS_PER_BLOCK, help="Farms generated and copied per block")
+    parser.add_argument("--no-admin-trigger", action="store_true",
+                        help="Disable trg_vung_trong_sync_admin_units while loading (tinh_id from the sampled "
+                             "province, huyen_id left NULL: run assign_admin_units.py afterwards)")
+    parser.add_argument("--skip-rollup", action="store_true", help="Do not rebuild tong_hop_vat_tu after loading")
+    parser.add_argument("--dry-run", action="store_true", help="Generate only (no database), report row counts")
+    parser.add_argument("--clean", action="store_true", help="Delete previously generated farms and their rows")
+    args = parser.parse_args()
+    if args.farms_per_farmer < 1:
+        parser.error("--farms-per-farmer must be at least 1")
+
+    if args.clean:
+        clean(args.prefix)
+        return True
+
+    print("=" * 70)
+    print(f"🧪 Synthetic dataset: {args.farms:,} farms, seed {args.seed}, as of {args.as_of}")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    db = None if args.dry_run else SessionLocal()
+    try:
+        units, from_db = load_provinces(db)
+        catalogs = placeholder_catalogs() if args.dry_run else load_catalogs(db)
+    finally:
+        if db is not None:
+            db.close()
+
+    if not catalogs.crops or not catalogs.activities:
+        print("❌ loai_cay_trong and loai_hoat_dong must not be empty, import the catalogs first")
+        return False
+
+    sampler = ProvinceSampler(units)
+    province_ids = np.array([unit.id for unit in units]) if from_db else None
+    generator = SyntheticGenerator(sampler, catalogs, args, province_ids)
+    print(f"🗺️  {len(units)} province polygons ({'don_vi_hanh_chinh' if from_db else 'GeoJSON'}), "
+          f"{len(catalogs.crops)} crops, {len(catalogs.activities)} activity types")
+
+    stats = {"users": TableStats("users")}
+    stats.update({table: TableStats(table) for table in TABLE_COLUMNS})
+    generate_seconds = 0.0
+    blocks = range(0, args.farms, args.block_size)
+
+    if args.dry_run:
+        stats["users"].rows = len(generator.farmers()["id"])
+        next_ids = {table: 1 for table in TABLE_COLUMNS}
+        for block, first_index in enumerate(blocks):
+            count = min(args.block_size, args.farms - first_index)
+            t0 = time.perf_counter()
+            data = generate_block(generator, block, first_index + 1, count, next_ids)
+            generate_seconds += time.perf_counter() - t0
+            for table in TABLE_COLUMNS:
+                stats[table].rows += len(data[table]["id"])
+                next_ids[table] += len(data[table]["id"])
+        print_report(stats, generate_seconds, time.perf_counter() - start, dry_run=True)
+        return True
+
+    with engine.begin() as conn:
+        existing = existing_synthetic_count(conn, args.prefix)
+        if existing:
+            print(f"❌ {existing:,} farms with prefix {args.prefix}- already exist, run --clean or use --prefix")
+            return False
+        existing = conn.execute(
+            text("SELECT COUNT(*) FROM users WHERE username LIKE :pattern"), {"pattern": farmer_pattern(args.prefix)}
+        ).scalar()
+        if existing:
+            print(f"❌ {existing:,} synthetic farmers ({farmer_pattern(args.prefix)}) already exist, run --clean")
+            return False
+
+        cursor = conn.connection.cursor()
+
+        # Farmer trước: vùng trồng tham chiếu chu_so_huu_id
+        t0 = time.perf_counter()
+        generator.first_farmer_id = reserve_ids(cursor, "users", generator.farmer_count)
+        stats["users"].rows = copy_rows(cursor, "users", USER_COLUMNS, generator.farmers())
+        stats["users"].seconds = time.perf_counter() - t0
+        print(f"   {stats['users'].rows:,} farmer users (password '{SYNTHETIC_FARMER_PASSWORD}')")
+        if args.no_admin_trigger:
+            cursor.execute("ALTER TABLE vung_trong DISABLE TRIGGER trg_vung_trong_sync_admin_units")
+
+        for block, first_index in enumerate(blocks):
+            count = min(args.block_size, args.farms - first_index)
+            t0 = time.perf_counter()
+            # Số dòng con chỉ biết sau khi sinh: sinh với id tạm rồi dời theo id cấp thật
+            data = generate_block(generator, block, first_index + 1, count, {table: 0 for table in TABLE_COLUMNS})
+            generate_seconds += time.perf_counter() - t0
+
+            offsets = {table: reserve_ids(cursor, table, len(data[table]["id"])) for table in TABLE_COLUMNS}
+            data["vung_trong"]["id"] += offsets["vung_trong"]
+            data["vu_mua"]["id"] += offsets["vu_mua"]
+            data["vu_mua"]["vung_trong_id"] += offsets["vung_trong"]
+            data["lich_su_canh_tac"]["id"] += offsets["lich_su_canh_tac"]
+            data["lich_su_canh_tac"]["vung_trong_id"] += offsets["vung_trong"]
+            data["lich_su_canh_tac"]["vu_mua_id"] += offsets["vu_mua"]
+            data["bao_dong"]["id"] += offsets["bao_dong"]
+            data["bao_dong"]["vung_trong_id"] += offsets["vung_trong"]
+
+            for table, columns in TABLE_COLUMNS.items():
+                t0 = time.perf_counter()
+                stats[table].rows += copy_rows(cursor, table, columns, data[table])
+                stats[table].seconds += time.perf_counter() - t0
+            print(f"   block {block + 1}/{len(blocks)}: {first_index + count:,} farms")
+
+        if args.no_admin_trigger:
+            cursor.execute("ALTER TABLE vung_trong ENABLE TRIGGER trg_vung_trong_sync_admin_units")
+
+    with engine.begin() as conn:
+        for table in stats:
+            conn.execute(text(f"ANALYZE {table}"))
+
+    if not args.skip_rollup:
+        TongHopVatTu.__table__.create(engine, checkfirst=True)
+        db = SessionLocal()
+        try:
+            t0 = time.perf_counter()
+            row_count = rebuild_input_rollup(db)
+            db.commit()
+            print(f"📦 Rebuilt {row_count:,} tong_hop_vat_tu rows in {time.perf_counter() - t0:.1f}s")
+        finally:
+            db.close()
+
+    # Xóa cache tile; API server dựng lại index cluster ở lần kiểm tra kế tiếp
+    mark_farm_data_changed()
+
+    print_report(stats, generate_seconds, time.perf_counter() - start, dry_run=False)
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Rebuild Input Usage Rollup
+Tạo bảng tong_hop_vat_tu (nếu chưa có) và dựng lại toàn bộ từ lich_su_canh_tac,
+đồng thời đồng bộ vung_trong.fertilizer_volume / pesticide_volume.
+
+Chạy sau backfill_history_quantity.py, hoặc khi nghi ngờ rollup bị lệch.
+"""
+import sys
+import os
+import time
+
+# Add Backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from database import SessionLocal, engine
+from models import TongHopVatTu
+from utils.data_version import mark_farm_data_changed
+from utils.input_rollup import rebuild_input_rollup
+
+
+def main():
+    """Create rollup table if needed and rebuild it"""
+    print("=" * 60)
+    print("📦 Rebuilding input usage rollup (tong_hop_vat_tu)")
+    print("=" * 60)
+    
+    TongHopVatTu.__table__.create(engine, checkfirst=True)
+    
+    db = SessionLocal()
+    
+    try:
+        start = time.perf_counter()
+        row_count = rebuild_input_rollup(db)
+        db.commit()
+        mark_farm_data_changed()  # fertilizer_volume / pesticide_volume đã đổi
+        elapsed = time.perf_counter() - start
+        
+        print(f"\n✅ Rebuilt {row_count:,} rollup rows in {elapsed:.2f}s")
+    except Exception as e:
+        print(f"\n❌ Error during rebuild: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# Pytest fixtures - gọi API qua TestClient trên database cấu hình trong config (.env)
+"""
+Các test chạy trên database thật (PostgreSQL + PostGIS, đã có dữ liệu) vì số
+câu SQL phụ thuộc vào planner / dữ liệu thật; không kết nối được thì skip.
+
+Usage (từ thư mục Backend):
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import pytest
+
+# Add Backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from config import settings
+from database import SessionLocal, engine
+from main import app
+from models import User
+from utils.auth import get_current_active_user
+from utils.farm_clusters import farm_cluster_index
+from utils.pagination import clear_count_cache
+from utils.query_counter import count_queries
+from utils.response_cache import invalidate_analytics_cache
+
+
+@pytest.fixture(scope="session")
+def database():
+    """Engine của app; skip toàn bộ test cần DB nếu không kết nối được"""
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        pytest.skip(f"Database unavailable ({type(e).__name__}), set DB_* in .env to run")
+    return engine
+
+
+@pytest.fixture(scope="session")
+def client(database, tmp_path_factory):
+    """
+    TestClient không chạy startup (không dựng index nền trong lúc đếm)
+
+    Tile cache ghi vào thư mục tạm; index cluster dựng sẵn một lần và không
+    tự kiểm tra phiên bản trong lúc test (câu SQL của thread nền sẽ bị đếm lẫn).
+    """
+    tile_cache_dir = settings.TILE_CACHE_DIR
+    check_seconds = settings.CLUSTER_INDEX_CHECK_SECONDS
+    settings.TILE_CACHE_DIR = str(tmp_path_factory.mktemp("tiles"))
+    settings.CLUSTER_INDEX_CHECK_SECONDS = float("inf")
+
+    db = SessionLocal()
+    try:
+        farm_cluster_index.build(db)
+    finally:
+        db.close()
+
+    yield TestClient(app)
+
+    app.dependency_overrides.pop(get_current_active_user, None)
+    settings.TILE_CACHE_DIR = tile_cache_dir
+    settings.CLUSTER_INDEX_CHECK_SECONDS = check_seconds
+
+
+def _load_user(role: str) -> User:
+    """User đầu tiên (đang hoạt động) có role, skip nếu DB không có"""
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.role == role, User.is_active.is_(True)).order_by(User.id).first()
+        if user is None:
+            pytest.skip(f"No active {role} user in database")
+        db.expunge(user)
+        return user
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def as_admin(client):
+    """Gọi API với quyền admin (bỏ qua xác thực JWT)"""
+    user = _load_user("admin")
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    yield user
+    app.dependency_overrides.pop(get_current_active_user, None)
+
+
+@pytest.fixture
+def as_farmer(client):
+    """Gọi API với quyền farmer đầu tiên"""
+    user = _load_user("farmer")
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    yield user
+    app.dependency_overrides.pop(get_current_active_user, None)
+
+
+@pytest.fixture
+def query_count(client, database):
+    """
+    Số câu SQL của một request GET (không tính cache analytics / count)
+
+    Usage:
+        def test_x(query_count, as_admin):
+            assert query_count("/api/farms", {"page_size": 5}) <= 3
+    """
+    def run(path: str, params: dict = None) -> int:
+        invalidate_analytics_cache()
+        clear_count_cache()
+        with count_queries(database) as counter:
+            response = client.get(path, params=params)
+        assert response.is_success, f"GET {path} {params or ''}: HTTP {response.status_code} {response.text[:200]}"
+        return counter.count
+
+    return run
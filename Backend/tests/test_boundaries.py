@@ -0,0 +1,48 @@
+# Boundary routes - fallback về GeoJSON đóng gói khi chưa chạy converter
+import pytest
+from fastapi.testclient import TestClient
+
+from config import settings
+from main import app
+
+
+@pytest.fixture
+def boundary_client(monkeypatch, tmp_path):
+    """BOUNDARY_DIR trống: như khi chưa chạy scripts/convert_shapefile_to_geojson.py"""
+    monkeypatch.setattr(settings, "BOUNDARY_DIR", str(tmp_path))
+    return TestClient(app)
+
+
+def test_manifest_falls_back_to_bundled_geojson(boundary_client):
+    response = boundary_client.get("/api/boundaries/manifest")
+    assert response.status_code == 200
+    manifest = response.json()
+    assert manifest["fallback"] is True
+    assert [level["min_zoom"] for level in manifest["levels"]] == [0]
+    assert "Đà Nẵng" in manifest["levels"][0]["provinces"]
+
+
+@pytest.mark.parametrize("zoom", [3, 6, 12])
+def test_provinces_redirect_to_bundled_file(boundary_client, zoom):
+    response = boundary_client.get("/api/boundaries/provinces", params={"zoom": zoom})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/geo+json"
+    assert len(response.json()["features"]) > 60
+
+
+def test_single_province_from_bundled_file(boundary_client):
+    response = boundary_client.get("/api/boundaries/provinces/Đà Nẵng")
+    assert response.status_code == 200
+    features = response.json()["features"]
+    assert [feature["properties"]["NAME_1"] for feature in features] == ["Đà Nẵng"]
+
+    etag = response.headers["etag"]
+    cached = boundary_client.get(
+        "/api/boundaries/provinces/Đà Nẵng", headers={"If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+
+
+def test_unknown_file_is_not_served(boundary_client):
+    response = boundary_client.get("/api/boundaries/files/provinces.z0.000000000000.geojson")
+    assert response.status_code == 404
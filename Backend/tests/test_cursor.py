@@ -0,0 +1,38 @@
+# Keyset cursor - encode/decode và kiểm tra kiểu giá trị (không cần database)
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from models import Feedback, User
+from utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 18, 8, 30)
+    keyset = [Feedback.created_at, Feedback.id]
+    assert decode_cursor(encode_cursor([created_at, 42]), keyset) == [created_at, 42]
+
+
+@pytest.mark.parametrize("values, keyset", [
+    (["abc"], [User.id]),
+    ([1.5], [User.id]),
+    ([True], [User.id]),
+    ([2 ** 40], [User.id]),
+    ([[1]], [User.id]),
+    ([7, 42], [Feedback.created_at, Feedback.id]),
+    (["2026-10-18T08:30:00", "42"], [Feedback.created_at, Feedback.id]),
+    (["not a date", 42], [Feedback.created_at, Feedback.id]),
+    ([1, 2], [User.id]),
+])
+def test_mismatched_cursor_is_rejected(values, keyset):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(encode_cursor(values), keyset)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["!!!", "bm90IGpzb24", encode_cursor([]) + "x"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, [User.id])
+    assert error.value.status_code == 400
@@ -0,0 +1,31 @@
+# Pagination query counts - số câu SQL của một trang không phụ thuộc page_size (phát hiện N+1)
+import pytest
+
+PAGE_SIZES = [5, 50, 100]
+
+# Endpoint danh sách có phân trang (admin)
+PAGINATED_ENDPOINTS = [
+    "/api/farms",
+    "/api/history",
+    "/api/users",
+    "/api/feedback/",
+    "/api/feedback/all",
+]
+
+
+@pytest.mark.parametrize("path", PAGINATED_ENDPOINTS)
+def test_page_query_count_does_not_grow_with_page_size(query_count, as_admin, path):
+    counts = {
+        page_size: query_count(path, {"page": 1, "page_size": page_size})
+        for page_size in PAGE_SIZES
+    }
+    assert len(set(counts.values())) == 1, f"{path}: {counts}"
+
+
+@pytest.mark.parametrize("path", PAGINATED_ENDPOINTS)
+def test_cursor_page_query_count_does_not_grow_with_page_size(query_count, as_admin, path):
+    counts = {
+        page_size: query_count(path, {"cursor": "", "page_size": page_size})
+        for page_size in PAGE_SIZES
+    }
+    assert len(set(counts.values())) == 1, f"{path}: {counts}"
@@ -0,0 +1,82 @@
+# Query count budgets - số câu SQL tối đa của từng endpoint (phát hiện N+1)
+import pytest
+
+# Endpoint admin/manager: (path, query params, số statement tối đa)
+ANALYTICS_BUDGETS = [
+    ("/api/analytics/kpi/overview", {}, 4),
+    ("/api/analytics/kpi/alerts", {}, 3),
+    ("/api/analytics/kpi/summary", {}, 1),
+    ("/api/analytics/kpi/markets", {}, 1),
+    ("/api/analytics/charts/crop-distribution", {}, 1),
+    ("/api/analytics/charts/input-usage", {}, 1),
+    ("/api/analytics/charts/input-usage-categorized", {}, 2),
+    ("/api/analytics/charts/alert-heatmap", {}, 1),
+    ("/api/analytics/charts/crop-market-relationship", {}, 2),
+    ("/api/analytics/charts/fruit-input-correlation", {}, 2),
+    ("/api/analytics/charts/input-usage-frequency", {"input_type": "fertilizer"}, 2),
+    ("/api/analytics/charts/input-usage-frequency", {"input_type": "pesticide"}, 2),
+    ("/api/analytics/reports/top-owners", {}, 1),
+    ("/api/analytics/reports/harvest-schedule", {}, 1),
+    ("/api/analytics/reports/revoked-alerts", {}, 1),
+    ("/api/analytics/spatial/farm-density", {}, 3),
+    ("/api/analytics/spatial/grid", {"cell_size": 0.5}, 1),
+    ("/api/analytics/spatial/grid", {"cell_size": 0.5, "shape": "hex", "bbox": "102,8,110,24"}, 1),
+    ("/api/analytics/farms/with-layers", {}, 1),
+    ("/api/analytics/farms/with-layers", {"bbox": "102,8,110,24"}, 3),
+    # Index trong bộ nhớ, không chạm DB
+    ("/api/analytics/farms/clusters", {"zoom": 6}, 0),
+    ("/api/analytics/farms/clusters", {"zoom": 12, "bbox": "105.5,20.8,106.0,21.2"}, 0),
+]
+
+# Endpoint vùng trồng / bản đồ (admin)
+FARM_BUDGETS = [
+    ("/api/farms/nearby", {"lat": 10.8, "lon": 106.7, "k": 50}, 1),
+    ("/api/farms/nearby", {"lat": 10.8, "lon": 106.7, "radius": 50000, "crop": "a"}, 1),
+    # +2 khi cache điểm tỉnh của vùng trồng chưa có tọa độ còn trống (utils/spatial)
+    ("/api/farms.geojson", {}, 3),
+    ("/api/farms.geojson", {"bbox": "102,8,110,24"}, 3),
+    ("/api/farms", {"bbox": "102,8,110,24"}, 5),
+    ("/api/tiles/farms/6/50/28.pbf", {}, 1),
+]
+
+# Endpoint analytics của farmer
+FARMER_BUDGETS = [
+    ("/api/analytics/farmer/kpi", {}, 4),
+    ("/api/analytics/farmer/crop-distribution", {}, 1),
+    ("/api/analytics/farmer/farms-map", {}, 1),
+    ("/api/analytics/farmer/cultivation-timeline", {}, 1),
+    ("/api/analytics/farmer/export-markets", {}, 1),
+    ("/api/analytics/farmer/input-usage", {}, 2),
+]
+
+
+def _id(budget):
+    path, params, _ = budget
+    return path + ("?" + "&".join(f"{key}={value}" for key, value in params.items()) if params else "")
+
+
+@pytest.mark.parametrize("path, params, budget", ANALYTICS_BUDGETS, ids=map(_id, ANALYTICS_BUDGETS))
+def test_analytics_query_budget(query_count, as_admin, path, params, budget):
+    assert query_count(path, params) <= budget
+
+
+@pytest.mark.parametrize("path, params, budget", FARM_BUDGETS, ids=map(_id, FARM_BUDGETS))
+def test_farm_query_budget(query_count, as_admin, path, params, budget):
+    assert query_count(path, params) <= budget
+
+
+@pytest.mark.parametrize("path, params, budget", FARMER_BUDGETS, ids=map(_id, FARMER_BUDGETS))
+def test_farmer_query_budget(query_count, as_farmer, path, params, budget):
+    assert query_count(path, params) <= budget
+
+
+def test_cached_tile_needs_no_query(query_count, as_admin):
+    path = "/api/tiles/farms/6/51/28.pbf"
+    query_count(path)
+    assert query_count(path) == 0
+
+
+@pytest.mark.parametrize("limit", [5, 50])
+def test_cultivation_timeline_query_count_does_not_grow_with_limit(query_count, as_farmer, limit):
+    assert query_count("/api/analytics/farmer/cultivation-timeline", {"limit": limit}) == \
+        query_count("/api/analytics/farmer/cultivation-timeline", {"limit": 1})
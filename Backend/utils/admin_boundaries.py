@@ -0,0 +1,303 @@
+# Admin Boundary Utilities - tra cứu đơn vị hành chính theo tọa độ (point-in-polygon)
+"""
+AdminUnitIndex giữ polygon tỉnh/huyện trong một shapely STRtree (các geometry
+đã prepare) và tra cứu hàng loạt điểm trong một lần gọi vectorized:
+tree.query(points, predicate="intersects") lọc bằng bounding box trong cây
+rồi kiểm tra chính xác trên geometry prepared, không có vòng lặp Python theo
+từng điểm.
+
+Nguồn polygon:
+- Shapefile trong Database/data_space/VNM_adm (cần geopandas, chỉ dùng trong script)
+- Bảng don_vi_hanh_chinh (đã nạp bởi scripts/assign_admin_units.py)
+- File GeoJSON ranh giới tỉnh (Frontend/public/data/vietnam-provinces.geojson)
+"""
+import json
+import re
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence
+
+import numpy as np
+import shapely
+import shapely.geometry
+from shapely.geometry.base import BaseGeometry
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models import DonViHanhChinh
+from models.admin_unit import CAP_TINH, CAP_HUYEN
+
+BOUNDARY_DIR = Path(__file__).parent.parent.parent / "Database/data_space/VNM_adm"
+
+# Shapefile mặc định cho từng cấp (theo cách đặt tên của GADM)
+SHAPEFILES = {
+    CAP_TINH: ["63Tinh_QuanDao.shp", "VNM_adm1.shp"],
+    CAP_HUYEN: ["VNM_adm2.shp"],
+}
+
+# Cột mã / tên / tên cấp cha trong shapefile, theo thứ tự ưu tiên
+CODE_COLUMNS = {CAP_TINH: ["GID_1", "ID_1", "HASC_1"], CAP_HUYEN: ["GID_2", "ID_2", "HASC_2"]}
+NAME_COLUMNS = {CAP_TINH: ["NAME_1", "Ten_Tinh", "TEN_TINH", "name"], CAP_HUYEN: ["NAME_2", "Ten_Huyen", "TEN_HUYEN", "name"]}
+PARENT_COLUMNS = {CAP_TINH: [], CAP_HUYEN: ["GID_1", "ID_1"]}
+
+NOT_FOUND = -1
+
+
+@dataclass
+class AdminUnit:
+    """Một đơn vị hành chính đọc từ shapefile hoặc DB"""
+    cap: int
+    ma: str
+    ten: str
+    geometry: BaseGeometry
+    parent_ma: Optional[str] = None
+    id: Optional[int] = None
+
+
+def _first_value(row, columns: Sequence[str]) -> Optional[str]:
+    for column in columns:
+        if column in row and row[column] is not None and str(row[column]) != "":
+            return str(row[column])
+    return None
+
+
+# Tên viết tắt / biến thể (sau khi chuẩn hóa) -> khóa chuẩn. GADM đặt tên
+# "Hồ Chí Minh city" và VARNAME_1 dùng các biến thể như "Dac Lac", "Bac Can".
+PROVINCE_ALIASES = {
+    "hcm": "ho chi minh",
+    "tphcm": "ho chi minh",
+    "tp hcm": "ho chi minh",
+    "sai gon": "ho chi minh",
+    "hanoi": "ha noi",
+    "haiphong": "hai phong",
+    "hue": "thua thien hue",
+    "dac lac": "dak lak",
+    "dac nong": "dak nong",
+    "bac can": "bac kan",
+    "ba ria vtau": "ba ria vung tau",
+    # Quần đảo có polygon riêng nhưng thuộc tỉnh (VARNAME_1 = tên tỉnh)
+    "qd hoang sa": "da nang",
+    "qd truong sa": "khanh hoa",
+}
+
+
+def normalize_province_name(name: Optional[str]) -> str:
+    """
+    Tên tỉnh chuẩn hóa: bỏ dấu, chữ thường, bỏ tiền tố "tỉnh"/"thành phố"/"TP"
+    và hậu tố "city"/"province" (chưa quy đổi PROVINCE_ALIASES)
+    """
+    if not name:
+        return ""
+    text = str(name).replace("đ", "d").replace("Đ", "D")
+    text = unicodedata.normalize("NFD", text)
+    text = "".join(c for c in text if unicodedata.category(c) != "Mn").lower()
+    text = re.sub(r"[^a-z0-9]+", " ", text).strip()
+    text = re.sub(r"^(tinh|thanh pho|tp)\s+", "", text)
+    return re.sub(r"\s+(city|province)$", "", text)
+
+
+def province_key(name: Optional[str]) -> str:
+    """
+    Khóa so sánh tên tỉnh: normalize_province_name() rồi quy đổi tên viết tắt /
+    biến thể (PROVINCE_ALIASES)
+
+    'Thành phố Hà Nội', 'Ha Noi', 'hà nội' -> 'ha noi';
+    'Đăk Nông' và 'Đắk Nông' -> 'dak nong';
+    'Hồ Chí Minh city', 'TP. Hồ Chí Minh', 'TPHCM' -> 'ho chi minh'
+    """
+    text = normalize_province_name(name)
+    return PROVINCE_ALIASES.get(text, text)
+
+
+def province_lookup(items: Iterable, name_of: Callable = lambda item: item.ten) -> Callable:
+    """
+    Hàm tra cứu tỉnh theo tên (tinh_name, tên trong GeoJSON, ...)
+
+    Khớp tên chuẩn hóa trước, sau đó mới tới province_key (alias), nên
+    'TP. Hồ Chí Minh' -> 'Hồ Chí Minh city' nhưng 'Đà Nẵng' không rơi vào
+    'QĐ.Hoàng Sa'. Khi nhiều item trùng tên, item đứng trước được chọn.
+
+    Returns:
+        Callable[[str], item | None]
+    """
+    by_name = {}
+    by_own_key = {}
+    by_alias = {}
+    for item in items:
+        name = normalize_province_name(name_of(item))
+        key = province_key(name_of(item))
+        by_name.setdefault(name, item)
+        (by_own_key if key == name else by_alias).setdefault(key, item)
+
+    def lookup(name: Optional[str]):
+        key = province_key(name)
+        return by_name.get(normalize_province_name(name)) or by_own_key.get(key) or by_alias.get(key)
+
+    return lookup
+
+
+def find_shapefile(cap: int, boundary_dir: Path = BOUNDARY_DIR) -> Path:
+    """
+    Shapefile đầu tiên tồn tại cho cấp hành chính
+
+    Raises:
+        FileNotFoundError: Nếu thư mục không có shapefile nào phù hợp
+    """
+    for name in SHAPEFILES[cap]:
+        path = Path(boundary_dir) / name
+        if path.exists():
+            return path
+    raise FileNotFoundError(
+        f"No shapefile for level {cap} in {boundary_dir} (tried {', '.join(SHAPEFILES[cap])})"
+    )
+
+
+def load_units_from_shapefile(path: Path, cap: int) -> List[AdminUnit]:
+    """
+    Đọc polygon của một cấp hành chính từ shapefile (chuyển về EPSG:4326)
+
+    Args:
+        path: Đường dẫn file .shp
+        cap: CAP_TINH hoặc CAP_HUYEN
+    """
+    import geopandas as gpd  # chỉ cần khi nạp từ shapefile
+
+    gdf = gpd.read_file(path)
+    if gdf.crs is not None and gdf.crs != "EPSG:4326":
+        gdf = gdf.to_crs(epsg=4326)
+
+    units = []
+    for index, row in gdf.iterrows():
+        geometry = row.geometry
+        if geometry is None or geometry.is_empty:
+            continue
+        name = _first_value(row, NAME_COLUMNS[cap]) or str(index)
+        units.append(AdminUnit(
+            cap=cap,
+            ma=_first_value(row, CODE_COLUMNS[cap]) or name,
+            ten=name,
+            geometry=shapely.make_valid(geometry),
+            parent_ma=_first_value(row, PARENT_COLUMNS[cap])
+        ))
+    return units
+
+
+def load_units_from_db(db: Session, cap: int) -> List[AdminUnit]:
+    """Đọc polygon một cấp hành chính từ bảng don_vi_hanh_chinh (một query)"""
+    rows = db.query(
+        DonViHanhChinh.id,
+        DonViHanhChinh.ma,
+        DonViHanhChinh.ten,
+        func.ST_AsBinary(DonViHanhChinh.geom).label("wkb")
+    ).filter(
+        DonViHanhChinh.cap == cap,
+        DonViHanhChinh.geom.isnot(None)
+    ).all()
+
+    geometries = shapely.from_wkb([bytes(row.wkb) for row in rows])
+    return [
+        AdminUnit(cap=cap, ma=row.ma, ten=row.ten, geometry=geometry, id=row.id)
+        for row, geometry in zip(rows, geometries)
+    ]
+
+
+def load_units_from_geojson(path: Path, cap: int = CAP_TINH) -> List[AdminUnit]:
+    """Đọc polygon từ GeoJSON (EPSG:4326), tên lấy theo NAME_COLUMNS"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    units = []
+    for index, feature in enumerate(data["features"]):
+        if not feature.get("geometry"):
+            continue
+        properties = feature.get("properties") or {}
+        name = _first_value(properties, NAME_COLUMNS[cap]) or str(index)
+        units.append(AdminUnit(
+            cap=cap,
+            ma=_first_value(properties, CODE_COLUMNS[cap]) or name,
+            ten=name,
+            geometry=shapely.make_valid(shapely.geometry.shape(feature["geometry"])),
+            id=index
+        ))
+    return units
+
+
+class AdminUnitIndex:
+    """STRtree của các polygon hành chính, tra cứu vectorized"""
+
+    def __init__(self, units: List[AdminUnit], ids: Optional[Sequence[int]] = None):
+        """
+        Args:
+            units: Danh sách đơn vị (cùng cấp)
+            ids: Id trả về cho từng đơn vị (mặc định unit.id)
+        """
+        self.units = units
+        self.geometries = np.array([unit.geometry for unit in units], dtype=object)
+        shapely.prepare(self.geometries)
+        self.ids = np.array(
+            ids if ids is not None else [unit.id for unit in units],
+            dtype=np.int64
+        )
+        self.tree = shapely.STRtree(self.geometries)
+
+    def __len__(self) -> int:
+        return len(self.units)
+
+    def lookup_positions(self, lons, lats) -> np.ndarray:
+        """
+        Vị trí (trong self.units) của polygon chứa mỗi điểm
+
+        Điểm nằm đúng trên ranh giới giữa hai đơn vị nhận đơn vị có vị trí
+        nhỏ hơn, để kết quả ổn định giữa các lần chạy.
+
+        Returns:
+            np.ndarray: int64, NOT_FOUND (-1) nếu điểm không nằm trong đơn vị nào
+        """
+        points = shapely.points(np.asarray(lons, dtype=float), np.asarray(lats, dtype=float))
+        result = np.full(len(points), NOT_FOUND, dtype=np.int64)
+        if len(points) == 0 or len(self.units) == 0:
+            return result
+
+        point_idx, geom_idx = self.tree.query(points, predicate="intersects")
+        # Sắp theo (điểm, vị trí polygon) rồi giữ cặp đầu tiên của mỗi điểm
+        order = np.lexsort((geom_idx, point_idx))
+        point_idx, geom_idx = point_idx[order], geom_idx[order]
+        _, first = np.unique(point_idx, return_index=True)
+        result[point_idx[first]] = geom_idx[first]
+        return result
+
+    def positions_near(self, lon: float, lat: float, distance: float = 0.0) -> np.ndarray:
+        """
+        Vị trí các polygon chứa (distance = 0) hoặc cách điểm không quá distance độ
+
+        Một điểm: truy vấn STRtree + predicate trên geometry prepared.
+        """
+        point = shapely.Point(lon, lat)
+        if distance > 0:
+            return np.sort(self.tree.query(point, predicate="dwithin", distance=distance))
+        return np.sort(self.tree.query(point, predicate="intersects"))
+
+    def pairs_near(self, lons, lats, distance: float):
+        """
+        Mọi cặp (điểm, polygon) cách nhau không quá distance độ (vectorized)
+
+        Returns:
+            (point_idx, geom_idx): hai mảng int cùng độ dài
+        """
+        points = shapely.points(np.asarray(lons, dtype=float), np.asarray(lats, dtype=float))
+        if len(points) == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        return self.tree.query(points, predicate="dwithin", distance=distance)
+
+    def lookup(self, lons, lats) -> np.ndarray:
+        """
+        Id đơn vị chứa mỗi điểm (NOT_FOUND nếu không có)
+
+        Args:
+            lons: Mảng kinh độ
+            lats: Mảng vĩ độ (cùng độ dài)
+        """
+        positions = self.lookup_positions(lons, lats)
+        return np.where(positions == NOT_FOUND, NOT_FOUND, self.ids[np.maximum(positions, 0)])
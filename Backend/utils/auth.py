@@ -11,10 +11,45 @@ from config import settings
 from database import get_db
 from models import User
 from schemas import TokenData
+from utils.cache import TTLCache
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
+# Resolved user principals keyed by username (password_hash is never cached)
+_USER_CACHE_FIELDS = (
+    "id", "username", "email", "full_name", "role",
+    "province_code", "is_active", "created_at", "updated_at"
+)
+user_cache = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_user_cache(*usernames: str) -> None:
+    """Bỏ user khỏi cache (gọi sau khi sửa/xóa/khóa tài khoản)"""
+    for username in usernames:
+        if username:
+            user_cache.pop(username)
+
+
+def _load_user(db: Session, username: str) -> Optional[User]:
+    """
+    Lấy user theo username, ưu tiên cache
+
+    Khi cache hit trả về User transient (không gắn session): chỉ đọc
+    các cột trong _USER_CACHE_FIELDS, không dùng relationship.
+    """
+    values = user_cache.get(username)
+    if values is not None:
+        return User(**values)
+
+    user = db.query(User).filter(User.username == username).first()
+    if user is not None:
+        user_cache.set(username, {field: getattr(user, field) for field in _USER_CACHE_FIELDS})
+    return user
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password using bcrypt"""
@@ -67,7 +102,7 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == token_data.username).first()
+    user = _load_user(db, token_data.username)
     if user is None:
         raise credentials_exception
     
@@ -0,0 +1,73 @@
+# Cache Utilities - bộ nhớ đệm trong tiến trình (LRU + TTL)
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional
+import time
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Cache giới hạn kích thước, mỗi entry hết hạn sau `ttl` giây
+
+    - Đầy thì bỏ entry ít dùng nhất (LRU)
+    - Thread-safe (dùng được từ endpoint sync chạy trong threadpool)
+    - Đếm hits/misses để theo dõi hiệu quả
+
+    Chỉ là cache trong một process: mỗi worker uvicorn có cache riêng.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Lấy giá trị còn hạn, trả về default nếu không có"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Lưu giá trị (ghi đè nếu đã có)"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Xóa một entry (không lỗi nếu không có)"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Xóa toàn bộ entry (giữ lại bộ đếm)"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Thống kê để hiển thị ở /health"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
@@ -0,0 +1,109 @@
+# Coordinate Validation - kiểm tra tọa độ vùng trồng nằm trong tỉnh khai báo
+"""
+Polygon tỉnh được nạp một lần lúc startup (main.py) vào AdminUnitIndex
+(STRtree + geometry prepared), nên mỗi lần tạo/sửa vùng trồng chỉ tốn một
+truy vấn cây cho một điểm (vài chục micro giây).
+
+Nguồn polygon: bảng don_vi_hanh_chinh (cap = 1) nếu đã nạp, nếu không thì
+file GeoJSON settings.PROVINCE_BOUNDARY_FILE. Không nạp được thì bỏ qua kiểm
+tra (ghi log cảnh báo) để không chặn việc ghi dữ liệu.
+"""
+import logging
+import os
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from config import settings
+from models.admin_unit import CAP_TINH
+from utils.admin_boundaries import (
+    AdminUnitIndex, load_units_from_db, load_units_from_geojson, province_key
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ProvinceValidator:
+    """Index polygon tỉnh dùng để kiểm tra tọa độ khi ghi"""
+
+    def __init__(self):
+        self.index: Optional[AdminUnitIndex] = None
+        self.source: Optional[str] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.index is not None and len(self.index) > 0
+
+    def load(self, db: Optional[Session] = None) -> int:
+        """
+        Nạp polygon tỉnh (DB trước, GeoJSON sau)
+
+        Returns:
+            int: Số tỉnh đã nạp (0 nếu không có nguồn nào)
+        """
+        units = []
+        if db is not None:
+            try:
+                units = load_units_from_db(db, CAP_TINH)
+                self.source = "don_vi_hanh_chinh"
+            except Exception as e:
+                db.rollback()
+                logger.info(f"Province polygons not loaded from database: {e}")
+
+        if not units and os.path.exists(settings.PROVINCE_BOUNDARY_FILE):
+            units = load_units_from_geojson(settings.PROVINCE_BOUNDARY_FILE, CAP_TINH)
+            self.source = settings.PROVINCE_BOUNDARY_FILE
+
+        self.index = AdminUnitIndex(units) if units else None
+        if not units:
+            self.source = None
+            logger.warning("⚠️  No province polygons found, farm coordinate validation disabled")
+        return len(units)
+
+    def provinces_at(self, lon: float, lat: float, tolerance: float = 0.0) -> List[str]:
+        """Tên các tỉnh chứa điểm (hoặc cách điểm không quá tolerance độ)"""
+        if not self.loaded:
+            return []
+        positions = self.index.positions_near(lon, lat, tolerance)
+        return [self.index.units[position].ten for position in positions]
+
+    def validate(self, latitude, longitude, tinh_name: Optional[str]) -> None:
+        """
+        Kiểm tra tọa độ nằm trong Việt Nam và trong tỉnh khai báo
+
+        Điểm cách ranh giới không quá COORDINATE_TOLERANCE_DEGREES vẫn hợp lệ
+        (polygon đã được đơn giản hóa, GPS có sai số).
+
+        Raises:
+            HTTPException: 400 nếu tọa độ ngoài mọi tỉnh hoặc không thuộc tỉnh khai báo
+        """
+        if not settings.COORDINATE_VALIDATION_ENABLED or not self.loaded:
+            return
+        if latitude is None or longitude is None:
+            return
+
+        lon, lat = float(longitude), float(latitude)
+        nearby = self.provinces_at(lon, lat, settings.COORDINATE_TOLERANCE_DEGREES)
+        if not nearby:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Coordinates ({lat}, {lon}) are outside every province"
+            )
+
+        if tinh_name and province_key(tinh_name) not in {province_key(name) for name in nearby}:
+            inside = self.provinces_at(lon, lat) or nearby
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Coordinates ({lat}, {lon}) are in {', '.join(inside)}, not in {tinh_name}"
+            )
+
+    def stats(self) -> dict:
+        return {
+            "provinces": len(self.index) if self.loaded else 0,
+            "source": self.source,
+            "enabled": settings.COORDINATE_VALIDATION_ENABLED and self.loaded
+        }
+
+
+province_validator = ProvinceValidator()
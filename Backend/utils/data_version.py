@@ -0,0 +1,74 @@
+# Data Version Utilities - phát hiện dữ liệu vùng trồng thay đổi ngoài API
+"""
+Cache trong bộ nhớ của API server (index cluster) chỉ thấy các lần ghi qua
+API của chính process đó. Dữ liệu còn bị ghi bởi:
+- Script chạy trong process riêng (import, sync_table, generate_synthetic_data,
+  assign_admin_units, update_farm_coordinates, rebuild_input_rollup)
+- Các worker uvicorn khác
+
+farm_data_version() gộp hai tín hiệu rẻ:
+- Bảng vung_trong: count(*), max(updated_at) và bộ đếm ghi của PostgreSQL
+  (pg_stat_user_tables: insert/update/delete, gồm cả COPY và UPDATE hàng loạt
+  không đụng updated_at)
+- Số thế hệ trong file FARM_DATA_VERSION_FILE, tăng bởi mark_farm_data_changed()
+  mà các script nạp hàng loạt gọi sau khi commit
+"""
+import os
+from typing import Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from config import backend_path, settings
+from utils.tiles import clear_tile_cache
+
+
+def _version_file() -> str:
+    # Tính từ thư mục Backend: script và API server chạy từ thư mục khác nhau
+    return backend_path(settings.FARM_DATA_VERSION_FILE)
+
+
+def farm_data_generation() -> int:
+    """Số thế hệ hiện tại trong FARM_DATA_VERSION_FILE (0 nếu chưa có)"""
+    try:
+        with open(_version_file(), "r", encoding="ascii") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def mark_farm_data_changed() -> int:
+    """
+    Báo dữ liệu vùng trồng đã đổi ngoài API (gọi từ script sau khi commit)
+
+    Xóa cache tile trên đĩa (dùng chung mọi worker); API server thấy thế hệ
+    mới ở lần kiểm tra kế tiếp và dựng lại index cluster trong thread nền.
+
+    Returns:
+        int: Số thế hệ mới
+    """
+    generation = farm_data_generation() + 1
+    path = _version_file()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="ascii") as f:
+        f.write(str(generation))
+    os.replace(tmp_path, path)
+    clear_tile_cache()
+    return generation
+
+
+def farm_data_version(db: Session) -> Tuple:
+    """
+    Phiên bản dữ liệu vùng trồng: khác nhau khi vung_trong đã bị ghi
+
+    Một query (count(*) trên vung_trong và một dòng pg_stat_user_tables).
+    """
+    row = db.execute(text("""
+        SELECT
+            (SELECT count(*) FROM vung_trong),
+            (SELECT max(updated_at) FROM vung_trong),
+            (SELECT n_tup_ins + n_tup_upd + n_tup_del
+             FROM pg_stat_user_tables WHERE relid = 'vung_trong'::regclass)
+    """)).one()
+    return (farm_data_generation(),) + tuple(row)
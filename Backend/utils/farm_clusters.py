@@ -0,0 +1,607 @@
+# Farm Cluster Index - gom cụm vùng trồng theo lưới phân cấp (theo zoom)
+"""
+Mỗi mức zoom z chia thế giới thành lưới ô vuông CELLS_PER_TILE x CELLS_PER_TILE
+ô trên mỗi tile XYZ, nên ô (cx, cy) ở zoom z là con của ô (cx // 2, cy // 2)
+ở zoom z - 1. Mỗi vùng trồng chỉ cần ô ở MAX_ZOOM; ô ở zoom thấp hơn là
+(cx >> k, cy >> k). Mỗi ô giữ tổng cộng dồn (số vùng, diện tích, vật tư,
+tổng tọa độ).
+
+Index nằm trong bộ nhớ của process:
+- Dựng một lần (thread nền lúc startup) bằng NumPy: sắp vùng trồng một lần
+  theo mã Morton của ô MAX_ZOOM, mỗi zoom thấp hơn gom từ zoom ngay trên bằng
+  reduceat; lưu dạng cột sắp theo key = cx << CELL_BITS | cy cho từng
+  (phạm vi, zoom) để tra khung nhìn bằng searchsorted
+- Ghi qua API (farms/history) cập nhật một ô delta mỗi zoom (upsert/remove),
+  cộng vào ô gốc lúc truy vấn
+- Ghi ngoài API (script, worker khác): tối đa mỗi CLUSTER_INDEX_CHECK_SECONDS
+  so sánh farm_data_version() với phiên bản lúc dựng, khác thì dựng lại trong
+  thread nền; index cũ hơn CLUSTER_INDEX_MAX_AGE_SECONDS cũng được dựng lại
+- Request không bao giờ dựng index: chỉ chờ tối đa CLUSTER_INDEX_WAIT_SECONDS
+  khi chưa có index, còn lại luôn trả index hiện tại
+"""
+import logging
+import time
+from dataclasses import dataclass
+from threading import Event, RLock, Thread
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import Float, cast
+from sqlalchemy.orm import Session
+
+from config import settings
+from models import VungTrong
+from utils.data_version import farm_data_version
+from utils.tiles import MAX_LATITUDE, fractional_tile
+
+logger = logging.getLogger(__name__)
+
+MIN_ZOOM = 0
+MAX_ZOOM = 16
+CELLS_PER_TILE = 4  # ô 64px trên tile 256px
+
+# key = cx << CELL_BITS | cy (cx, cy < 2^CELL_BITS ở mọi zoom)
+CELL_BITS = MAX_ZOOM + 2
+CELL_MASK = (1 << CELL_BITS) - 1
+
+# Khóa phạm vi cho dữ liệu toàn quốc (admin)
+ALL_SCOPE = None
+
+VALUE_FIELDS = ("dien_tich", "fertilizer_volume", "pesticide_volume", "sum_lon", "sum_lat")
+
+
+@dataclass
+class FarmPoint:
+    """Dữ liệu của một vùng trồng cần cho cluster"""
+    id: int
+    lon: float
+    lat: float
+    tinh_name: Optional[str]
+    dien_tich: float
+    fertilizer_volume: float
+    pesticide_volume: float
+    cx: int = 0  # ô ở MAX_ZOOM
+    cy: int = 0
+
+
+@dataclass
+class ClusterCell:
+    """Tổng cộng dồn của một ô lưới (ô delta: count có thể âm)"""
+    count: int = 0
+    dien_tich: float = 0.0
+    fertilizer_volume: float = 0.0
+    pesticide_volume: float = 0.0
+    sum_lon: float = 0.0
+    sum_lat: float = 0.0
+    id_xor: int = 0  # XOR các id: khi count == 1 chính là id vùng trồng còn lại
+
+    def add(self, farm: FarmPoint, sign: int = 1) -> None:
+        self.count += sign
+        self.dien_tich += sign * farm.dien_tich
+        self.fertilizer_volume += sign * farm.fertilizer_volume
+        self.pesticide_volume += sign * farm.pesticide_volume
+        self.sum_lon += sign * farm.lon
+        self.sum_lat += sign * farm.lat
+        self.id_xor ^= farm.id
+
+    def is_empty(self) -> bool:
+        """Ô delta không còn thay đổi gì (bỏ qua sai số cộng trừ float)"""
+        return (
+            self.count == 0 and self.id_xor == 0 and
+            all(abs(getattr(self, name)) < 1e-9 for name in VALUE_FIELDS)
+        )
+
+
+@dataclass
+class CellArrays:
+    """Các ô của một (phạm vi, zoom) dạng cột, sắp tăng dần theo keys"""
+    keys: np.ndarray
+    count: np.ndarray
+    dien_tich: np.ndarray
+    fertilizer_volume: np.ndarray
+    pesticide_volume: np.ndarray
+    sum_lon: np.ndarray
+    sum_lat: np.ndarray
+    id_xor: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def take(self, index) -> "CellArrays":
+        return CellArrays(**{name: getattr(self, name)[index] for name in self.__dataclass_fields__})
+
+
+@dataclass
+class FarmArrays:
+    """Vùng trồng lúc dựng index, sắp theo id (để remove/upsert tra lại)"""
+    ids: np.ndarray
+    lon: np.ndarray
+    lat: np.ndarray
+    province: np.ndarray  # vị trí trong provinces, -1 = không có tỉnh
+    dien_tich: np.ndarray
+    fertilizer_volume: np.ndarray
+    pesticide_volume: np.ndarray
+    cx: np.ndarray
+    cy: np.ndarray
+    provinces: List[str]
+
+
+def _to_float(value) -> float:
+    return float(value) if value is not None else 0.0
+
+
+def farm_point(farm) -> Optional[FarmPoint]:
+    """VungTrong (hoặc row cùng cột) -> FarmPoint, None nếu không có tọa độ"""
+    if farm.latitude is None or farm.longitude is None:
+        return None
+    lon, lat = float(farm.longitude), float(farm.latitude)
+    cx, cy = _max_zoom_cell(lon, lat)
+    return FarmPoint(
+        id=farm.id,
+        lon=lon,
+        lat=lat,
+        tinh_name=farm.tinh_name,
+        dien_tich=_to_float(farm.dien_tich),
+        fertilizer_volume=_to_float(farm.fertilizer_volume),
+        pesticide_volume=_to_float(farm.pesticide_volume),
+        cx=cx,
+        cy=cy
+    )
+
+
+def _max_zoom_cell(lon: float, lat: float) -> Tuple[int, int]:
+    fx, fy = fractional_tile(lon, lat, MAX_ZOOM)
+    return int(fx * CELLS_PER_TILE), int(fy * CELLS_PER_TILE)
+
+
+def max_zoom_cells(lons: np.ndarray, lats: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """fractional_tile ở MAX_ZOOM (vectorized) -> ô (cx, cy) int64"""
+    n = (1 << MAX_ZOOM) * CELLS_PER_TILE
+    lat_rad = np.radians(np.clip(lats, -MAX_LATITUDE, MAX_LATITUDE))
+    x = (lons + 180.0) / 360.0 * n
+    y = (1 - np.log(np.tan(lat_rad) + 1 / np.cos(lat_rad)) / np.pi) / 2 * n
+    return x.astype(np.int64), y.astype(np.int64)
+
+
+def cell_key(cx: int, cy: int, zoom: int) -> int:
+    """Key của ô chứa ô MAX_ZOOM (cx, cy) ở mức zoom"""
+    shift = MAX_ZOOM - zoom
+    return (cx >> shift) << CELL_BITS | (cy >> shift)
+
+
+def _spread_bits(values: np.ndarray) -> np.ndarray:
+    """Chèn một bit 0 giữa các bit (để trộn cx, cy thành mã Morton)"""
+    v = values.astype(np.uint64)
+    for shift, mask in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF), (4, 0x0F0F0F0F0F0F0F0F),
+                        (2, 0x3333333333333333), (1, 0x5555555555555555)):
+        v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+    return v
+
+
+def morton_keys(cx: np.ndarray, cy: np.ndarray) -> np.ndarray:
+    """
+    Mã Morton (Z-order) của ô MAX_ZOOM
+
+    Ô cha ở zoom thấp hơn k mức là morton >> 2k, nên sau khi sắp theo mã
+    Morton, các ô con của cùng một ô cha luôn nằm liền nhau ở mọi zoom.
+    """
+    return (_spread_bits(cx) << np.uint64(1)) | _spread_bits(cy)
+
+
+def _group_starts(*columns: np.ndarray) -> np.ndarray:
+    """Vị trí đầu mỗi nhóm giá trị liên tiếp giống nhau (trên mọi cột)"""
+    changed = np.zeros(len(columns[0]) - 1, dtype=bool)
+    for column in columns:
+        changed |= column[1:] != column[:-1]
+    return np.flatnonzero(np.concatenate(([True], changed)))
+
+
+def _level_cells(scope, cx, cy, count, values, id_xor) -> Tuple[np.ndarray, CellArrays]:
+    """Ô của một zoom (đang theo thứ tự Morton) -> (scope, CellArrays sắp theo scope rồi key)"""
+    keys = cx << CELL_BITS | cy
+    order = np.argsort(scope << (2 * CELL_BITS) | keys)
+    return scope[order], CellArrays(
+        keys=keys[order],
+        count=count[order],
+        id_xor=id_xor[order],
+        **{name: values[order, column] for column, name in enumerate(VALUE_FIELDS)}
+    )
+
+
+def aggregate_levels(scope: np.ndarray, farms: FarmArrays, values: np.ndarray, ids: np.ndarray):
+    """
+    Gom điểm thành ô cho mọi zoom: sắp một lần theo (scope, Morton), sau đó mỗi
+    zoom chỉ cần reduceat trên các ô của zoom ngay trên (ít phần tử hơn).
+
+    Yields:
+        tuple: (zoom, scope của từng ô, CellArrays)
+    """
+    if len(ids) == 0:
+        return
+    morton = morton_keys(farms.cx, farms.cy)
+    order = np.argsort(scope.astype(np.uint64) << np.uint64(2 * CELL_BITS) | morton)
+    scope, morton = scope[order], morton[order]
+    cx, cy = farms.cx[order], farms.cy[order]
+    count = np.ones(len(order), dtype=np.int64)
+    values, id_xor = values[order], ids[order]
+
+    for zoom in range(MAX_ZOOM, MIN_ZOOM - 1, -1):
+        if zoom < MAX_ZOOM:
+            morton, cx, cy = morton >> np.uint64(2), cx >> 1, cy >> 1
+        starts = _group_starts(morton, scope)
+        scope, morton, cx, cy = scope[starts], morton[starts], cx[starts], cy[starts]
+        count = np.add.reduceat(count, starts)
+        values = np.add.reduceat(values, starts, axis=0)
+        id_xor = np.bitwise_xor.reduceat(id_xor, starts)
+        yield (zoom,) + _level_cells(scope, cx, cy, count, values, id_xor)
+
+
+def build_cells(farms: FarmArrays) -> Dict[Tuple[Optional[str], int], CellArrays]:
+    """(phạm vi, zoom) -> CellArrays cho toàn quốc và từng tỉnh"""
+    values = np.column_stack([
+        farms.dien_tich, farms.fertilizer_volume, farms.pesticide_volume, farms.lon, farms.lat
+    ])
+    empty = CellArrays(
+        keys=np.zeros(0, dtype=np.int64), count=np.zeros(0, dtype=np.int64),
+        id_xor=np.zeros(0, dtype=np.int64), **{name: np.zeros(0) for name in VALUE_FIELDS}
+    )
+    cells = {(ALL_SCOPE, zoom): empty for zoom in range(MIN_ZOOM, MAX_ZOOM + 1)}
+
+    # Toàn quốc: một scope duy nhất
+    for zoom, _, level in aggregate_levels(np.zeros(len(farms.ids), dtype=np.int64), farms, values, farms.ids):
+        cells[(ALL_SCOPE, zoom)] = level
+
+    # Từng tỉnh: scope = vị trí tỉnh, bỏ vùng trồng không có tỉnh
+    in_province = farms.province >= 0
+    subset = FarmArrays(
+        ids=farms.ids[in_province], lon=farms.lon[in_province], lat=farms.lat[in_province],
+        province=farms.province[in_province], dien_tich=farms.dien_tich[in_province],
+        fertilizer_volume=farms.fertilizer_volume[in_province],
+        pesticide_volume=farms.pesticide_volume[in_province],
+        cx=farms.cx[in_province], cy=farms.cy[in_province], provinces=farms.provinces
+    )
+    for zoom, scope, level in aggregate_levels(subset.province, subset, values[in_province], subset.ids):
+        bounds = np.searchsorted(scope, np.arange(len(farms.provinces) + 1))
+        for position, name in enumerate(farms.provinces):
+            cells[(name, zoom)] = level.take(slice(bounds[position], bounds[position + 1]))
+    return cells
+
+
+def farm_arrays(rows) -> FarmArrays:
+    """
+    Row (id, latitude, longitude, tinh_name, dien_tich, fertilizer_volume, pesticide_volume)
+    -> FarmArrays (số đã là float, NULL -> 0)
+    """
+    columns = list(zip(*rows)) if rows else [()] * 7
+    ids = np.array(columns[0], dtype=np.int64)
+    lat = np.array(columns[1], dtype=float)
+    lon = np.array(columns[2], dtype=float)
+
+    # Mã hóa tỉnh bằng dict (nhanh hơn np.unique trên chuỗi), -1 = không có tỉnh
+    codes: Dict[str, int] = {}
+    province = np.array(
+        [codes.setdefault(name, len(codes)) if name else -1 for name in columns[3]], dtype=np.int64
+    )
+
+    def number(values) -> np.ndarray:
+        return np.nan_to_num(np.array(values, dtype=float))  # None -> nan -> 0
+
+    cx, cy = max_zoom_cells(lon, lat)
+    order = np.argsort(ids)
+    return FarmArrays(
+        ids=ids[order], lon=lon[order], lat=lat[order], province=province[order],
+        dien_tich=number(columns[4])[order],
+        fertilizer_volume=number(columns[5])[order],
+        pesticide_volume=number(columns[6])[order],
+        cx=cx[order], cy=cy[order], provinces=list(codes)
+    )
+
+
+class FarmClusterIndex:
+    """Lưới cluster phân cấp cho toàn quốc và cho từng tỉnh"""
+
+    def __init__(self):
+        self._lock = RLock()
+        self._ready = Event()
+        self._building = False
+        self._pending: List[Tuple[str, object]] = []
+        self._base: Optional[FarmArrays] = None
+        # (scope, zoom) -> CellArrays lúc dựng
+        self._cells: Dict[Tuple[Optional[str], int], CellArrays] = {}
+        # (scope, zoom) -> {key: ClusterCell delta} từ các lần ghi sau khi dựng
+        self._deltas: Dict[Tuple[Optional[str], int], Dict[int, ClusterCell]] = {}
+        # Vùng trồng đã thay đổi sau khi dựng (giá trị hiện tại), và id gốc đã bị thay/xóa
+        self._changed: Dict[int, FarmPoint] = {}
+        self._replaced: set = set()
+        self._built_at: Optional[float] = None
+        self._build_seconds: Optional[float] = None
+        # farm_data_version() đọc trước khi dựng; None = phải dựng lại
+        self._version: Optional[tuple] = None
+        self._checked_at = 0.0
+
+    # ========== Build ==========
+
+    def build(self, db: Session) -> int:
+        """
+        Dựng lại index từ vung_trong (một query, gom ô bằng NumPy)
+
+        Ghi qua API trong lúc dựng được ghi lại và áp dụng sau khi thay index.
+        Phiên bản dữ liệu được đọc trước khi đọc vùng trồng, nên ghi xảy ra
+        trong lúc dựng sẽ làm lần kiểm tra sau dựng lại.
+
+        Returns:
+            int: Số vùng trồng có tọa độ
+        """
+        with self._lock:
+            self._building = True
+            self._pending = []
+        try:
+            start = time.perf_counter()
+            version = farm_data_version(db)
+            # Float ngay trong SQL: driver trả float, không tạo Decimal cho từng ô
+            rows = db.query(
+                VungTrong.id,
+                cast(VungTrong.latitude, Float),
+                cast(VungTrong.longitude, Float),
+                VungTrong.tinh_name,
+                cast(VungTrong.dien_tich, Float),
+                cast(VungTrong.fertilizer_volume, Float),
+                cast(VungTrong.pesticide_volume, Float)
+            ).filter(
+                VungTrong.latitude.isnot(None),
+                VungTrong.longitude.isnot(None)
+            ).all()
+            base = farm_arrays(rows)
+            cells = build_cells(base)
+
+            with self._lock:
+                self._base = base
+                self._cells = cells
+                self._deltas = {}
+                self._changed = {}
+                self._replaced = set()
+                for operation, value in self._pending:
+                    if operation == "upsert":
+                        self._upsert_point(*value)
+                    else:
+                        self._remove(value)
+                self._version = version
+                self._built_at = self._checked_at = time.monotonic()
+                self._build_seconds = time.perf_counter() - start
+                self._ready.set()
+            return len(base.ids)
+        finally:
+            with self._lock:
+                self._building = False
+                self._pending = []
+
+    def is_stale(self, db: Session) -> bool:
+        """Dữ liệu đã đổi từ lần dựng trước, hoặc index đã quá CLUSTER_INDEX_MAX_AGE_SECONDS"""
+        if self._version is None or self._built_at is None:
+            return True
+        if time.monotonic() - self._built_at >= settings.CLUSTER_INDEX_MAX_AGE_SECONDS:
+            return True
+        return farm_data_version(db) != self._version
+
+    def start_build(self, session_factory: Callable[[], Session], only_if_stale: bool = False) -> bool:
+        """
+        Dựng index trong thread nền (không làm gì nếu đang dựng)
+
+        Args:
+            only_if_stale: Chỉ dựng khi is_stale() (kiểm tra trong thread nền)
+
+        Returns:
+            bool: True nếu đã bắt đầu một lần dựng / kiểm tra mới
+        """
+        with self._lock:
+            if self._building:
+                return False
+            self._building = True  # giữ chỗ, build() đặt lại
+
+        def run():
+            db = session_factory()
+            try:
+                if only_if_stale and not self.is_stale(db):
+                    with self._lock:
+                        self._building = False
+                    return
+                farm_count = self.build(db)
+                logger.info(f"Farm cluster index built: {farm_count} farms in {self._build_seconds:.1f}s")
+            except Exception:
+                logger.exception("Farm cluster index build failed")
+                with self._lock:
+                    self._building = False
+            finally:
+                db.close()
+
+        Thread(target=run, name="farm-cluster-index", daemon=True).start()
+        return True
+
+    def ensure_built(self, session_factory: Callable[[], Session], timeout: float) -> bool:
+        """
+        Chờ index sẵn sàng tối đa timeout giây (dựng nền nếu chưa có ai dựng)
+
+        Khi đã có index: trả về ngay, và tối đa mỗi CLUSTER_INDEX_CHECK_SECONDS
+        kiểm tra phiên bản dữ liệu trong thread nền (dựng lại nếu đã cũ).
+
+        Returns:
+            bool: False nếu index vẫn chưa dựng xong
+        """
+        if self._ready.is_set():
+            now = time.monotonic()
+            if now - self._checked_at >= settings.CLUSTER_INDEX_CHECK_SECONDS:
+                self._checked_at = now
+                self.start_build(session_factory, only_if_stale=True)
+            return True
+        self.start_build(session_factory)
+        return self._ready.wait(timeout)
+
+    def invalidate(self) -> None:
+        """Đánh dấu index đã cũ: request kế tiếp bắt đầu dựng lại trong thread nền"""
+        with self._lock:
+            self._version = None
+            self._checked_at = 0.0
+
+    # ========== Incremental updates ==========
+
+    def _apply(self, farm: FarmPoint, sign: int) -> None:
+        """Cộng (sign=1) / trừ (sign=-1) vùng trồng vào một ô delta mỗi zoom"""
+        scopes = [ALL_SCOPE] + ([farm.tinh_name] if farm.tinh_name else [])
+        for scope in scopes:
+            for zoom in range(MIN_ZOOM, MAX_ZOOM + 1):
+                cells = self._deltas.setdefault((scope, zoom), {})
+                key = cell_key(farm.cx, farm.cy, zoom)
+                cell = cells.get(key)
+                if cell is None:
+                    cell = cells[key] = ClusterCell()
+                cell.add(farm, sign)
+                if cell.is_empty():
+                    del cells[key]
+
+    def _base_point(self, farm_id: int) -> Optional[FarmPoint]:
+        """Vùng trồng lúc dựng (None nếu không có hoặc đã bị thay/xóa)"""
+        base = self._base
+        if base is None or farm_id in self._replaced:
+            return None
+        position = int(np.searchsorted(base.ids, farm_id))
+        if position >= len(base.ids) or base.ids[position] != farm_id:
+            return None
+        province = base.province[position]
+        return FarmPoint(
+            id=farm_id,
+            lon=float(base.lon[position]),
+            lat=float(base.lat[position]),
+            tinh_name=base.provinces[province] if province >= 0 else None,
+            dien_tich=float(base.dien_tich[position]),
+            fertilizer_volume=float(base.fertilizer_volume[position]),
+            pesticide_volume=float(base.pesticide_volume[position]),
+            cx=int(base.cx[position]),
+            cy=int(base.cy[position])
+        )
+
+    def _remove(self, farm_id: int) -> None:
+        farm = self._changed.pop(farm_id, None)
+        if farm is None:
+            farm = self._base_point(farm_id)
+            if farm is not None:
+                self._replaced.add(farm_id)
+        if farm is not None:
+            self._apply(farm, -1)
+
+    def _upsert_point(self, farm_id: int, point: Optional[FarmPoint] = None) -> None:
+        self._remove(farm_id)
+        if point is not None:
+            self._changed[point.id] = point
+            self._apply(point, 1)
+
+    def remove(self, farm_id: int) -> None:
+        """Bỏ một vùng trồng khỏi index"""
+        with self._lock:
+            if self._building:
+                self._pending.append(("remove", farm_id))
+            if self._base is not None:
+                self._remove(farm_id)
+
+    def upsert(self, farm) -> None:
+        """
+        Thêm hoặc cập nhật một vùng trồng (tọa độ, tỉnh, diện tích, vật tư)
+
+        Chưa dựng index thì chỉ ghi lại nếu đang dựng: lần dựng đầu đọc từ DB.
+        """
+        point = farm_point(farm)
+        with self._lock:
+            if self._building:
+                self._pending.append(("upsert", (farm.id, point)))
+            if self._base is not None:
+                self._upsert_point(farm.id, point)
+
+    # ========== Query ==========
+
+    def clusters(self, zoom: int, bbox=None, province: Optional[str] = None) -> List[dict]:
+        """
+        Các cluster ở mức zoom trong bbox (minx, miny, maxx, maxy)
+
+        Args:
+            zoom: Mức zoom của bản đồ (cắt về [MIN_ZOOM, MAX_ZOOM])
+            bbox: Khung nhìn, None = toàn bộ
+            province: Chỉ vùng trồng của tỉnh này (manager)
+        """
+        zoom = max(MIN_ZOOM, min(MAX_ZOOM, zoom))
+        with self._lock:
+            cells = self._cells.get((province, zoom))
+            deltas = self._deltas.get((province, zoom), {})
+
+            if bbox is not None:
+                minx, miny, maxx, maxy = bbox
+                x0, y1 = fractional_tile(minx, miny, zoom)
+                x1, y0 = fractional_tile(maxx, maxy, zoom)
+                x0, x1 = int(x0 * CELLS_PER_TILE), int(x1 * CELLS_PER_TILE)
+                y0, y1 = int(y0 * CELLS_PER_TILE), int(y1 * CELLS_PER_TILE)
+
+                def in_view(key: int) -> bool:
+                    return x0 <= key >> CELL_BITS <= x1 and y0 <= key & CELL_MASK <= y1
+
+                if cells is not None:
+                    # key sắp theo cx trước: các cột x0..x1 là một đoạn liên tiếp
+                    lo, hi = np.searchsorted(cells.keys, [x0 << CELL_BITS, (x1 + 1) << CELL_BITS])
+                    cy = cells.keys[lo:hi] & CELL_MASK
+                    cells = cells.take(lo + np.flatnonzero((cy >= y0) & (cy <= y1)))
+                deltas = {key: cell for key, cell in deltas.items() if in_view(key)}
+
+            rows = []
+            if cells is not None:
+                rows = [list(row) for row in zip(
+                    cells.count.tolist(), cells.dien_tich.tolist(), cells.fertilizer_volume.tolist(),
+                    cells.pesticide_volume.tolist(), cells.sum_lon.tolist(), cells.sum_lat.tolist(),
+                    cells.id_xor.tolist()
+                )]
+            if deltas:
+                positions = dict(zip(cells.keys.tolist(), range(len(rows)))) if cells is not None else {}
+                for key, delta in deltas.items():
+                    position = positions.get(key)
+                    if position is None:
+                        rows.append([0, 0.0, 0.0, 0.0, 0.0, 0.0, 0])
+                        position = len(rows) - 1
+                    row = rows[position]
+                    row[0] += delta.count
+                    row[1] += delta.dien_tich
+                    row[2] += delta.fertilizer_volume
+                    row[3] += delta.pesticide_volume
+                    row[4] += delta.sum_lon
+                    row[5] += delta.sum_lat
+                    row[6] ^= delta.id_xor
+
+        return [
+            {
+                "count": count,
+                "farm_id": id_xor if count == 1 else None,
+                "latitude": round(sum_lat / count, 6),
+                "longitude": round(sum_lon / count, 6),
+                "dien_tich": round(dien_tich, 2),
+                "fertilizer_volume": round(fertilizer_volume, 2),
+                "pesticide_volume": round(pesticide_volume, 2)
+            }
+            for count, dien_tich, fertilizer_volume, pesticide_volume, sum_lon, sum_lat, id_xor in rows
+            if count > 0
+        ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "farms": (
+                    len(self._base.ids) - len(self._replaced) + len(self._changed)
+                    if self._base is not None else 0
+                ),
+                "cells": sum(len(cells) for cells in self._cells.values()),
+                "delta_cells": sum(len(cells) for cells in self._deltas.values()),
+                "building": self._building,
+                "stale": self._version is None,
+                "build_seconds": round(self._build_seconds, 2) if self._build_seconds is not None else None,
+                "age_seconds": (
+                    round(time.monotonic() - self._built_at, 1)
+                    if self._built_at is not None else None
+                )
+            }
+
+
+farm_cluster_index = FarmClusterIndex()
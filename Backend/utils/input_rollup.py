@@ -0,0 +1,266 @@
+# Input Rollup Utilities - cập nhật bảng tổng hợp vật tư (tong_hop_vat_tu)
+import logging
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import List, Tuple
+
+from sqlalchemy import func, select, literal, update, delete, insert, inspect, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from models import LichSuCanhTac, VungTrong
+from models.input_usage import TongHopVatTu, LOAI_PHAN_BON, LOAI_THUOC_BVTV
+from utils.quantity import UNIT_KG, UNIT_L
+
+logger = logging.getLogger(__name__)
+
+# Đơn vị khi lịch sử không có don_vi_chuan (như normalize_history_quantity)
+DEFAULT_UNITS = {LOAI_PHAN_BON: UNIT_KG, LOAI_THUOC_BVTV: UNIT_L}
+
+# Đơn vị của VungTrong.fertilizer_volume / pesticide_volume: chỉ cộng lượng
+# ghi theo đơn vị này (phân bón dạng lỏng tính bằng L không nằm trong tổng kg)
+VOLUME_UNITS = {"fertilizer_volume": UNIT_KG, "pesticide_volume": UNIT_L}
+
+# Nâng cấp bảng tạo trước khi có cột don_vi_chuan (như add_tong_hop_vat_tu.sql)
+UPGRADE_ROLLUP_TABLE_SQL = [
+    "ALTER TABLE tong_hop_vat_tu ADD COLUMN IF NOT EXISTS don_vi_chuan VARCHAR(10) NOT NULL DEFAULT 'kg'",
+    "ALTER TABLE tong_hop_vat_tu ALTER COLUMN don_vi_chuan DROP DEFAULT",
+    "ALTER TABLE tong_hop_vat_tu DROP CONSTRAINT IF EXISTS uq_tong_hop_vat_tu",
+    "ALTER TABLE tong_hop_vat_tu ADD CONSTRAINT uq_tong_hop_vat_tu "
+    "UNIQUE (vung_trong_id, thang, loai_vat_tu, vat_tu_id, don_vi_chuan)",
+]
+
+# Kiểm tra lại sự tồn tại của bảng rollup tối đa mỗi N giây khi đang thiếu
+ROLLUP_TABLE_RECHECK_SECONDS = 60.0
+
+# True / False: đã biết bảng có / chưa có; None: chưa kiểm tra
+_rollup_table_ready = None
+_rollup_table_checked_at = 0.0
+
+
+def _rollup_table_state(db: Session) -> str:
+    """'missing', 'outdated' (chưa có cột don_vi_chuan) hoặc 'ready'"""
+    inspector = inspect(db.get_bind())
+    if not inspector.has_table(TongHopVatTu.__tablename__):
+        return "missing"
+    columns = {column["name"] for column in inspector.get_columns(TongHopVatTu.__tablename__)}
+    return "ready" if "don_vi_chuan" in columns else "outdated"
+
+
+def ensure_rollup_table(db: Session) -> bool:
+    """
+    Tạo bảng tong_hop_vat_tu nếu chưa có và dựng rollup từ lịch sử (gọi lúc startup)
+
+    Tương đương Database/migrations/add_tong_hop_vat_tu.sql (cả phần nâng cấp
+    bảng cũ chưa có don_vi_chuan). Không raise: nếu không tạo được (thiếu
+    quyền, ...) thì ghi lịch sử vẫn chạy, chỉ bỏ qua rollup.
+
+    Returns:
+        bool: True nếu bảng sẵn sàng
+    """
+    global _rollup_table_ready, _rollup_table_checked_at
+    try:
+        state = _rollup_table_state(db)
+        if state != "ready":
+            if state == "missing":
+                TongHopVatTu.__table__.create(db.get_bind(), checkfirst=True)
+            else:
+                for statement in UPGRADE_ROLLUP_TABLE_SQL:
+                    db.execute(text(statement))
+            row_count = rebuild_input_rollup(db)
+            db.commit()
+            logger.info(f"{'Created' if state == 'missing' else 'Upgraded'} tong_hop_vat_tu "
+                        f"and rebuilt {row_count} rollup rows")
+        _rollup_table_ready = True
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"⚠️  tong_hop_vat_tu unavailable, input rollup disabled: {e}")
+        _rollup_table_ready = False
+    _rollup_table_checked_at = time.monotonic()
+    return _rollup_table_ready
+
+
+def rollup_table_ready(db: Session) -> bool:
+    """
+    Bảng rollup có tồn tại không (kết quả được nhớ; khi thiếu thì kiểm tra lại
+    sau ROLLUP_TABLE_RECHECK_SECONDS, để chạy migration không cần restart)
+    """
+    global _rollup_table_ready, _rollup_table_checked_at
+    now = time.monotonic()
+    if _rollup_table_ready or (
+        _rollup_table_ready is False and now - _rollup_table_checked_at < ROLLUP_TABLE_RECHECK_SECONDS
+    ):
+        return _rollup_table_ready
+    try:
+        _rollup_table_ready = _rollup_table_state(db) == "ready"
+    except Exception:
+        _rollup_table_ready = False
+    _rollup_table_checked_at = now
+    if not _rollup_table_ready:
+        logger.warning(
+            "⚠️  tong_hop_vat_tu missing or outdated, history writes skip the input rollup "
+            "(run Database/migrations/add_tong_hop_vat_tu.sql)"
+        )
+    return _rollup_table_ready
+
+
+def snapshot_history(history) -> SimpleNamespace:
+    """
+    Chụp lại các trường ảnh hưởng tới rollup trước khi sửa bản ghi
+
+    Dùng trong update: trừ snapshot cũ rồi cộng bản ghi mới.
+    """
+    return SimpleNamespace(
+        vung_trong_id=history.vung_trong_id,
+        ngay_thuc_hien=history.ngay_thuc_hien,
+        phan_bon_id=history.phan_bon_id,
+        thuoc_bvtv_id=history.thuoc_bvtv_id,
+        so_luong=history.so_luong,
+        don_vi_chuan=history.don_vi_chuan
+    )
+
+
+def _contributions(history) -> List[Tuple[str, int, str]]:
+    """Các bộ (loai_vat_tu, vat_tu_id, don_vi_chuan) mà một bản ghi lịch sử đóng góp"""
+    items = []
+    if history.phan_bon_id:
+        items.append((LOAI_PHAN_BON, history.phan_bon_id))
+    if history.thuoc_bvtv_id:
+        items.append((LOAI_THUOC_BVTV, history.thuoc_bvtv_id))
+    return [
+        (loai_vat_tu, vat_tu_id, history.don_vi_chuan or DEFAULT_UNITS[loai_vat_tu])
+        for loai_vat_tu, vat_tu_id in items
+    ]
+
+
+def apply_history_to_rollup(db: Session, history, sign: int = 1) -> None:
+    """
+    Cộng (sign=1) hoặc trừ (sign=-1) một bản ghi lịch sử vào rollup
+
+    Chạy trong transaction của request, caller tự commit. Khi bảng
+    tong_hop_vat_tu chưa được tạo thì bỏ qua (không làm hỏng việc ghi lịch
+    sử); migration / rebuild_input_rollup dựng lại rollup từ lịch sử sau.
+
+    Args:
+        db: Database session
+        history: LichSuCanhTac hoặc snapshot_history(...)
+        sign: 1 khi thêm, -1 khi xóa
+    """
+    contributions = _contributions(history)
+    if not contributions or not history.vung_trong_id or not history.ngay_thuc_hien:
+        return
+    if not rollup_table_ready(db):
+        return
+
+    thang = history.ngay_thuc_hien.replace(day=1)
+    so_luong = Decimal(history.so_luong or 0) * sign
+
+    for loai_vat_tu, vat_tu_id, don_vi_chuan in contributions:
+        stmt = pg_insert(TongHopVatTu).values(
+            vung_trong_id=history.vung_trong_id,
+            thang=thang,
+            loai_vat_tu=loai_vat_tu,
+            vat_tu_id=vat_tu_id,
+            don_vi_chuan=don_vi_chuan,
+            so_lan=sign,
+            tong_so_luong=so_luong
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_tong_hop_vat_tu",
+            set_={
+                "so_lan": TongHopVatTu.so_lan + stmt.excluded.so_lan,
+                "tong_so_luong": TongHopVatTu.tong_so_luong + stmt.excluded.tong_so_luong
+            }
+        )
+        db.execute(stmt)
+
+    if sign < 0:
+        # Bỏ các dòng không còn bản ghi lịch sử nào
+        db.execute(
+            delete(TongHopVatTu).where(
+                TongHopVatTu.vung_trong_id == history.vung_trong_id,
+                TongHopVatTu.thang == thang,
+                TongHopVatTu.so_lan <= 0
+            )
+        )
+
+    sync_farm_volumes(db, history.vung_trong_id)
+
+
+def _farm_volume_subquery(loai_vat_tu: str, don_vi_chuan: str):
+    """Tổng tong_so_luong của một loại vật tư / đơn vị cho vung_trong hiện tại (correlated)"""
+    return select(
+        func.coalesce(func.sum(TongHopVatTu.tong_so_luong), 0)
+    ).where(
+        TongHopVatTu.vung_trong_id == VungTrong.id,
+        TongHopVatTu.loai_vat_tu == loai_vat_tu,
+        TongHopVatTu.don_vi_chuan == don_vi_chuan
+    ).scalar_subquery()
+
+
+def sync_farm_volumes(db: Session, vung_trong_id: int = None) -> None:
+    """
+    Đồng bộ VungTrong.fertilizer_volume (kg) / pesticide_volume (L) từ rollup
+
+    Lượng ghi theo đơn vị khác (VD phân bón lỏng, L) không cộng vào; xem theo
+    từng đơn vị ở /analytics/charts/input-usage-categorized.
+
+    Args:
+        db: Database session
+        vung_trong_id: Chỉ một vùng trồng (None = tất cả)
+    """
+    stmt = update(VungTrong).values(
+        fertilizer_volume=_farm_volume_subquery(LOAI_PHAN_BON, VOLUME_UNITS["fertilizer_volume"]),
+        pesticide_volume=_farm_volume_subquery(LOAI_THUOC_BVTV, VOLUME_UNITS["pesticide_volume"])
+    )
+    if vung_trong_id is not None:
+        stmt = stmt.where(VungTrong.id == vung_trong_id)
+    db.execute(stmt.execution_options(synchronize_session=False))
+
+
+def rebuild_input_rollup(db: Session) -> int:
+    """
+    Dựng lại toàn bộ rollup từ lich_su_canh_tac bằng INSERT ... SELECT GROUP BY
+
+    Caller tự commit.
+
+    Returns:
+        int: Số dòng rollup sau khi dựng lại
+    """
+    db.execute(delete(TongHopVatTu))
+
+    thang = func.date_trunc("month", LichSuCanhTac.ngay_thuc_hien).cast(TongHopVatTu.thang.type)
+    so_luong = func.coalesce(LichSuCanhTac.so_luong, 0)
+
+    for loai_vat_tu, vat_tu_column in (
+        (LOAI_PHAN_BON, LichSuCanhTac.phan_bon_id),
+        (LOAI_THUOC_BVTV, LichSuCanhTac.thuoc_bvtv_id),
+    ):
+        don_vi_chuan = func.coalesce(LichSuCanhTac.don_vi_chuan, DEFAULT_UNITS[loai_vat_tu])
+        grouped = select(
+            LichSuCanhTac.vung_trong_id,
+            thang.label("thang"),
+            literal(loai_vat_tu).label("loai_vat_tu"),
+            vat_tu_column.label("vat_tu_id"),
+            don_vi_chuan.label("don_vi_chuan"),
+            func.count(LichSuCanhTac.id).label("so_lan"),
+            func.sum(so_luong).label("tong_so_luong")
+        ).where(
+            vat_tu_column.isnot(None),
+            LichSuCanhTac.vung_trong_id.isnot(None),
+            LichSuCanhTac.ngay_thuc_hien.isnot(None)
+        ).group_by(
+            LichSuCanhTac.vung_trong_id, thang, vat_tu_column, don_vi_chuan
+        )
+
+        db.execute(
+            insert(TongHopVatTu).from_select(
+                ["vung_trong_id", "thang", "loai_vat_tu", "vat_tu_id", "don_vi_chuan", "so_lan", "tong_so_luong"],
+                grouped
+            )
+        )
+
+    sync_farm_volumes(db)
+
+    return db.query(func.count(TongHopVatTu.id)).scalar()
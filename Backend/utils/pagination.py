@@ -1,33 +1,242 @@
 # Pagination Utilities
-from typing import TypeVar, Generic, List
+from typing import TypeVar, Generic, List, Optional, Sequence, Tuple
+from datetime import date, datetime
+from decimal import Decimal
 from pydantic import BaseModel
+from fastapi import HTTPException, status
+from sqlalchemy import BigInteger, tuple_
 from sqlalchemy.orm import Query
+from config import settings
+from utils.cache import TTLCache
+import base64
+import binascii
+import json
 import math
 
 T = TypeVar('T')
 
+# Count strategies (chọn theo từng endpoint)
+COUNT_EXACT = "exact"        # SELECT COUNT(*) mỗi request
+COUNT_ESTIMATE = "estimate"  # Số dòng ước lượng của planner (EXPLAIN)
+COUNT_CACHED = "cached"      # COUNT(*) chính xác, cache theo câu SQL + tham số
+COUNT_STRATEGIES = (COUNT_EXACT, COUNT_ESTIMATE, COUNT_CACHED)
+
+# Exact counts keyed by filter signature
+_count_cache = TTLCache(
+    max_size=settings.COUNT_CACHE_MAX_SIZE,
+    ttl=settings.COUNT_CACHE_TTL_SECONDS
+)
+
 
 class PaginationParams(BaseModel):
     """Pagination parameters"""
     page: int = 1
     page_size: int = 20
-    
+
     @property
     def offset(self) -> int:
         return (self.page - 1) * self.page_size
 
 
-def paginate(query: Query, page: int = 1, page_size: int = 20) -> dict:
+def _json_default(value):
+    """Serialize date/datetime in cursor values"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Unsupported cursor value: {value!r}")
+
+
+def encode_cursor(values: Sequence) -> str:
+    """
+    Encode keyset values of the last row into an opaque cursor string
+
+    Args:
+        values: Values of the keyset columns (same order as keyset)
+
+    Returns:
+        str: URL-safe base64 cursor
+    """
+    raw = json.dumps(list(values), default=_json_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _coerce_cursor_value(column, value):
+    """
+    Keyset value from JSON -> Python type of the column
+
+    Raises:
+        ValueError: value does not match the column type (e.g. string cursor
+            on an integer id), so it never reaches the database
+    """
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is bool:
+        valid = isinstance(value, bool)
+    elif python_type is int:
+        # INTEGER / BIGINT range: ngoài khoảng thì PostgreSQL báo lỗi
+        bits = 63 if isinstance(column.type, BigInteger) else 31
+        valid = isinstance(value, int) and not isinstance(value, bool) and -2 ** bits <= value < 2 ** bits
+    elif python_type in (float, Decimal):
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+        if valid:
+            return python_type(str(value)) if python_type is Decimal else float(value)
+    elif python_type is str:
+        valid = isinstance(value, str)
+    else:
+        valid = True
+    if not valid:
+        raise ValueError(f"cursor value {value!r} does not match {column.key}")
+    return value
+
+
+def decode_cursor(cursor: str, keyset: Sequence) -> list:
+    """
+    Decode cursor string back to typed keyset values
+
+    Args:
+        cursor: Cursor from encode_cursor
+        keyset: Keyset columns (used to restore and validate value types)
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed or its values do not
+            match the keyset column types
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(keyset):
+            raise ValueError("cursor length mismatch")
+
+        typed = [_coerce_cursor_value(column, value) for column, value in zip(keyset, values)]
+        return typed
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def _row_cursor(item, keyset: Sequence) -> str:
+    """Cursor pointing after the given row"""
+    return encode_cursor([getattr(item, column.key) for column in keyset])
+
+
+def _count_statement(query: Query):
+    """Câu SELECT dùng để đếm: bỏ eager load và ORDER BY (không ảnh hưởng số dòng)"""
+    return query.enable_eagerloads(False).order_by(None).statement
+
+
+def _compile(query: Query):
+    """Compile query theo dialect của session, trả về (sql, params)"""
+    bind = query.session.get_bind()
+    compiled = _count_statement(query).compile(
+        dialect=bind.dialect,
+        compile_kwargs={"render_postcompile": True}
+    )
+    return bind.dialect.name, str(compiled), compiled.params
+
+
+def estimate_count(query: Query) -> Optional[int]:
+    """
+    Số dòng planner ước lượng cho query (EXPLAIN, không chạy query)
+
+    Returns:
+        int hoặc None nếu database không phải PostgreSQL
+    """
+    dialect_name, sql, params = _compile(query)
+    if dialect_name != "postgresql":
+        return None
+
+    connection = query.session.connection()
+    plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql, params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def cached_count(query: Query) -> int:
+    """COUNT(*) chính xác, cache theo câu SQL + tham số (TTL COUNT_CACHE_TTL_SECONDS)"""
+    _, sql, params = _compile(query)
+    key = (sql, tuple(sorted((name, repr(value)) for name, value in params.items())))
+
+    total = _count_cache.get(key)
+    if total is None:
+        total = query.count()
+        _count_cache.set(key, total)
+    return total
+
+
+def clear_count_cache() -> None:
+    """Xóa count đã cache (gọi sau khi thêm/xóa bản ghi nếu cần total đúng ngay)"""
+    _count_cache.clear()
+
+
+def count_rows(query: Query, strategy: str = COUNT_EXACT) -> Tuple[int, bool]:
+    """
+    Đếm số dòng của query theo strategy
+
+    "estimate" chỉ dùng số ước lượng khi kết quả đủ lớn
+    (>= COUNT_ESTIMATE_THRESHOLD); tập nhỏ thì COUNT(*) vừa rẻ vừa chính xác.
+
+    Returns:
+        tuple: (total, is_estimate)
+    """
+    if strategy not in COUNT_STRATEGIES:
+        raise ValueError(f"Unknown count strategy: {strategy}")
+
+    if strategy == COUNT_ESTIMATE:
+        estimate = estimate_count(query)
+        if estimate is not None and estimate >= settings.COUNT_ESTIMATE_THRESHOLD:
+            return estimate, True
+        return query.count(), False
+
+    if strategy == COUNT_CACHED:
+        return cached_count(query), False
+
+    return query.count(), False
+
+
+def paginate(
+    query: Query,
+    page: int = 1,
+    page_size: int = 20,
+    cursor: Optional[str] = None,
+    keyset: Optional[Sequence] = None,
+    count_strategy: str = COUNT_EXACT
+) -> dict:
     """
     Paginate SQLAlchemy query
-    
+
+    Two modes:
+    - Offset (default): count + OFFSET/LIMIT, returns total/total_pages.
+      How total is computed depends on `count_strategy` (see count_rows);
+      total_estimated is True when it comes from the planner.
+    - Keyset: when `cursor` is given (empty string = first page). Rows are
+      ordered by `keyset` columns descending and filtered with a row-value
+      comparison, so deep pages cost the same as the first one. total and
+      total_pages are None in this mode.
+
+    When `keyset` is given, `next_cursor` is returned in both modes so a
+    client can switch from page numbers to cursors at any point.
+
     Args:
         query: SQLAlchemy query object
-        page: Page number (1-indexed)
+        page: Page number (1-indexed, offset mode)
         page_size: Number of items per page
-    
+        cursor: Opaque cursor from a previous response's next_cursor
+        keyset: Unique ordering columns, e.g. [LichSuCanhTac.ngay_thuc_hien, LichSuCanhTac.id]
+        count_strategy: "exact", "estimate" or "cached" (offset mode)
+
     Returns:
-        dict: Paginated result with items, total, page info
+        dict: Paginated result with items, total, page info, next_cursor
     """
     if page < 1:
         page = 1
@@ -35,17 +244,47 @@ def paginate(query: Query, page: int = 1, page_size: int = 20) -> dict:
         page_size = 20
     if page_size > 100:
         page_size = 100
-    
-    total = query.count()
+
+    if cursor is not None:
+        if not keyset:
+            raise ValueError("Keyset pagination requires keyset columns")
+
+        query = query.order_by(None).order_by(*[column.desc() for column in keyset])
+        if cursor:
+            values = decode_cursor(cursor, keyset)
+            query = query.filter(tuple_(*keyset) < tuple_(*values))
+
+        # Fetch one extra row to know whether another page exists
+        rows = query.limit(page_size + 1).all()
+        items = rows[:page_size]
+        next_cursor = _row_cursor(items[-1], keyset) if len(rows) > page_size else None
+
+        return {
+            "items": items,
+            "total": None,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": None,
+            "next_cursor": next_cursor,
+            "total_estimated": False
+        }
+
+    total, total_estimated = count_rows(query, count_strategy)
     offset = (page - 1) * page_size
     items = query.offset(offset).limit(page_size).all()
-    
+
     total_pages = math.ceil(total / page_size)
-    
+
+    next_cursor = None
+    if keyset and items and page < total_pages:
+        next_cursor = _row_cursor(items[-1], keyset)
+
     return {
         "items": items,
         "total": total,
         "page": page,
         "page_size": page_size,
-        "total_pages": total_pages
+        "total_pages": total_pages,
+        "next_cursor": next_cursor,
+        "total_estimated": total_estimated
     }
@@ -0,0 +1,122 @@
+# Quantity Utilities - chuẩn hóa liều lượng vật tư (lieu_luong) về số + đơn vị chuẩn
+import re
+import unicodedata
+from decimal import Decimal, InvalidOperation
+from typing import Optional, Tuple
+
+# Đơn vị chuẩn
+UNIT_KG = "kg"
+UNIT_L = "L"
+
+# Hệ số quy đổi về đơn vị chuẩn: alias -> (hệ số, đơn vị chuẩn)
+UNIT_FACTORS = {
+    # Khối lượng
+    "kg": (Decimal("1"), UNIT_KG),
+    "kilogram": (Decimal("1"), UNIT_KG),
+    "g": (Decimal("0.001"), UNIT_KG),
+    "gr": (Decimal("0.001"), UNIT_KG),
+    "gram": (Decimal("0.001"), UNIT_KG),
+    "gam": (Decimal("0.001"), UNIT_KG),
+    "mg": (Decimal("0.000001"), UNIT_KG),
+    "yen": (Decimal("10"), UNIT_KG),
+    "ta": (Decimal("100"), UNIT_KG),
+    "tan": (Decimal("1000"), UNIT_KG),
+    "t": (Decimal("1000"), UNIT_KG),
+    # Thể tích
+    "l": (Decimal("1"), UNIT_L),
+    "lit": (Decimal("1"), UNIT_L),
+    "litre": (Decimal("1"), UNIT_L),
+    "liter": (Decimal("1"), UNIT_L),
+    "ml": (Decimal("0.001"), UNIT_L),
+    "cc": (Decimal("0.001"), UNIT_L),
+}
+
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?")
+_UNIT_RE = re.compile(r"[a-z]+")
+
+
+def _strip_accents(text: str) -> str:
+    """Bỏ dấu tiếng Việt: 'lít' -> 'lit', 'tấn' -> 'tan'"""
+    text = text.replace("đ", "d").replace("Đ", "D")
+    normalized = unicodedata.normalize("NFD", text)
+    return "".join(c for c in normalized if unicodedata.category(c) != "Mn")
+
+
+def _parse_unit(text: Optional[str]) -> Optional[Tuple[Decimal, str]]:
+    """
+    Tìm hệ số quy đổi từ chuỗi đơn vị
+
+    Chỉ xét tử số của đơn vị dạng tỷ lệ ("kg/ha" -> "kg").
+    """
+    if not text:
+        return None
+    numerator = _strip_accents(str(text)).lower().split("/")[0]
+    match = _UNIT_RE.search(numerator)
+    if not match:
+        return None
+    return UNIT_FACTORS.get(match.group())
+
+
+def parse_quantity(
+    lieu_luong: Optional[str],
+    don_vi: Optional[str] = None,
+    default_unit: Optional[str] = None
+) -> Tuple[Optional[Decimal], Optional[str]]:
+    """
+    Parse liều lượng dạng text thành số lượng theo đơn vị chuẩn (kg/L)
+
+    Đơn vị lấy theo thứ tự: phần chữ đi sau số trong lieu_luong,
+    sau đó cột don_vi, cuối cùng default_unit.
+
+    Examples:
+        parse_quantity("500 g")            -> (Decimal("0.500"), "kg")
+        parse_quantity("1,5", "lít/ha")    -> (Decimal("1.5"), "L")
+        parse_quantity("120", None, "kg")  -> (Decimal("120"), "kg")
+
+    Args:
+        lieu_luong: Liều lượng dạng text (VD: "100", "2,5 kg", "500ml")
+        don_vi: Đơn vị nhập kèm (VD: "kg/ha")
+        default_unit: Đơn vị chuẩn dùng khi không xác định được đơn vị
+
+    Returns:
+        tuple: (so_luong, don_vi_chuan), (None, None) nếu không có số
+    """
+    if lieu_luong is None:
+        return None, None
+
+    text = str(lieu_luong).strip()
+    match = _NUMBER_RE.search(text)
+    if not match:
+        return None, None
+
+    try:
+        value = Decimal(match.group().replace(",", "."))
+    except InvalidOperation:
+        return None, None
+
+    unit = _parse_unit(text[match.end():]) or _parse_unit(don_vi)
+    if unit:
+        factor, canonical = unit
+        return value * factor, canonical
+
+    return value, default_unit
+
+
+def normalize_history_quantity(history) -> None:
+    """
+    Tính lại so_luong / don_vi_chuan cho một bản ghi LichSuCanhTac
+
+    Khi không đọc được đơn vị: phân bón mặc định kg, thuốc BVTV mặc định L.
+
+    Args:
+        history: LichSuCanhTac instance (được cập nhật tại chỗ)
+    """
+    default_unit = None
+    if history.phan_bon_id:
+        default_unit = UNIT_KG
+    elif history.thuoc_bvtv_id:
+        default_unit = UNIT_L
+
+    history.so_luong, history.don_vi_chuan = parse_quantity(
+        history.lieu_luong, history.don_vi, default_unit
+    )
@@ -0,0 +1,48 @@
+# Query Counter Utilities - đếm số câu SQL được gửi tới database
+from contextlib import contextmanager
+from typing import List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryCounter:
+    """Kết quả đếm: số statement và danh sách câu SQL đã chạy"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __repr__(self):
+        return f"<QueryCounter(count={self.count})>"
+
+
+@contextmanager
+def count_queries(engine: Engine):
+    """
+    Context manager đếm số câu SQL chạy trên engine
+
+    Usage:
+        with count_queries(engine) as counter:
+            db.query(VungTrong).all()
+        print(counter.count)
+
+    Args:
+        engine: SQLAlchemy engine cần theo dõi
+
+    Yields:
+        QueryCounter: Bộ đếm, cập nhật sau mỗi statement
+    """
+    counter = QueryCounter()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
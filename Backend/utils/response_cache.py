@@ -0,0 +1,104 @@
+# Response Cache Utilities - cache kết quả analytics theo role/tỉnh/query params
+import functools
+import hashlib
+import inspect
+import json
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from config import settings
+from utils.cache import TTLCache
+
+analytics_cache = TTLCache(
+    max_size=settings.ANALYTICS_CACHE_MAX_SIZE,
+    ttl=settings.ANALYTICS_CACHE_TTL_SECONDS
+)
+
+# Client luôn phải hỏi lại server, nhưng có thể gửi If-None-Match để nhận 304
+CACHE_CONTROL = "private, no-cache"
+
+
+def invalidate_analytics_cache() -> None:
+    """Xóa toàn bộ response đã cache (gọi sau khi ghi farms/history)"""
+    analytics_cache.clear()
+
+
+def _cache_key(request: Request, user) -> tuple:
+    """
+    Key = path + role + province_code + query params (đã sắp xếp)
+
+    Farmer chỉ thấy dữ liệu của mình nên thêm user id vào key.
+    """
+    role = getattr(user, "role", None)
+    scope = (role, getattr(user, "province_code", None))
+    if role == "farmer":
+        scope += (user.id,)
+    params = tuple(sorted(request.query_params.multi_items()))
+    return (request.url.path, scope, params)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """So If-None-Match với ETag hiện tại"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _build_response(request: Request, body: bytes, etag: str) -> Response:
+    """200 kèm body, hoặc 304 nếu client đã có bản này"""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def cache_response(endpoint):
+    """
+    Decorator cho endpoint analytics (GET)
+
+    - Cache JSON đã serialize trong analytics_cache (LRU + TTL)
+    - Trả ETag; request có If-None-Match trùng thì trả 304 không body
+    - Endpoint phải có tham số current_user
+
+    Decorator tự thêm tham số `request: Request` vào signature nếu endpoint
+    chưa khai báo, để FastAPI inject.
+
+    Usage:
+        @router.get("/kpi/overview")
+        @cache_response
+        async def get_kpi_overview(db = Depends(get_db), current_user = Depends(...)):
+            ...
+    """
+    signature = inspect.signature(endpoint)
+    wants_request = "request" in signature.parameters
+    parameters = list(signature.parameters.values())
+    if not wants_request:
+        parameters.append(
+            inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+        )
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        request = kwargs["request"] if wants_request else kwargs.pop("request")
+        key = _cache_key(request, kwargs.get("current_user"))
+
+        cached = analytics_cache.get(key)
+        if cached is None:
+            result = endpoint(*args, **kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+            body = json.dumps(
+                jsonable_encoder(result), ensure_ascii=False, separators=(",", ":")
+            ).encode("utf-8")
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            cached = (body, etag)
+            analytics_cache.set(key, cached)
+
+        body, etag = cached
+        return _build_response(request, body, etag)
+
+    wrapper.__signature__ = signature.replace(parameters=parameters)
+    return wrapper
@@ -0,0 +1,126 @@
+# Spatial Utilities - lọc theo bounding box (viewport bản đồ)
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from models import DonViHanhChinh, VungTrong
+from models.admin_unit import CAP_TINH
+from utils.admin_boundaries import province_lookup
+from utils.response_cache import analytics_cache
+
+SRID_WGS84 = 4326
+
+# analytics_cache key: tinh_name -> (lon, lat) cho vùng trồng chưa có tọa độ
+UNLOCATED_FARM_POINTS_KEY = ("spatial", "unlocated-farm-points")
+
+BBox = Tuple[float, float, float, float]
+
+
+def parse_bbox(bbox: Optional[str]) -> Optional[BBox]:
+    """
+    Parse tham số bbox=minx,miny,maxx,maxy (kinh độ/vĩ độ WGS84)
+
+    Args:
+        bbox: Chuỗi "minLng,minLat,maxLng,maxLat" (VD: Leaflet getBounds().toBBoxString())
+
+    Returns:
+        tuple hoặc None nếu không truyền bbox
+
+    Raises:
+        HTTPException: 400 nếu bbox sai định dạng hoặc ngoài phạm vi
+    """
+    if not bbox:
+        return None
+
+    try:
+        minx, miny, maxx, maxy = (float(value) for value in bbox.split(","))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="bbox must be 'minx,miny,maxx,maxy'"
+        )
+
+    if not (-180 <= minx < maxx <= 180 and -90 <= miny < maxy <= 90):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="bbox out of range (expected minx < maxx in [-180, 180], miny < maxy in [-90, 90])"
+        )
+
+    return minx, miny, maxx, maxy
+
+
+def bbox_envelope(bbox: BBox):
+    """ST_MakeEnvelope cho bbox (SRID 4326)"""
+    return func.ST_MakeEnvelope(*bbox, SRID_WGS84)
+
+
+def within_bbox(geom_column, bbox: BBox):
+    """
+    Điều kiện geom && envelope (dùng GiST index)
+
+    Với cột Point, giao bounding box cũng là giao thật nên không cần
+    thêm ST_Intersects.
+    """
+    return geom_column.op("&&")(bbox_envelope(bbox))
+
+
+def unlocated_farm_points(db: Session) -> Dict[str, Tuple[float, float]]:
+    """
+    Điểm thay thế cho vùng trồng chưa có tọa độ (geom NULL): điểm đặt nhãn
+    (hoặc tâm) của tỉnh trong don_vi_hanh_chinh, theo tinh_name
+
+    Tên tỉnh khớp bằng province_lookup (chuẩn hóa + alias). Hai query nhỏ,
+    cache trong analytics_cache (xóa khi farms thay đổi).
+
+    Returns:
+        dict: tinh_name -> (lon, lat); tỉnh không khớp thì không có trong dict
+    """
+    points = analytics_cache.get(UNLOCATED_FARM_POINTS_KEY)
+    if points is not None:
+        return points
+
+    names = [
+        row.tinh_name for row in db.query(VungTrong.tinh_name).filter(
+            VungTrong.geom.is_(None),
+            VungTrong.tinh_name.isnot(None)
+        ).distinct()
+    ]
+    points = {}
+    if names:
+        provinces = db.query(
+            DonViHanhChinh.ten,
+            func.coalesce(DonViHanhChinh.nhan_lon, DonViHanhChinh.tam_lon).label("lon"),
+            func.coalesce(DonViHanhChinh.nhan_lat, DonViHanhChinh.tam_lat).label("lat")
+        ).filter(
+            DonViHanhChinh.cap == CAP_TINH,
+            func.coalesce(DonViHanhChinh.nhan_lat, DonViHanhChinh.tam_lat).isnot(None)
+        ).order_by(DonViHanhChinh.id).all()
+        find_province = province_lookup(provinces)
+        for name in names:
+            province = find_province(name)
+            if province is not None:
+                points[name] = (float(province.lon), float(province.lat))
+
+    analytics_cache.set(UNLOCATED_FARM_POINTS_KEY, points)
+    return points
+
+
+def farm_within_bbox(db: Session, bbox: BBox):
+    """
+    within_bbox cho vùng trồng, giữ cả vùng trồng chưa có tọa độ
+
+    Vùng trồng geom NULL nằm trong bbox khi điểm tỉnh của nó
+    (unlocated_farm_points) nằm trong bbox, nên khung nhìn bản đồ không
+    làm mất các vùng trồng client đặt tại tâm tỉnh.
+    """
+    minx, miny, maxx, maxy = bbox
+    names = [
+        name for name, (lon, lat) in unlocated_farm_points(db).items()
+        if minx <= lon <= maxx and miny <= lat <= maxy
+    ]
+    condition = within_bbox(VungTrong.geom, bbox)
+    if names:
+        condition = or_(condition, and_(VungTrong.geom.is_(None), VungTrong.tinh_name.in_(names)))
+    return condition
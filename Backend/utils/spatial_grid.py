@@ -0,0 +1,132 @@
+# Spatial Grid Utilities - gom điểm vào ô vuông / lục giác (heatmap)
+"""
+Bin tọa độ (kinh độ, vĩ độ) vào lưới đều bằng NumPy:
+
+- square: ô vuông cạnh cell_size độ, khóa (floor(x / s), floor(y / s))
+- hex: lục giác đỉnh nhọn, bán kính ngoại tiếp cell_size độ, khóa là tọa
+  độ trục (q, r) sau khi làm tròn theo tọa độ cube
+
+Mỗi ô được cộng dồn bằng np.unique(return_inverse) + np.bincount, không
+có vòng lặp Python theo từng điểm. Lưới cố định theo gốc (0, 0) nên kết
+quả của một độ phân giải có thể cache rồi cắt theo khung nhìn.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+GRID_SQUARE = "square"
+GRID_HEX = "hex"
+GRID_SHAPES = (GRID_SQUARE, GRID_HEX)
+
+SQRT3 = np.sqrt(3.0)
+
+
+@dataclass
+class GridCells:
+    """Kết quả gom lưới: tâm ô và tổng các trọng số theo ô"""
+    shape: str
+    cell_size: float
+    lons: np.ndarray
+    lats: np.ndarray
+    counts: np.ndarray
+    sums: Dict[str, np.ndarray]
+
+
+def _square_keys(lons: np.ndarray, lats: np.ndarray, size: float):
+    return np.stack([np.floor(lons / size), np.floor(lats / size)], axis=1).astype(np.int64)
+
+
+def _square_centers(keys: np.ndarray, size: float):
+    return (keys[:, 0] + 0.5) * size, (keys[:, 1] + 0.5) * size
+
+
+def _hex_keys(lons: np.ndarray, lats: np.ndarray, size: float):
+    """Tọa độ trục (q, r) của lục giác đỉnh nhọn chứa mỗi điểm"""
+    q = (SQRT3 / 3 * lons - lats / 3) / size
+    r = (2 / 3 * lats) / size
+    # Làm tròn cube (x + y + z = 0): sửa thành phần có sai số lớn nhất
+    x, z = q, r
+    y = -x - z
+    rx, ry, rz = np.round(x), np.round(y), np.round(z)
+    dx, dy, dz = np.abs(rx - x), np.abs(ry - y), np.abs(rz - z)
+    fix_x = (dx > dy) & (dx > dz)
+    fix_z = ~fix_x & (dz >= dy)
+    rx = np.where(fix_x, -ry - rz, rx)
+    rz = np.where(fix_z, -rx - ry, rz)
+    return np.stack([rx, rz], axis=1).astype(np.int64)
+
+
+def _hex_centers(keys: np.ndarray, size: float):
+    q, r = keys[:, 0], keys[:, 1]
+    return size * SQRT3 * (q + r / 2), size * 1.5 * r
+
+
+def aggregate_grid(
+    lons: np.ndarray,
+    lats: np.ndarray,
+    shape: str,
+    cell_size: float,
+    weights: Optional[Dict[str, np.ndarray]] = None
+) -> GridCells:
+    """
+    Gom điểm vào lưới và cộng dồn trọng số theo ô
+
+    Args:
+        lons: Kinh độ các điểm
+        lats: Vĩ độ các điểm
+        shape: GRID_SQUARE hoặc GRID_HEX
+        cell_size: Cạnh ô vuông / bán kính lục giác (độ)
+        weights: {tên: mảng giá trị} cộng theo ô (VD: dien_tich)
+    """
+    weights = weights or {}
+    if shape == GRID_HEX:
+        keys = _hex_keys(lons, lats, cell_size)
+    else:
+        keys = _square_keys(lons, lats, cell_size)
+
+    if len(keys) == 0:
+        empty = np.empty(0)
+        return GridCells(shape, cell_size, empty, empty, np.empty(0, dtype=np.int64),
+                         {name: empty for name in weights})
+
+    cell_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    centers = _hex_centers(cell_keys, cell_size) if shape == GRID_HEX else _square_centers(cell_keys, cell_size)
+
+    return GridCells(
+        shape=shape,
+        cell_size=cell_size,
+        lons=centers[0],
+        lats=centers[1],
+        counts=np.bincount(inverse, minlength=len(cell_keys)),
+        sums={
+            name: np.bincount(inverse, weights=values, minlength=len(cell_keys))
+            for name, values in weights.items()
+        }
+    )
+
+
+def cell_polygon(shape: str, lon: float, lat: float, size: float) -> List[List[float]]:
+    """Vòng tọa độ [lon, lat] (khép kín) của ô có tâm (lon, lat)"""
+    if shape == GRID_HEX:
+        angles = np.radians(np.arange(6) * 60 + 30)
+        ring = np.stack([lon + size * np.cos(angles), lat + size * np.sin(angles)], axis=1)
+    else:
+        half = size / 2
+        ring = np.array([
+            [lon - half, lat - half], [lon + half, lat - half],
+            [lon + half, lat + half], [lon - half, lat + half]
+        ])
+    ring = np.round(ring, 6).tolist()
+    return ring + ring[:1]
+
+
+def cells_in_bbox(cells: GridCells, bbox) -> np.ndarray:
+    """Mặt nạ các ô giao khung nhìn (minx, miny, maxx, maxy), nới thêm một ô"""
+    minx, miny, maxx, maxy = bbox
+    margin = cells.cell_size
+    return (
+        (cells.lons >= minx - margin) & (cells.lons <= maxx + margin) &
+        (cells.lats >= miny - margin) & (cells.lats <= maxy + margin)
+    )
@@ -0,0 +1,201 @@
+# Tile Utilities - toán tile XYZ (Web Mercator) và cache tile trên đĩa
+import glob
+import hashlib
+import math
+import os
+import shutil
+import time
+from typing import Iterable, Optional, Tuple
+
+from config import backend_path, settings
+
+# MVT: kích thước lưới tile và vùng đệm (đơn vị tile)
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+
+# Nửa chu vi Trái Đất trong EPSG:3857
+MERCATOR_MAX = 20037508.342789244
+MAX_LATITUDE = 85.0511287798066
+
+MAX_ZOOM = 22
+
+# Tên layer (thư mục cache và tên layer trong MVT)
+FARMS_LAYER = "farms"
+
+
+def is_valid_tile(z: int, x: int, y: int) -> bool:
+    """Kiểm tra z/x/y nằm trong lưới tile"""
+    if z < 0 or z > MAX_ZOOM:
+        return False
+    n = 1 << z
+    return 0 <= x < n and 0 <= y < n
+
+
+def tile_bounds_mercator(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """Khung tile trong EPSG:3857 (minx, miny, maxx, maxy)"""
+    size = 2 * MERCATOR_MAX / (1 << z)
+    minx = -MERCATOR_MAX + x * size
+    maxy = MERCATOR_MAX - y * size
+    return minx, maxy - size, minx + size, maxy
+
+
+def _tile_to_lonlat(x: float, y: float, z: int) -> Tuple[float, float]:
+    """Góc tây bắc của tile (x, y có thể lẻ) -> (lon, lat)"""
+    n = 1 << z
+    lon = x / n * 360.0 - 180.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    return lon, lat
+
+
+def tile_bounds_lonlat(z: int, x: int, y: int, buffer: float = 0) -> Tuple[float, float, float, float]:
+    """
+    Khung tile theo kinh/vĩ độ (minx, miny, maxx, maxy)
+
+    Args:
+        buffer: Mở rộng theo tỉ lệ cạnh tile (VD: TILE_BUFFER / TILE_EXTENT)
+    """
+    west, north = _tile_to_lonlat(x - buffer, y - buffer, z)
+    east, south = _tile_to_lonlat(x + 1 + buffer, y + 1 + buffer, z)
+    return max(west, -180.0), max(south, -90.0), min(east, 180.0), min(north, 90.0)
+
+
+def fractional_tile(lon: float, lat: float, z: int) -> Tuple[float, float]:
+    """Tọa độ tile (lẻ) của một điểm ở mức zoom z"""
+    lat = max(min(lat, MAX_LATITUDE), -MAX_LATITUDE)
+    n = 1 << z
+    x = (lon + 180.0) / 360.0 * n
+    lat_rad = math.radians(lat)
+    y = (1 - math.log(math.tan(lat_rad) + 1 / math.cos(lat_rad)) / math.pi) / 2 * n
+    return x, y
+
+
+def tiles_for_point(lon: float, lat: float, zooms: Iterable[int]):
+    """
+    Các tile chứa điểm, kể cả tile lân cận có điểm nằm trong vùng đệm
+
+    Yields:
+        tuple: (z, x, y)
+    """
+    margin = TILE_BUFFER / TILE_EXTENT
+    for z in zooms:
+        n = 1 << z
+        fx, fy = fractional_tile(lon, lat, z)
+        xs = range(max(int(math.floor(fx - margin)), 0), min(int(math.floor(fx + margin)), n - 1) + 1)
+        ys = range(max(int(math.floor(fy - margin)), 0), min(int(math.floor(fy + margin)), n - 1) + 1)
+        for x in xs:
+            for y in ys:
+                yield z, x, y
+
+
+# ========== Disk cache ==========
+#
+# Ghi qua API xóa đúng các tile chứa vùng trồng (invalidate_farm_tiles).
+# Ghi ngoài API (script nạp hàng loạt, rebuild rollup, đổi danh mục cây trồng)
+# xóa toàn bộ bằng clear_tile_cache() (qua mark_farm_data_changed()); tile
+# quá TILE_CACHE_TTL_SECONDS (theo mtime) coi như chưa cache để không có tile
+# cũ tồn tại mãi khi một đường ghi nào đó quên xóa.
+
+def tile_cache_dir() -> str:
+    """Thư mục cache tile, tính từ thư mục Backend (script chạy từ nơi khác)"""
+    return backend_path(settings.TILE_CACHE_DIR)
+
+
+def tile_scope(province_filter: Optional[str]) -> str:
+    """Thư mục con theo phạm vi dữ liệu: 'all' hoặc một tỉnh (hash để an toàn tên file)"""
+    if not province_filter:
+        return "all"
+    return "p-" + hashlib.sha1(province_filter.encode("utf-8")).hexdigest()[:12]
+
+
+def _tile_path(layer: str, scope: str, z: int, x: int, y: int) -> str:
+    return os.path.join(tile_cache_dir(), layer, scope, str(z), str(x), f"{y}.pbf")
+
+
+def read_cached_tile(layer: str, scope: str, z: int, x: int, y: int) -> Optional[bytes]:
+    """Đọc tile đã cache, None nếu chưa có hoặc đã quá TILE_CACHE_TTL_SECONDS"""
+    try:
+        with open(_tile_path(layer, scope, z, x, y), "rb") as f:
+            if time.time() - os.fstat(f.fileno()).st_mtime > settings.TILE_CACHE_TTL_SECONDS:
+                return None
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def write_cached_tile(layer: str, scope: str, z: int, x: int, y: int, data: bytes) -> None:
+    """Ghi tile vào cache (ghi file tạm rồi rename để không đọc phải file dở)"""
+    if z > settings.TILE_CACHE_MAX_ZOOM:
+        return
+    path = _tile_path(layer, scope, z, x, y)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def invalidate_point_tiles(layer: str, lon, lat) -> int:
+    """
+    Xóa các tile đã cache (mọi phạm vi) có chứa điểm lon/lat
+
+    Returns:
+        int: Số file tile đã xóa
+    """
+    if lon is None or lat is None:
+        return 0
+
+    removed = 0
+    zooms = range(0, settings.TILE_CACHE_MAX_ZOOM + 1)
+    for z, x, y in tiles_for_point(float(lon), float(lat), zooms):
+        pattern = _tile_path(layer, "*", z, x, y)
+        for path in glob.glob(pattern):
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+def clear_tile_cache() -> int:
+    """
+    Xóa toàn bộ tile đã cache (mọi layer, phạm vi, zoom)
+
+    Gọi sau khi dữ liệu trong tile đổi hàng loạt ngoài API.
+
+    Returns:
+        int: Số file tile đã xóa
+    """
+    root = tile_cache_dir()
+    if not os.path.isdir(root):
+        return 0
+    removed = sum(len(files) for _, _, files in os.walk(root))
+    for entry in os.scandir(root):
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+def farm_location(farm) -> Optional[Tuple]:
+    """(lon, lat) của vùng trồng; lấy trước commit vì commit làm hết hạn thuộc tính"""
+    if farm is None:
+        return None
+    return farm.longitude, farm.latitude
+
+
+def invalidate_farm_tiles(*locations) -> int:
+    """
+    Xóa tile của layer farms tại các vị trí (lon, lat) từ farm_location()
+
+    Truyền cả vị trí cũ và mới khi vùng trồng bị dời.
+    """
+    removed = 0
+    for location in locations:
+        if location is not None:
+            removed += invalidate_point_tiles(FARMS_LAYER, *location)
+    return removed
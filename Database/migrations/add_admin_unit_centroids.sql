@@ -0,0 +1,14 @@
+-- Migration: Centroid and label point for administrative units
+-- Date: 2026-10-18
+-- Description: Filled by scripts/extract_province_centroids.py --write-db,
+--              returned by /analytics/spatial/farm-density so the frontend
+--              no longer depends on a regenerated provinceCoordinates.js
+
+ALTER TABLE don_vi_hanh_chinh
+ADD COLUMN IF NOT EXISTS tam_lat NUMERIC(10, 6) NULL,
+ADD COLUMN IF NOT EXISTS tam_lon NUMERIC(10, 6) NULL,
+ADD COLUMN IF NOT EXISTS nhan_lat NUMERIC(10, 6) NULL,
+ADD COLUMN IF NOT EXISTS nhan_lon NUMERIC(10, 6) NULL;
+
+COMMENT ON COLUMN don_vi_hanh_chinh.tam_lat IS 'Tâm theo diện tích (có thể nằm ngoài polygon)';
+COMMENT ON COLUMN don_vi_hanh_chinh.nhan_lat IS 'Điểm nhãn, luôn nằm trong polygon';
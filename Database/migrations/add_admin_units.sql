@@ -0,0 +1,57 @@
+-- Migration: Administrative units (province / district) for vung_trong
+-- Date: 2026-10-18
+-- Description: don_vi_hanh_chinh holds boundaries loaded from
+--              Database/data_space/VNM_adm; vung_trong.tinh_id / huyen_id are
+--              assigned by point-in-polygon (Backend/scripts/assign_admin_units.py)
+
+CREATE EXTENSION IF NOT EXISTS postgis;
+
+CREATE TABLE IF NOT EXISTS don_vi_hanh_chinh (
+    id SERIAL PRIMARY KEY,
+    cap SMALLINT NOT NULL,                       -- 1 = tỉnh, 2 = huyện
+    ma VARCHAR(50) NOT NULL,                     -- GID_1 / GID_2 trong shapefile
+    ten VARCHAR(200) NOT NULL,
+    parent_id INTEGER NULL REFERENCES don_vi_hanh_chinh(id),
+    geom geometry(MultiPolygon, 4326) NULL,
+    CONSTRAINT uq_don_vi_hanh_chinh_cap_ma UNIQUE (cap, ma)
+);
+
+CREATE INDEX IF NOT EXISTS ix_don_vi_hanh_chinh_cap ON don_vi_hanh_chinh (cap);
+CREATE INDEX IF NOT EXISTS idx_don_vi_hanh_chinh_geom ON don_vi_hanh_chinh USING GIST (geom);
+
+ALTER TABLE vung_trong
+ADD COLUMN IF NOT EXISTS tinh_id INTEGER NULL REFERENCES don_vi_hanh_chinh(id),
+ADD COLUMN IF NOT EXISTS huyen_id INTEGER NULL REFERENCES don_vi_hanh_chinh(id);
+
+CREATE INDEX IF NOT EXISTS ix_vung_trong_tinh_id ON vung_trong (tinh_id);
+CREATE INDEX IF NOT EXISTS ix_vung_trong_huyen_id ON vung_trong (huyen_id);
+
+COMMENT ON TABLE don_vi_hanh_chinh IS 'Ranh giới tỉnh/huyện từ shapefile VNM_adm';
+COMMENT ON COLUMN vung_trong.tinh_id IS 'Tỉnh chứa tọa độ vùng trồng (point-in-polygon)';
+COMMENT ON COLUMN vung_trong.huyen_id IS 'Huyện chứa tọa độ vùng trồng (point-in-polygon)';
+
+-- Assign tinh_id / huyen_id for rows written after the batch job
+-- (the batch job handles existing rows; this keeps single-row writes in sync)
+CREATE OR REPLACE FUNCTION vung_trong_sync_admin_units() RETURNS trigger AS $$
+DECLARE
+    point geometry;
+BEGIN
+    IF NEW.latitude IS NULL OR NEW.longitude IS NULL THEN
+        NEW.tinh_id := NULL;
+        NEW.huyen_id := NULL;
+        RETURN NEW;
+    END IF;
+
+    point := ST_SetSRID(ST_MakePoint(NEW.longitude, NEW.latitude), 4326);
+    SELECT id INTO NEW.tinh_id FROM don_vi_hanh_chinh
+    WHERE cap = 1 AND ST_Intersects(geom, point) ORDER BY id LIMIT 1;
+    SELECT id INTO NEW.huyen_id FROM don_vi_hanh_chinh
+    WHERE cap = 2 AND ST_Intersects(geom, point) ORDER BY id LIMIT 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_vung_trong_sync_admin_units ON vung_trong;
+CREATE TRIGGER trg_vung_trong_sync_admin_units
+BEFORE INSERT OR UPDATE OF latitude, longitude ON vung_trong
+FOR EACH ROW EXECUTE FUNCTION vung_trong_sync_admin_units();
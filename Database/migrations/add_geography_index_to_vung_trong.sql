@@ -0,0 +1,10 @@
+-- Migration: Geography index for nearby-farm search
+-- Date: 2026-10-18
+-- Description: Expression GiST index on geom::geography so /farms/nearby can
+--              use it for both ST_DWithin (radius in meters) and KNN (<->)
+--              ordering. Requires add_geom_to_vung_trong.sql.
+
+CREATE INDEX IF NOT EXISTS idx_vung_trong_geog
+ON vung_trong USING GIST ((geom::geography));
+
+ANALYZE vung_trong;
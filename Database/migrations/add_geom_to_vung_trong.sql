@@ -0,0 +1,40 @@
+-- Migration: Add PostGIS point geometry to vung_trong table
+-- Date: 2026-10-18
+-- Description: geom (Point, EPSG:4326) kept in sync with latitude/longitude
+--              by a trigger, GiST index for bounding-box (viewport) queries
+
+CREATE EXTENSION IF NOT EXISTS postgis;
+
+-- Add geometry column
+ALTER TABLE vung_trong
+ADD COLUMN IF NOT EXISTS geom geometry(Point, 4326) NULL;
+
+-- Keep geom in sync with latitude/longitude on every insert/update
+CREATE OR REPLACE FUNCTION vung_trong_sync_geom() RETURNS trigger AS $$
+BEGIN
+    IF NEW.latitude IS NULL OR NEW.longitude IS NULL THEN
+        NEW.geom := NULL;
+    ELSE
+        NEW.geom := ST_SetSRID(ST_MakePoint(NEW.longitude, NEW.latitude), 4326);
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_vung_trong_sync_geom ON vung_trong;
+CREATE TRIGGER trg_vung_trong_sync_geom
+BEFORE INSERT OR UPDATE OF latitude, longitude ON vung_trong
+FOR EACH ROW EXECUTE FUNCTION vung_trong_sync_geom();
+
+-- Backfill existing rows
+UPDATE vung_trong
+SET geom = ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)
+WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
+
+-- Spatial index for && / ST_Intersects / ST_DWithin
+CREATE INDEX IF NOT EXISTS idx_vung_trong_geom
+ON vung_trong USING GIST (geom);
+
+ANALYZE vung_trong;
+
+COMMENT ON COLUMN vung_trong.geom IS 'Vị trí vùng trồng (Point, EPSG:4326), tự cập nhật từ latitude/longitude';
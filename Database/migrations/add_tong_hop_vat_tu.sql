@@ -0,0 +1,64 @@
+-- Migration: Input usage rollup (tong_hop_vat_tu)
+-- Date: 2026-10-18
+-- Description: Per farm / month / input usage count and summed so_luong,
+--              maintained on every lich_su_canh_tac create/update/delete
+--              (Backend/utils/input_rollup.py). Backfilled here from the
+--              existing history; re-running rebuilds the rollup from scratch.
+--              One row per don_vi_chuan (kg / L): kg and L are never summed
+--              together; history without a unit counts as kg (phan_bon) or
+--              L (thuoc_bvtv), like utils/quantity.normalize_history_quantity.
+-- Requires: Backend/migrations/add_quantity_to_lich_su_canh_tac.py
+--           (+ scripts/backfill_history_quantity.py for so_luong)
+
+CREATE TABLE IF NOT EXISTS tong_hop_vat_tu (
+    id SERIAL PRIMARY KEY,
+    vung_trong_id INTEGER NOT NULL REFERENCES vung_trong(id) ON DELETE CASCADE,
+    thang DATE NOT NULL,                         -- Ngày đầu tháng
+    loai_vat_tu VARCHAR(20) NOT NULL,            -- phan_bon, thuoc_bvtv
+    vat_tu_id INTEGER NOT NULL,                  -- phan_bon.id hoặc thuoc_bvtv.id
+    don_vi_chuan VARCHAR(10) NOT NULL,           -- kg, L
+    so_lan INTEGER NOT NULL DEFAULT 0,
+    tong_so_luong NUMERIC(16, 4) NOT NULL DEFAULT 0,
+    CONSTRAINT uq_tong_hop_vat_tu UNIQUE (vung_trong_id, thang, loai_vat_tu, vat_tu_id, don_vi_chuan)
+);
+
+-- Tables created before don_vi_chuan existed (rows are rebuilt below)
+ALTER TABLE tong_hop_vat_tu ADD COLUMN IF NOT EXISTS don_vi_chuan VARCHAR(10) NOT NULL DEFAULT 'kg';
+ALTER TABLE tong_hop_vat_tu ALTER COLUMN don_vi_chuan DROP DEFAULT;
+ALTER TABLE tong_hop_vat_tu DROP CONSTRAINT IF EXISTS uq_tong_hop_vat_tu;
+ALTER TABLE tong_hop_vat_tu ADD CONSTRAINT uq_tong_hop_vat_tu
+    UNIQUE (vung_trong_id, thang, loai_vat_tu, vat_tu_id, don_vi_chuan);
+
+CREATE INDEX IF NOT EXISTS ix_tong_hop_vat_tu_id ON tong_hop_vat_tu (id);
+CREATE INDEX IF NOT EXISTS ix_tong_hop_vat_tu_vung_trong_id ON tong_hop_vat_tu (vung_trong_id);
+CREATE INDEX IF NOT EXISTS ix_tong_hop_vat_tu_thang ON tong_hop_vat_tu (thang);
+
+COMMENT ON TABLE tong_hop_vat_tu IS 'Tổng hợp vật tư theo vùng trồng / tháng (rollup của lich_su_canh_tac)';
+
+-- Backfill (same GROUP BY as utils/input_rollup.rebuild_input_rollup)
+DELETE FROM tong_hop_vat_tu;
+
+INSERT INTO tong_hop_vat_tu (vung_trong_id, thang, loai_vat_tu, vat_tu_id, don_vi_chuan, so_lan, tong_so_luong)
+SELECT vung_trong_id, date_trunc('month', ngay_thuc_hien)::date, 'phan_bon', phan_bon_id,
+       coalesce(don_vi_chuan, 'kg'), count(id), sum(coalesce(so_luong, 0))
+FROM lich_su_canh_tac
+WHERE phan_bon_id IS NOT NULL AND vung_trong_id IS NOT NULL AND ngay_thuc_hien IS NOT NULL
+GROUP BY vung_trong_id, date_trunc('month', ngay_thuc_hien)::date, phan_bon_id, coalesce(don_vi_chuan, 'kg');
+
+INSERT INTO tong_hop_vat_tu (vung_trong_id, thang, loai_vat_tu, vat_tu_id, don_vi_chuan, so_lan, tong_so_luong)
+SELECT vung_trong_id, date_trunc('month', ngay_thuc_hien)::date, 'thuoc_bvtv', thuoc_bvtv_id,
+       coalesce(don_vi_chuan, 'L'), count(id), sum(coalesce(so_luong, 0))
+FROM lich_su_canh_tac
+WHERE thuoc_bvtv_id IS NOT NULL AND vung_trong_id IS NOT NULL AND ngay_thuc_hien IS NOT NULL
+GROUP BY vung_trong_id, date_trunc('month', ngay_thuc_hien)::date, thuoc_bvtv_id, coalesce(don_vi_chuan, 'L');
+
+-- vung_trong.fertilizer_volume (kg) / pesticide_volume (L) from the rollup (sync_farm_volumes)
+UPDATE vung_trong v SET
+    fertilizer_volume = coalesce((
+        SELECT sum(tong_so_luong) FROM tong_hop_vat_tu r
+        WHERE r.vung_trong_id = v.id AND r.loai_vat_tu = 'phan_bon' AND r.don_vi_chuan = 'kg'
+    ), 0),
+    pesticide_volume = coalesce((
+        SELECT sum(tong_so_luong) FROM tong_hop_vat_tu r
+        WHERE r.vung_trong_id = v.id AND r.loai_vat_tu = 'thuoc_bvtv' AND r.don_vi_chuan = 'L'
+    ), 0);
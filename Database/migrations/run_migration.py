@@ -1,5 +1,13 @@
 """
-Run database migration to add latitude and longitude columns
+Run a database migration SQL script
+
+Usage:
+    python run_migration.py                              # add_coordinates_to_vung_trong.sql
+    python run_migration.py add_geom_to_vung_trong.sql
+    python run_migration.py add_admin_units.sql
+    python run_migration.py add_admin_unit_centroids.sql
+    python run_migration.py add_geography_index_to_vung_trong.sql
+    python run_migration.py add_tong_hop_vat_tu.sql
 """
 import sys
 import os
@@ -10,10 +18,13 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from sqlalchemy import create_engine, text
 from config import settings
 
-def run_migration():
+DEFAULT_MIGRATION = 'add_coordinates_to_vung_trong.sql'
+
+
+def run_migration(filename=DEFAULT_MIGRATION):
     """Run the migration SQL script"""
     print("=" * 70)
-    print("Running migration: Add latitude/longitude to vung_trong table")
+    print(f"Running migration: {filename}")
     print("=" * 70)
     
     # Create engine
@@ -22,10 +33,10 @@ def run_migration():
     # Read migration SQL
     migration_file = os.path.join(
         os.path.dirname(__file__), 
-        'add_coordinates_to_vung_trong.sql'
+        filename
     )
     
-    with open(migration_file, 'r') as f:
+    with open(migration_file, 'r', encoding='utf-8') as f:
         sql = f.read()
     
     # Execute migration
@@ -45,5 +56,5 @@ def run_migration():
         return False
 
 if __name__ == "__main__":
-    success = run_migration()
+    success = run_migration(*sys.argv[1:2])
     sys.exit(0 if success else 1)
@@ -0,0 +1,35 @@
+"""
+========== Backend Cache Hook ==========
+Báo cho API server (Backend) biết dữ liệu đã được nạp lại ngoài API
+Author: HeThongWebGIS_MSVT
+
+Cache tile trên đĩa và index cluster trong bộ nhớ của API server chỉ tự cập
+nhật khi ghi qua API. Sau khi import xong, gọi notify_data_changed():
+xóa cache tile và tăng thế hệ dữ liệu (Backend/utils/data_version.py) để
+API server dựng lại index cluster ở lần kiểm tra kế tiếp.
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent / "Backend"
+
+
+def notify_data_changed():
+    """
+    Best effort: không có Backend / thiếu dependency của Backend thì chỉ cảnh báo,
+    không làm hỏng lần import đã commit
+    """
+    if str(BACKEND_DIR) not in sys.path:
+        # append: không che các module cùng tên trong Database/scripts
+        sys.path.append(str(BACKEND_DIR))
+    try:
+        from utils.data_version import mark_farm_data_changed
+        mark_farm_data_changed()
+        logger.info("🧹 Backend tile cache cleared, farm cluster index marked for rebuild")
+    except Exception as e:
+        logger.warning(f"⚠️  Could not notify Backend caches ({type(e).__name__}: {e}), "
+                       f"restart the API server to drop cached tiles / clusters")
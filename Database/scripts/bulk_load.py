@@ -0,0 +1,393 @@
+"""
+========== Bulk Load Helpers ==========
+Nạp dữ liệu hàng loạt vào PostgreSQL bằng COPY FROM STDIN
+Author: HeThongWebGIS_MSVT
+
+Quy trình cho mỗi bảng:
+1. Tạo bảng tạm (TEMP) cùng kiểu cột với bảng đích
+2. COPY ... FROM STDIN (FORMAT csv) các dòng đã làm sạch vào bảng tạm,
+   dữ liệu được stream theo từng khối, không dựng cả file CSV trong bộ nhớ;
+   kèm số thứ tự dòng trong file (cột ORDINAL_COLUMN)
+3. Merge một câu lệnh: INSERT ... SELECT FROM bảng tạm
+   (ON CONFLICT (key) DO UPDATE khi có khóa; dòng trùng khóa trong file thì
+   dòng xuất hiện sau cùng thắng)
+
+sync_table() dùng cùng bảng tạm cho chế độ incremental: so sánh dấu vân tay
+từng dòng (md5 của ROW(...)::text) với bảng đích theo khóa tự nhiên rồi chỉ
+áp dụng các dòng thêm / sửa / xóa.
+
+Dùng chung cho import_msvt.py, import_msvt_csv.py, import_all_data.py.
+
+Usage:
+    from bulk_load import bulk_load
+
+    with engine.begin() as conn:
+        bulk_load(conn, "chu_so_huu", ["id", "ho_ten"], rows, key=["id"])
+"""
+
+import csv
+import datetime
+import io
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Iterable, Mapping, Optional, Sequence
+
+from psycopg2 import sql
+
+logger = logging.getLogger(__name__)
+
+# Số dòng ghi vào buffer CSV mỗi lần COPY đọc thêm dữ liệu
+COPY_CHUNK_ROWS = 5000
+
+# Cột số thứ tự dòng (1, 2, ...) trong bảng tạm, để chọn dòng cuối khi trùng khóa
+ORDINAL_COLUMN = "_row_ord"
+
+
+@dataclass
+class LoadStats:
+    """Kết quả nạp một bảng"""
+    table: str
+    copied: int
+    merged: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.copied / self.seconds if self.seconds > 0 else float("inf")
+
+
+@dataclass
+class DiffStats:
+    """Kết quả đồng bộ incremental một bảng"""
+    table: str
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    kept: int = 0          # Dòng không còn trong file nhưng đang được tham chiếu
+    unchanged: int = 0
+    seconds: float = 0.0
+    skipped: bool = False  # File nguồn không đổi, không đọc lại
+
+
+def copy_value(value):
+    """
+    Chuyển giá trị Python sang ô CSV cho COPY
+
+    None / NaN -> NULL (ô rỗng không trích dẫn); float nguyên (12.0, do pandas
+    đọc cột số có ô trống) -> "12" để nạp được vào cột INTEGER.
+    """
+    if value is None:
+        return None
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        return str(int(value)) if value.is_integer() else repr(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value)
+
+
+class CsvRowStream:
+    """
+    File-like chỉ đọc: sinh CSV từ iterator các dòng khi COPY gọi read()
+
+    Lưu ý định dạng CSV của COPY: ô rỗng không trích dẫn là NULL, nên chuỗi
+    rỗng cũng được nạp thành NULL (các script đều coi '' là thiếu dữ liệu).
+
+    Với ordinal=True, mỗi dòng có thêm ô cuối là số thứ tự dòng (bắt đầu từ 1).
+    """
+
+    def __init__(self, rows: Iterable, columns: Sequence[str], ordinal: bool = False):
+        self.rows = iter(rows)
+        self.columns = list(columns)
+        self.ordinal = ordinal
+        self.count = 0
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._pending = ""
+        self._done = False
+
+    def _values(self, row):
+        if isinstance(row, Mapping):
+            return [copy_value(row.get(column)) for column in self.columns]
+        return [copy_value(value) for value in row]
+
+    def _fill(self):
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        for _ in range(COPY_CHUNK_ROWS):
+            row = next(self.rows, None)
+            if row is None:
+                self._done = True
+                break
+            self.count += 1
+            values = self._values(row)
+            if self.ordinal:
+                values.append(self.count)
+            self._writer.writerow(values)
+        self._pending += self._buffer.getvalue()
+
+    def read(self, size: int = -1) -> str:
+        while not self._done and (size < 0 or len(self._pending) < size):
+            self._fill()
+        if size < 0:
+            size = len(self._pending)
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+
+def copy_to_staging(cursor, table: str, staging: str, columns: Sequence[str], rows: Iterable) -> int:
+    """
+    Tạo bảng tạm (cùng kiểu cột với bảng đích) và COPY các dòng vào đó
+
+    Bảng tạm có thêm cột ORDINAL_COLUMN: thứ tự dòng trong rows.
+
+    Returns:
+        int: Số dòng đã COPY
+    """
+    column_list = sql.SQL(", ").join(map(sql.Identifier, columns))
+    ordinal = sql.Identifier(ORDINAL_COLUMN)
+    cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(staging)))
+    cursor.execute(sql.SQL(
+        "CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+        "SELECT {columns}, NULL::bigint AS {ordinal} FROM {table} WITH NO DATA"
+    ).format(staging=sql.Identifier(staging), columns=column_list, ordinal=ordinal,
+             table=sql.Identifier(table)))
+
+    stream = CsvRowStream(rows, columns, ordinal=True)
+    cursor.copy_expert(
+        sql.SQL("COPY {staging} ({columns}, {ordinal}) FROM STDIN WITH (FORMAT csv)").format(
+            staging=sql.Identifier(staging), columns=column_list, ordinal=ordinal
+        ).as_string(cursor),
+        stream
+    )
+    return stream.count
+
+
+def bulk_load(
+    conn,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable,
+    key: Optional[Sequence[str]] = None,
+    update_columns: Optional[Sequence[str]] = None
+) -> LoadStats:
+    """
+    COPY các dòng vào bảng tạm rồi merge set-based vào bảng đích
+
+    Args:
+        conn: SQLAlchemy Connection trong một transaction (engine.begin())
+        table: Tên bảng đích
+        columns: Các cột được nạp (theo thứ tự giá trị trong mỗi dòng)
+        rows: Iterable các dict (theo tên cột) hoặc tuple (theo thứ tự columns)
+        key: Cột khóa tự nhiên cho ON CONFLICT; None -> chỉ INSERT
+        update_columns: Cột cập nhật khi trùng khóa (mặc định mọi cột ngoài key)
+
+    Returns:
+        LoadStats: Số dòng COPY, số dòng merge và thời gian
+    """
+    start = time.perf_counter()
+    staging = f"_stage_{table}"
+    column_list = sql.SQL(", ").join(map(sql.Identifier, columns))
+    cursor = conn.connection.cursor()
+
+    try:
+        copied = copy_to_staging(cursor, table, staging, columns, rows)
+
+        if key:
+            key_list = sql.SQL(", ").join(map(sql.Identifier, key))
+            updates = update_columns if update_columns is not None else [c for c in columns if c not in key]
+            # DISTINCT ON: dòng trùng khóa trong file chỉ giữ dòng cuối cùng (ON
+            # CONFLICT không cho cập nhật một dòng hai lần trong cùng câu lệnh)
+            select = sql.SQL(
+                "SELECT DISTINCT ON ({key}) {columns} FROM {staging} ORDER BY {key}, {ordinal} DESC"
+            ).format(key=key_list, columns=column_list, staging=sql.Identifier(staging),
+                     ordinal=sql.Identifier(ORDINAL_COLUMN))
+            if updates:
+                conflict = sql.SQL("ON CONFLICT ({key}) DO UPDATE SET {updates}").format(
+                    key=key_list,
+                    updates=sql.SQL(", ").join(
+                        sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(c)) for c in updates
+                    )
+                )
+            else:
+                conflict = sql.SQL("ON CONFLICT ({key}) DO NOTHING").format(key=key_list)
+        else:
+            select = sql.SQL("SELECT {columns} FROM {staging}").format(
+                columns=column_list, staging=sql.Identifier(staging)
+            )
+            conflict = sql.SQL("")
+
+        cursor.execute(sql.SQL("INSERT INTO {table} ({columns}) {select} {conflict}").format(
+            table=sql.Identifier(table), columns=column_list, select=select, conflict=conflict
+        ))
+        merged = cursor.rowcount
+        cursor.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(staging)))
+    finally:
+        cursor.close()
+
+    stats = LoadStats(table=table, copied=copied, merged=merged, seconds=time.perf_counter() - start)
+    logger.info(
+        f"📦 {table}: {stats.copied:,} rows copied, {stats.merged:,} merged "
+        f"in {stats.seconds:.2f}s ({stats.rows_per_second:,.0f} rows/s)"
+    )
+    return stats
+
+
+def qualified_columns(alias: str, columns: Sequence[str]):
+    """alias.col1, alias.col2, ..."""
+    return sql.SQL(", ").join(
+        sql.SQL("{}.{}").format(sql.Identifier(alias), sql.Identifier(c)) for c in columns
+    )
+
+
+def referencing_columns(cursor, table: str):
+    """
+    Các khóa ngoại (một cột) trỏ tới bảng
+
+    Returns:
+        list: (bảng tham chiếu, cột tham chiếu, cột được tham chiếu)
+    """
+    cursor.execute("""
+        SELECT c.conrelid::regclass::text, a.attname, af.attname
+        FROM pg_constraint c
+        JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1]
+        JOIN pg_attribute af ON af.attrelid = c.confrelid AND af.attnum = c.confkey[1]
+        WHERE c.contype = 'f'
+          AND c.confrelid = %s::regclass
+          AND array_length(c.conkey, 1) = 1
+    """, (table,))
+    return cursor.fetchall()
+
+
+def sync_table(
+    conn,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable,
+    key: Sequence[str],
+    delete_missing: bool = True
+) -> DiffStats:
+    """
+    Đồng bộ incremental: chỉ thêm / sửa / xóa các dòng khác với bảng đích
+
+    Dấu vân tay mỗi dòng là md5(ROW(columns)::text), tính trên bảng tạm và
+    bảng đích với cùng kiểu cột nên chỉ khác nhau khi dữ liệu khác nhau.
+    Khác TRUNCATE, id của các dòng không đổi được giữ nguyên nên tham chiếu
+    từ vùng trồng / lịch sử canh tác không bị mất. Dòng không còn trong file
+    nhưng đang được khóa ngoại tham chiếu được giữ lại (đếm vào kept).
+
+    Args:
+        conn: SQLAlchemy Connection trong một transaction (engine.begin())
+        table: Tên bảng đích (phải có UNIQUE trên key)
+        columns: Các cột được nạp, gồm cả key
+        rows: Iterable các dict hoặc tuple như bulk_load()
+        key: Cột khóa tự nhiên
+        delete_missing: Xóa các dòng có trong bảng nhưng không còn trong file
+
+    Returns:
+        DiffStats: Số dòng thêm / sửa / xóa / giữ lại / không đổi
+    """
+    start = time.perf_counter()
+    staging = f"_stage_{table}"
+    diff = f"_diff_{table}"
+    target = sql.Identifier(table)
+    column_list = sql.SQL(", ").join(map(sql.Identifier, columns))
+    key_list = sql.SQL(", ").join(map(sql.Identifier, key))
+    key_match = sql.SQL(" AND ").join(
+        sql.SQL("t.{0} = d.{0}").format(sql.Identifier(c)) for c in key
+    )
+    key_not_null = sql.SQL(" AND ").join(sql.SQL("{} IS NOT NULL").format(sql.Identifier(c)) for c in key)
+    updates = [c for c in columns if c not in key]
+    stats = DiffStats(table=table)
+    cursor = conn.connection.cursor()
+
+    try:
+        copy_to_staging(cursor, table, staging, columns, rows)
+
+        # Một dòng cho mỗi khóa (dòng cuối cùng trong file, như bulk_load), kèm
+        # dấu vân tay; chọn tùy ý sẽ làm row_hash đổi giữa các lần chạy -> update thừa
+        cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(diff)))
+        cursor.execute(sql.SQL("""
+            CREATE TEMP TABLE {diff} ON COMMIT DROP AS
+            SELECT DISTINCT ON ({key}) {columns}, md5(ROW({columns})::text) AS row_hash
+            FROM {staging} WHERE {key_not_null} ORDER BY {key}, {ordinal} DESC
+        """).format(diff=sql.Identifier(diff), key=key_list, columns=column_list,
+                    staging=sql.Identifier(staging), key_not_null=key_not_null,
+                    ordinal=sql.Identifier(ORDINAL_COLUMN)))
+        total = cursor.rowcount
+
+        if delete_missing:
+            protected = [
+                sql.SQL("NOT EXISTS (SELECT 1 FROM {ref} r WHERE r.{ref_col} = t.{col})").format(
+                    ref=sql.SQL(ref_table), ref_col=sql.Identifier(ref_col), col=sql.Identifier(col)
+                )
+                for ref_table, ref_col, col in referencing_columns(cursor, table)
+            ]
+            missing = sql.SQL("NOT EXISTS (SELECT 1 FROM {diff} d WHERE {match})").format(
+                diff=sql.Identifier(diff), match=key_match
+            )
+            cursor.execute(sql.SQL("DELETE FROM {target} t WHERE {conditions}").format(
+                target=target, conditions=sql.SQL(" AND ").join([missing] + protected)
+            ))
+            stats.deleted = cursor.rowcount
+            cursor.execute(sql.SQL("SELECT count(*) FROM {target} t WHERE {missing}").format(
+                target=target, missing=missing
+            ))
+            stats.kept = cursor.fetchone()[0]
+
+        if updates:
+            cursor.execute(sql.SQL("""
+                UPDATE {target} t SET {assignments}
+                FROM {diff} d
+                WHERE {match} AND md5(ROW({target_columns})::text) <> d.row_hash
+            """).format(
+                target=target,
+                assignments=sql.SQL(", ").join(
+                    sql.SQL("{0} = d.{0}").format(sql.Identifier(c)) for c in updates
+                ),
+                diff=sql.Identifier(diff),
+                match=key_match,
+                target_columns=qualified_columns("t", columns)
+            ))
+            stats.updated = cursor.rowcount
+
+        cursor.execute(sql.SQL("""
+            INSERT INTO {target} ({columns})
+            SELECT {diff_columns} FROM {diff} d
+            WHERE NOT EXISTS (SELECT 1 FROM {target} t WHERE {match})
+            ON CONFLICT ({key}) DO NOTHING
+        """).format(target=target, columns=column_list, diff_columns=qualified_columns("d", columns),
+                    diff=sql.Identifier(diff), match=key_match, key=key_list))
+        stats.inserted = cursor.rowcount
+        stats.unchanged = total - stats.inserted - stats.updated
+
+        cursor.execute(sql.SQL("DROP TABLE {}, {}").format(sql.Identifier(staging), sql.Identifier(diff)))
+    finally:
+        cursor.close()
+
+    stats.seconds = time.perf_counter() - start
+    logger.info(
+        f"🔁 {table}: +{stats.inserted:,} ~{stats.updated:,} -{stats.deleted:,} "
+        f"(kept {stats.kept:,}, unchanged {stats.unchanged:,}) in {stats.seconds:.2f}s"
+    )
+    return stats
+
+
+def print_diff_report(results: Sequence[DiffStats]):
+    """In bảng tổng hợp thay đổi theo từng bảng (chế độ incremental)"""
+    print("\n" + "=" * 70)
+    print("INCREMENTAL DIFF REPORT")
+    print("=" * 70)
+    print(f"  {'table':22s} {'insert':>8s} {'update':>8s} {'delete':>8s} {'kept':>6s} {'same':>8s}")
+    for stats in results:
+        if stats.skipped:
+            print(f"  {stats.table:22s} {'(source file unchanged, skipped)':>42s}")
+            continue
+        print(f"  {stats.table:22s} {stats.inserted:>8,} {stats.updated:>8,} {stats.deleted:>8,} "
+              f"{stats.kept:>6,} {stats.unchanged:>8,}")
+    print("=" * 70)
@@ -2,15 +2,31 @@
 ========== Comprehensive Data Import Script ==========
 Import all data from Database/data folders with 3NF compliance
 Author: HeThongWebGIS_MSVT
+
+Usage:
+    python import_all_data.py                 # full reload (TRUNCATE + COPY)
+    python import_all_data.py --incremental   # only changed files / rows
+
+--incremental: file nguồn không đổi (SHA-256 trong import_state) thì bỏ qua;
+file đã đổi được đồng bộ theo khóa tự nhiên (chỉ thêm / sửa / xóa dòng khác
+biệt, id các dòng không đổi được giữ nguyên) và in báo cáo diff từng bảng.
 """
 
+import argparse
+import itertools
 import sys
 import os
-import pandas as pd
 from pathlib import Path
 from sqlalchemy import create_engine, text
 import logging
 
+from backend_caches import notify_data_changed
+from bulk_load import DiffStats, bulk_load, print_diff_report, sync_table
+from import_state import ImportState, ensure_source_key, file_digest, source_key
+from record_reader import (
+    DEFAULT_BATCH_SIZE, SUPPORTED_SUFFIXES, find_header_row, normalize_header, parse_date, read_batches
+)
+
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -20,10 +36,16 @@ engine = create_engine(DATABASE_URL)
 
 DATA_DIR = Path(__file__).parent.parent / "data"
 
+# Set by main() from the command line
+INCREMENTAL = False
+READ_BATCH_SIZE = DEFAULT_BATCH_SIZE
+import_state = None
+diff_results = []
+
 
 def clean_value(value, max_len=None):
     """Clean and validate value"""
-    if pd.isna(value) or value == '' or value == 'nan':
+    if value is None or value == '' or value == 'nan':
         return None
     cleaned = str(value).strip()
     if max_len and len(cleaned) > max_len:
@@ -31,6 +53,73 @@ def clean_value(value, max_len=None):
     return cleaned
 
 
+def read_source(file_path, **kwargs):
+    """
+    Stream cleaned records from a catalog file (.xlsx / .xls / .csv)
+
+    Rows are read READ_BATCH_SIZE at a time and flow straight into COPY,
+    so memory stays flat whatever the workbook size.
+    """
+    return itertools.chain.from_iterable(read_batches(file_path, batch_size=READ_BATCH_SIZE, **kwargs))
+
+
+# Columns loaded into each table (order of COPY)
+PHAN_BON_COLUMNS = ['ten_phan_bon', 'thanh_phan', 'nha_san_xuat', 'lieu_luong_khuyen_nghi']
+THUOC_BVTV_COLUMNS = ['ten_thuoc', 'hoat_chat', 'nha_san_xuat', 'doi_tuong_phong_tru', 'loai_thuoc']
+GIONG_CAY_COLUMNS = ['ten_giong', 'chu_so_huu', 'ngay_dang_ky', 'tinh_trang']
+CHU_SO_HUU_COLUMNS = ['ho_ten', 'cmnd', 'dia_chi', 'dien_thoai']
+VUNG_TRONG_COLUMNS = ['ma_vung', 'ten_vung', 'dien_tich', 'chu_so_huu_id', 'trang_thai']
+CO_SO_COLUMNS = ['ten_co_so', 'dia_chi', 'dien_thoai']
+CO_SO_MAX_LENGTHS = {'ten_co_so': 200, 'dia_chi': 500, 'dien_thoai': 50}
+
+
+def source_name(file_path):
+    """Tên file nguồn trong import_state (tương đối với DATA_DIR)"""
+    return Path(file_path).relative_to(DATA_DIR).as_posix()
+
+
+def source_unchanged(file_path, table):
+    """Incremental: file giống lần import trước -> bỏ qua, không đọc lại"""
+    if not INCREMENTAL or not import_state.is_unchanged(source_name(file_path), file_digest(file_path)):
+        return False
+    logger.info(f"⏭️  {Path(file_path).name} unchanged since last import, skipping {table}")
+    diff_results.append(DiffStats(table=table, skipped=True))
+    return True
+
+
+def load_table(conn, table, columns, records, file_path, key=None, key_fields=None, delete_missing=True):
+    """
+    Nạp một bảng: full (TRUNCATE + COPY) hoặc incremental (sync theo khóa)
+
+    Args:
+        key: Cột khóa tự nhiên có sẵn (VD: ['ma_vung'])
+        key_fields: Trường băm thành source_key khi bảng không có mã riêng
+        delete_missing: Incremental: xóa dòng không còn trong file
+
+    Returns:
+        int: Số dòng trong file nguồn đã nạp
+    """
+    if key_fields:
+        ensure_source_key(conn, table)
+        columns = columns + ['source_key']
+        key = ['source_key']
+        records = (
+            dict(record, source_key=source_key(*(record[field] for field in key_fields)))
+            for record in records
+        )
+    
+    if INCREMENTAL:
+        stats = sync_table(conn, table, columns, records, key=key, delete_missing=delete_missing)
+        diff_results.append(stats)
+        count = stats.inserted + stats.updated + stats.unchanged
+    else:
+        conn.execute(text(f"TRUNCATE TABLE {table} CASCADE"))
+        count = bulk_load(conn, table, columns, records, key=key).copied
+    
+    import_state.record(conn, source_name(file_path), file_digest(file_path), count)
+    return count
+
+
 def import_phanbon():
     """Import phân bón data"""
     print("\n" + "=" * 70)
@@ -43,11 +132,23 @@ def import_phanbon():
         logger.warning(f"File not found: {file_path}")
         return False
     
+    if source_unchanged(file_path, 'phan_bon'):
+        return True
+    
     try:
-        df = pd.read_excel(file_path)
-        logger.info(f"Loaded {len(df)} rows from {file_path.name}")
+        logger.info(f"Reading {file_path.name}")
         
-        # Ensure table exists
+        records = (
+            {
+                'ten_phan_bon': clean_value(row.get('Tên phân bón')),
+                'thanh_phan': clean_value(row.get('Thành phần, hàm lượng đăng ký')),
+                'nha_san_xuat': clean_value(row.get('Tổ chức, cá nhân đăng ký')),
+                'lieu_luong_khuyen_nghi': clean_value(row.get('Thành phần, hàm lượng đăng ký'))
+            }
+            for row in read_source(file_path)
+        )
+        
+        # Ensure table exists, then bulk load (COPY)
         with engine.begin() as conn:
             conn.execute(text("""
                 CREATE TABLE IF NOT EXISTS phan_bon (
@@ -57,29 +158,13 @@ def import_phanbon():
                     nha_san_xuat VARCHAR(500),
                     lieu_luong_khuyen_nghi TEXT
                 );
-                TRUNCATE TABLE phanbon CASCADE;
             """))
+            count = load_table(conn, 'phan_bon', PHAN_BON_COLUMNS, (
+                record for record in records if record['ten_phan_bon']
+            ), file_path, key_fields=['ten_phan_bon', 'nha_san_xuat', 'thanh_phan'])
         
-        # Import data
-        records = []
-        for idx, row in df.iterrows():
-            ten = clean_value(row.get('Tên phân bón'))
-            if not ten:
-                continue
-            
-            record = {
-                'ten_phan_bon': ten,
-                'thanh_phan': clean_value(row.get('Thành phần, hàm lượng đăng ký')),
-                'nha_san_xuat': clean_value(row.get('Tổ chức, cá nhân đăng ký')),
-                'lieu_luong_khuyen_nghi': clean_value(row.get('Thành phần, hàm lượng đăng ký'))
-            }
-            records.append(record)
-        
-        # Bulk insert
-        if records:
-            df_import = pd.DataFrame(records)
-            df_import.to_sql('phan_bon', engine, if_exists='append', index=False)
-            logger.info(f"✅ Imported {len(records)} phân bón")
+        if count:
+            logger.info(f"✅ Imported {count} phân bón")
             return True
         
     except Exception as e:
@@ -101,11 +186,24 @@ def import_thuoc_bvtv():
         logger.warning(f"File not found: {file_path}")
         return False
     
+    if source_unchanged(file_path, 'thuoc_bvtv'):
+        return True
+    
     try:
-        df = pd.read_excel(file_path)
-        logger.info(f"Loaded {len(df)} rows from {file_path.name}")
+        logger.info(f"Reading {file_path.name}")
         
-        # Ensure table exists
+        records = (
+            {
+                'ten_thuoc': clean_value(row.get('Tên thương phẩm')),
+                'hoat_chat': clean_value(row.get('Hoạt chất')),
+                'nha_san_xuat': clean_value(row.get('Tổ chức đăng ký')),
+                'doi_tuong_phong_tru': clean_value(row.get('Đối tượng phòng trừ')),
+                'loai_thuoc': clean_value(row.get(' Loại thuốc bảo vệ thực vật'))
+            }
+            for row in read_source(file_path)
+        )
+        
+        # Ensure table exists, then bulk load (COPY)
         with engine.begin() as conn:
             conn.execute(text("""
                 CREATE TABLE IF NOT EXISTS thuoc_bvtv (
@@ -116,29 +214,13 @@ def import_thuoc_bvtv():
                     doi_tuong_phong_tru TEXT,
                     loai_thuoc VARCHAR(200)
                 );
-                TRUNCATE TABLE thuoc_bvtv CASCADE;
             """))
+            count = load_table(conn, 'thuoc_bvtv', THUOC_BVTV_COLUMNS, (
+                record for record in records if record['hoat_chat']
+            ), file_path, key_fields=['ten_thuoc', 'hoat_chat', 'nha_san_xuat'])
         
-        # Import data
-        records = []
-        for idx, row in df.iterrows():
-            hoat_chat = clean_value(row.get('Hoạt chất'))
-            if not hoat_chat:
-                continue
-            
-            record = {
-                'ten_thuoc': clean_value(row.get('Tên thương phẩm')),
-                'hoat_chat': hoat_chat,
-                'nha_san_xuat': clean_value(row.get('Tổ chức đăng ký')),
-                'doi_tuong_phong_tru': clean_value(row.get('Đối tượng phòng trừ')),
-                'loai_thuoc': clean_value(row.get(' Loại thuốc bảo vệ thực vật'))
-            }
-            records.append(record)
-        
-        if records:
-            df_import = pd.DataFrame(records)
-            df_import.to_sql('thuoc_bvtv', engine, if_exists='append', index=False)
-            logger.info(f"✅ Imported {len(records)} thuốc BVTV")
+        if count:
+            logger.info(f"✅ Imported {count} thuốc BVTV")
             return True
         
     except Exception as e:
@@ -160,11 +242,23 @@ def import_giong():
         logger.warning(f"File not found: {file_path}")
         return False
     
+    if source_unchanged(file_path, 'giong_cay'):
+        return True
+    
     try:
-        df = pd.read_excel(file_path)
-        logger.info(f"Loaded {len(df)} rows from {file_path.name}")
+        logger.info(f"Reading {file_path.name}")
+        
+        records = (
+            {
+                'ten_giong': clean_value(row.get('tengiong')),
+                'chu_so_huu': clean_value(row.get('tenchusohuu')),
+                'ngay_dang_ky': parse_date(row.get('ngaydk_bd_hieuluc')),
+                'tinh_trang': clean_value(row.get('Tình trạng bằng'))
+            }
+            for row in read_source(file_path)
+        )
         
-        # Ensure table exists
+        # Ensure table exists, then bulk load (COPY)
         with engine.begin() as conn:
             conn.execute(text("""
                 CREATE TABLE IF NOT EXISTS giong_cay (
@@ -174,28 +268,13 @@ def import_giong():
                     ngay_dang_ky DATE,
                     tinh_trang VARCHAR(200)
                 );
-                TRUNCATE TABLE giong_cay CASCADE;
             """))
+            count = load_table(conn, 'giong_cay', GIONG_CAY_COLUMNS, (
+                record for record in records if record['ten_giong']
+            ), file_path, key_fields=['ten_giong', 'chu_so_huu'])
         
-        # Import data
-        records = []
-        for idx, row in df.iterrows():
-            ten_giong = clean_value(row.get('tengiong'))
-            if not ten_giong:
-                continue
-            
-            record = {
-                'ten_giong': ten_giong,
-                'chu_so_huu': clean_value(row.get('tenchusohuu')),
-                'ngay_dang_ky': pd.to_datetime(row.get('ngaydk_bd_hieuluc'), errors='coerce'),
-                'tinh_trang': clean_value(row.get('Tình trạng bằng'))
-            }
-            records.append(record)
-        
-        if records:
-            df_import = pd.DataFrame(records)
-            df_import.to_sql('giong_cay', engine, if_exists='append', index=False)
-            logger.info(f"✅ Imported {len(records)} giống cây")
+        if count:
+            logger.info(f"✅ Imported {count} giống cây")
             return True
         
     except Exception as e:
@@ -205,98 +284,203 @@ def import_giong():
         return False
 
 
+def import_chu_so_huu():
+    """Import chủ sở hữu (msvt_chusohuu.xlsx)"""
+    file_path = DATA_DIR / "msvt" / "msvt_chusohuu.xlsx"
+    if not file_path.exists():
+        logger.warning(f"File not found: {file_path}")
+        return False
+    
+    if source_unchanged(file_path, 'chu_so_huu'):
+        return True
+    
+    try:
+        logger.info(f"Reading {file_path.name}")
+        
+        with engine.begin() as conn:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS chu_so_huu (
+                    id SERIAL PRIMARY KEY,
+                    ho_ten VARCHAR(200),
+                    cmnd VARCHAR(50),
+                    dia_chi TEXT,
+                    dien_thoai VARCHAR(50)
+                );
+            """))
+            
+            records = (
+                {
+                    'ho_ten': clean_value(row.get('hoten', row.get('Họ tên'))),
+                    'cmnd': clean_value(row.get('cmnd', row.get('CMND'))),
+                    'dia_chi': clean_value(row.get('diachi', row.get('Địa chỉ'))),
+                    'dien_thoai': clean_value(row.get('dienthoai', row.get('Điện thoại')))
+                }
+                for row in read_source(file_path)
+            )
+            count = load_table(conn, 'chu_so_huu', CHU_SO_HUU_COLUMNS, (
+                record for record in records if record['ho_ten']
+            ), file_path, key_fields=['ho_ten', 'cmnd'])
+        
+        logger.info(f"✅ Imported {count} chủ sở hữu")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Error importing chủ sở hữu: {e}")
+        return False
+
+
+def import_vung_trong_xlsx():
+    """Import vùng trồng (msvt_thongtinvungtrong.xlsx)"""
+    file_path = DATA_DIR / "msvt" / "msvt_thongtinvungtrong.xlsx"
+    if not file_path.exists():
+        logger.warning(f"File not found: {file_path}")
+        return False
+    
+    if source_unchanged(file_path, 'vung_trong'):
+        return True
+    
+    try:
+        logger.info(f"Reading {file_path.name}")
+        
+        with engine.begin() as conn:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS vung_trong (
+                    id SERIAL PRIMARY KEY,
+                    ma_vung VARCHAR(50) UNIQUE,
+                    ten_vung VARCHAR(200),
+                    dien_tich NUMERIC(10,2),
+                    chu_so_huu_id INTEGER,
+                    trang_thai VARCHAR(100)
+                );
+            """))
+            
+            records = (
+                {
+                    'ma_vung': clean_value(row.get('mavung', row.get('Mã vùng'))),
+                    'ten_vung': clean_value(row.get('tenvung', row.get('Tên vùng'))),
+                    'dien_tich': row.get('dientich', row.get('Diện tích')),
+                    'chu_so_huu_id': row.get('chusohuu_ID'),
+                    'trang_thai': clean_value(row.get('trangthai', row.get('Trạng thái')))
+                }
+                for row in read_source(file_path)
+            )
+            # ma_vung UNIQUE: dòng trùng mã được gộp thay vì làm hỏng cả lần nạp.
+            # Incremental không xóa: vùng trồng còn được tạo trực tiếp trên web.
+            count = load_table(conn, 'vung_trong', VUNG_TRONG_COLUMNS, (
+                record for record in records if record['ma_vung']
+            ), file_path, key=['ma_vung'], delete_missing=False)
+        
+        logger.info(f"✅ Imported {count} vùng trồng")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Error importing vùng trồng: {e}")
+        return False
+
+
 def import_msvt_data():
     """Import MSVT data (vùng trồng, chủ sở hữu, thị trường)"""
     print("\n" + "=" * 70)
     print("IMPORTING: MSVT Data (Farms, Owners, Markets)")
     print("=" * 70)
     
-    msvt_dir = DATA_DIR / "msvt"
-    
-    # 1. Import chủ sở hữu
-    file_path = msvt_dir / "msvt_chusohuu.xlsx"
-    if file_path.exists():
-        try:
-            df = pd.read_excel(file_path)
-            logger.info(f"Loaded {len(df)} chủ sở hữu")
-            
-            with engine.begin() as conn:
-                conn.execute(text("""
-                    CREATE TABLE IF NOT EXISTS chu_so_huu (
-                        id SERIAL PRIMARY KEY,
-                        ho_ten VARCHAR(200),
-                        cmnd VARCHAR(50),
-                        dia_chi TEXT,
-                        dien_thoai VARCHAR(50)
-                    );
-                    TRUNCATE TABLE chu_so_huu CASCADE;
-                """))
-            
-            records = []
-            for idx, row in df.iterrows():
-                ho_ten = clean_value(row.get('hoten', row.get('Họ tên')))
-                if ho_ten:
-                    records.append({
-                        'ho_ten': ho_ten,
-                        'cmnd': clean_value(row.get('cmnd', row.get('CMND'))),
-                        'dia_chi': clean_value(row.get('diachi', row.get('Địa chỉ'))),
-                        'dien_thoai': clean_value(row.get('dienthoai', row.get('Điện thoại')))
-                    })
-            
-            if records:
-                pd.DataFrame(records).to_sql('chu_so_huu', engine, if_exists='append', index=False)
-                logger.info(f"✅ Imported {len(records)} chủ sở hữu")
-        except Exception as e:
-            logger.error(f"❌ Error importing chủ sở hữu: {e}")
-    
-    # 2. Import vùng trồng
-    file_path = msvt_dir / "msvt_thongtinvungtrong.xlsx"
-    if file_path.exists():
-        try:
-            df = pd.read_excel(file_path)
-            logger.info(f"Loaded {len(df)} vùng trồng")
-            
-            with engine.begin() as conn:
-                conn.execute(text("""
-                    CREATE TABLE IF NOT EXISTS vung_trong (
-                        id SERIAL PRIMARY KEY,
-                        ma_vung VARCHAR(50) UNIQUE,
-                        ten_vung VARCHAR(200),
-                        dien_tich NUMERIC(10,2),
-                        chu_so_huu_id INTEGER,
-                        trang_thai VARCHAR(100)
-                    );
-                    TRUNCATE TABLE vung_trong CASCADE;
-                """))
-            
-            records = []
-            for idx, row in df.iterrows():
-                ma_vung = clean_value(row.get('mavung', row.get('Mã vùng')))
-                if ma_vung:
-                    records.append({
-                        'ma_vung': ma_vung,
-                        'ten_vung': clean_value(row.get('tenvung', row.get('Tên vùng'))),
-                        'dien_tich': row.get('dientich', row.get('Diện tích')),
-                        'chu_so_huu_id': row.get('chusohuu_ID'),
-                        'trang_thai': clean_value(row.get('trangthai', row.get('Trạng thái')))
-                    })
-            
-            if records:
-                pd.DataFrame(records).to_sql('vung_trong', engine, if_exists='append', index=False)
-                logger.info(f"✅ Imported {len(records)} vùng trồng")
-        except Exception as e:
-            logger.error(f"❌ Error importing vùng trồng: {e}")
+    import_chu_so_huu()
+    import_vung_trong_xlsx()
     
     return True
 
 
+def co_so_records(folder):
+    """
+    Records of every facility list in a coso/ folder
+
+    The lists are official reports with a title block above the table, so
+    the header row is located by its 'Tên cơ sở' cell and columns are
+    matched by keyword (headers differ between provinces and years).
+    """
+    for file_path in sorted(folder.iterdir()):
+        if file_path.suffix.lower() not in SUPPORTED_SUFFIXES:
+            continue
+        header_row = find_header_row(file_path, 'Tên cơ sở')
+        if header_row is None:
+            logger.warning(f"No 'Tên cơ sở' header in {file_path.name}, skipping")
+            continue
+        
+        columns = None
+        for row in read_source(file_path, header_row=header_row):
+            if columns is None:
+                headers = {name: normalize_header(name) for name in row}
+                columns = {
+                    'ten_co_so': [n for n, h in headers.items() if 'tên cơ sở' in h][:1],
+                    'dia_chi': [n for n, h in headers.items() if 'địa chỉ' in h or h.startswith(('ấp', 'xã', 'huyện'))],
+                    'dien_thoai': [n for n, h in headers.items() if 'điện thoại' in h or 'sđt' in h][:1]
+                }
+            yield {
+                field: clean_value(", ".join(str(row[name]) for name in names if row[name] is not None),
+                                   max_len=CO_SO_MAX_LENGTHS[field])
+                for field, names in columns.items()
+            }
+
+
+def import_co_so(table, folder_name, label):
+    """Import facility list (cơ sở buôn bán) from every file in coso/<folder_name>"""
+    print("\n" + "=" * 70)
+    print(f"IMPORTING: {label}")
+    print("=" * 70)
+    
+    folder = DATA_DIR / "coso" / folder_name
+    if not folder.is_dir():
+        logger.warning(f"Folder not found: {folder}")
+        return False
+    
+    if source_unchanged(folder, table):
+        return True
+    
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    id SERIAL PRIMARY KEY,
+                    ten_co_so VARCHAR(200) NOT NULL,
+                    dia_chi VARCHAR(500),
+                    tinh_id INTEGER,
+                    huyen_id INTEGER,
+                    xa_id INTEGER,
+                    x NUMERIC(10,6),
+                    y NUMERIC(10,6),
+                    dien_thoai VARCHAR(50)
+                );
+            """))
+            count = load_table(conn, table, CO_SO_COLUMNS, (
+                record for record in co_so_records(folder) if record['ten_co_so']
+            ), folder, key_fields=['ten_co_so', 'dia_chi'])
+        
+        logger.info(f"✅ Imported {count} {label}")
+        return True
+        
+    except Exception as e:
+        logger.error(f"❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def import_co_so_phan_bon():
+    """Import cơ sở buôn bán phân bón (coso/cs_pb)"""
+    return import_co_so('co_so_phan_bon', 'cs_pb', 'cơ sở phân bón')
+
+
+def import_co_so_thuoc_bvtv():
+    """Import cơ sở buôn bán thuốc BVTV (coso/cs_tbvtv)"""
+    return import_co_so('co_so_thuoc_bvtv', 'cs_tbvtv', 'cơ sở thuốc BVTV')
+
+
 def generate_summary():
     """Generate import summary"""
     print("\n" + "=" * 70)
     print("IMPORT SUMMARY")
     print("=" * 70)
     
-    tables = ['phan_bon', 'thuoc_bvtv', 'giong_cay', 'chu_so_huu', 'vung_trong']
+    tables = ['phan_bon', 'thuoc_bvtv', 'giong_cay', 'chu_so_huu', 'vung_trong',
+              'co_so_phan_bon', 'co_so_thuoc_bvtv']
     
     with engine.connect() as conn:
         for table in tables:
@@ -312,9 +496,21 @@ def generate_summary():
 
 def main():
     """Main import function"""
+    global INCREMENTAL, READ_BATCH_SIZE, import_state
+    
+    parser = argparse.ArgumentParser(description="Import all data from Database/data")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Skip unchanged files, apply only changed rows (no TRUNCATE)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Rows read from a source file per batch")
+    args = parser.parse_args()
+    INCREMENTAL = args.incremental
+    READ_BATCH_SIZE = args.batch_size
+    import_state = ImportState(engine)
+    
     print("\n" + "=" * 80)
     print(" " * 20 + "COMPREHENSIVE DATA IMPORT")
-    print(" " * 25 + "3NF Compliant")
+    print(" " * 25 + ("3NF Compliant - incremental" if INCREMENTAL else "3NF Compliant"))
     print("=" * 80)
     
     success = True
@@ -332,9 +528,21 @@ def main():
     if not import_msvt_data():
         success = False
     
+    if not import_co_so_phan_bon():
+        success = False
+    
+    if not import_co_so_thuoc_bvtv():
+        success = False
+    
+    # Tile / cluster của API server đã cũ
+    notify_data_changed()
+    
     # Generate summary
     generate_summary()
     
+    if INCREMENTAL:
+        print_diff_report(diff_results)
+    
     print("\n" + "=" * 80)
     if success:
         print("✅ DATA IMPORT COMPLETED SUCCESSFULLY!")
@@ -8,6 +8,9 @@ from pathlib import Path
 from sqlalchemy import create_engine, text
 import logging
 
+from backend_caches import notify_data_changed
+from bulk_load import bulk_load
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -28,14 +31,10 @@ def import_msvt():
         df = pd.read_excel(DATA_DIR / "msvt_caytrong.xlsx")
         conn.execute(text("TRUNCATE TABLE loai_cay_trong CASCADE"))
         
-        for _, row in df.iterrows():
-            conn.execute(text("""
-                INSERT INTO loai_cay_trong (ten_cay, ten_khoa_hoc)
-                VALUES (:ten, :khoa_hoc)
-            """), {
-                "ten": str(row['tencaytrong']),
-                "khoa_hoc": str(row['tencaytrong'])  # Using same as default
-            })
+        bulk_load(conn, "loai_cay_trong", ["ten_cay", "ten_khoa_hoc"], (
+            # Using same as default
+            (str(ten), str(ten)) for ten in df['tencaytrong']
+        ))
         print(f"   ✅ Imported {len(df)} cây trồng")
         
         # 2. Import Chủ sở hữu
@@ -43,16 +42,15 @@ def import_msvt():
         df = pd.read_excel(DATA_DIR / "msvt_chusohuu.xlsx")
         conn.execute(text("TRUNCATE TABLE chu_so_huu CASCADE"))
         
-        for _, row in df.iterrows():
-            conn.execute(text("""
-                INSERT INTO chu_so_huu (id, ho_ten, dia_chi, dien_thoai)
-                VALUES (:id, :ten, :diachi, :sdt)
-            """), {
-                "id": int(row['chusohuu_ID']),
-                "ten": str(row.get('ten_cs_donggoi', '')),
-                "diachi": str(row.get('diachi', '')),
-                "sdt": str(row.get('sdt', ''))
-            })
+        bulk_load(conn, "chu_so_huu", ["id", "ho_ten", "dia_chi", "dien_thoai"], (
+            (
+                int(row['chusohuu_ID']),
+                str(row.get('ten_cs_donggoi', '')),
+                str(row.get('diachi', '')),
+                str(row.get('sdt', ''))
+            )
+            for row in df.to_dict('records')
+        ), key=["id"])
         print(f"   ✅ Imported {len(df)} chủ sở hữu")
         
         # 3. Import Thị trường
@@ -66,14 +64,10 @@ def import_msvt():
         """))
         conn.execute(text("TRUNCATE TABLE thi_truong CASCADE"))
         
-        for _, row in df.iterrows():
-            conn.execute(text("""
-                INSERT INTO thi_truong (id, ten_thi_truong)
-                VALUES (:id, :ten)
-            """), {
-                "id": int(row['thitruong_ID']),
-                "ten": str(row['tenthitruong'])
-            })
+        bulk_load(conn, "thi_truong", ["id", "ten_thi_truong"], (
+            (int(row['thitruong_ID']), str(row['tenthitruong']))
+            for row in df.to_dict('records')
+        ), key=["id"])
         print(f"   ✅ Imported {len(df)} thị trường")
         
         # 4. Import Vùng trồng - Thị trường relationship
@@ -90,32 +84,22 @@ def import_msvt():
         """))
         conn.execute(text("TRUNCATE TABLE vung_trong_thi_truong CASCADE"))
         
-        for _, row in df.iterrows():
-            conn.execute(text("""
-                INSERT INTO vung_trong_thi_truong (ma_vung, ten_vung, cay_trong_id)
-                VALUES (:ma, :ten, :cay)
-            """), {
-                "ma": str(row.get('maso', row.get('mavungtrong_puc', ''))),
-                "ten": str(row.get('tenvungtrong', '')),
-                "cay": int(row['caytrong_ID']) if pd.notna(row.get('caytrong_ID')) else None
-            })
+        bulk_load(conn, "vung_trong_thi_truong", ["ma_vung", "ten_vung", "cay_trong_id"], (
+            (
+                str(row.get('maso', row.get('mavungtrong_puc', ''))),
+                str(row.get('tenvungtrong', '')),
+                int(row['caytrong_ID']) if pd.notna(row.get('caytrong_ID')) else None
+            )
+            for row in df.to_dict('records')
+        ))
         print(f"   ✅ Imported {len(df)} vùng trồng - thị trường")
         
         # 5. Import Thông tin vùng trồng (bổ sung)
         print("\n5. Importing Thông tin vùng trồng...")
         df = pd.read_excel(DATA_DIR / "msvt_thongtinvungtrong.xlsx")
         
-        # Update existing vung_trong records
-        count = 0
-        for _, row in df.iterrows():
-            chu_so_huu_id = int(row['chusohuu_ID']) if pd.notna(row.get('chusohuu_ID')) else None
-            thi_truong_id = int(row['thitruong_ID']) if pd.notna(row.get('thitruong_ID')) else None
-            
-            # Try to update vung_trong with additional info
-            # This requires matching logic - skipping for now as we need mavung key
-            count += 1
-        
-        print(f"   ✅ Processed {len(df)} thông tin vùng trồng")
+        # Chưa có khóa mavung để khớp với vung_trong: chỉ đọc file, chưa ghi gì
+        print(f"   ⏭️  Skipped {len(df)} thông tin vùng trồng (no mavung key to match vung_trong)")
     
     # Summary
     print("\n" + "=" * 70)
@@ -142,3 +126,4 @@ def import_msvt():
 
 if __name__ == "__main__":
     import_msvt()
+    notify_data_changed()
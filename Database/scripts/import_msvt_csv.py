@@ -1,14 +1,22 @@
 """
 Import MSVT Data from CSV Files with 3NF Compliance
 Author: HeThongWebGIS_MSVT
+
+Usage:
+    python import_msvt_csv.py                 # full reload
+    python import_msvt_csv.py --incremental   # only changed files / rows, keeps vung_trong
 """
 
-import pandas as pd
-import numpy as np
+import argparse
 from pathlib import Path
 from sqlalchemy import create_engine, text
 import logging
 
+from backend_caches import notify_data_changed
+from bulk_load import DiffStats, bulk_load, print_diff_report, sync_table
+from import_state import ImportState, file_digest
+from record_reader import parse_decimal, read_records
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -16,24 +24,58 @@ DATABASE_URL = "postgresql://anllen@localhost:5432/webgis_msvt"
 engine = create_engine(DATABASE_URL)
 DATA_DIR = Path(__file__).parent.parent / "data" / "msvt"
 
+# Set by main() from the command line
+INCREMENTAL = False
+import_state = None
+diff_results = []
+
 
 def clean_value(val):
     """Clean and normalize value"""
-    if pd.isna(val) or val == '' or val == 'NaN':
+    if val is None or val == '' or val == 'NaN':
         return None
     return str(val).strip()
 
 
-def parse_dien_tich(val):
-    """Parse dien tich (handle comma as decimal separator)"""
-    if pd.isna(val):
-        return None
-    try:
-        # Replace comma with dot for decimal
-        val_str = str(val).replace(',', '.')
-        return float(val_str)
-    except:
-        return None
+VUNG_TRONG_COLUMNS = [
+    "ma_vung", "ten_vung", "dien_tich", "nguoi_dai_dien",
+    "cay_trong_id", "xa_name", "huyen_name", "tinh_name",
+    "thi_truong_xuat_khau"
+]
+
+
+# dientich uses comma as decimal separator ("18,00")
+VUNG_TRONG_CONVERTERS = {'caytrong_ID': int, 'dientich': parse_decimal}
+
+
+def vung_trong_record(row):
+    """Clean one msvt_thitruongvungtrong.csv row into vung_trong columns"""
+    cay_trong_id = row.get('caytrong_ID')
+    
+    # Validate cay_trong_id (must exist in loai_cay_trong or be NULL)
+    if cay_trong_id is not None and cay_trong_id <= 0:
+        cay_trong_id = None
+    
+    return {
+        "ma_vung": clean_value(row.get('mavungtrong_puc')),
+        "ten_vung": clean_value(row.get('tenvungtrong')),
+        "dien_tich": row.get('dientich'),
+        "nguoi_dai_dien": clean_value(row.get('nguoidaidien')),
+        "cay_trong_id": cay_trong_id,
+        "xa_name": clean_value(row.get('xa')),
+        "huyen_name": clean_value(row.get('huyen')),
+        "tinh_name": clean_value(row.get('tinh')),
+        "thi_truong_xuat_khau": clean_value(row.get('thitruongxuatkhau'))
+    }
+
+
+def source_unchanged(file_path, table):
+    """Incremental: file giống lần import trước -> bỏ qua"""
+    if not INCREMENTAL or not import_state.is_unchanged(f"msvt/{file_path.name}", file_digest(file_path)):
+        return False
+    logger.info(f"⏭️  {file_path.name} unchanged since last import, skipping {table}")
+    diff_results.append(DiffStats(table=table, skipped=True))
+    return True
 
 
 def import_cay_trong_csv():
@@ -43,14 +85,11 @@ def import_cay_trong_csv():
     print("="*70)
     
     file_path = DATA_DIR / "msvt_caytrong.csv"
+    if source_unchanged(file_path, "loai_cay_trong"):
+        return True
     
     with engine.begin() as conn:
-        df = pd.read_csv(file_path, encoding='utf-8-sig', delimiter=';')
-        
-        # Remove rows with NaN
-        df = df.dropna(subset=['caytrong_ID', 'tencaytrong'])
-        
-        logger.info(f"Loaded {len(df)} cây trồng from CSV")
+        logger.info(f"Reading {file_path.name}")
         
         # Create table if not exists, then clear
         conn.execute(text("""
@@ -60,28 +99,28 @@ def import_cay_trong_csv():
                 ten_khoa_hoc VARCHAR(300)
             )
         """))
-        conn.execute(text("TRUNCATE TABLE loai_cay_trong CASCADE"))
+        # Import (ten_khoa_hoc default same as ten_cay)
+        # Rows without id or name are skipped
+        rows = (
+            (row['caytrong_ID'], row['tencaytrong'], row['tencaytrong'])
+            for row in read_records(file_path, converters={'caytrong_ID': int})
+            if row.get('caytrong_ID') is not None and row.get('tencaytrong')
+        )
+        columns = ["id", "ten_cay", "ten_khoa_hoc"]
         
-        # Import
-        count = 0
-        for _, row in df.iterrows():
-            cay_id = int(row['caytrong_ID'])
-            ten_cay = clean_value(row['tencaytrong'])
-            
-            if not ten_cay:
-                continue
-            
-            conn.execute(text("""
-                INSERT INTO loai_cay_trong (id, ten_cay, ten_khoa_hoc)
-                VALUES (:id, :ten, :khoa_hoc)
-                ON CONFLICT (id) DO UPDATE SET ten_cay = EXCLUDED.ten_cay
-            """), {
-                "id": cay_id,
-                "ten": ten_cay,
-                "khoa_hoc": ten_cay  # Default same as ten_cay
-            })
-            count += 1
+        if INCREMENTAL:
+            # Cây trồng còn được vùng trồng tham chiếu thì không bị xóa
+            stats = sync_table(conn, "loai_cay_trong", columns, rows, key=["id"])
+            diff_results.append(stats)
+            count = stats.inserted + stats.updated + stats.unchanged
+        else:
+            conn.execute(text("TRUNCATE TABLE loai_cay_trong CASCADE"))
+            count = bulk_load(
+                conn, "loai_cay_trong", columns, rows,
+                key=["id"], update_columns=["ten_cay"]
+            ).copied
         
+        import_state.record(conn, f"msvt/{file_path.name}", file_digest(file_path), count)
         logger.info(f"✅ Imported {count} cây trồng")
     
     return True
@@ -94,81 +133,55 @@ def import_vung_trong_csv():
     print("="*70)
    
     file_path = DATA_DIR / "msvt_thitruongvungtrong.csv"
+    if source_unchanged(file_path, "vung_trong"):
+        return True
     
     with engine.begin() as conn:
-        df = pd.read_csv(file_path, encoding='utf-8-sig', delimiter=';')
-        logger.info(f"Loaded {len(df)} vùng trồng from CSV")
+        logger.info(f"Reading {file_path.name}")
         
         # Recreate vung_trong table with proper structure
-        conn.execute(text("""
-            DROP TABLE IF EXISTS vung_trong CASCADE;
+        # (incremental: keep the table, farm ids and their history)
+        if not INCREMENTAL:
+            conn.execute(text("""
+                DROP TABLE IF EXISTS vung_trong CASCADE;
             
-            CREATE TABLE vung_trong (
-                id SERIAL PRIMARY KEY,
-                ma_vung VARCHAR(50) UNIQUE,
-                ten_vung VARCHAR(200),
-                dien_tich NUMERIC(10,2),
-                nguoi_dai_dien VARCHAR(200),
-                cay_trong_id INTEGER REFERENCES loai_cay_trong(id),
-                xa_name VARCHAR(200),
-                huyen_name VARCHAR(200),
-                tinh_name VARCHAR(100),
-                thi_truong_xuat_khau VARCHAR(200),
-                created_at TIMESTAMP DEFAULT NOW()
-            );
+                CREATE TABLE vung_trong (
+                    id SERIAL PRIMARY KEY,
+                    ma_vung VARCHAR(50) UNIQUE,
+                    ten_vung VARCHAR(200),
+                    dien_tich NUMERIC(10,2),
+                    nguoi_dai_dien VARCHAR(200),
+                    cay_trong_id INTEGER REFERENCES loai_cay_trong(id),
+                    xa_name VARCHAR(200),
+                    huyen_name VARCHAR(200),
+                    tinh_name VARCHAR(100),
+                    thi_truong_xuat_khau VARCHAR(200),
+                    created_at TIMESTAMP DEFAULT NOW()
+                );
             
-            COMMENT ON COLUMN vung_trong.xa_name IS 'Tên xã (denormalized for now, will normalize to xa_id when boundary data imported)';
-            COMMENT ON COLUMN vung_trong.huyen_name IS 'Tên huyện (denormalized for now)';
-            COMMENT ON COLUMN vung_trong.tinh_name IS 'Tên tỉnh (denormalized for now)';
-        """))
+                COMMENT ON COLUMN vung_trong.xa_name IS 'Tên xã (denormalized for now, will normalize to xa_id when boundary data imported)';
+                COMMENT ON COLUMN vung_trong.huyen_name IS 'Tên huyện (denormalized for now)';
+                COMMENT ON COLUMN vung_trong.tinh_name IS 'Tên tỉnh (denormalized for now)';
+            """))
         
-        logger.info("Re-created vung_trong table with proper 3NF structure")
+            logger.info("Re-created vung_trong table with proper 3NF structure")
         
         # Import data
-        count = 0
-        for _, row in df.iterrows():
-            ma_vung = clean_value(row.get('mavungtrong_puc'))
-            ten_vung = clean_value(row.get('tenvungtrong'))
-            
-            if not ma_vung:
-                continue
-            
-            # Parse fields
-            dien_tich = parse_dien_tich(row.get('dientich'))
-            cay_trong_id = int(row['caytrong_ID']) if pd.notna(row.get('caytrong_ID')) else None
-            
-            # Validate cay_trong_id (must exist in loai_cay_trong or be NULL)
-            if cay_trong_id is not None and cay_trong_id <= 0:
-                cay_trong_id = None
-            
-            conn.execute(text("""
-                INSERT INTO vung_trong (
-                    ma_vung, ten_vung, dien_tich, nguoi_dai_dien,
-                    cay_trong_id, xa_name, huyen_name, tinh_name,
-                    thi_truong_xuat_khau
-                )
-                VALUES (
-                    :ma_vung, :ten_vung, :dien_tich, :nguoi_dai_dien,
-                    :cay_trong_id, :xa, :huyen, :tinh,
-                    :thi_truong
-                )
-                ON CONFLICT (ma_vung) DO UPDATE SET
-                    ten_vung = EXCLUDED.ten_vung,
-                    dien_tich = EXCLUDED.dien_tich,
-                    nguoi_dai_dien = EXCLUDED.nguoi_dai_dien
-            """), {
-                "ma_vung": ma_vung,
-                "ten_vung": ten_vung,
-                "dien_tich": dien_tich,
-                "nguoi_dai_dien": clean_value(row.get('nguoidaidien')),
-                "cay_trong_id": cay_trong_id,
-                "xa": clean_value(row.get('xa')),
-                "huyen": clean_value(row.get('huyen')),
-                "tinh": clean_value(row.get('tinh')),
-                "thi_truong": clean_value(row.get('thitruongxuatkhau'))
-            })
-            count += 1
+        records = (
+            record for record in map(vung_trong_record, read_records(file_path, converters=VUNG_TRONG_CONVERTERS))
+            if record['ma_vung']
+        )
+        if INCREMENTAL:
+            # Không xóa: vùng trồng còn được tạo trực tiếp trên web
+            stats = sync_table(conn, "vung_trong", VUNG_TRONG_COLUMNS, records,
+                               key=["ma_vung"], delete_missing=False)
+            diff_results.append(stats)
+            count = stats.inserted + stats.updated + stats.unchanged
+        else:
+            count = bulk_load(conn, "vung_trong", VUNG_TRONG_COLUMNS, records, key=["ma_vung"],
+                              update_columns=["ten_vung", "dien_tich", "nguoi_dai_dien"]).copied
         
+        import_state.record(conn, f"msvt/{file_path.name}", file_digest(file_path), count)
         logger.info(f"✅ Imported {count} vùng trồng")
         
         # Show 3NF compliance note
@@ -246,6 +259,14 @@ def generate_summary():
 
 def main():
     """Main import function"""
+    global INCREMENTAL, import_state
+    
+    parser = argparse.ArgumentParser(description="Import MSVT CSV files")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Skip unchanged files, apply only changed rows (no DROP/TRUNCATE)")
+    INCREMENTAL = parser.parse_args().incremental
+    import_state = ImportState(engine)
+    
     print("\n" + "="*80)
     print(" "*15 + "IMPORTING NEW MSVT CSV FILES")
     print(" "*20 + "3NF COMPLIANT")
@@ -261,9 +282,15 @@ def main():
     if not import_vung_trong_csv():
         success = False
     
+    # Tile / cluster của API server (tên cây trồng, vùng trồng) đã cũ
+    notify_data_changed()
+    
     # Generate summary
     generate_summary()
     
+    if INCREMENTAL:
+        print_diff_report(diff_results)
+    
     print("\n" + "="*80)
     if success:
         print("✅ CSV IMPORT COMPLETED SUCCESSFULLY!")
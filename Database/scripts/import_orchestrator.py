@@ -0,0 +1,297 @@
+"""
+========== Import Orchestrator ==========
+Chạy song song các bước import theo đồ thị phụ thuộc (DAG)
+Author: HeThongWebGIS_MSVT
+
+- Mỗi bước là một hàm import có sẵn (import_all_data.py, import_msvt_csv.py)
+- Các bước độc lập chạy song song trong ProcessPoolExecutor; mỗi process
+  import lại module nên có engine / kết nối PostgreSQL riêng
+- Thứ tự khóa ngoại: một bước chỉ bắt đầu khi mọi bước nó phụ thuộc đã xong
+  (VD: vung_trong tham chiếu loai_cay_trong, phan_bon, thuoc_bvtv; TRUNCATE
+  ... CASCADE các bảng đó trong lúc nạp vung_trong sẽ xóa mất dữ liệu mới)
+- Resume: các bước đã xong được ghi vào file trạng thái; --resume chạy lại
+  từ bước lỗi, bỏ qua các bước đã thành công. Chạy hết thành công thì xóa file
+- Báo cáo thời gian từng bước và tổng thời gian (so với chạy tuần tự)
+
+Usage:
+    python import_orchestrator.py                     # full reload, 4 processes
+    python import_orchestrator.py --incremental -j 6
+    python import_orchestrator.py --resume            # after a failed run
+    python import_orchestrator.py --only phan_bon thuoc_bvtv
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import multiprocessing
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from graphlib import TopologicalSorter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+logger = logging.getLogger(__name__)
+
+STATE_FILE = Path(__file__).parent / ".import_orchestrator_state.json"
+DEFAULT_WORKERS = 4
+
+
+@dataclass
+class ImportTask:
+    """Một bước import: hàm `function` trong module `module`"""
+    name: str
+    module: str
+    function: str
+    depends_on: Tuple[str, ...] = ()
+
+
+# Đồ thị phụ thuộc. Cạnh = khóa ngoại hoặc TRUNCATE CASCADE chạm tới bảng khác.
+TASKS = [
+    ImportTask("phan_bon", "import_all_data", "import_phanbon"),
+    ImportTask("thuoc_bvtv", "import_all_data", "import_thuoc_bvtv"),
+    ImportTask("giong_cay", "import_all_data", "import_giong"),
+    ImportTask("chu_so_huu", "import_all_data", "import_chu_so_huu"),
+    ImportTask("co_so_phan_bon", "import_all_data", "import_co_so_phan_bon"),
+    ImportTask("co_so_thuoc_bvtv", "import_all_data", "import_co_so_thuoc_bvtv"),
+    ImportTask("loai_cay_trong", "import_msvt_csv", "import_cay_trong_csv"),
+    ImportTask("vung_trong", "import_msvt_csv", "import_vung_trong_csv",
+               depends_on=("loai_cay_trong", "phan_bon", "thuoc_bvtv")),
+]
+
+
+@dataclass
+class TaskResult:
+    """Kết quả một bước (trả về từ process con, phải pickle được)"""
+    name: str
+    ok: bool
+    seconds: float
+    error: Optional[str] = None
+    diffs: List[dict] = field(default_factory=list)
+
+
+def run_task(task: ImportTask, incremental: bool, batch_size: int) -> TaskResult:
+    """
+    Chạy một bước trong process con
+
+    Module được import trong process này nên engine (và pool kết nối) là riêng.
+    Các biến chế độ của script (INCREMENTAL, import_state, ...) được đặt như
+    main() của script đó.
+    """
+    from import_state import ImportState
+
+    start = time.perf_counter()
+    try:
+        module = importlib.import_module(task.module)
+        module.INCREMENTAL = incremental
+        if hasattr(module, "READ_BATCH_SIZE"):
+            module.READ_BATCH_SIZE = batch_size
+        # Bảng import_state đã được main() tạo trước khi mở pool
+        module.import_state = ImportState(module.engine, create=False)
+        module.diff_results = []
+
+        ok = bool(getattr(module, task.function)())
+        module.engine.dispose()
+        return TaskResult(
+            name=task.name,
+            ok=ok,
+            seconds=time.perf_counter() - start,
+            error=None if ok else f"{task.module}.{task.function}() reported failure",
+            diffs=[asdict(stats) for stats in module.diff_results]
+        )
+    except Exception as e:
+        return TaskResult(name=task.name, ok=False, seconds=time.perf_counter() - start,
+                          error=f"{type(e).__name__}: {e}")
+
+
+def build_graph(tasks: List[ImportTask]) -> Dict[str, Tuple[str, ...]]:
+    """
+    {tên bước: các bước phụ thuộc}, chỉ giữ phụ thuộc nằm trong danh sách chạy
+
+    Raises:
+        ValueError: Phụ thuộc vào bước không tồn tại
+        graphlib.CycleError: Đồ thị có chu trình
+    """
+    known = {task.name for task in TASKS}
+    selected = {task.name for task in tasks}
+    graph = {}
+    for task in tasks:
+        unknown = set(task.depends_on) - known
+        if unknown:
+            raise ValueError(f"{task.name} depends on unknown task(s): {', '.join(sorted(unknown))}")
+        graph[task.name] = tuple(dep for dep in task.depends_on if dep in selected)
+    TopologicalSorter(graph).prepare()  # kiểm tra chu trình trước khi chạy
+    return graph
+
+
+def load_state() -> dict:
+    if STATE_FILE.exists():
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {"completed": {}}
+
+
+def save_state(state: dict):
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+
+
+def run(tasks: List[ImportTask], workers: int, incremental: bool, batch_size: int,
+        completed: Dict[str, float]) -> List[TaskResult]:
+    """
+    Lập lịch động: bước nào đủ phụ thuộc thì gửi vào pool ngay
+
+    Bước lỗi không làm dừng các nhánh độc lập; các bước phụ thuộc vào nó bị
+    bỏ qua (để --resume chạy lại sau).
+
+    Args:
+        completed: {tên bước: giây} đã xong từ lần chạy trước (resume), được cập nhật
+    """
+    by_name = {task.name: task for task in tasks}
+    sorter = TopologicalSorter(build_graph(tasks))
+    sorter.prepare()
+
+    state = {"completed": completed, "incremental": incremental}
+    results = []
+    blocked = set()
+    running = {}
+
+    # spawn: process con không thừa hưởng kết nối / engine của process cha
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        while sorter.is_active():
+            for name in sorter.get_ready():
+                task = by_name[name]
+                if name in completed:
+                    logger.info(f"⏭️  {name}: completed in previous run, skipping")
+                    sorter.done(name)
+                elif blocked.intersection(task.depends_on):
+                    logger.warning(f"⛔ {name}: skipped, a dependency failed")
+                    blocked.add(name)
+                    sorter.done(name)
+                else:
+                    logger.info(f"▶️  {name} ({task.module}.{task.function})")
+                    running[pool.submit(run_task, task, incremental, batch_size)] = name
+
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:  # process con chết (BrokenProcessPool, ...)
+                    result = TaskResult(name=name, ok=False, seconds=0.0, error=f"{type(e).__name__}: {e}")
+                results.append(result)
+                if result.ok:
+                    logger.info(f"✅ {name} finished in {result.seconds:.1f}s")
+                    completed[name] = round(result.seconds, 3)
+                    save_state(state)
+                else:
+                    logger.error(f"❌ {name} failed after {result.seconds:.1f}s: {result.error}")
+                    blocked.add(name)
+                sorter.done(name)
+
+    return results
+
+
+def print_report(results: List[TaskResult], wall_seconds: float, skipped: List[str]):
+    """Thời gian từng bước, tổng thời gian và diff (incremental)"""
+    print("\n" + "=" * 70)
+    print("IMPORT ORCHESTRATOR REPORT")
+    print("=" * 70)
+    for result in sorted(results, key=lambda r: -r.seconds):
+        status = "ok" if result.ok else "FAILED"
+        print(f"  {result.name:20s} {result.seconds:>8.1f}s  {status}")
+        for diff in result.diffs:
+            if diff["skipped"]:
+                print(f"      {diff['table']}: source unchanged, skipped")
+            else:
+                print(f"      {diff['table']}: +{diff['inserted']:,} ~{diff['updated']:,} "
+                      f"-{diff['deleted']:,} (kept {diff['kept']:,}, unchanged {diff['unchanged']:,})")
+    for name in skipped:
+        print(f"  {name:20s} {'':>9s}  not run")
+
+    serial = sum(result.seconds for result in results)
+    print("-" * 70)
+    print(f"  Wall time: {wall_seconds:.1f}s (sum of steps {serial:.1f}s, "
+          f"x{serial / wall_seconds if wall_seconds > 0 else 1:.1f} parallel speed-up)")
+    print("=" * 70)
+
+
+def main():
+    """Main orchestrator function"""
+    parser = argparse.ArgumentParser(description="Run all import steps in parallel, in dependency order")
+    parser.add_argument("-j", "--workers", type=int, default=DEFAULT_WORKERS, help="Number of worker processes")
+    parser.add_argument("--incremental", action="store_true", help="Incremental mode of every import step")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows read from a source file per batch")
+    parser.add_argument("--resume", action="store_true", help="Skip steps completed by the previous (failed) run")
+    parser.add_argument("--only", nargs="+", metavar="STEP", help="Run only these steps (dependencies not added)")
+    parser.add_argument("--list", action="store_true", help="Print the steps in dependency order and exit")
+    args = parser.parse_args()
+
+    tasks = TASKS
+    if args.only:
+        unknown = set(args.only) - {task.name for task in TASKS}
+        if unknown:
+            parser.error(f"unknown step(s): {', '.join(sorted(unknown))}")
+        tasks = [task for task in TASKS if task.name in args.only]
+
+    if args.list:
+        for name in TopologicalSorter(build_graph(tasks)).static_order():
+            task = next(task for task in tasks if task.name == name)
+            after = f" (after {', '.join(task.depends_on)})" if task.depends_on else ""
+            print(f"  {name:20s} {task.module}.{task.function}{after}")
+        return True
+
+    completed = {}
+    if args.resume:
+        state = load_state()
+        if state.get("incremental", args.incremental) != args.incremental:
+            parser.error("previous run used a different --incremental setting, run without --resume")
+        completed = state["completed"]
+        logger.info(f"Resuming: {len(completed)} step(s) already completed")
+    elif STATE_FILE.exists():
+        STATE_FILE.unlink()
+
+    print("\n" + "=" * 80)
+    print(" " * 20 + f"IMPORT ORCHESTRATOR ({args.workers} processes"
+          f"{', incremental' if args.incremental else ''})")
+    print("=" * 80)
+
+    # Tạo bảng import_state một lần trước khi mở pool: các process con cùng
+    # chạy CREATE TABLE IF NOT EXISTS sẽ tranh nhau (duplicate key trên pg_type)
+    from import_all_data import engine
+    from import_state import ImportState
+    ImportState.create_table(engine)
+    engine.dispose()
+
+    start = time.perf_counter()
+    results = run(tasks, args.workers, args.incremental, args.batch_size, completed)
+    wall_seconds = time.perf_counter() - start
+    if any(result.ok for result in results):
+        # Process con không gọi main() của script, báo cache của API server ở đây
+        from backend_caches import notify_data_changed
+        notify_data_changed()
+
+    ran = {result.name for result in results}
+    not_run = [task.name for task in tasks if task.name not in ran and task.name not in completed]
+    print_report(results, wall_seconds, not_run)
+
+    success = all(result.ok for result in results) and not not_run
+    if success:
+        if STATE_FILE.exists():
+            STATE_FILE.unlink()
+        print("✅ ALL IMPORT STEPS COMPLETED")
+    else:
+        print(f"⚠️  SOME STEPS FAILED, fix and re-run with --resume (state in {STATE_FILE.name})")
+    return success
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,104 @@
+"""
+========== Import State ==========
+Dấu vân tay file nguồn và khóa tự nhiên cho chế độ import incremental
+Author: HeThongWebGIS_MSVT
+
+- file_digest(): SHA-256 nội dung file nguồn, lưu trong bảng import_state
+  sau mỗi lần import; lần sau file không đổi thì bỏ qua
+- source_key(): khóa tự nhiên (md5) cho các danh mục không có mã riêng
+  (phân bón, thuốc BVTV, giống), dùng làm UNIQUE cho ON CONFLICT
+"""
+
+import hashlib
+from pathlib import Path
+
+from sqlalchemy import text
+
+# Kích thước khối khi băm file (file Excel danh mục có thể vài chục MB)
+DIGEST_CHUNK_BYTES = 1 << 20
+
+
+def file_digest(path: Path) -> str:
+    """
+    SHA-256 (hex) nội dung file, đọc theo khối
+
+    Với thư mục (VD: coso/cs_pb): băm tên + digest của từng file bên trong,
+    nên thêm / sửa / xóa một file đều làm digest thay đổi.
+    """
+    path = Path(path)
+    digest = hashlib.sha256()
+    if path.is_dir():
+        for child in sorted(p for p in path.iterdir() if p.is_file()):
+            digest.update(child.name.encode("utf-8"))
+            digest.update(file_digest(child).encode("ascii"))
+        return digest.hexdigest()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DIGEST_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_key(*values) -> str:
+    """
+    Khóa tự nhiên từ các trường định danh một dòng danh mục
+
+    Chuẩn hóa khoảng trắng / chữ hoa, None và '' coi như nhau, nên cùng
+    một sản phẩm trong hai phiên bản file cho cùng khóa.
+    """
+    parts = [" ".join(str(value).split()).lower() if value is not None else "" for value in values]
+    return hashlib.md5("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def ensure_source_key(conn, table: str):
+    """Thêm cột source_key (UNIQUE) cho bảng danh mục nếu chưa có"""
+    conn.execute(text(f"""
+        ALTER TABLE {table} ADD COLUMN IF NOT EXISTS source_key VARCHAR(32);
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_{table}_source_key ON {table} (source_key);
+    """))
+
+
+class ImportState:
+    """Bảng import_state: file nguồn -> digest của lần import thành công gần nhất"""
+
+    def __init__(self, engine, create: bool = True):
+        """
+        Args:
+            create: tạo bảng import_state nếu chưa có. Khi nhiều process chạy
+                song song (import_orchestrator) thì bảng được tạo một lần trước
+                và các process dùng create=False, vì CREATE TABLE IF NOT EXISTS
+                đồng thời có thể lỗi duplicate key trên pg_type.
+        """
+        self.engine = engine
+        if create:
+            self.create_table(engine)
+
+    @staticmethod
+    def create_table(engine):
+        with engine.begin() as conn:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS import_state (
+                    source VARCHAR(300) PRIMARY KEY,
+                    sha256 CHAR(64) NOT NULL,
+                    row_count INTEGER,
+                    imported_at TIMESTAMP DEFAULT NOW()
+                )
+            """))
+
+    def is_unchanged(self, source: str, digest: str) -> bool:
+        with self.engine.connect() as conn:
+            stored = conn.execute(
+                text("SELECT sha256 FROM import_state WHERE source = :source"),
+                {"source": source}
+            ).scalar()
+        return stored == digest
+
+    def record(self, conn, source: str, digest: str, row_count: int):
+        """Ghi digest trong cùng transaction với dữ liệu vừa import"""
+        conn.execute(text("""
+            INSERT INTO import_state (source, sha256, row_count, imported_at)
+            VALUES (:source, :sha256, :row_count, NOW())
+            ON CONFLICT (source) DO UPDATE SET
+                sha256 = EXCLUDED.sha256,
+                row_count = EXCLUDED.row_count,
+                imported_at = EXCLUDED.imported_at
+        """), {"source": source, "sha256": digest, "row_count": row_count})
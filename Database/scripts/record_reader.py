@@ -0,0 +1,222 @@
+"""
+========== Streaming Record Reader ==========
+Đọc file danh mục (.xlsx, .xls, .csv) theo từng lô, bộ nhớ không phụ thuộc kích thước file
+Author: HeThongWebGIS_MSVT
+
+Cùng một interface cho mọi định dạng:
+- .xlsx / .xlsm: openpyxl read_only (parse XML theo luồng, không dựng cả sheet)
+- .xls: xlrd on_demand (định dạng BIFF tối đa 65.536 dòng nên bộ nhớ vẫn có trần)
+- .csv: csv.reader, mặc định delimiter ';' và utf-8-sig như file MSVT
+
+Mỗi dòng là dict {tên cột trong header: giá trị đã làm sạch}:
+chuỗi được strip, ô rỗng / 'nan' -> None, số nguyên lưu dạng float (12.0)
+-> int, ngày giữ kiểu datetime. Có thể truyền converters để ép kiểu từng cột.
+
+Usage:
+    from record_reader import read_batches, read_records
+
+    for batch in read_batches(path, batch_size=5000):
+        ...
+    bulk_load(conn, table, columns, (clean(row) for row in read_records(path)))
+"""
+
+import csv
+import datetime
+import itertools
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+DEFAULT_BATCH_SIZE = 5000
+CSV_DELIMITER = ';'
+CSV_ENCODING = 'utf-8-sig'
+SUPPORTED_SUFFIXES = ('.xlsx', '.xlsm', '.xls', '.csv')
+
+MISSING_VALUES = {'', 'nan', 'NaN', 'None', 'NULL'}
+
+
+def clean_cell(value):
+    """Làm sạch một ô: None cho ô rỗng, int cho số nguyên, strip chuỗi"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        return None if value in MISSING_VALUES else value
+    if isinstance(value, float):
+        if value != value:  # NaN
+            return None
+        return int(value) if value.is_integer() else value
+    return value
+
+
+def header_names(cells) -> List[str]:
+    """
+    Tên cột từ dòng header, giống pandas: ô trống -> 'Unnamed: i',
+    tên trùng -> 'ten.1', 'ten.2'
+    """
+    names = []
+    seen = {}
+    for index, cell in enumerate(cells):
+        name = f"Unnamed: {index}" if cell is None or str(cell).strip() == '' else str(cell)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _xlsx_rows(path: Path, sheet) -> Iterator[tuple]:
+    from openpyxl import load_workbook  # chỉ cần cho .xlsx
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[sheet] if isinstance(sheet, int) else workbook[sheet]
+        yield from worksheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _xls_rows(path: Path, sheet) -> Iterator[list]:
+    import xlrd  # chỉ cần cho .xls
+
+    workbook = xlrd.open_workbook(path, on_demand=True)
+    try:
+        worksheet = workbook.sheet_by_index(sheet) if isinstance(sheet, int) else workbook.sheet_by_name(sheet)
+        for index in range(worksheet.nrows):
+            row = []
+            for cell in worksheet.row(index):
+                if cell.ctype == xlrd.XL_CELL_DATE:
+                    row.append(xlrd.xldate.xldate_as_datetime(cell.value, workbook.datemode))
+                elif cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK):
+                    row.append(None)
+                else:
+                    row.append(cell.value)
+            yield row
+    finally:
+        workbook.release_resources()
+
+
+def _csv_rows(path: Path, delimiter: str, encoding: str) -> Iterator[list]:
+    with open(path, newline='', encoding=encoding) as f:
+        yield from csv.reader(f, delimiter=delimiter)
+
+
+def _raw_rows(path: Path, sheet, delimiter: str, encoding: str) -> Iterator:
+    suffix = path.suffix.lower()
+    if suffix in ('.xlsx', '.xlsm'):
+        return _xlsx_rows(path, sheet)
+    if suffix == '.xls':
+        return _xls_rows(path, sheet)
+    if suffix in ('.csv', '.txt'):
+        return _csv_rows(path, delimiter, encoding)
+    raise ValueError(f"Unsupported file type: {path.name}")
+
+
+def normalize_header(name) -> str:
+    """Header để so khớp: chữ thường, gộp khoảng trắng / xuống dòng"""
+    return " ".join(str(name).split()).lower()
+
+
+def find_header_row(
+    path,
+    keyword: str,
+    sheet=0,
+    max_rows: int = 30,
+    delimiter: str = CSV_DELIMITER,
+    encoding: str = CSV_ENCODING
+) -> Optional[int]:
+    """
+    Dòng header đầu tiên có ô chứa keyword (file có tiêu đề / quốc hiệu phía trên)
+
+    Returns:
+        int: Chỉ số dòng (dùng cho header_row), None nếu không thấy
+    """
+    keyword = normalize_header(keyword)
+    rows = _raw_rows(Path(path), sheet, delimiter, encoding)
+    for index, row in enumerate(itertools.islice(rows, max_rows)):
+        if any(cell is not None and keyword in normalize_header(cell) for cell in row):
+            return index
+    return None
+
+
+def read_records(
+    path,
+    sheet=0,
+    header_row: int = 0,
+    converters: Optional[Dict[str, Callable]] = None,
+    delimiter: str = CSV_DELIMITER,
+    encoding: str = CSV_ENCODING
+) -> Iterator[dict]:
+    """
+    Đọc từng dòng của file dưới dạng dict đã làm sạch
+
+    Args:
+        path: File .xlsx / .xlsm / .xls / .csv
+        sheet: Chỉ số hoặc tên sheet (Excel)
+        header_row: Dòng header (0 = dòng đầu tiên)
+        converters: {tên cột: hàm} ép kiểu sau khi làm sạch, None được giữ nguyên
+        delimiter, encoding: Cho file CSV
+
+    Raises:
+        ValueError: Định dạng file không hỗ trợ
+    """
+    rows = _raw_rows(Path(path), sheet, delimiter, encoding)
+    converters = converters or {}
+    rows = itertools.islice(rows, header_row, None)
+    header = next(rows, None)
+    if header is None:
+        return
+    names = header_names(header)
+
+    for row in rows:
+        values = [clean_cell(value) for value in row]
+        if all(value is None for value in values):
+            continue
+        record = dict(zip(names, values))
+        for name in names[len(values):]:
+            record[name] = None
+        for name, convert in converters.items():
+            if record.get(name) is not None:
+                record[name] = convert(record[name])
+        yield record
+
+
+def read_batches(path, batch_size: int = DEFAULT_BATCH_SIZE, **kwargs) -> Iterator[List[dict]]:
+    """
+    Đọc file theo lô tối đa batch_size dòng (tham số khác như read_records)
+
+    Chỉ một lô được giữ trong bộ nhớ tại một thời điểm.
+    """
+    records = read_records(path, **kwargs)
+    while True:
+        batch = list(itertools.islice(records, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def parse_decimal(value):
+    """Số thập phân dạng chuỗi Việt Nam ('1,5') hoặc số -> float"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace(',', '.'))
+    except ValueError:
+        return None
+
+
+def parse_date(value):
+    """datetime / date / chuỗi ISO hoặc dd/mm/yyyy -> date (None nếu thiếu / không đọc được)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    for fmt in ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d %H:%M:%S'):
+        try:
+            return datetime.datetime.strptime(str(value).strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
@@ -4,6 +4,35 @@
  */
 import { ref, onMounted, onUnmounted, nextTick } from 'vue'
 import L from 'leaflet'
+import api from '../services/api'
+
+/**
+ * URL ranh giới tỉnh ở mức đơn giản hóa phù hợp với zoom
+ * (backend redirect tới file có hash, cache immutable, nén sẵn)
+ */
+export const provinceBoundaryUrl = (zoom = 6) =>
+    `${api.defaults.baseURL}/boundaries/provinces?zoom=${Math.round(zoom)}`
+
+let boundaryMinZooms = null
+
+/**
+ * Zoom tối thiểu của từng mức đơn giản hóa ranh giới (từ manifest, tải một lần)
+ * Lỗi / chưa có manifest: coi như một mức duy nhất
+ */
+export const loadBoundaryMinZooms = () => {
+    if (!boundaryMinZooms) {
+        boundaryMinZooms = api.get('/boundaries/manifest')
+            .then(response => response.data.levels.map(level => level.min_zoom).sort((a, b) => a - b))
+            .catch(() => [])
+    }
+    return boundaryMinZooms
+}
+
+/**
+ * Mức ranh giới backend chọn cho zoom (level chi tiết nhất có min_zoom <= zoom)
+ */
+export const boundaryLevelForZoom = (minZooms, zoom) =>
+    Math.max(minZooms.filter(minZoom => minZoom <= Math.round(zoom)).length - 1, 0)
 
 // Fix Leaflet default icon paths
 delete L.Icon.Default.prototype._getIconUrl
@@ -101,7 +130,7 @@ export function useMap(mapContainerId) {
      * Thêm circle markers (điểm tròn thay vì icon)
      * Dùng cho hiển thị các vùng trồng trên bản đồ
      */
-    const addCircleMarkers = (locations) => {
+    const addCircleMarkers = (locations, { fitBounds = true } = {}) => {
         if (!map.value) return
 
         locations.forEach(loc => {
@@ -147,12 +176,78 @@ export function useMap(mapContainerId) {
         })
 
         // Fit bounds to show all markers
-        if (markers.value.length > 0) {
+        if (fitBounds && markers.value.length > 0) {
             const group = L.featureGroup(markers.value)
             map.value.fitBounds(group.getBounds().pad(0.1))
         }
     }
 
+    /**
+     * Bounding box của khung nhìn hiện tại cho tham số bbox của API
+     * Dạng "minLng,minLat,maxLng,maxLat", giới hạn trong phạm vi WGS84
+     */
+    const getBbox = () => {
+        if (!map.value) return null
+
+        const bounds = map.value.getBounds()
+        return [
+            Math.max(bounds.getWest(), -180),
+            Math.max(bounds.getSouth(), -90),
+            Math.min(bounds.getEast(), 180),
+            Math.min(bounds.getNorth(), 90)
+        ].map(value => value.toFixed(5)).join(',')
+    }
+
+    /**
+     * Gọi callback(bbox) khi người dùng dừng kéo/zoom bản đồ
+     * Trả về hàm hủy đăng ký
+     */
+    const onViewportChange = (callback, delay = 300) => {
+        if (!map.value) return () => {}
+
+        let timer = null
+        const handler = () => {
+            clearTimeout(timer)
+            timer = setTimeout(() => callback(getBbox()), delay)
+        }
+
+        map.value.on('moveend', handler)
+        return () => {
+            clearTimeout(timer)
+            if (map.value) map.value.off('moveend', handler)
+        }
+    }
+
+    /**
+     * Gọi callback(zoom) khi zoom vượt ngưỡng sang mức ranh giới khác
+     * (debounce; zoom trong cùng một mức không tải lại). Trả về hàm hủy đăng ký
+     *
+     * loadedZoom: zoom của ranh giới đang hiển thị
+     */
+    const onBoundaryLevelChange = (callback, loadedZoom, delay = 300) => {
+        if (!map.value) return () => {}
+
+        let timer = null
+        let currentZoom = loadedZoom ?? map.value.getZoom()
+        const handler = () => {
+            clearTimeout(timer)
+            timer = setTimeout(async () => {
+                if (!map.value) return
+                const zoom = map.value.getZoom()
+                const minZooms = await loadBoundaryMinZooms()
+                if (boundaryLevelForZoom(minZooms, zoom) === boundaryLevelForZoom(minZooms, currentZoom)) return
+                currentZoom = zoom
+                callback(zoom)
+            }, delay)
+        }
+
+        map.value.on('zoomend', handler)
+        return () => {
+            clearTimeout(timer)
+            if (map.value) map.value.off('zoomend', handler)
+        }
+    }
+
     /**
      * Fly to location
      */
@@ -406,16 +501,26 @@ export function useMap(mapContainerId) {
     /**
      * Load province boundaries and add click handlers
      */
+    let stopBoundaryWatch = null
+
     const loadProvinceBoundaries = async (onProvinceClick = null) => {
         try {
             // Load Vietnam province GeoJSON
-            const response = await fetch('/data/vietnam-provinces.json')
+            const zoom = map.value.getZoom()
+            const response = await fetch(provinceBoundaryUrl(zoom))
             const data = await response.json()
 
-            if (layerGroups.value.provinces) {
-                map.value.removeLayer(layerGroups.value.provinces)
+            // Layer đang bị ẩn (toggleLayerVisibility) thì giữ ẩn khi tải lại
+            const previous = layerGroups.value.provinces
+            const visible = !previous || map.value.hasLayer(previous)
+            if (previous) {
+                map.value.removeLayer(previous)
             }
 
+            // Tải lại mức chi tiết khác khi zoom vượt ngưỡng
+            if (stopBoundaryWatch) stopBoundaryWatch()
+            stopBoundaryWatch = onBoundaryLevelChange(() => loadProvinceBoundaries(onProvinceClick), zoom)
+
             layerGroups.value.provinces = L.geoJSON(data, {
                 style: {
                     color: '#2563eb',
@@ -453,7 +558,12 @@ export function useMap(mapContainerId) {
                         className: 'province-tooltip'
                     })
                 }
-            }).addTo(map.value)
+            })
+
+            if (visible) {
+                // Dưới các marker / vùng trồng đã vẽ
+                layerGroups.value.provinces.addTo(map.value).bringToBack()
+            }
 
             return layerGroups.value.provinces
         } catch (error) {
@@ -488,6 +598,9 @@ export function useMap(mapContainerId) {
         addCircleMarkers,
         clearMarkers,
         flyTo,
+        getBbox,
+        onViewportChange,
+        onBoundaryLevelChange,
         addGeoJsonLayer,
         loadGeoJson,
         clearGeoJsonLayers,
@@ -25,6 +25,31 @@ export const analyticsService = {
         })
     },
 
+    /**
+     * Get all KPI cards (overview + alerts) in one request
+     */
+    getKPISummary() {
+        return api.get('/analytics/kpi/summary').then(response => {
+            const data = response.data
+            return {
+                ...response,
+                data: {
+                    kpi: {
+                        totalFarms: data.total_farms,
+                        totalArea: data.total_area,
+                        activeSeasons: data.active_seasons,
+                        totalFarmers: data.total_farmers
+                    },
+                    alerts: {
+                        total_alerts: data.total_alerts,
+                        unresolved: data.unresolved_alerts,
+                        by_severity: data.alerts_by_severity
+                    }
+                }
+            }
+        })
+    },
+
     /**
      * Get alert statistics
      */
@@ -88,6 +113,14 @@ export const analyticsService = {
         return api.get('/analytics/spatial/farm-density')
     },
 
+    /**
+     * Get square/hex grid aggregates (farms, area, inputs, alerts) for a heatmap
+     * params: { cell_size, shape: 'square' | 'hex', bbox: "minLng,minLat,maxLng,maxLat" }
+     */
+    getSpatialGrid(params) {
+        return api.get('/analytics/spatial/grid', { params })
+    },
+
     // ========== New Advanced Chart Endpoints ==========
 
     /**
@@ -122,9 +155,18 @@ export const analyticsService = {
 
     /**
      * Get farms with layer visualization data
+     * params.bbox = "minLng,minLat,maxLng,maxLat" limits to the map viewport
+     */
+    getFarmsWithLayers(params = {}) {
+        return api.get('/analytics/farms/with-layers', { params })
+    },
+
+    /**
+     * Get server-side farm clusters for a zoom level
+     * params: { zoom, bbox: "minLng,minLat,maxLng,maxLat" }
      */
-    getFarmsWithLayers() {
-        return api.get('/analytics/farms/with-layers')
+    getFarmClusters(params) {
+        return api.get('/analytics/farms/clusters', { params })
     },
 
     /**
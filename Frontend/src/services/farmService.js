@@ -12,6 +12,14 @@ export const farmService = {
         return api.get('/farms', { params })
     },
 
+    /**
+     * Vùng trồng gần một điểm (gần nhất trước, kèm distance_m)
+     * params: { lat, lon, radius (mét), k, crop, market }
+     */
+    getNearbyFarms(params) {
+        return api.get('/farms/nearby', { params })
+    },
+
     /**
      * Lấy chi tiết vùng trồng
      */
@@ -1,272 +1,290 @@
 /**
  * Province Coordinates Mapping
- * Auto-generated from 63tinh-quandao.geojson
- * Contains centroids of 65 Vietnam provinces and islands
+ * Auto-generated by scripts/extract_province_centroids.py
+ * Contains label points (inside each province) of 65 Vietnam provinces and islands
  */
 
 export const PROVINCE_COORDS = {
   "Đà Nẵng": [
-    16.1155,
-    108.0792
+    16.0683,
+    108.0624
   ],
   "Đồng Nai": [
-    10.9453,
+    11.0597,
     107.1845
   ],
   "Đồng Tháp": [
-    10.568,
-    105.5609
+    10.5648,
+    105.6074
   ],
   "Đăk Nông": [
-    12.1532,
-    107.7738
+    12.2282,
+    107.688
   ],
   "Đắk Lắk": [
-    12.7657,
-    108.2455
+    12.8225,
+    108.2128
   ],
   "Điện Biên": [
-    21.7441,
-    102.9307
+    21.712,
+    103.0232
   ],
   "An Giang": [
-    10.5321,
-    105.2768
+    10.5101,
+    105.1813
   ],
   "Bà Rịa - Vũng Tàu": [
-    10.3547,
-    107.1391
+    10.5097,
+    107.2608
   ],
   "Bình Định": [
-    14.0656,
-    109.0836
+    14.1236,
+    108.949
   ],
   "Bình Dương": [
-    11.198,
-    106.6232
+    11.2156,
+    106.6573
   ],
   "Bình Phước": [
-    11.7435,
-    106.856
+    11.7535,
+    106.9082
   ],
   "Bình Thuận": [
-    11.0332,
-    108.0951
+    11.1181,
+    108.0488
   ],
   "Bạc Liêu": [
-    9.33,
-    105.5162
+    9.3127,
+    105.491
   ],
   "Bắc Giang": [
-    21.3939,
-    106.4008
+    21.3581,
+    106.48
   ],
   "Bắc Kạn": [
-    22.2032,
-    105.8261
+    22.2619,
+    105.8263
   ],
   "Bắc Ninh": [
-    21.088,
-    106.0909
+    21.1091,
+    106.1056
   ],
   "Bến Tre": [
-    10.0263,
-    106.6017
+    10.1259,
+    106.4601
   ],
   "Cà Mau": [
-    8.8974,
-    105.0402
+    9.055,
+    105.0407
   ],
   "Cao Bằng": [
-    22.7281,
-    106.1764
+    22.7451,
+    106.0858
   ],
   "Cần Thơ": [
-    10.0896,
-    105.5693
+    10.115,
+    105.5293
   ],
   "Gia Lai": [
-    13.8683,
-    108.2129
+    13.8358,
+    108.1769
   ],
   "Hà Giang": [
-    22.7369,
-    105.0203
+    22.7685,
+    104.9787
   ],
   "Hà Nội": [
-    21.0266,
-    105.7217
+    20.9858,
+    105.6947
   ],
   "Hà Nam": [
-    20.5074,
-    105.976
+    20.5407,
+    105.9655
   ],
   "Hà Tĩnh": [
-    18.2757,
-    105.802
+    18.2905,
+    105.7361
   ],
   "Hồ Chí Minh city": [
-    10.5916,
-    106.832
+    10.7618,
+    106.6846
   ],
   "Hòa Bình": [
-    20.7224,
-    105.3434
+    20.68,
+    105.3336
   ],
   "Hưng Yên": [
-    20.8211,
-    106.0976
+    20.8142,
+    106.0609
   ],
   "Hải Dương": [
-    20.9443,
-    106.3737
+    20.9313,
+    106.3607
   ],
   "Hải Phòng": [
-    20.774,
-    106.937
+    20.795,
+    106.6776
   ],
   "Hậu Giang": [
-    9.7653,
-    105.5647
+    9.7838,
+    105.6259
   ],
   "Khánh Hòa": [
-    12.3689,
-    109.2349
+    12.3315,
+    109.0376
   ],
   "Kiên Giang": [
-    10.0056,
-    104.5183
+    9.9701,
+    105.2882
   ],
   "Kon Tum": [
-    14.7324,
-    107.9317
+    14.7289,
+    107.9414
   ],
   "Lào Cai": [
-    22.3155,
-    104.1537
+    22.3646,
+    104.1123
   ],
   "Lâm Đồng": [
-    11.9248,
-    108.0942
+    11.7502,
+    108.0957
   ],
   "Lai Châu": [
-    22.2845,
-    103.1359
+    22.3179,
+    103.1885
   ],
   "Lạng Sơn": [
-    21.8039,
-    106.5306
+    21.8392,
+    106.6217
   ],
   "Long An": [
-    10.6685,
-    106.3809
+    10.7309,
+    106.1687
   ],
   "Nam Định": [
-    20.2631,
-    106.2583
+    20.2619,
+    106.2116
   ],
   "Nghệ An": [
-    19.1885,
-    105.1341
+    19.2374,
+    104.9442
   ],
   "Ninh Bình": [
-    20.2317,
-    105.8723
+    20.2189,
+    105.9039
   ],
   "Ninh Thuận": [
-    11.6893,
-    108.9602
+    11.7066,
+    108.8706
   ],
   "Phú Thọ": [
-    21.3188,
-    105.1367
+    21.32,
+    105.1151
   ],
   "Phú Yên": [
-    13.2895,
-    109.1441
+    13.1704,
+    109.0587
   ],
   "Quảng Bình": [
-    17.5983,
-    106.3955
+    17.532,
+    106.2947
   ],
   "Quảng Nam": [
-    15.5582,
-    108.0834
+    15.5904,
+    107.9545
   ],
   "Quảng Ngãi": [
-    14.9847,
-    108.7021
+    14.9924,
+    108.651
   ],
   "Quảng Ninh": [
-    21.0635,
-    107.3749
+    21.2478,
+    107.2748
   ],
   "Quảng Trị": [
-    16.74,
-    106.9827
+    16.7471,
+    106.9293
   ],
   "Sóc Trăng": [
-    9.4649,
-    105.8993
+    9.5567,
+    105.9243
   ],
   "Sơn La": [
-    21.2417,
-    103.9922
+    21.1931,
+    104.072
   ],
   "Tây Ninh": [
-    11.4097,
-    106.2043
+    11.403,
+    106.1614
   ],
   "Thái Bình": [
-    20.4818,
-    106.4816
+    20.507,
+    106.3904
   ],
   "Thái Nguyên": [
-    21.6968,
-    105.9106
+    21.6939,
+    105.8217
   ],
   "Thừa Thiên - Huế": [
-    16.3394,
-    107.6868
+    16.3277,
+    107.501
   ],
   "Thanh Hóa": [
-    20.0536,
-    105.2546
+    20.0441,
+    105.32
   ],
   "Tiền Giang": [
-    10.395,
-    106.4546
+    10.3973,
+    106.306
   ],
   "Trà Vinh": [
-    9.7679,
-    106.3828
+    9.7974,
+    106.306
   ],
   "Tuyên Quang": [
-    22.0936,
-    105.2883
+    22.1136,
+    105.2666
   ],
   "Vĩnh Long": [
-    10.0758,
-    106.0157
+    10.1026,
+    105.9903
   ],
   "Vĩnh Phúc": [
-    21.3665,
-    105.59
+    21.3534,
+    105.5634
   ],
   "Yên Bái": [
-    21.8821,
-    104.525
+    21.7777,
+    104.5665
   ],
   "QĐ.Hoàng Sa": [
-    16.6735,
-    112.3032
+    16.0672,
+    112.5851
   ],
   "QĐ.Trường Sa": [
-    10.8193,
-    114.572
+    11.0527,
+    114.2837
   ]
 }
 
+/**
+ * Refresh PROVINCE_COORDS from the database (don_vi_hanh_chinh), so new
+ * boundaries do not require regenerating this file
+ * @param {object} analyticsService - service exposing getFarmDensity()
+ */
+export async function loadProvinceCoords(analyticsService) {
+  try {
+    const response = await analyticsService.getFarmDensity()
+    for (const province of response.data.provinces || []) {
+      if (province.name && province.latitude != null && province.longitude != null) {
+        PROVINCE_COORDS[province.name] = [province.latitude, province.longitude]
+      }
+    }
+  } catch (error) {
+    console.warn('Could not load province coordinates, using bundled values', error)
+  }
+}
+
 /**
  * Get coordinates for a province name
  * @param {string} provinceName - Name of province (e.g., "Hà Nội")
@@ -277,7 +295,7 @@ export function getProvinceCoords(provinceName) {
   if (PROVINCE_COORDS[provinceName]) {
     return PROVINCE_COORDS[provinceName]
   }
-  
+
   // Try case-insensitive match
   const normalizedName = provinceName.trim()
   for (const [key, value] of Object.entries(PROVINCE_COORDS)) {
@@ -285,7 +303,7 @@ export function getProvinceCoords(provinceName) {
       return value
     }
   }
-  
+
   // Default to Vietnam center
   console.warn(`Province "${provinceName}" not found, using Vietnam center`)
   return [14.0583, 108.2772]
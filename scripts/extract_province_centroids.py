@@ -2,81 +2,212 @@
 """
 Extract province centroids from GeoJSON
 Generates provinceCoordinates.js for frontend use
+
+Per province (Polygon / MultiPolygon, holes included):
+- centroid: area-weighted (shoelace) centroid, NumPy-vectorized over all ring edges
+- label point: a point guaranteed inside the largest part (the centroid
+  itself when it is inside, otherwise the middle of the widest interior
+  span of a horizontal scan line through the centroid)
+
+Optionally writes both points into don_vi_hanh_chinh (cap = 1), which
+/analytics/spatial/farm-density returns and the frontend loads at runtime.
+
+Usage:
+    python scripts/extract_province_centroids.py [--geojson PATH] [--write-db] [--no-js]
 """
+import argparse
 import json
+import sys
 from pathlib import Path
 
-def calculate_polygon_centroid(coords):
-    """Calculate centroid of a polygon using coordinate averaging"""
-    if not coords or not coords[0]:
+import numpy as np
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_GEOJSON = BASE_DIR / 'Frontend/public/data/vietnam-provinces.geojson'
+DEFAULT_OUTPUT = BASE_DIR / 'Frontend/src/utils/provinceCoordinates.js'
+
+COORD_DECIMALS = 4
+
+
+def ring_edges(ring):
+    """Ring -> (x1, y1, x2, y2) arrays of its edges (closes the ring if needed)"""
+    points = np.asarray(ring, dtype=float)[:, :2]
+    if len(points) and not np.array_equal(points[0], points[-1]):
+        points = np.vstack([points, points[:1]])
+    return points[:-1, 0], points[:-1, 1], points[1:, 0], points[1:, 1]
+
+
+def polygon_edges(rings):
+    """All edges of a polygon (exterior + holes) concatenated"""
+    edges = [ring_edges(ring) for ring in rings if len(ring) >= 3]
+    if not edges:
+        empty = np.empty(0)
+        return empty, empty, empty, empty
+    return tuple(np.concatenate(parts) for parts in zip(*edges))
+
+
+def polygon_area_centroid(rings):
+    """
+    Diện tích và tâm (shoelace) của một polygon có lỗ
+
+    Hướng vòng không quan trọng: exterior luôn cộng, hole luôn trừ.
+
+    Returns:
+        (area, cx, cy) với area >= 0 (đơn vị độ vuông)
+    """
+    total_area = 0.0
+    moment_x = 0.0
+    moment_y = 0.0
+    for index, ring in enumerate(rings):
+        if len(ring) < 3:
+            continue
+        x1, y1, x2, y2 = ring_edges(ring)
+        cross = x1 * y2 - x2 * y1
+        signed_area = cross.sum() / 2
+        if signed_area == 0:
+            continue
+        # Exterior dương, hole âm, bất kể hướng vòng
+        sign = (1 if index == 0 else -1) * np.sign(signed_area)
+        total_area += sign * signed_area
+        moment_x += sign * ((x1 + x2) * cross).sum() / 6
+        moment_y += sign * ((y1 + y2) * cross).sum() / 6
+
+    if total_area <= 0:
+        points = np.asarray(rings[0], dtype=float)[:, :2]
+        return 0.0, float(points[:, 0].mean()), float(points[:, 1].mean())
+    return total_area, moment_x / total_area, moment_y / total_area
+
+
+def scanline_crossings(rings, y):
+    """Hoành độ (đã sắp xếp) các điểm cắt của đường ngang y với các cạnh polygon"""
+    x1, y1, x2, y2 = polygon_edges(rings)
+    crosses = (y1 > y) != (y2 > y)
+    x1, y1, x2, y2 = x1[crosses], y1[crosses], x2[crosses], y2[crosses]
+    return np.sort(x1 + (y - y1) * (x2 - x1) / (y2 - y1))
+
+
+def polygon_label_point(rings, cx, cy):
+    """
+    Điểm nằm trong polygon, gần tâm nhất có thể
+
+    Luật chẵn-lẻ trên đường ngang qua tâm: tâm nằm trong polygon khi số điểm
+    cắt bên trái là lẻ. Nếu không, lấy trung điểm khoảng trong rộng nhất.
+    """
+    crossings = scanline_crossings(rings, cy)
+    if len(crossings) < 2:
+        return cx, cy
+    if np.count_nonzero(crossings < cx) % 2 == 1:
+        return cx, cy
+
+    starts, ends = crossings[0::2], crossings[1::2]
+    widest = int(np.argmax(ends[:len(starts)] - starts[:len(ends)]))
+    return float((starts[widest] + ends[widest]) / 2), cy
+
+
+def geometry_centroid_and_label(geometry):
+    """
+    Tâm (trọng số diện tích) và điểm nhãn của Polygon / MultiPolygon
+
+    Returns:
+        ((lat, lng), (lat, lng)) hoặc None nếu geometry không hỗ trợ
+    """
+    if geometry['type'] == 'Polygon':
+        polygons = [geometry['coordinates']]
+    elif geometry['type'] == 'MultiPolygon':
+        polygons = geometry['coordinates']
+    else:
         return None
-    
-    # coords[0] is the exterior ring
-    ring = coords[0]
-    x_sum = sum(point[0] for point in ring)
-    y_sum = sum(point[1] for point in ring)
-    n = len(ring)
-    
-    return [round(y_sum / n, 4), round(x_sum / n, 4)]  # [lat, lng]
-
-def calculate_multipolygon_centroid(coords):
-    """Calculate centroid of a multipolygon"""
-    all_points = []
-    for polygon in coords:
-        if polygon and polygon[0]:
-            all_points.extend(polygon[0])
-    
-    if not all_points:
+
+    parts = np.array([polygon_area_centroid(rings) for rings in polygons if rings and rings[0]])
+    if len(parts) == 0:
         return None
-    
-    x_sum = sum(point[0] for point in all_points)
-    y_sum = sum(point[1] for point in all_points)
-    n = len(all_points)
-    
-    return [round(y_sum / n, 4), round(x_sum / n, 4)]  # [lat, lng]
-
-def extract_province_coords(geojson_path):
-    """Extract province name → coordinates mapping from GeoJSON"""
+
+    areas = parts[:, 0]
+    if areas.sum() > 0:
+        cx, cy = (parts[:, 1:] * areas[:, None]).sum(axis=0) / areas.sum()
+    else:
+        cx, cy = parts[:, 1:].mean(axis=0)
+
+    # Điểm nhãn nằm trên phần lớn nhất (đất liền, không phải đảo)
+    largest = int(np.argmax(areas))
+    _, part_cx, part_cy = parts[largest]
+    rings = [rings for rings in polygons if rings and rings[0]][largest]
+    inside_crossings = scanline_crossings(rings, cy)
+    if np.count_nonzero(inside_crossings < cx) % 2 == 1:
+        label_x, label_y = cx, cy
+    else:
+        label_x, label_y = polygon_label_point(rings, part_cx, part_cy)
+
+    return (
+        [round(float(cy), COORD_DECIMALS), round(float(cx), COORD_DECIMALS)],
+        [round(float(label_y), COORD_DECIMALS), round(float(label_x), COORD_DECIMALS)]
+    )
+
+
+def extract_province_points(geojson_path):
+    """
+    Extract province name → centroid / label point mapping from GeoJSON
+
+    Returns:
+        dict: {name: {"code", "centroid": [lat, lng], "label": [lat, lng]}}
+    """
     with open(geojson_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
-    
-    province_coords = {}
-    
+
+    provinces = {}
+
     for feature in data['features']:
-        name = feature['properties'].get('NAME_1')
-        if not name:
+        properties = feature['properties']
+        name = properties.get('NAME_1')
+        if not name or not feature.get('geometry'):
             continue
-        
-        geom = feature['geometry']
-        geom_type = geom['type']
-        coords = geom['coordinates']
-        
-        if geom_type == 'Polygon':
-            centroid = calculate_polygon_centroid(coords)
-        elif geom_type == 'MultiPolygon':
-            centroid = calculate_multipolygon_centroid(coords)
-        else:
-            print(f"Warning: Unknown geometry type {geom_type} for {name}")
+
+        result = geometry_centroid_and_label(feature['geometry'])
+        if result is None:
+            print(f"Warning: Unknown geometry type {feature['geometry']['type']} for {name}")
             continue
-        
-        if centroid:
-            province_coords[name] = centroid
-    
-    return province_coords
+
+        centroid, label = result
+        provinces[name] = {
+            "code": properties.get('GID_1') or properties.get('ID_1') or name,
+            "centroid": centroid,
+            "label": label
+        }
+
+    return provinces
+
 
 def generate_js_file(province_coords, output_path):
     """Generate JavaScript file with province coordinates"""
     js_content = """/**
  * Province Coordinates Mapping
- * Auto-generated from 63tinh-quandao.geojson
- * Contains centroids of 65 Vietnam provinces and islands
+ * Auto-generated by scripts/extract_province_centroids.py
+ * Contains label points (inside each province) of 65 Vietnam provinces and islands
  */
 
 export const PROVINCE_COORDS = """
-    
+
     js_content += json.dumps(province_coords, ensure_ascii=False, indent=2)
     js_content += """
 
+/**
+ * Refresh PROVINCE_COORDS from the database (don_vi_hanh_chinh), so new
+ * boundaries do not require regenerating this file
+ * @param {object} analyticsService - service exposing getFarmDensity()
+ */
+export async function loadProvinceCoords(analyticsService) {
+  try {
+    const response = await analyticsService.getFarmDensity()
+    for (const province of response.data.provinces || []) {
+      if (province.name && province.latitude != null && province.longitude != null) {
+        PROVINCE_COORDS[province.name] = [province.latitude, province.longitude]
+      }
+    }
+  } catch (error) {
+    console.warn('Could not load province coordinates, using bundled values', error)
+  }
+}
+
 /**
  * Get coordinates for a province name
  * @param {string} provinceName - Name of province (e.g., "Hà Nội")
@@ -87,7 +218,7 @@ export function getProvinceCoords(provinceName) {
   if (PROVINCE_COORDS[provinceName]) {
     return PROVINCE_COORDS[provinceName]
   }
-  
+
   // Try case-insensitive match
   const normalizedName = provinceName.trim()
   for (const [key, value] of Object.entries(PROVINCE_COORDS)) {
@@ -95,31 +226,119 @@ export function getProvinceCoords(provinceName) {
       return value
     }
   }
-  
+
   // Default to Vietnam center
   console.warn(`Province "${provinceName}" not found, using Vietnam center`)
   return [14.0583, 108.2772]
 }
 """
-    
+
     with open(output_path, 'w', encoding='utf-8') as f:
         f.write(js_content)
 
+
+def write_to_database(provinces):
+    """
+    Ghi centroid / label point vào các tỉnh (cap = 1) đã có trong don_vi_hanh_chinh
+
+    Tỉnh được ghép theo tên chuẩn hóa (normalize_province_name), không theo mã:
+    scripts/assign_admin_units.py nạp tỉnh với mã GID_1 của shapefile, còn
+    GeoJSON chỉ có ID_1, upsert theo (cap, ma) sẽ tạo tỉnh thứ hai. Chỉ tỉnh
+    chưa có dòng nào mới được thêm mới. Tỉnh có geom mà vẫn chưa có tâm (tên
+    không có trong GeoJSON) được tính bằng ST_Centroid / ST_PointOnSurface.
+    """
+    sys.path.insert(0, str(BASE_DIR / 'Backend'))
+    from sqlalchemy import func, update
+    from sqlalchemy.dialects.postgresql import insert
+    from database import SessionLocal
+    from models import DonViHanhChinh
+    from models.admin_unit import CAP_TINH
+    from utils.admin_boundaries import normalize_province_name
+
+    db = SessionLocal()
+    try:
+        unit_ids = {}
+        for unit_id, ten in db.query(DonViHanhChinh.id, DonViHanhChinh.ten).filter(
+            DonViHanhChinh.cap == CAP_TINH
+        ):
+            unit_ids.setdefault(normalize_province_name(ten), []).append(unit_id)
+
+        updates = []
+        inserts = []
+        for name, point in provinces.items():
+            values = {
+                "tam_lat": point["centroid"][0],
+                "tam_lon": point["centroid"][1],
+                "nhan_lat": point["label"][0],
+                "nhan_lon": point["label"][1]
+            }
+            ids = unit_ids.get(normalize_province_name(name))
+            if ids:
+                updates.extend({"id": unit_id, **values} for unit_id in ids)
+            else:
+                inserts.append({"cap": CAP_TINH, "ma": point["code"], "ten": name, **values})
+
+        if updates:
+            db.execute(update(DonViHanhChinh), updates)
+        if inserts:
+            statement = insert(DonViHanhChinh.__table__).values(inserts)
+            statement = statement.on_conflict_do_update(
+                constraint="uq_don_vi_hanh_chinh_cap_ma",
+                set_={
+                    column: getattr(statement.excluded, column)
+                    for column in ("ten", "tam_lat", "tam_lon", "nhan_lat", "nhan_lon")
+                }
+            )
+            db.execute(statement)
+
+        centroid = func.ST_Centroid(DonViHanhChinh.geom)
+        label = func.ST_PointOnSurface(DonViHanhChinh.geom)
+        from_geom = db.execute(
+            update(DonViHanhChinh).where(
+                DonViHanhChinh.cap == CAP_TINH,
+                DonViHanhChinh.nhan_lat.is_(None),
+                DonViHanhChinh.geom.isnot(None)
+            ).values(
+                tam_lat=func.round(func.ST_Y(centroid).cast(DonViHanhChinh.tam_lat.type), COORD_DECIMALS),
+                tam_lon=func.round(func.ST_X(centroid).cast(DonViHanhChinh.tam_lon.type), COORD_DECIMALS),
+                nhan_lat=func.round(func.ST_Y(label).cast(DonViHanhChinh.nhan_lat.type), COORD_DECIMALS),
+                nhan_lon=func.round(func.ST_X(label).cast(DonViHanhChinh.nhan_lon.type), COORD_DECIMALS)
+            ).execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    print(f"Updated {len(updates)} province rows, inserted {len(inserts)}, "
+          f"{from_geom} computed from geom in don_vi_hanh_chinh")
+
+
 if __name__ == '__main__':
-    geojson_path = Path('Frontend/public/data/63tinh-quandao.geojson')
-    output_path = Path('Frontend/src/utils/provinceCoordinates.js')
-    
-    # Create utils directory if not exists
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    print(f"Reading GeoJSON from: {geojson_path}")
-    province_coords = extract_province_coords(geojson_path)
-    
-    print(f"Extracted {len(province_coords)} provinces")
-    print("Sample coordinates:")
-    for i, (name, coords) in enumerate(list(province_coords.items())[:5]):
-        print(f"  {name}: {coords}")
-    
-    generate_js_file(province_coords, output_path)
-    print(f"\nGenerated: {output_path}")
+    parser = argparse.ArgumentParser(description="Extract province centroids and label points")
+    parser.add_argument("--geojson", default=str(DEFAULT_GEOJSON), help="GeoJSON ranh giới tỉnh (NAME_1)")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="File provinceCoordinates.js")
+    parser.add_argument("--write-db", action="store_true", help="Ghi vào don_vi_hanh_chinh (cần migration add_admin_units.sql)")
+    parser.add_argument("--no-js", action="store_true", help="Không ghi provinceCoordinates.js")
+    args = parser.parse_args()
+
+    print(f"Reading GeoJSON from: {args.geojson}")
+    provinces = extract_province_points(args.geojson)
+
+    print(f"Extracted {len(provinces)} provinces")
+    print("Sample coordinates (centroid / label):")
+    for name, point in list(provinces.items())[:5]:
+        print(f"  {name}: {point['centroid']} / {point['label']}")
+
+    if not args.no_js:
+        output_path = Path(args.output)
+        # Create utils directory if not exists
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        generate_js_file({name: point["label"] for name, point in provinces.items()}, output_path)
+        print(f"\nGenerated: {output_path}")
+
+    if args.write_db:
+        write_to_database(provinces)
+
     print("✓ Province coordinates ready for use!")